@@ -0,0 +1,170 @@
+"""Benchmarks for CustomListWidget.
+
+Runs under the `offscreen` QPA platform unless `QT_QPA_PLATFORM` is set.
+See `run_benchmarks.py` to run the whole suite and save the results.
+
+Usage:
+    python benchmarks/bench_qlistwidget.py [item_count ...]
+"""
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qListWidget")
+)
+
+from PyQt5 import QtCore, QtWidgets
+
+from bench_qtreewidget import DEFAULT_ITEM_COUNTS, report, timed, _clock
+
+import custom_qlistwidget as qlistwidget
+
+
+REMOVE_COUNT = 1000
+QUERY_REPEAT = 1000
+
+
+# Prefix of the benchmark names per list class
+LIST_MODES = [("list", False), ("list model", True)]
+
+
+def make_list(item_count, model_backed=False):
+    """Create a shown list of `item_count` checkable items.
+
+    Keyword Args:
+        model_backed (bool): Create a `CustomListView` rather than a
+            `CustomListWidget`.
+
+    Returns:
+        tuple(qlistwidget.CustomListWidget or qlistwidget.CustomListView,
+            float): List widget, and the elapsed seconds of its population.
+    """
+    if model_backed:
+        list_widget = qlistwidget.CustomListView()
+    else:
+        list_widget = qlistwidget.CustomListWidget()
+    list_widget.resize(400, 800)
+    list_widget.show()
+
+    start = _clock()
+    if model_backed:
+        list_widget.set_checkable_items(
+            "item{0}".format(num) for num in range(item_count)
+        )
+    else:
+        for num in range(item_count):
+            list_widget.addItem(
+                list_widget.create_checkable_item("item{0}".format(num))
+            )
+    QtWidgets.QApplication.processEvents()
+    seconds = _clock() - start
+    return list_widget, seconds
+
+
+def discard_list(list_widget):
+    list_widget.deleteLater()
+    QtWidgets.QApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def bench_list_populate(item_count):
+    """Time population through `create_checkable_item`, against
+    `CustomListView.set_checkable_items`, up to the first layout.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    results = []
+    for prefix, model_backed in LIST_MODES:
+        list_widget, seconds = make_list(item_count, model_backed)
+        discard_list(list_widget)
+        results.append(("{0} populate".format(prefix), seconds, item_count))
+    return results
+
+
+def bench_list_queries(item_count, repeat=QUERY_REPEAT):
+    """Time `get_selected_text` and `derive_list_items_num`.
+
+    Keyword Args:
+        repeat (int): Number of calls per query.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of calls.
+    """
+    results = []
+    for prefix, model_backed in LIST_MODES:
+        list_widget, _ = make_list(item_count, model_backed)
+        list_widget.setCurrentIndex(
+            list_widget.model().index(item_count // 2, 0)
+        )
+
+        for name, func in [("get_selected_text",
+                            list_widget.get_selected_text),
+                           ("derive_list_items_num",
+                            list_widget.derive_list_items_num)]:
+            start = _clock()
+            for _ in range(repeat):
+                func()
+            results.append(("{0} {1}".format(prefix, name),
+                            _clock() - start, repeat))
+        discard_list(list_widget)
+    return results
+
+
+def bench_list_remove(item_count, remove_count=REMOVE_COUNT):
+    """Time `remove_list_item` of items spread evenly across the list.
+
+    Keyword Args:
+        remove_count (int): Number of items to be selected and removed.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of removed items.
+    """
+    results = []
+    for prefix, model_backed in LIST_MODES:
+        list_widget, _ = make_list(item_count, model_backed)
+        list_widget.setSelectionMode(
+            QtWidgets.QAbstractItemView.ExtendedSelection
+        )
+
+        model = list_widget.model()
+        step = max(item_count // remove_count, 1)
+        selection = QtCore.QItemSelection()
+        rows = range(0, item_count, step)
+        for row in rows:
+            selection.select(model.index(row, 0), model.index(row, 0))
+        list_widget.selectionModel().select(
+            selection, QtCore.QItemSelectionModel.ClearAndSelect
+        )
+
+        seconds = timed(list_widget.remove_list_item)
+        QtWidgets.QApplication.processEvents()
+        discard_list(list_widget)
+        results.append(("{0} remove_list_item".format(prefix), seconds,
+                        len(rows)))
+    return results
+
+
+# Benchmarks of the suite, in running order. Each takes the item count and
+# returns a list of (name, seconds, count).
+BENCHMARKS = [
+    bench_list_populate,
+    bench_list_queries,
+    bench_list_remove,
+]
+
+
+def main(argv):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(argv)
+    item_counts = [int(arg) for arg in argv[1:]] or DEFAULT_ITEM_COUNTS
+    for item_count in item_counts:
+        for bench in BENCHMARKS:
+            report(item_count, bench(item_count))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,1041 @@
+"""Benchmarks for CustomTreeWidget and CustomTreeView.
+
+Runs under the `offscreen` QPA platform unless `QT_QPA_PLATFORM` is set.
+See `run_benchmarks.py` to run the whole suite and save the results.
+
+Usage:
+    python benchmarks/bench_qtreewidget.py [item_count ...]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+TREE_WIDGET_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "qTreeWidget"
+)
+sys.path.insert(0, TREE_WIDGET_DIR)
+
+from collections import OrderedDict
+from functools import partial
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+import custom_qtreewidget_Qt5Compatible as qtreewidget
+
+
+DEFAULT_ITEM_COUNTS = [1000, 10000, 100000]
+PARENT_COUNT = 10
+REMOVE_FRACTIONS = [0.1, 0.5, 1.0]
+MOVE_SELECTED_COUNT = 5000
+MOVE_REPEAT = 20
+RENAME_COUNT = 1000
+# Children renamed, checked, moved and removed each by the diff benchmark
+DIFF_EDIT_COUNT = 100
+PAINT_REPEAT = 20
+# Successive keystrokes of the filter benchmark, narrowing down the matches
+FILTER_KEYSTROKES = [
+    "c", "ch", "chi", "child1", "child12", "child123", "child1234",
+]
+# Interval of the timer measuring the responsiveness of the GUI thread while
+# loading in the background, in milliseconds
+RESPONSIVENESS_INTERVAL = 5
+# Fresh interpreters started per import benchmark, the fastest one is kept
+IMPORT_REPEAT = 5
+# Per-item loops, kept for comparison, are only timed up to this count
+LOOP_ITEM_LIMIT = 100000
+# Virtualized menu entries toggled by the menu benchmark
+MENU_TOGGLE_COUNT = 100
+
+# Prefer the high resolution clock, if any
+_clock = getattr(time, "perf_counter", time.time)
+
+
+def make_tree_items(item_count, parent_count=PARENT_COUNT):
+    """Generate contents of `item_count` children spread across parents.
+
+    Args:
+        item_count (int): Total number of child items.
+        parent_count (int): Number of top-level items.
+
+    Returns:
+        dict: Contents in `{parent: [children]}` format.
+    """
+    tree_items = OrderedDict()
+    per_parent = max(item_count // parent_count, 1)
+    for parent_num in range(parent_count):
+        tree_items["parent{0}".format(parent_num)] = [
+            "child{0}".format(child_num) for child_num in range(per_parent)
+        ]
+    return tree_items
+
+
+def timed(func, *args, **kwargs):
+    """Run given function once.
+
+    Returns:
+        float: Elapsed time in seconds.
+    """
+    start = _clock()
+    func(*args, **kwargs)
+    return _clock() - start
+
+
+def make_tree(tree_items=None, expanded=False):
+    """Create a shown tree, optionally populated.
+
+    Keyword Args:
+        tree_items (dict or None): Contents to populate the tree with.
+        expanded (bool): Expand all top-level items. False by default.
+
+    Returns:
+        qtreewidget.CustomTreeWidget: Tree widget.
+    """
+    tree = qtreewidget.CustomTreeWidget()
+    tree.resize(400, 800)
+    tree.show()
+    if tree_items is not None:
+        tree.populate(tree_items)
+    if expanded:
+        tree.expandAll()
+    QtWidgets.QApplication.processEvents()
+    return tree
+
+
+def discard_tree(tree):
+    tree.deleteLater()
+    QtWidgets.QApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def populate_loop(tree, tree_items):
+    """Per-item population, as done previously in `MainApp.__init__`."""
+    for parent_name, child_names in tree_items.items():
+        parent = qtreewidget.CustomTreeWidgetItem(
+            tree, parent_name, is_tristate=True
+        )
+        for child_name in child_names:
+            qtreewidget.CustomTreeWidgetItem(parent, child_name)
+
+
+# Run by a fresh interpreter, prints the elapsed seconds of the statements
+IMPORT_SCRIPT = """
+import sys
+import time
+sys.path.insert(0, {0!r})
+_clock = getattr(time, "perf_counter", time.time)
+start = _clock()
+{1}
+sys.stdout.write(repr(_clock() - start))
+"""
+
+
+def time_fresh_import(statements, repeat=IMPORT_REPEAT):
+    """Time given statements in fresh interpreters, as on a host launch.
+
+    Args:
+        statements (str): Python code to be timed, eg. "import json".
+
+    Keyword Args:
+        repeat (int): Number of interpreters to be started.
+
+    Returns:
+        float: Elapsed seconds of the fastest run.
+    """
+    env = dict(os.environ)
+    # As imported by the host applications, from cached bytecode
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    script = IMPORT_SCRIPT.format(TREE_WIDGET_DIR, statements)
+    return min(
+        float(subprocess.check_output([sys.executable, "-c", script], env=env))
+        for _ in range(repeat)
+    )
+
+
+def bench_import(item_count):
+    """Time the import of the widgets and the creation of a first tree, each
+    in a fresh interpreter.
+
+    Args:
+        item_count (int): Not used, the timings do not depend on the tree
+            size.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of imports.
+    """
+    # Caches the bytecode, so that it is not compiled by the timed runs
+    time_fresh_import(
+        "import custom_qtreewidget\ncustom_qtreewidget.MainApp", repeat=1
+    )
+
+    results = []
+    for name, statements in [
+            ("import lazy entry", "import custom_qtreewidget"),
+            ("import QtCore only",
+             "from qt_binding import QtCore\nQtCore.Qt"),
+            ("import tree module",
+             "import custom_qtreewidget_Qt5Compatible"),
+            ("startup first tree",
+             "import custom_qtreewidget\n"
+             "from qt_binding import QtWidgets\n"
+             "app = QtWidgets.QApplication([])\n"
+             "tree = custom_qtreewidget.CustomTreeWidget()")]:
+        results.append((name, time_fresh_import(statements), 1))
+    return results
+
+
+def bench_populate(item_count):
+    """Compare the per-item loop against `CustomTreeWidget.populate`, with
+    and without child providers.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree_items = make_tree_items(item_count)
+    lazy_items = OrderedDict(
+        (parent_name, lambda name, child_names=child_names: child_names)
+        for parent_name, child_names in tree_items.items()
+    )
+    results = []
+
+    funcs = [("populate", lambda tree, items: tree.populate(items)),
+             ("populate lazy", lambda tree, items: tree.populate(lazy_items))]
+    if item_count <= LOOP_ITEM_LIMIT:
+        funcs.insert(0, ("populate_loop", populate_loop))
+
+    for name, func in funcs:
+        tree = make_tree()
+        results.append((name, timed(func, tree, tree_items), item_count))
+        discard_tree(tree)
+
+    return results
+
+
+def check_half(tree):
+    """Check the children of every other top-level item, and the first child
+    of the remaining ones, so that every mode has something to filter.
+    """
+    for num in range(tree.topLevelItemCount()):
+        parent = tree.topLevelItem(num)
+        if num % 2:
+            parent.child(0).setCheckState(0, QtCore.Qt.Checked)
+        else:
+            parent.setCheckState(0, QtCore.Qt.Checked)
+    QtWidgets.QApplication.processEvents()
+
+
+def bench_derive_tree_items(item_count):
+    """Time `derive_tree_items` per mode, upon the first and repeated calls.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree = make_tree(make_tree_items(item_count))
+    check_half(tree)
+
+    results = []
+    for mode in ("all", "checked", "unchecked"):
+        results.append((
+            "derive_tree_items {0}".format(mode),
+            timed(tree.derive_tree_items, mode),
+            item_count
+        ))
+        results.append((
+            "derive_tree_items {0} cached".format(mode),
+            timed(tree.derive_tree_items, mode),
+            item_count
+        ))
+    discard_tree(tree)
+    return results
+
+
+def bench_stream(item_count):
+    """Time `iter_tree_items`, and the export/ import of the tree contents
+    through NDJSON and JSON files.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree = make_tree(make_tree_items(item_count))
+    check_half(tree)
+
+    results = []
+    for mode in ("all", "checked"):
+        start = _clock()
+        for _ in tree.iter_tree_items(mode):
+            pass
+        results.append((
+            "iter_tree_items {0}".format(mode), _clock() - start, item_count
+        ))
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        for extension in (".ndjson", ".json"):
+            file_path = os.path.join(temp_dir, "tree_items" + extension)
+            results.append((
+                "export_tree_items {0}".format(extension),
+                timed(tree.export_tree_items, file_path),
+                item_count
+            ))
+
+            import_tree = make_tree()
+            results.append((
+                "import_tree_items {0}".format(extension),
+                timed(import_tree.import_tree_items, file_path),
+                item_count
+            ))
+            discard_tree(import_tree)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    discard_tree(tree)
+    return results
+
+
+def iter_records(tree_items):
+    for parent_name, child_names in tree_items.items():
+        for child_name in child_names:
+            yield parent_name, child_name, QtCore.Qt.Unchecked
+
+
+def bench_background_load(item_count):
+    """Time `load_tree_items_async` of the tree widget, with and without the
+    garbage collector frozen, and of the model-backed view, up to `finished`.
+    The longest stall of the GUI thread is reported as measured by a timer of
+    `RESPONSIVENESS_INTERVAL` ms, with a count of 1.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of loaded items.
+    """
+    tree_items = make_tree_items(item_count)
+
+    results = []
+    for name, tree, freeze_gc in [
+        ("background load", make_tree(), False),
+        ("background load gc frozen", make_tree(), True),
+        ("model background load", qtreewidget.CustomTreeView(), False),
+    ]:
+        tree.show()
+        stalls = [0.0]
+        ticks = [_clock()]
+
+        def measure_stall():
+            now = _clock()
+            stalls[0] = max(stalls[0], now - ticks[0])
+            ticks[0] = now
+
+        timer = QtCore.QTimer()
+        timer.setInterval(RESPONSIVENESS_INTERVAL)
+        timer.timeout.connect(measure_stall)
+
+        loop = QtCore.QEventLoop()
+        start = _clock()
+        timer.start()
+        loader = tree.load_tree_items_async(
+            partial(iter_records, tree_items), freeze_gc=freeze_gc
+        )
+        loader.finished.connect(loop.quit)
+        loop.exec_()
+        seconds = _clock() - start
+        timer.stop()
+
+        results.append((name, seconds, item_count))
+        results.append(("{0} longest stall".format(name), stalls[0], 1))
+        discard_tree(tree)
+    return results
+
+
+def bench_snapshot(item_count):
+    """Time `save_snapshot`/ `load_snapshot` of the tree widget and of the
+    model-backed view. The tree widget, which creates an item per row, is
+    only timed up to `LOOP_ITEM_LIMIT` items.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree_items = make_tree_items(item_count)
+    results = []
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, "tree.snapshot")
+
+        view = qtreewidget.CustomTreeView()
+        view.populate(tree_items)
+        results.append((
+            "view save_snapshot", timed(view.save_snapshot, file_path),
+            item_count
+        ))
+        view.deleteLater()
+
+        view = qtreewidget.CustomTreeView()
+        view.resize(400, 800)
+        view.show()
+        start = _clock()
+        view.load_snapshot(file_path)
+        QtWidgets.QApplication.processEvents()
+        results.append(("view load_snapshot", _clock() - start, item_count))
+        view.deleteLater()
+
+        if item_count <= LOOP_ITEM_LIMIT:
+            tree = make_tree(tree_items)
+            results.append((
+                "save_snapshot", timed(tree.save_snapshot, file_path),
+                item_count
+            ))
+            discard_tree(tree)
+
+            tree = make_tree()
+            start = _clock()
+            tree.load_snapshot(file_path)
+            QtWidgets.QApplication.processEvents()
+            results.append(("load_snapshot", _clock() - start, item_count))
+            discard_tree(tree)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    QtWidgets.QApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    return results
+
+
+def bench_diff(item_count, edit_count=DIFF_EDIT_COUNT):
+    """Time `diff_snapshot_nodes` of edited contents against their baseline,
+    and `derive_diff` of the tree widget up to `LOOP_ITEM_LIMIT` items.
+
+    Keyword Args:
+        edit_count (int): Number of children renamed, checked, moved and
+            removed each.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of compared items.
+    """
+    tree_items = make_tree_items(item_count)
+    baseline_nodes = [
+        (name, 0, list(child_names), bytearray(len(child_names)))
+        for name, child_names in tree_items.items()
+    ]
+    nodes = [
+        (name, 0, list(child_names), bytearray(child_states))
+        for name, _, child_names, child_states in baseline_nodes
+    ]
+    for num in range(edit_count):
+        _, _, child_names, child_states = nodes[num % len(nodes)]
+        row = (num * 7) % len(child_names)
+        child_names[row] += "_renamed"
+        child_states[(row + 1) % len(child_names)] ^= 1
+        child_names.append(child_names.pop((row + 2) % len(child_names)))
+        child_states.append(child_states.pop((row + 2) % len(child_states)))
+        del child_names[(row + 3) % len(child_names)]
+        del child_states[(row + 3) % len(child_states)]
+
+    results = [(
+        "diff_snapshot_nodes",
+        timed(qtreewidget.diff_snapshot_nodes, baseline_nodes, nodes),
+        item_count
+    )]
+
+    if item_count <= LOOP_ITEM_LIMIT:
+        tree = make_tree(tree_items)
+        tree.set_baseline()
+        baseline_nodes = tree.derive_snapshot_nodes()
+        root_item = tree.invisibleRootItem()
+        for num in range(edit_count):
+            parent_item = root_item.child(num % root_item.childCount())
+            child_item = parent_item.child(
+                (num * 7) % parent_item.childCount()
+            )
+            child_item.setText(0, child_item.text(0) + "_renamed")
+        results.append(("derive_diff", timed(tree.derive_diff), item_count))
+        check_diff(tree, baseline_nodes, renamed_count=edit_count)
+
+        # Only the parent of the toggled child is compared again
+        child_item = root_item.child(0).child(0)
+        child_item.setCheckState(0, QtCore.Qt.Checked)
+        results.append(("derive_diff after toggle", timed(tree.derive_diff),
+                        item_count))
+        check_diff(tree, baseline_nodes, renamed_count=edit_count)
+        discard_tree(tree)
+    return results
+
+
+def check_diff(tree, baseline_nodes, renamed_count):
+    """Check the diff of the tree widget against a full comparison.
+
+    Raises:
+        AssertionError: If the diff is wrong.
+    """
+    changes = tree.derive_diff()
+    expected = qtreewidget.diff_snapshot_nodes(
+        baseline_nodes, tree.derive_snapshot_nodes()
+    )
+    if changes != expected or len(changes["renamed"]) != renamed_count:
+        raise AssertionError("derive_diff differs from diff_snapshot_nodes")
+
+
+def bench_check_cascade(item_count):
+    """Time checking/ unchecking a top-level item, cascading to its children.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of toggled child items.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    parent = tree.topLevelItem(0)
+    child_count = parent.childCount()
+
+    results = []
+    for name, state in [("check cascade", QtCore.Qt.Checked),
+                        ("uncheck cascade", QtCore.Qt.Unchecked)]:
+        start = _clock()
+        parent.setCheckState(0, state)
+        # Includes the batched `itemsToggled`/ `contentsUpdate`
+        QtWidgets.QApplication.processEvents()
+        results.append((name, _clock() - start, child_count))
+    discard_tree(tree)
+    return results
+
+
+def bench_bulk_check(item_count):
+    """Time `check_all`, `invert_checks` and `uncheck_all` over the whole
+    tree, and `set_check_state` of every other child of a top-level item.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+
+    results = []
+    for name, func in [("check_all", tree.check_all),
+                       ("invert_checks", tree.invert_checks),
+                       ("uncheck_all", tree.uncheck_all)]:
+        start = _clock()
+        func()
+        # Includes the aggregated `itemsToggled`/ `contentsUpdate`
+        QtWidgets.QApplication.processEvents()
+        results.append((name, _clock() - start, item_count))
+
+    parent = tree.topLevelItem(0)
+    items = [parent.child(num) for num in range(0, parent.childCount(), 2)]
+    start = _clock()
+    tree.set_check_state(items, QtCore.Qt.Checked)
+    QtWidgets.QApplication.processEvents()
+    results.append(("set_check_state", _clock() - start, len(items)))
+    discard_tree(tree)
+    return results
+
+def bench_undo(item_count):
+    """Time a journaled check cascade and bulk removal, and their undo/ redo.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    tree.set_undo_enabled()
+    parent = tree.topLevelItem(0)
+    child_count = parent.childCount()
+
+    results = []
+    start = _clock()
+    parent.setCheckState(0, QtCore.Qt.Checked)
+    QtWidgets.QApplication.processEvents()
+    results.append(("journaled check cascade", _clock() - start, child_count))
+
+    for name, func in [("undo check cascade", tree.undo),
+                       ("redo check cascade", tree.redo)]:
+        start = _clock()
+        func()
+        QtWidgets.QApplication.processEvents()
+        results.append((name, _clock() - start, child_count))
+
+    tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+    model = tree.model()
+    parent_index = tree.indexFromItem(parent)
+    selection = QtCore.QItemSelection(
+        model.index(0, 0, parent_index),
+        model.index(child_count // 2 - 1, 0, parent_index)
+    )
+    tree.selectionModel().select(
+        selection, QtCore.QItemSelectionModel.ClearAndSelect
+    )
+    for name, func in [("journaled remove_selected_item",
+                        tree.remove_selected_item),
+                       ("undo remove_selected_item", tree.undo),
+                       ("redo remove_selected_item", tree.redo)]:
+        start = _clock()
+        func()
+        QtWidgets.QApplication.processEvents()
+        results.append((name, _clock() - start, child_count // 2))
+
+    discard_tree(tree)
+    return results
+
+
+def bench_rename(item_count, rename_count=RENAME_COUNT):
+    """Time the detection of renamed items, up to `contentsUpdate`.
+
+    Keyword Args:
+        rename_count (int): Number of child items to be renamed.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of renamed items.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    # Builds the name index, as kept up to date upon renaming
+    tree.derive_name_index(tree.topLevelItem(0))
+
+    changes = []
+    tree.contentsUpdate.connect(changes.append)
+
+    parent = tree.topLevelItem(0)
+    rename_count = min(rename_count, parent.childCount())
+    start = _clock()
+    for num in range(rename_count):
+        child = parent.child(num)
+        child.setText(0, child.text(0) + "_renamed")
+        # Duplicate-name check of the next rename, see `is_existing_name`
+        tree.is_existing_name(child.text(0), parent)
+    QtWidgets.QApplication.processEvents()
+    seconds = _clock() - start
+
+    discard_tree(tree)
+    return [("rename", seconds, rename_count)]
+
+
+def bench_filter(item_count, keystrokes=FILTER_KEYSTROKES):
+    """Time `CustomTreeWidget.set_filter_text` upon successive keystrokes.
+
+    Keyword Args:
+        keystrokes (list(str)): Successive filter texts, the first of which
+            also hides the top-level items.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of items, matching or indexed.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+
+    results = []
+    seconds = timed(tree.derive_matching_items, "")
+    results.append(("filter build index", seconds, item_count))
+
+    for text in keystrokes:
+        start = _clock()
+        tree.set_filter_text(text)
+        QtWidgets.QApplication.processEvents()
+        seconds = _clock() - start
+        results.append((
+            "filter {0!r}".format(text), seconds, len(tree._filter_matches)
+        ))
+
+    start = _clock()
+    tree.set_filter_text("")
+    QtWidgets.QApplication.processEvents()
+    results.append(("filter clear", _clock() - start, item_count))
+
+    discard_tree(tree)
+    return results
+
+
+def select_children(tree, fraction):
+    """Select a fraction of the child items, spread evenly across parents.
+
+    Returns:
+        int: Number of selected items.
+    """
+    selection = QtCore.QItemSelection()
+    step = max(int(round(1.0 / fraction)), 1)
+    selected_count = 0
+    for parent_num in range(tree.topLevelItemCount()):
+        parent_index = tree.model().index(parent_num, 0)
+        child_count = tree.model().rowCount(parent_index)
+        if step == 1:
+            rows = [(0, child_count - 1)]
+        else:
+            rows = [(row, row) for row in range(0, child_count, step)]
+        for first, last in rows:
+            selection.select(
+                tree.model().index(first, 0, parent_index),
+                tree.model().index(last, 0, parent_index)
+            )
+            selected_count += last - first + 1
+
+    tree.selectionModel().select(
+        selection, QtCore.QItemSelectionModel.ClearAndSelect
+    )
+    return selected_count
+
+
+def remove_loop(tree):
+    """Per-item removal, as done previously in `remove_selected_item`."""
+    root = tree.invisibleRootItem()
+    for item in tree.selectedItems():
+        (item.parent() or root).removeChild(item)
+
+
+def bench_remove(item_count, fractions=REMOVE_FRACTIONS, with_loop=False):
+    """Time `CustomTreeWidget.remove_selected_item` per selected fraction.
+
+    Keyword Args:
+        fractions (list(float)): Fractions of the child items to be removed.
+        with_loop (bool): Also time the previous per-item removal.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of removed items.
+    """
+    tree_items = make_tree_items(item_count)
+    results = []
+    for fraction in fractions:
+        funcs = [("remove_selected_item", lambda tree: tree.remove_selected_item())]
+        if with_loop and item_count <= LOOP_ITEM_LIMIT:
+            funcs.insert(0, ("remove_loop", remove_loop))
+
+        for name, func in funcs:
+            tree = make_tree()
+            tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+            tree.populate(tree_items)
+            tree.expandAll()
+            QtWidgets.QApplication.processEvents()
+
+            selected_count = select_children(tree, fraction)
+            seconds = timed(func, tree)
+            QtWidgets.QApplication.processEvents()
+            results.append(
+                ("{0} {1:.0%}".format(name, fraction), seconds, selected_count)
+            )
+            discard_tree(tree)
+
+    return results
+
+
+def bench_move_item(item_count, repeat=MOVE_REPEAT):
+    """Time `CustomTreeWidget.move_item` of a child item, both ways.
+
+    Keyword Args:
+        repeat (int): Number of moves per direction.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of moves.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    parent = tree.topLevelItem(0)
+    tree.setCurrentItem(parent.child(parent.childCount() // 2))
+
+    results = []
+    for direction in ("up", "down"):
+        start = _clock()
+        for _ in range(repeat):
+            tree.move_item(direction)
+        QtWidgets.QApplication.processEvents()
+        results.append(
+            ("move_item {0}".format(direction), _clock() - start, repeat)
+        )
+    discard_tree(tree)
+    return results
+
+
+def bench_move(item_count, selected_count=MOVE_SELECTED_COUNT):
+    """Time `CustomTreeWidget.move_item_multi` by one position, both ways.
+
+    Keyword Args:
+        selected_count (int): Number of child items to be selected, spread
+            evenly across parents.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of moved items.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+
+    fraction = min(float(selected_count) / item_count, 1.0)
+    selected_count = select_children(tree, fraction)
+
+    results = []
+    for direction in ("up", "down"):
+        seconds = timed(tree.move_item_multi, direction)
+        QtWidgets.QApplication.processEvents()
+        results.append(
+            ("move_item_multi {0}".format(direction), seconds, selected_count)
+        )
+    discard_tree(tree)
+    return results
+
+
+def show_menu(menu):
+    """Pop given menu up and hide it, as upon a click.
+
+    Args:
+        menu (QtWidgets.QMenu): Menu to be shown.
+    """
+    # Silences the warnings of the `offscreen` platform about popups
+    handler = QtCore.qInstallMessageHandler(lambda *args: None)
+    try:
+        menu.popup(QtCore.QPoint(0, 0))
+        menu.hide()
+    finally:
+        QtCore.qInstallMessageHandler(handler)
+
+
+def build_menu_per_click(tree):
+    """Build the menu of the tree items from scratch, as `MainApp` used to
+    upon every click.
+
+    Returns:
+        qtreewidget.QCustomMenu: Menu of the tree items.
+    """
+    menu = qtreewidget.QCustomMenu(title="")
+    for parent_name, child_names in tree.derive_tree_items().items():
+        sub_menu = qtreewidget.QCustomMenu(title=parent_name, parent=menu)
+        menu.addAction(sub_menu.menuAction())
+        for child_name in child_names:
+            sub_menu.addAction(qtreewidget.QSubAction(child_name, sub_menu))
+    return menu
+
+
+def bench_tree_menu(item_count):
+    """Compare rebuilding the menu of the tree items per click against
+    `TreeMenuModel`, showing the menu after an edit. Rebuilding is only
+    timed up to `LOOP_ITEM_LIMIT` items.
+
+    Also times the first popup of a virtualized submenu, filtering it
+    through successive keystrokes, before and after indexing its names, and
+    syncing check states between its entries and the tree items.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of tree items.
+    """
+    tree = make_tree(make_tree_items(item_count))
+    parent = tree.topLevelItem(0)
+    child = parent.child(0)
+
+    results = []
+    if item_count <= LOOP_ITEM_LIMIT:
+        start = _clock()
+        menu = build_menu_per_click(tree)
+        show_menu(menu)
+        results.append(("menu rebuilt per click", _clock() - start, item_count))
+        menu.deleteLater()
+        QtWidgets.QApplication.sendPostedEvents(
+            None, QtCore.QEvent.DeferredDelete
+        )
+
+    tree_menu = qtreewidget.TreeMenuModel(tree)
+    start = _clock()
+    show_menu(tree_menu.menu())
+    results.append(("menu model first popup", _clock() - start, item_count))
+
+    child.setText(0, child.text(0) + "_renamed")
+    QtWidgets.QApplication.processEvents()
+    start = _clock()
+    show_menu(tree_menu.menu())
+    results.append(("menu model popup after edit", _clock() - start,
+                     item_count))
+
+    # Virtualized, as having more than `virtual_entry_count` child items
+    sub_menu = tree_menu.menu().actions()[0].menu()
+    start = _clock()
+    show_menu(sub_menu)
+    results.append(("menu model first submenu popup", _clock() - start,
+                    parent.childCount()))
+
+    entries = sub_menu.virtual_entries()
+    if entries is not None:
+        # Scanning the names, then looking them up once indexed
+        for state in ("scan", "index"):
+            if state == "index":
+                start = _clock()
+                while not entries.is_indexed():
+                    QtWidgets.QApplication.processEvents()
+                results.append(("virtual menu indexing", _clock() - start,
+                                entries.entry_count()))
+
+            for text in FILTER_KEYSTROKES:
+                start = _clock()
+                entries.set_filter_text(text)
+                results.append((
+                    "virtual filter '{0}' {1}".format(text, state),
+                    _clock() - start, entries.entry_count()
+                ))
+            entries.set_filter_text("")
+
+        # Check state binding, both ways
+        toggle_count = min(MENU_TOGGLE_COUNT, parent.childCount())
+        start = _clock()
+        for row in range(toggle_count):
+            sub_menu.entryToggled.emit(row, row % 2 == 0)
+        results.append(("menu toggles to tree", _clock() - start,
+                        toggle_count))
+
+        children = [parent.child(num) for num in range(parent.childCount())]
+        start = _clock()
+        tree_menu.update_check_states(children)
+        results.append(("tree toggles to menu", _clock() - start,
+                        len(children)))
+
+    tree_menu.menu().deleteLater()
+    discard_tree(tree)
+    return results
+
+
+def bench_paint(item_count, repeat=PAINT_REPEAT):
+    """Time painting of a full viewport through `CustomTreeDelegate`, without
+    and with every highlight rule enabled, then while filtered and compared
+    against a baseline.
+
+    Keyword Args:
+        repeat (int): Number of paints per case.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of painted rows.
+    """
+    tree = make_tree(make_tree_items(item_count), expanded=True)
+    delegate = qtreewidget.CustomTreeDelegate(tree)
+    tree.setItemDelegate(delegate)
+
+    # Flag every visible row with some categories
+    parent = tree.topLevelItem(0)
+    categories = [
+        qtreewidget.HIGHLIGHT_NEW,
+        qtreewidget.HIGHLIGHT_RENAMED,
+        qtreewidget.HIGHLIGHT_SEARCH_HIT,
+        qtreewidget.HIGHLIGHT_ERROR,
+    ]
+    for num in range(min(parent.childCount(), 200)):
+        parent.child(num).set_highlight(categories[num % len(categories)])
+        if num % 3 == 0:
+            parent.child(num).setCheckState(0, QtCore.Qt.Checked)
+
+    row_height = max(tree.sizeHintForRow(0), 1)
+    row_count = tree.viewport().height() // row_height
+
+    results = []
+    for name, enabled in [("paint viewport", False),
+                          ("paint viewport highlighted", True)]:
+        if enabled:
+            color = QtGui.QColor(255, 0, 0)
+            delegate.text_color = color
+            delegate.set_highlight_rule(
+                qtreewidget.HIGHLIGHT_CHECKED, background_color=color
+            )
+            delegate.set_highlight_rule(
+                qtreewidget.HIGHLIGHT_SEARCH_HIT, bold=True
+            )
+            delegate.set_highlight_rule(
+                qtreewidget.HIGHLIGHT_ERROR, text_color=color, italic=True
+            )
+
+        tree.viewport().grab()
+        start = _clock()
+        for _ in range(repeat):
+            tree.viewport().grab()
+        results.append((name, _clock() - start, row_count * repeat))
+
+    # Search hits and diff flags are folded in per row
+    tree.set_baseline()
+    for num in range(0, min(parent.childCount(), 200), 5):
+        child = parent.child(num)
+        child.setText(0, child.text(0) + "_renamed")
+    tree.set_filter_text("1")
+    tree.expandAll()
+    tree.scrollToTop()
+    tree.viewport().grab()
+    start = _clock()
+    for _ in range(repeat):
+        tree.viewport().grab()
+    results.append((
+        "paint viewport filtered with baseline", _clock() - start,
+        row_count * repeat
+    ))
+
+    discard_tree(tree)
+    return results
+
+
+def bench_model(item_count):
+    """Time the model-backed engine: populate and `derive_tree_items`.
+
+    Returns:
+        list(tuple(str, float, int)): Benchmark name, elapsed seconds and
+            number of processed items.
+    """
+    tree_items = make_tree_items(item_count)
+    view = qtreewidget.CustomTreeView()
+    view.setModel(qtreewidget.CustomTreeModel(view))
+    view.resize(400, 800)
+    view.show()
+
+    results = [("model populate", timed(view.populate, tree_items), item_count)]
+    QtWidgets.QApplication.processEvents()
+
+    model = view.model()
+    for row in range(0, model.rowCount(), 2):
+        model.setData(model.index(row, 0), QtCore.Qt.Checked,
+                      QtCore.Qt.CheckStateRole)
+    for mode in ("all", "checked", "unchecked"):
+        results.append((
+            "model derive_tree_items {0}".format(mode),
+            timed(view.derive_tree_items, mode),
+            item_count
+        ))
+
+    view.deleteLater()
+    QtWidgets.QApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    return results
+
+
+# Benchmarks of the suite, in running order. Each takes the item count and
+# returns a list of (name, seconds, count).
+BENCHMARKS = [
+    bench_import,
+    bench_populate,
+    bench_derive_tree_items,
+    bench_stream,
+    bench_background_load,
+    bench_snapshot,
+    bench_diff,
+    bench_check_cascade,
+    bench_bulk_check,
+    bench_undo,
+    bench_rename,
+    bench_filter,
+    bench_move_item,
+    bench_move,
+    bench_remove,
+    bench_tree_menu,
+    bench_paint,
+    bench_model,
+]
+
+
+def report(item_count, results):
+    for name, seconds, count in results:
+        print ("{0:>10} items  {1:<36} {2:>9.4f}s  {3:>14,.0f} items/sec".format(
+            item_count, name, seconds, count / max(seconds, 1e-9)
+        ))
+
+
+def main(argv):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(argv)
+    item_counts = [int(arg) for arg in argv[1:]] or DEFAULT_ITEM_COUNTS
+    for item_count in item_counts:
+        for bench in BENCHMARKS:
+            report(item_count, bench(item_count))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
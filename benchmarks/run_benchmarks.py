@@ -0,0 +1,183 @@
+"""Runs the benchmark suite of the tree and list widgets, and saves the
+results as JSON to be compared across releases.
+
+Runs under the `offscreen` QPA platform unless `QT_QPA_PLATFORM` is set.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1000 100000 1000000]
+        [--output results.json] [--compare baseline.json] [--only populate]
+
+Results are saved in the following format:
+
+    ..code-block:: json
+            {
+                'environment': {'python': '3.8.10', 'qt': '5.15.2', ...},
+                'results': [
+                    {
+                        'module': 'bench_qtreewidget',
+                        'benchmark': 'populate',
+                        'size': 1000,
+                        'seconds': 0.0051,
+                        'count': 1000,
+                        'items_per_sec': 196078.4
+                    }
+                ]
+            }
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+import bench_qlistwidget
+import bench_qtreewidget
+
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def derive_environment():
+    """Derive the versions the results have been measured with.
+
+    Returns:
+        dict: Python, Qt and PyQt versions, platform, QPA platform, date and
+            git revision if any.
+    """
+    try:
+        revision = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        "python": platform.python_version(),
+        "qt": QtCore.QT_VERSION_STR,
+        "pyqt": QtCore.PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": revision,
+    }
+
+
+def run_suite(sizes, only=None):
+    """Run every benchmark of the tree and list widgets, per size.
+
+    Args:
+        sizes (list(int)): Item counts to run the benchmarks with.
+
+    Keyword Args:
+        only (list(str) or None): Substrings of benchmark functions to be run,
+            eg. "populate". All benchmarks are run if None.
+
+    Returns:
+        list(dict): Results, see module docstring.
+    """
+    modules = [bench_qtreewidget, bench_qlistwidget]
+
+    results = []
+    for size in sizes:
+        for module in modules:
+            for bench in module.BENCHMARKS:
+                if only and not any(name in bench.__name__ for name in only):
+                    continue
+
+                bench_results = bench(size)
+                bench_qtreewidget.report(size, bench_results)
+                for name, seconds, count in bench_results:
+                    results.append({
+                        "module": module.__name__,
+                        "benchmark": name,
+                        "size": size,
+                        "seconds": seconds,
+                        "count": count,
+                        "items_per_sec": count / max(seconds, 1e-9),
+                    })
+    return results
+
+
+def compare_results(baseline, results):
+    """Print the speed-up of each result against the baseline.
+
+    Args:
+        baseline (dict): Saved results to compare against.
+        results (list(dict)): Current results.
+    """
+    baseline_seconds = dict(
+        ((result["benchmark"], result["size"]), result["seconds"])
+        for result in baseline["results"]
+    )
+    print ("\nCompared to {0} ({1}):".format(
+        baseline["environment"].get("revision"),
+        baseline["environment"].get("date")
+    ))
+    for result in results:
+        seconds = baseline_seconds.get((result["benchmark"], result["size"]))
+        if seconds is None:
+            continue
+        print ("{0:>10} items  {1:<36} {2:>8.2f}x".format(
+            result["size"],
+            result["benchmark"],
+            seconds / max(result["seconds"], 1e-9)
+        ))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+        help="Item counts to run the benchmarks with."
+    )
+    parser.add_argument(
+        "--output",
+        help="Path of the JSON results. Saved into benchmarks/results/ by "
+             "default."
+    )
+    parser.add_argument(
+        "--compare", help="Path of previous JSON results to compare against."
+    )
+    parser.add_argument(
+        "--only", nargs="+",
+        help="Only run the benchmark functions containing these names."
+    )
+    args = parser.parse_args(argv[1:])
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(argv)
+
+    environment = derive_environment()
+    results = run_suite(args.sizes, only=args.only)
+
+    output = args.output
+    if output is None:
+        if not os.path.isdir(RESULTS_DIR):
+            os.makedirs(RESULTS_DIR)
+        output = os.path.join(RESULTS_DIR, "{0}_{1}.json".format(
+            time.strftime("%Y%m%d_%H%M%S"), environment["revision"] or "local"
+        ))
+
+    with open(output, "w") as json_file:
+        json.dump(
+            {"environment": environment, "results": results},
+            json_file,
+            indent=4
+        )
+    print ("\nResults saved to {0}".format(output))
+
+    if args.compare:
+        with open(args.compare) as json_file:
+            compare_results(json.load(json_file), results)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,12 +1,30 @@
-from qtswitch import QtCore, QtGui
+import logging
+from array import array
+
+# Lazy binding layer, shipped next to this module
+from qt_binding import QtCore, QtGui, QtWidgets
+
+LOGGER = logging.getLogger(__name__)
 
 
 # Globals if 'CategoryDelegate' is used.
 IsCategoryRole = QtCore.Qt.UserRole
 ParentRole = QtCore.Qt.UserRole + 1
 
+# Bits of the per-row states of `CustomListModel`
+_CHECKED_BIT = 0x01
+_EDITABLE_BIT = 0x02
+
+# Typecode of unsigned 32-bit arrays, for the offsets into the string table
+# of `CustomListModel`. "L" is 64-bit on most 64-bit platforms.
+_UINT32 = "I" if array("I").itemsize == 4 else "L"
+# Ends each text of the string table, as it is never part of UTF-8 text
+_TEXT_END = b"\xff"
+# Size of the string table addressed by the unsigned 32-bit offsets, 4GB
+_MAX_TABLE_SIZE = 1 << 32
 
-class CategoryDelegate(QtGui.QStyledItemDelegate):
+
+class CategoryDelegate(QtWidgets.QStyledItemDelegate):
     # https://stackoverflow.com/questions/56999157/check-an-item-that-effects-on-a-certain-set-of-items-within-qlistwidget
     def editorEvent(self, event, model, option, index):
         old_state = model.data(index, QtCore.Qt.CheckStateRole)
@@ -26,7 +44,7 @@ class CategoryDelegate(QtGui.QStyledItemDelegate):
         return res
 
 
-class CustomListWidget(QtGui.QListWidget):
+class CustomListWidget(QtWidgets.QListWidget):
     def __init__(self, parent=None):
         super(CustomListWidget, self).__init__(parent=parent)
 
@@ -72,7 +90,7 @@ class CustomListWidget(QtGui.QListWidget):
         Returns:
             str: Name of the list item.
         """
-        return self.get_current_selected_item.text()
+        return self.get_current_selected_item().text()
 
     def get_selected_row(self):
         """Derive row number of current selected list item.
@@ -106,7 +124,7 @@ class CustomListWidget(QtGui.QListWidget):
         Returns:
             QListWidgetItem: List-widget item.
         """
-        list_item = QtGui.QListWidgetItem(item_text)
+        list_item = QtWidgets.QListWidgetItem(item_text)
         if is_editable:
             list_item.setFlags(
                 list_item.flags()
@@ -129,9 +147,9 @@ class CustomListWidget(QtGui.QListWidget):
         Args:
             event ():
         """
-        list_menu = QtGui.QMenu()
+        list_menu = QtWidgets.QMenu()
         it = self.itemAt(self.viewport().mapFromGlobal(QtGui.QCursor().pos()))
-        update_cat_items = QtGui.QAction("Check all or none", self)
+        update_cat_items = QtWidgets.QAction("Check all or none", self)
         # update_cat_items.triggered.connect(self.update_opts)
         list_menu.addAction(update_cat_items)
         list_menu.exec_(QtGui.QCursor().pos())
@@ -143,7 +161,435 @@ class CustomListWidget(QtGui.QListWidget):
 
 
 
-class MainApp(QtGui.QWidget):
+class CustomListModel(QtCore.QAbstractListModel):
+    """Model-backed storage for large lists, to be used with
+    `CustomListView`.
+
+    Rows are not wrapped into Python objects. Their texts are encoded as
+    UTF-8 into a single string table, each ended by a 0xFF byte and
+    addressed by an array of unsigned 32-bit start offsets, and their check/
+    editable states are packed into a bytearray, one byte per row. Texts are
+    only decoded for the rows being shown.
+
+    Renamed rows get their new text appended to the table, and removed rows
+    leave theirs in place. The table is compacted once more than half of it
+    is unused, so it holds up to 2GB of text. Texts that would take the
+    table beyond the 4GB addressed by the offsets are rejected with a
+    ValueError, and the rows are left as they were.
+
+    Args:
+        parent (QtCore.QObject or None): Parent object.
+    """
+    def __init__(self, parent=None):
+        super(CustomListModel, self).__init__(parent)
+        self._table = bytearray()
+        self._starts = array(_UINT32)
+        self._states = bytearray()
+        # Number of bytes of the table used by the rows, ends included
+        self._text_size = 0
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._states)
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        flags = (
+            QtCore.Qt.ItemIsEnabled
+            | QtCore.Qt.ItemIsSelectable
+            | QtCore.Qt.ItemIsUserCheckable
+            | QtCore.Qt.ItemNeverHasChildren
+        )
+        if self._states[index.row()] & _EDITABLE_BIT:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return self.item_text(row)
+
+        elif role == QtCore.Qt.CheckStateRole:
+            if self._states[row] & _CHECKED_BIT:
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """Override QAbstractListModel setData function.
+
+        Args:
+            index (QtCore.QModelIndex): Index of the row.
+            value (int or unicode): New value of the row for given role.
+            role (int): Value of Qt.ItemDataRole. It can be Qt.EditRole or
+                Qt.CheckStateRole.
+
+        Returns:
+            bool: True if the value has been set. False for a text that would
+                take the string table beyond 4GB.
+        """
+        if not index.isValid():
+            return False
+
+        row = index.row()
+        if role == QtCore.Qt.EditRole:
+            if not value or value == self.item_text(row):
+                return False
+            try:
+                self._set_text(row, value)
+            except ValueError as error:
+                # Not raised, as views call this from C++
+                LOGGER.error("Row %d not renamed: %s", row, error)
+                return False
+            self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole, role])
+            return True
+
+        elif role == QtCore.Qt.CheckStateRole:
+            if value == QtCore.Qt.Checked:
+                self._states[row] |= _CHECKED_BIT
+            else:
+                self._states[row] &= ~_CHECKED_BIT
+            self.dataChanged.emit(index, index, [role])
+            return True
+
+        return False
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        if parent.isValid() or count <= 0:
+            return False
+        last = row + count - 1
+        if row < 0 or last >= len(self._states):
+            return False
+
+        self.beginRemoveRows(parent, row, last)
+        self._text_size -= sum(
+            self._derive_text_size(num) for num in range(row, last + 1)
+        )
+        del self._starts[row:last + 1]
+        del self._states[row:last + 1]
+        self.endRemoveRows()
+
+        if self._text_size * 2 < len(self._table):
+            self._compact()
+        return True
+
+    def set_items(self, texts, is_editable=False):
+        """Replace all rows with given texts, unchecked.
+
+        Args:
+            texts (iterable(str)): Texts of the rows.
+
+        Keyword Args:
+            is_editable (bool): Allows the rows to be renamed. False by
+                default.
+
+        Raises:
+            ValueError: If the texts exceed the 4GB of the string table.
+        """
+        encoded = [text.encode("utf-8") for text in texts]
+        self._check_table_size(encoded, 0)
+
+        self.beginResetModel()
+        self._table = bytearray()
+        self._starts = array(_UINT32)
+        self._states = bytearray()
+        self._text_size = 0
+        self._append_rows(encoded, is_editable)
+        self.endResetModel()
+
+    def add_items(self, texts, is_editable=False):
+        """Append rows of given texts, unchecked.
+
+        Args:
+            texts (iterable(str)): Texts of the rows.
+
+        Keyword Args:
+            is_editable (bool): Allows the rows to be renamed. False by
+                default.
+
+        Raises:
+            ValueError: If the texts would take the string table beyond 4GB.
+        """
+        encoded = [text.encode("utf-8") for text in texts]
+        if not encoded:
+            return
+        self._check_table_size(encoded)
+        first = len(self._states)
+        self.beginInsertRows(QtCore.QModelIndex(), first,
+                             first + len(encoded) - 1)
+        self._append_rows(encoded, is_editable)
+        self.endInsertRows()
+
+    def item_text(self, row):
+        """Derive the text of given row.
+
+        Args:
+            row (int): Row number.
+
+        Returns:
+            str: Text of the row.
+        """
+        start = self._starts[row]
+        table = self._table
+        return table[start:table.index(_TEXT_END, start)].decode("utf-8")
+
+    def is_checked(self, row):
+        """Derive if given row is checked.
+
+        Args:
+            row (int): Row number.
+
+        Returns:
+            bool: True if the row is checked.
+        """
+        return bool(self._states[row] & _CHECKED_BIT)
+
+    def _append_rows(self, encoded, is_editable):
+        """Append unchecked rows of given UTF-8 encoded texts.
+
+        Args:
+            encoded (list(bytes)): Encoded texts of the rows.
+            is_editable (bool): Allows the rows to be renamed.
+        """
+        self._append_encoded(encoded)
+        state = _EDITABLE_BIT if is_editable else 0
+        self._states.extend(bytearray([state]) * len(encoded))
+
+    def _derive_text_size(self, row):
+        """Derive the number of bytes of the table used by given row.
+
+        Args:
+            row (int): Row number.
+
+        Returns:
+            int: Size of the encoded text of the row, its end included.
+        """
+        start = self._starts[row]
+        return self._table.index(_TEXT_END, start) + 1 - start
+
+    def _check_table_size(self, encoded, table_size=None):
+        """Check that given texts fit into the string table, as addressed by
+        unsigned 32-bit offsets.
+
+        Args:
+            encoded (list(bytes)): Encoded texts to be appended.
+
+        Keyword Args:
+            table_size (int or None): Size of the table they are appended
+                to, the current one if None.
+
+        Raises:
+            ValueError: If the table would exceed 4GB.
+        """
+        if table_size is None:
+            table_size = len(self._table)
+        # Each text is followed by its end
+        size = table_size + sum(map(len, encoded)) + len(encoded)
+        if size > _MAX_TABLE_SIZE:
+            raise ValueError(
+                "String table would take {0} bytes, beyond the {1} bytes "
+                "addressed by its 32-bit offsets".format(size, _MAX_TABLE_SIZE)
+            )
+
+    def _append_encoded(self, encoded):
+        """Append UTF-8 encoded texts to the string table, along with their
+        offsets.
+
+        Args:
+            encoded (list(bytes)): Encoded texts of the rows.
+
+        Raises:
+            ValueError: If the table would exceed 4GB, see
+                `_check_table_size`. Nothing is appended then.
+        """
+        if not encoded:
+            return
+        self._check_table_size(encoded)
+        starts = self._starts
+        offset = len(self._table)
+        first_offset = offset
+        for data in encoded:
+            starts.append(offset)
+            offset += len(data) + 1
+
+        self._table.extend(_TEXT_END.join(encoded))
+        self._table.extend(_TEXT_END)
+        self._text_size += offset - first_offset
+
+    def _set_text(self, row, text):
+        """Point given row to its new text, appended to the string table.
+
+        Args:
+            row (int): Row number.
+            text (str): New text of the row.
+        """
+        data = text.encode("utf-8")
+        if len(self._table) + len(data) + 1 > _MAX_TABLE_SIZE:
+            # Makes room first, as the old texts of the renamed rows are
+            # dropped
+            self._compact()
+        self._check_table_size([data])
+        self._text_size += len(data) + 1 - self._derive_text_size(row)
+        self._starts[row] = len(self._table)
+        self._table.extend(data)
+        self._table.extend(_TEXT_END)
+
+        if self._text_size * 2 < len(self._table):
+            self._compact()
+
+    def _compact(self):
+        """Rebuild the string table with the texts of the rows only."""
+        table = self._table
+        encoded = [
+            bytes(table[start:table.index(_TEXT_END, start)])
+            for start in self._starts
+        ]
+        self._table = bytearray()
+        self._starts = array(_UINT32)
+        self._text_size = 0
+        self._append_encoded(encoded)
+
+
+class CustomListView(QtWidgets.QListView):
+    """Model-backed counterpart of `CustomListWidget`, for large lists.
+
+    Provides the same helper API as `CustomListWidget`, but rows are
+    addressed by `QtCore.QModelIndex` instead of `QListWidgetItem`, and
+    added through `add_checkable_items` instead of `create_checkable_item`.
+
+    Args:
+        parent (QtWidgets.QWidget or None): Parent widget.
+    """
+    # Rows laid out per event-loop turn
+    layout_batch_size = 5000
+
+    def __init__(self, parent=None):
+        super(CustomListView, self).__init__(parent=parent)
+
+        # All rows are of the same size, which spares the view from
+        # measuring each row upon layout.
+        self.setUniformItemSizes(True)
+        # Lays the rows out over successive event-loop turns, starting with
+        # the visible ones
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setBatchSize(self.layout_batch_size)
+
+        self.setModel(CustomListModel(self))
+
+    def initial_selection(self):
+        """Always selects the first list item if any.
+        """
+        if self.derive_list_items_num():
+            self.setCurrentIndex(self.model().index(0, 0))
+            self.setFocus()
+
+    def get_current_selected_item(self):
+        """Derive currently selected row.
+
+        Returns:
+            QtCore.QModelIndex: Index of the row, invalid if none.
+        """
+        return self.currentIndex()
+
+    def get_selected_text(self):
+        """Derive text name of current selected list item.
+
+        Returns:
+            str or None: Name of the list item.
+        """
+        current = self.get_current_selected_item()
+        if current.isValid():
+            return self.model().item_text(current.row())
+
+    def get_selected_row(self):
+        """Derive row number of current selected list item.
+
+        Returns:
+            int: Row number of currently selected item, -1 if none.
+        """
+        return self.currentIndex().row()
+
+    def derive_list_items_num(self):
+        """Derive the number of list items.
+
+        Returns:
+            int: The number of rows found in the model.
+        """
+        return self.model().rowCount()
+
+    def add_checkable_items(self, item_texts, is_editable=False):
+        """Append checkable list items, unchecked upon creation.
+
+        Args:
+            item_texts (iterable(str)): Names of the list items.
+
+        Keyword Args:
+            is_editable (bool): Allows list items to be editable.
+                False by default.
+        """
+        self.model().add_items(item_texts, is_editable=is_editable)
+
+    def set_checkable_items(self, item_texts, is_editable=False):
+        """Replace all list items with checkable ones, unchecked upon
+        creation.
+
+        Args:
+            item_texts (iterable(str)): Names of the list items.
+
+        Keyword Args:
+            is_editable (bool): Allows list items to be editable.
+                False by default.
+        """
+        self.model().set_items(item_texts, is_editable=is_editable)
+
+    def contextMenuEvent(self, event):
+        """Right-click menu action on list items.
+
+        Args:
+            event ():
+        """
+        list_menu = QtWidgets.QMenu()
+        update_cat_items = QtWidgets.QAction("Check all or none", self)
+        list_menu.addAction(update_cat_items)
+        list_menu.exec_(QtGui.QCursor().pos())
+
+    def remove_list_item(self):
+        """Remove selected list items.
+
+        Contiguous runs of selected rows are removed in a single operation
+        each, from the last one, reading the selection ranges rather than
+        creating an index per selected row.
+        """
+        rows = []
+        for selection_range in self.selectionModel().selection():
+            rows.extend(
+                range(selection_range.top(), selection_range.bottom() + 1)
+            )
+        if not rows:
+            return
+
+        rows.sort()
+        runs = []
+        first = last = rows[0]
+        for row in rows[1:]:
+            if row > last + 1:
+                runs.append((first, last))
+                first = row
+            last = row
+        runs.append((first, last))
+
+        model = self.model()
+        for first, last in reversed(runs):
+            model.removeRows(first, last - first + 1)
+
+
+class MainApp(QtWidgets.QWidget):
     def __init__(self):
         super(MainApp, self).__init__()
 
@@ -151,8 +597,8 @@ class MainApp(QtGui.QWidget):
 
         ########################################################################
 
-        layout = QtGui.QVBoxLayout()
-        self.btn = QtGui.QPushButton("TEST BTN.")
+        layout = QtWidgets.QVBoxLayout()
+        self.btn = QtWidgets.QPushButton("TEST BTN.")
         layout.addWidget(self._ui)
         layout.addWidget(self.btn)
 
@@ -178,10 +624,23 @@ class MainApp(QtGui.QWidget):
 
 
 
+### model-backed ###
+def main_model_backed(item_count=500000):
+    import sys
+
+    app = QtWidgets.QApplication(sys.argv)
+    w = CustomListView()
+    w.set_checkable_items("Item {}".format(x) for x in range(item_count))
+    w.initial_selection()
+    w.show()
+    sys.exit(app.exec_())
+
+
+
 if __name__ == "__main__":
     import sys
 
-    app = QtGui.QApplication(sys.argv)
+    app = QtWidgets.QApplication(sys.argv)
     w = MainApp()
     w.show()
     sys.exit(app.exec_())
@@ -0,0 +1,11 @@
+"""Custom tree widgets, see `custom_qtreewidget_Qt5Compatible`.
+
+Importing this module imports neither Qt nor the widget classes. Those are
+imported upon first use of any of its attributes, eg.
+`custom_qtreewidget.CustomTreeWidget`, through the binding picked by
+`qt_binding`.
+"""
+from qt_binding import lazy_module
+
+
+lazy_module(__name__, "custom_qtreewidget_Qt5Compatible", __doc__)
@@ -1,11 +1,23 @@
-# from qtswitch import QtGui, QtCore
 import sys
-from PyQt5 import QtCore, QtGui, QtWidgets
+from qt_binding import QtCore, QtGui, QtWidgets
 
-from collections import defaultdict, OrderedDict
+from collections import Counter, OrderedDict, defaultdict, deque
 from functools import partial
+from itertools import compress, repeat
+from operator import and_, is_, is_not, itemgetter, lt, methodcaller, ne
 
+import gc
+import json
 import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left
 LOGGER = logging.getLogger(__name__)
 
 # https://stackoverflow.com/questions/31342228/pyqt-tree-widget-adding-check-boxes-for-dynamic-removal
@@ -23,39 +35,555 @@ Expected layout:
 '''
 
 IsNewItemRole = QtCore.Qt.UserRole + 1000
+# Integer bit flags of the highlight categories an item belongs to
+HighlightFlagsRole = QtCore.Qt.UserRole + 1001
 IsPageRole = QtCore.Qt.UserRole + 2000
 
 EntityInfoRole = QtCore.Qt.UserRole + 500
 
+# Highlight categories, as bit flags of `HighlightFlagsRole`. A rule of higher
+# flag value takes precedence, see `CustomTreeDelegate.set_highlight_rule`.
+HIGHLIGHT_CHECKED = 0x01
+HIGHLIGHT_NEW = 0x02
+HIGHLIGHT_RENAMED = 0x04
+HIGHLIGHT_SEARCH_HIT = 0x08
+HIGHLIGHT_MOVED = 0x10
+HIGHLIGHT_CHECK_CHANGED = 0x20
+HIGHLIGHT_ERROR = 0x40
+# Categories stored along the edits, which are derived from the differences
+# against the baseline instead once one is set. See `CustomTreeWidget.set_baseline`.
+_STICKY_HIGHLIGHTS = HIGHLIGHT_NEW | HIGHLIGHT_RENAMED
+# Roles of the model changes that invalidate the diff against the baseline
+_DIFF_ROLES = frozenset(
+    (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole, QtCore.Qt.CheckStateRole)
+)
+
+# Flags of CustomTreeWidgetItem, composed once instead of per item creation.
+_ITEM_FLAGS = QtCore.Qt.ItemIsEditable | QtCore.Qt.ItemIsUserCheckable
+_TRISTATE_ITEM_FLAGS = _ITEM_FLAGS | QtCore.Qt.ItemIsTristate
+# Flags of a freshly created QTreeWidgetItem, see the Qt documentation. Set in
+# one go on the new items rather than queried back from each of them.
+_DEFAULT_ITEM_FLAGS = (
+    QtCore.Qt.ItemIsSelectable
+    | QtCore.Qt.ItemIsUserCheckable
+    | QtCore.Qt.ItemIsEnabled
+    | QtCore.Qt.ItemIsDragEnabled
+    | QtCore.Qt.ItemIsDropEnabled
+)
+
+
+# Clock of the instrumentation, see `CustomTreeWidget.set_instrumented`
+_clock = getattr(time, "perf_counter", time.time)
+
+# Up to this number of rows, child items are taken out of their parent one by
+# one. Beyond, the children are re-assigned in bulk, see `_take_child_rows`.
+# Each `takeChild` costs a re-layout of the expanded rows of the view, and
+# QTreeWidget has no removal of a range of rows: its model's `removeRows`
+# takes them one by one as well. Removing 10% of 20k expanded rows takes about
+# 4.9s row by row, and 0.03s in bulk.
+_TAKE_CHILD_LIMIT = 8
+
+# Children created per batch when loading a stream of records, which bounds
+# the temporary lists. See `CustomTreeWidget.load_tree_items`.
+_RECORD_CHUNK_SIZE = 10000
+# Characters read per chunk of a JSON document, see `read_tree_items`.
+_JSON_READ_SIZE = 1 << 16
+# Extensions of the files written/ read as one JSON record per line
+_NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+# Characters ending a JSON number or literal
+_JSON_DELIMITERS = frozenset(" \t\r\n,:]}")
+
+# Memory cap of the undo journal by default, in bytes. See
+# `CustomTreeWidget.set_undo_enabled`.
+UNDO_MEMORY_LIMIT = 32 * 1024 * 1024
+# Consecutive check toggles recorded within this number of seconds are undone
+# as a single entry
+_UNDO_MERGE_INTERVAL = 1.0
+# Kinds of the undo commands, see `_UndoEntry`
+_UNDO_INSERT, _UNDO_REMOVE, _UNDO_MOVE, _UNDO_RENAME, _UNDO_CHECK = range(5)
+_STRING_TYPES = (str, type(u""))
+
+# Records read per chunk by the reading thread of `TreeItemsLoader`, and
+# chunks read ahead of their insertion, which bounds the memory of a load.
+_LOADER_CHUNK_SIZE = 5000
+_LOADER_PENDING_CHUNKS = 8
+# Seconds spent inserting records per event-loop turn while loading in the
+# background, a fraction of a 60 fps frame
+_LOADER_FRAME_BUDGET = 0.008
+# Insertion takes up to as long as the rest of the previous turn took, eg.
+# repainting a large tree, but no longer than this number of seconds. Else a
+# slow repaint per batch would leave little time to the insertion.
+_LOADER_MAX_FRAME_BUDGET = 0.05
+# Records inserted by the first batch of a load. The batch size is then
+# adjusted to the frame budget.
+_LOADER_FIRST_BATCH_SIZE = 500
+# Reading threads of `TreeItemsLoader`, with their reader, by id. Kept until
+# done, even if the loader is deleted beforehand.
+_READING_THREADS = {}
+# Loaded items may be frozen out of the garbage collector while loading, else
+# its full collections scan all of them over and over again, stalling the GUI
+# thread. Not available before Python 3.7.
+_gc_freeze = getattr(gc, "freeze", None)
+_gc_unfreeze = getattr(gc, "unfreeze", None)
+# Ids of the loaders holding the garbage collector frozen, see
+# `_hold_gc_freeze`
+_GC_FREEZE_HOLDERS = set()
+
+
+def _hold_gc_freeze(holder_id):
+    """Freeze the objects tracked so far out of the garbage collector, on
+    behalf of given holder. The freeze is process-wide, and only undone once
+    every holder has released it.
+
+    Args:
+        holder_id (int): Id of the holder.
+    """
+    if _gc_freeze is None:
+        return
+    _GC_FREEZE_HOLDERS.add(holder_id)
+    _gc_freeze()
+
+
+def _release_gc_freeze(holder_id):
+    """Release the freeze held by given holder, see `_hold_gc_freeze`.
+
+    Args:
+        holder_id (int): Id of the holder.
+    """
+    if holder_id not in _GC_FREEZE_HOLDERS:
+        return
+    _GC_FREEZE_HOLDERS.discard(holder_id)
+    if not _GC_FREEZE_HOLDERS:
+        _gc_unfreeze()
+
+
+def new_change_set():
+    """Create an empty change set, as emitted by `contentsUpdate`.
+
+    Items are referred to by their path, eg. 'parentName/childName'. The
+    children of an added/ removed top-level item are not listed separately.
+
+    Returns:
+        dict: Lists of changed items with the following keys:
+            * "added"         - Paths of inserted items.
+            * "removed"       - Paths of removed items.
+            * "renamed"       - Tuples of old path and new path.
+            * "moved"         - Paths of items moved within their parent.
+            * "check_changed" - Paths of checked/ unchecked items.
+            * "reset"         - True if the whole contents were replaced.
+    """
+    return {
+        "added": [],
+        "removed": [],
+        "renamed": [],
+        "moved": [],
+        "check_changed": [],
+        "reset": False,
+    }
+
+
+def _iter_parent_items(tree_items):
+    """Iterate over the top-level items of given contents.
+
+    Args:
+        tree_items (dict): Either in `{parent: [children]}` or in
+            `{page: {parent: [children]}}` format.
+
+    Yields:
+        tuple(str, list(str) or callable): Name of top-level item and its sub
+            items, or the child provider of a lazily populated item.
+    """
+    for key, value in tree_items.items():
+        if isinstance(value, dict):
+            for parent_name, child_names in value.items():
+                yield parent_name, child_names
+        else:
+            yield key, value
+
+
+def _iter_record_chunks(records, chunk_size=_RECORD_CHUNK_SIZE):
+    """Group a stream of records into chunks of children per parent.
+
+    Args:
+        records (iterable(tuple)): `(parent, child, state)` records, as
+            yielded by `CustomTreeWidget.iter_tree_items`.
+
+    Keyword Args:
+        chunk_size (int): Maximum number of children per chunk.
+
+    Yields:
+        tuple(str, list(tuple(str, int or None))): Name of top-level item, and
+            up to `chunk_size` of its consecutive `(child, state)` records. The
+            list is empty for a record without child.
+    """
+    parent_name = None
+    children = None
+    for record_parent, child_name, state in records:
+        if children is not None and (record_parent != parent_name or
+                                     len(children) >= chunk_size):
+            yield parent_name, children
+            children = None
+
+        if children is None:
+            parent_name = record_parent
+            children = []
+        if child_name is not None:
+            children.append((child_name, state))
+
+    if children is not None:
+        yield parent_name, children
+
+
+class _JsonTokenReader(object):
+    """Reader of the tokens of a JSON document, a chunk of the file at a time.
+
+    Args:
+        json_file (file): File opened for reading.
+    """
+    _WHITESPACE = re.compile(r"\s*")
+
+    def __init__(self, json_file, chunk_size=_JSON_READ_SIZE):
+        self._file = json_file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self):
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def next_token(self):
+        """Read the next token.
+
+        Returns:
+            tuple(bool, object): True and one of `{}[]:,` for a punctuation,
+                False and the decoded value otherwise. (True, None) once the
+                end of the file is reached.
+
+        Raises:
+            ValueError: If the document is malformed.
+        """
+        while True:
+            self._pos = self._WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos >= len(self._buffer):
+                if not self._read_more():
+                    return True, None
+                continue
+
+            char = self._buffer[self._pos]
+            if char in "{}[]:,":
+                self._pos += 1
+                return True, char
+
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Value cut by the end of the chunk
+                if self._read_more():
+                    continue
+                raise
+
+            # Numbers and literals may be cut by the end of the chunk too,
+            # they are complete once followed by a delimiter
+            if (char != '"' and (end == len(self._buffer) or
+                                 self._buffer[end] not in _JSON_DELIMITERS) and
+                    self._read_more()):
+                continue
+
+            self._pos = end
+            return False, value
+
+    def expect(self, punctuation):
+        is_punctuation, token = self.next_token()
+        if not is_punctuation or token != punctuation:
+            raise ValueError(
+                "Expected '{0}', got {1!r}".format(punctuation, token)
+            )
+
+
+def _iter_json_records(tokens, page_depth=1):
+    """Iterate over the entries of a `{parent: [children]}` JSON object, whose
+    opening brace has been read.
+
+    Args:
+        tokens (_JsonTokenReader): Reader of the JSON document.
+
+    Keyword Args:
+        page_depth (int): Levels of nested `{page: {...}}` objects allowed.
+
+    Yields:
+        tuple(str, str or None, None): Records without check state.
+    """
+    while True:
+        is_punctuation, token = tokens.next_token()
+        if is_punctuation and token == "}":
+            return
+        if is_punctuation and token == ",":
+            continue
+        if is_punctuation:
+            raise ValueError("Expected a name, got {0!r}".format(token))
+
+        parent_name = token
+        tokens.expect(":")
+        is_punctuation, token = tokens.next_token()
+        if token == "{" and is_punctuation and page_depth:
+            for record in _iter_json_records(tokens, page_depth - 1):
+                yield record
+            continue
+        if token != "[" or not is_punctuation:
+            raise ValueError(
+                "Expected the children of {0!r}, got {1!r}".format(
+                    parent_name, token
+                )
+            )
+
+        has_children = False
+        while True:
+            is_punctuation, token = tokens.next_token()
+            if is_punctuation and token == "]":
+                break
+            if is_punctuation and token == ",":
+                continue
+            if is_punctuation:
+                raise ValueError(
+                    "Expected a child of {0!r}, got {1!r}".format(
+                        parent_name, token
+                    )
+                )
+            has_children = True
+            yield parent_name, token, None
+
+        if not has_children:
+            yield parent_name, None, None
+
+
+def _is_ndjson_path(file_path):
+    return os.path.splitext(file_path)[1].lower() in _NDJSON_EXTENSIONS
+
+
+def write_tree_items(records, file_path):
+    """Write the records of a tree into a file, one record at a time.
+
+    The format depends on the extension of the file:
+        * ".ndjson"/ ".jsonl" - One `[parent, child, state]` array per line,
+          keeping the check states.
+        * Otherwise - A JSON object in `{parent: [children]}` format, as
+          returned by `CustomTreeWidget.derive_tree_items`. Check states are
+          not kept.
+
+    Args:
+        records (iterable(tuple)): `(parent, child, state)` records, as
+            yielded by `CustomTreeWidget.iter_tree_items`.
+        file_path (str): Path of the file to write into.
+
+    Returns:
+        int: Number of written records.
+    """
+    count = 0
+    with open(file_path, "w") as json_file:
+        if _is_ndjson_path(file_path):
+            previous_name = None
+            prefix = None
+            for parent_name, child_name, state in records:
+                # Parent name is encoded once for all of its children
+                if prefix is None or parent_name != previous_name:
+                    prefix = "[{0}, ".format(json.dumps(parent_name))
+                    previous_name = parent_name
+                json_file.write("{0}{1}, {2}]\n".format(
+                    prefix,
+                    json.dumps(child_name),
+                    "null" if state is None else int(state)
+                ))
+                count += 1
+            return count
+
+        json_file.write("{")
+        previous_name = None
+        has_children = False
+        for parent_name, child_name, _ in records:
+            if not count or parent_name != previous_name:
+                if count:
+                    json_file.write("\n]," if has_children else "],")
+                json_file.write("\n{0}: [".format(json.dumps(parent_name)))
+                previous_name = parent_name
+                has_children = False
+
+            if child_name is not None:
+                json_file.write(",\n    " if has_children else "\n    ")
+                json_file.write(json.dumps(child_name))
+                has_children = True
+            count += 1
+
+        if count:
+            json_file.write("\n]" if has_children else "]")
+        json_file.write("\n}\n")
+    return count
+
+
+def read_tree_items(file_path):
+    """Read the records of a tree from a file, one record at a time.
+
+    See `write_tree_items` for the formats. A JSON object may also be in
+    `{page: {parent: [children]}}` format.
+
+    Args:
+        file_path (str): Path of the file to read from.
+
+    Yields:
+        tuple(str, str or None, int or None): `(parent, child, state)` records.
+            Child is None for a top-level item without children, and state is
+            None when not kept by the format.
+
+    Raises:
+        ValueError: If the file is malformed.
+    """
+    with open(file_path) as json_file:
+        if _is_ndjson_path(file_path):
+            for line in json_file:
+                if line.strip():
+                    parent_name, child_name, state = json.loads(line)
+                    yield parent_name, child_name, state
+            return
+
+        tokens = _JsonTokenReader(json_file)
+        tokens.expect("{")
+        for record in _iter_json_records(tokens):
+            yield record
+
 
 class CustomTreeDelegate(QtWidgets.QStyledItemDelegate):
     """
     
     Set apporiate color to text so as to highlight new/ modified items.
+
+    Each highlight category is a bit flag of `HighlightFlagsRole` (see
+    `HIGHLIGHT_NEW` and the like), styled by a rule of the delegate. Styles
+    are resolved once per combination of flags and cached, so painting a row
+    costs a single data lookup whatever the number of rules. Checked items
+    are told apart from the check state already read by the base class.
+    While a `CustomTreeWidget` is filtered or has a baseline, the item of
+    the row is looked up as well, to fold its search hit and diff flags in
+    from dicts keyed by item.
+
+    Cached styles derive from the palette and font of the view. Call
+    `clear_style_cache` if either of them is changed afterwards.
     """
     # https://stackoverflow.com/questions/57486888/derive-and-set-color-to-the-index-of-newly-added-children
+    def __init__(self, parent=None):
+        super(CustomTreeDelegate, self).__init__(parent)
+
+        # Rules keyed by flag, and the resolved styles keyed by the flags of
+        # the painted items
+        self._rules = {}
+        self._styles = {}
+        self._rule_flags = 0
+
     @property
     def text_color(self):
-        """Sets text color to QTreeWidgetItem.
+        """Sets text color to new/ renamed QTreeWidgetItem.
 
-        If QTreeWidgetItem do not have `_text_color` attribute, default
-        color will be used.
+        If no color has been set, an invalid color is returned.
 
         Returns:
             QtGui.QColor: RGB color values.
         """
-        if not hasattr(self, "_text_color"):
-            self._text_color = QtGui.QColor()
-        return self._text_color
+        rule = self._rules.get(HIGHLIGHT_NEW)
+        if rule is None or rule["text_color"] is None:
+            return QtGui.QColor()
+        return QtGui.QColor(rule["text_color"])
 
     @text_color.setter
     def text_color(self, color):
         """Sets QColor towards object.
 
         Args:
-            color (QtGui.QColor): RGB color values.
+            color (QtGui.QColor): RGB color values. An invalid color removes
+                the highlight.
+        """
+        for flag in (HIGHLIGHT_NEW, HIGHLIGHT_RENAMED):
+            if color.isValid():
+                self.set_highlight_rule(flag, text_color=color)
+            else:
+                self.remove_highlight_rule(flag)
+
+    def set_highlight_rule(self, flag, text_color=None, background_color=None,
+                           bold=False, italic=False):
+        """Style the items of given highlight category.
+
+        Args:
+            flag (int): Highlight category, eg. `HIGHLIGHT_ERROR`.
+
+        Keyword Args:
+            text_color (QtGui.QColor or None): Color of the text.
+            background_color (QtGui.QColor or None): Color of the background.
+            bold (bool): Use bold font. False by default.
+            italic (bool): Use italic font. False by default.
+        """
+        self._rules[flag] = {
+            "text_color": QtGui.QColor(text_color) if text_color else None,
+            "background_color": (
+                QtGui.QColor(background_color) if background_color else None
+            ),
+            "bold": bold,
+            "italic": italic,
+        }
+        self._rule_flags |= flag
+        self.clear_style_cache()
+
+    def remove_highlight_rule(self, flag):
+        """Stop styling the items of given highlight category.
+
+        Args:
+            flag (int): Highlight category, eg. `HIGHLIGHT_ERROR`.
         """
-        self._text_color = color
+        if self._rules.pop(flag, None) is not None:
+            self._rule_flags &= ~flag
+            self.clear_style_cache()
+
+    def clear_style_cache(self):
+        """Drop the resolved styles, to be resolved again upon next paint."""
+        self._styles.clear()
+
+    def _resolve_style(self, flags, option):
+        """Merge the rules of given flags into a style.
+
+        Args:
+            flags (int): Highlight flags that have a rule.
+            option (QtWidgets.QStyleOptionViewItem): Style option of the
+                painted item, to derive the palette and font from.
+
+        Returns:
+            tuple: Palette, font and background brush of the style. Each of
+                them is None if left to the default.
+        """
+        text_color = background_color = None
+        bold = italic = False
+        # Rules of higher flag value are applied last, and take precedence
+        for flag in sorted(self._rules):
+            if not flags & flag:
+                continue
+            rule = self._rules[flag]
+            text_color = rule["text_color"] or text_color
+            background_color = rule["background_color"] or background_color
+            bold = bold or rule["bold"]
+            italic = italic or rule["italic"]
+
+        palette = font = background = None
+        if text_color is not None:
+            palette = QtGui.QPalette(option.palette)
+            palette.setBrush(QtGui.QPalette.Text, QtGui.QBrush(text_color))
+        if bold or italic:
+            font = QtGui.QFont(option.font)
+            font.setBold(bold or font.bold())
+            font.setItalic(italic or font.italic())
+        if background_color is not None:
+            background = QtGui.QBrush(background_color)
+        return palette, font, background
 
     def initStyleOption(self, option, index):
         """Change font color to red if it fulfills certain conditions.
@@ -64,13 +592,491 @@ class CustomTreeDelegate(QtWidgets.QStyledItemDelegate):
             * Newly-Added item
             * Modified item (ie. when item is renamed)
 
+        Any other highlight category is styled as per its rule. If the tree
+        widget has a baseline, new/ renamed items are the ones of its diff,
+        see `CustomTreeWidget.diff_flags`.
+
         Args:
             option ():
             index (QModelIndex?)
         """
         super(CustomTreeDelegate, self).initStyleOption(option, index)
-        if self.text_color.isValid() and index.data(IsNewItemRole):
-            option.palette.setBrush(QtWidgets.QtGui.Text, self.text_color)
+        if not self._rule_flags:
+            return
+
+        flags = index.data(HighlightFlagsRole) or 0
+        if option.checkState == QtCore.Qt.Checked:
+            flags |= HIGHLIGHT_CHECKED
+        tree_widget = option.widget
+        if (isinstance(tree_widget, CustomTreeWidget) and
+                tree_widget.has_view_flags()):
+            flags = tree_widget.derive_view_flags(index, flags)
+        flags &= self._rule_flags
+        if not flags:
+            return
+
+        style = self._styles.get(flags)
+        if style is None:
+            style = self._styles[flags] = self._resolve_style(flags, option)
+
+        palette, font, background = style
+        if palette is not None:
+            option.palette = palette
+        if font is not None:
+            option.font = font
+        if background is not None:
+            option.backgroundBrush = background
+
+
+class _ChildCounts(object):
+    """Running counts of the child items of a `CustomTreeWidgetItem`.
+
+    Only the check states of column 0 are counted, as per
+    `CustomTreeWidget.derive_tree_items`.
+    """
+    __slots__ = ("checked", "unchecked", "new")
+
+    def __init__(self):
+        self.checked = 0
+        self.unchecked = 0
+        self.new = 0
+
+    def add_item(self, item, sign=1):
+        """Add given child item into the counts.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Child item.
+            sign (int): 1 to add the item, -1 to subtract it.
+        """
+        state = item.checkState(0)
+        if state == QtCore.Qt.Checked:
+            self.checked += sign
+        elif state == QtCore.Qt.Unchecked:
+            self.unchecked += sign
+
+        if item.data(0, IsNewItemRole):
+            self.new += sign
+
+    def update_state(self, old_state, new_state):
+        """Move a child item from one check state count into another.
+
+        Args:
+            old_state (QtCore.Qt.CheckState): Previous check state.
+            new_state (QtCore.Qt.CheckState): Current check state.
+        """
+        if old_state == QtCore.Qt.Checked:
+            self.checked -= 1
+        elif old_state == QtCore.Qt.Unchecked:
+            self.unchecked -= 1
+
+        if new_state == QtCore.Qt.Checked:
+            self.checked += 1
+        elif new_state == QtCore.Qt.Unchecked:
+            self.unchecked += 1
+
+
+class _SearchIndex(object):
+    """Trigram index of the item names, for case-insensitive substring search.
+
+    Each indexed item holds a slot, which keeps a reference to the item so that
+    its id is not reused while indexed. Freed slots are reused. Slots are also
+    grouped per parent, so that the children of a parent can be indexed again
+    after a bulk edit, see `refresh`.
+
+    The last search is kept until the next change, so that a text that only
+    grows, as typed, is compared against the previous matches.
+    """
+    __slots__ = (
+        "items", "names", "slots", "grams", "free_slots", "parent_keys",
+        "children", "last_search",
+    )
+
+    def __init__(self):
+        self.items = []
+        self.names = []
+        self.slots = {}
+        self.grams = defaultdict(set)
+        self.free_slots = []
+        self.parent_keys = []
+        self.children = defaultdict(set)
+        self.last_search = None
+
+    def add(self, item, parent_key=None):
+        """Index given item under its current name.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Item to be indexed.
+
+        Keyword Args:
+            parent_key (int or None): Id of the parent of the item, None for
+                the top-level items.
+        """
+        key = id(item)
+        if key in self.slots:
+            return
+
+        name = item.text(0).lower()
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.items[slot] = item
+            self.names[slot] = name
+            self.parent_keys[slot] = parent_key
+        else:
+            slot = len(self.items)
+            self.items.append(item)
+            self.names.append(name)
+            self.parent_keys.append(parent_key)
+
+        self.slots[key] = slot
+        self.children[parent_key].add(slot)
+        for gram in _derive_grams(name):
+            self.grams[gram].add(slot)
+        self.last_search = None
+
+    def remove(self, item):
+        """Drop given item, under the name it has been indexed with.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Indexed item.
+        """
+        slot = self.slots.pop(id(item), None)
+        if slot is None:
+            return
+
+        for gram in _derive_grams(self.names[slot]):
+            postings = self.grams[gram]
+            postings.discard(slot)
+            if not postings:
+                del self.grams[gram]
+
+        parent_key = self.parent_keys[slot]
+        siblings = self.children[parent_key]
+        siblings.discard(slot)
+        if not siblings:
+            del self.children[parent_key]
+
+        self.items[slot] = None
+        self.names[slot] = None
+        self.parent_keys[slot] = None
+        self.free_slots.append(slot)
+        self.last_search = None
+
+    def rename(self, item):
+        """Index given item again under its current name.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Renamed item.
+        """
+        slot = self.slots.get(id(item))
+        if slot is not None:
+            parent_key = self.parent_keys[slot]
+            self.remove(item)
+            self.add(item, parent_key)
+
+    def refresh(self, parent_key, items):
+        """Index the current children of given parent, after a bulk edit.
+        Children no longer under the parent are dropped, along with their own
+        children for the top-level items.
+
+        Args:
+            parent_key (int or None): Id of the parent, None for the top-level
+                items.
+            items (list(QtWidgets.QTreeWidgetItem)): Current children of the
+                parent.
+        """
+        keys = set(id(item) for item in items)
+        for slot in list(self.children.get(parent_key, ())):
+            item = self.items[slot]
+            if id(item) not in keys:
+                if parent_key is None:
+                    self.refresh(id(item), [])
+                self.remove(item)
+
+        for item in items:
+            if id(item) in self.slots:
+                continue
+            self.add(item, parent_key)
+            if parent_key is None:
+                for num in range(item.childCount()):
+                    self.add(item.child(num), id(item))
+
+    def search(self, text):
+        """Find the items whose name contains given text, see
+        `_search_grams`.
+
+        Args:
+            text (str): Text to search for, case-insensitively.
+
+        Returns:
+            list(QtWidgets.QTreeWidgetItem): Matching items, in no particular
+                order.
+        """
+        text = text.lower()
+        candidates = None
+        if self.last_search is not None and self.last_search[0] in text:
+            candidates = self.last_search[1]
+
+        slots = _search_grams(self.grams, self.names, text, candidates)
+        self.last_search = (text, slots)
+        items = self.items
+        return [items[slot] for slot in slots]
+
+
+def _derive_grams(text):
+    return set(text[num:num + 3] for num in range(len(text) - 2))
+
+
+def _search_grams(grams, names, text, candidates=None):
+    """Find the names containing given text, through their trigrams.
+
+    Only the names holding every trigram of the text are compared. Texts
+    shorter than a trigram are compared against every name, unless
+    candidates are given.
+
+    Args:
+        grams (dict): Slots of the names holding each trigram.
+        names (list(str or None)): Lower-case names by slot, None for the
+            freed slots.
+        text (str): Lower-case text to search for.
+
+    Keyword Args:
+        candidates (iterable(int) or None): Slots of the names matching a
+            part of the text, such as the previous text as typed. Only these
+            are compared when given.
+
+    Returns:
+        list(int): Slots of the matching names, in no particular order.
+    """
+    if candidates is not None:
+        return [slot for slot in candidates if text in names[slot]]
+
+    if len(text) < 3:
+        return [
+            slot for slot, name in enumerate(names)
+            if name is not None and text in name
+        ]
+
+    postings = sorted(
+        (grams.get(gram, ()) for gram in _derive_grams(text)), key=len
+    )
+    if not postings[0]:
+        return []
+    candidates = set(postings[0]).intersection(*postings[1:])
+    return [slot for slot in candidates if text in names[slot]]
+
+
+class _UndoEntry(object):
+    """Commands of an undoable edit, see `_UndoJournal`.
+
+    Commands are tuples led by their kind:
+        * `(_UNDO_INSERT, parent row, runs, payload)` - Inserted rows.
+        * `(_UNDO_REMOVE, parent row, runs, payload)` - Removed rows.
+        * `(_UNDO_MOVE, parent row, runs, direction)` - Runs of rows moved by
+          one position, see `CustomTreeWidget.move_item_multi`.
+        * `(_UNDO_RENAME, parent row, row, old name, new name)`
+        * `[_UNDO_CHECK, parent rows, rows, old states, new states]` - Check
+          toggles, appended into packed arrays.
+
+    Parent row is the row of the top-level item, -1 for the top-level items
+    themselves. Runs are the first and last row of contiguous rows. Payload
+    holds the names and packed states of the rows that are out of the tree,
+    see `CustomTreeWidget._pack_undo_items`, and is None otherwise.
+    """
+    __slots__ = ("commands", "size", "is_check_only", "recorded_at")
+
+    def __init__(self):
+        self.commands = []
+        self.size = 0
+        self.is_check_only = True
+        self.recorded_at = 0.0
+
+    def derive_size(self):
+        """Estimate the memory held by the commands.
+
+        Returns:
+            int: Size in bytes.
+        """
+        size = sys.getsizeof(self.commands)
+        for command in self.commands:
+            size += _derive_undo_size(command)
+        return size
+
+
+def _derive_undo_size(value):
+    """Estimate the memory held by a command, or any of its values.
+
+    Returns:
+        int: Size in bytes, including the nested values.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)) and value:
+        if isinstance(value[0], _STRING_TYPES):
+            size += sum(map(sys.getsizeof, value))
+        else:
+            # Leading kinds and rows are small cached ints
+            size += sum(
+                _derive_undo_size(item) for item in value
+                if not isinstance(item, int)
+            )
+    return size
+
+
+class _UndoJournal(object):
+    """Undo/ redo stacks of the edits of a `CustomTreeWidget`.
+
+    Commands recorded within the same event-loop turn make a single entry,
+    see `_UndoEntry`. Consecutive entries holding check toggles alone are
+    merged, if recorded within `_UNDO_MERGE_INTERVAL` seconds. Once the
+    entries exceed the memory cap, the oldest ones are evicted.
+
+    Args:
+        max_bytes (int): Memory cap of the undo and redo entries.
+    """
+    __slots__ = (
+        "undo_entries", "redo_entries", "max_bytes", "size", "open_entry",
+        "suspended"
+    )
+
+    def __init__(self, max_bytes=UNDO_MEMORY_LIMIT):
+        self.undo_entries = deque()
+        # Next entry to redo last
+        self.redo_entries = deque()
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Entry recorded within the current event-loop turn
+        self.open_entry = None
+        # Set while the edits are not to be recorded, eg. while undoing
+        self.suspended = False
+
+    def record(self, command):
+        """Record a command into the open entry.
+
+        Args:
+            command (tuple): Command, see `_UndoEntry`.
+
+        Returns:
+            bool: True if an entry has been opened, to be closed once control
+                returns to the event loop.
+        """
+        is_opened = self._open()
+        self.open_entry.commands.append(command)
+        self.open_entry.is_check_only = False
+        return is_opened
+
+    def record_check(self, parent_row, row, old_state, new_state):
+        """Record a check toggle into the open entry.
+
+        Toggles are appended into the check command of the entry, if it is
+        the last one recorded.
+
+        Returns:
+            bool: True if an entry has been opened.
+        """
+        is_opened = self._open()
+        command = self._derive_check_command()
+        command[1].append(parent_row)
+        command[2].append(row)
+        command[3].append(old_state)
+        command[4].append(new_state)
+        return is_opened
+
+    def record_checks(self, parent_row, rows, old_states, new_states):
+        """Record the check toggles of children of the same parent, as per
+        `record_check`.
+
+        Args:
+            parent_row (int): Row of the parent, -1 for the top-level items.
+            rows (list(int)): Rows of the toggled items.
+            old_states (list(int)): Check states before the toggles.
+            new_states (list(int)): Check states after the toggles.
+
+        Returns:
+            bool: True if an entry has been opened.
+        """
+        is_opened = self._open()
+        command = self._derive_check_command()
+        command[1].extend(repeat(parent_row, len(rows)))
+        command[2].extend(rows)
+        command[3].extend(old_states)
+        command[4].extend(new_states)
+        return is_opened
+
+    def _derive_check_command(self):
+        commands = self.open_entry.commands
+        if not commands or commands[-1][0] != _UNDO_CHECK:
+            commands.append([
+                _UNDO_CHECK, array("i"), array("i"), bytearray(), bytearray()
+            ])
+        return commands[-1]
+
+    def _open(self):
+        if self.open_entry is not None:
+            return False
+        self.open_entry = _UndoEntry()
+        # New edits are not to be redone onto
+        self.size -= sum(entry.size for entry in self.redo_entries)
+        self.redo_entries.clear()
+        return True
+
+    def close(self):
+        """Push the open entry onto the undo stack, and evict the oldest
+        entries beyond the memory cap.
+
+        Returns:
+            bool: True if an entry has been pushed.
+        """
+        entry, self.open_entry = self.open_entry, None
+        if entry is None or not entry.commands:
+            return False
+
+        recorded_at = _clock()
+        if entry.is_check_only and self.undo_entries:
+            last_entry = self.undo_entries[-1]
+            if (last_entry.is_check_only and
+                    recorded_at - last_entry.recorded_at <=
+                    _UNDO_MERGE_INTERVAL):
+                self.undo_entries.pop()
+                self.size -= last_entry.size
+                last_entry.commands.extend(entry.commands)
+                entry = last_entry
+
+        entry.recorded_at = recorded_at
+        entry.size = entry.derive_size()
+        self.undo_entries.append(entry)
+        self.size += entry.size
+        self.evict()
+        return True
+
+    def push(self, entry, entries):
+        """Push an undone/ redone entry onto the other stack.
+
+        Args:
+            entry (_UndoEntry): Applied entry, whose commands have changed.
+            entries (collections.deque): Undo or redo entries.
+        """
+        self.size -= entry.size
+        entry.size = entry.derive_size()
+        # Applied entries are not merged with the following toggles
+        entry.recorded_at = 0.0
+        entries.append(entry)
+        self.size += entry.size
+        self.evict()
+
+    def evict(self):
+        """Evict the oldest entries, then the furthest entries to redo, until
+        the memory cap is met.
+        """
+        while self.size > self.max_bytes and self.undo_entries:
+            self.size -= self.undo_entries.popleft().size
+        while self.size > self.max_bytes and self.redo_entries:
+            self.size -= self.redo_entries.popleft().size
+
+    def clear(self):
+        """Drop every entry, eg. once the rows they refer to are invalid."""
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.open_entry = None
+        self.size = 0
 
 
 class CustomTreeWidgetItem(QtWidgets.QTreeWidgetItem):
@@ -82,31 +1088,37 @@ class CustomTreeWidgetItem(QtWidgets.QTreeWidgetItem):
         is_tristate (bool): Should it be a tri-state checkbox. False by default.
         is_new_item (bool): If it is a new item. False by default.
     """
-    def __init__(self, parent=None, text="", is_tristate=False, is_new_item=False):
-        super(CustomTreeWidgetItem, self).__init__(parent)
+    # Running counts of the child items, see `child_counts`. Only assigned to
+    # the items that have been queried, child items do not carry any.
+    _child_counts = None
 
-        self.setText(0, text)
-        # flags = QtCore.Qt.ItemIsEditable | QtCore.Qt.ItemIsUserCheckable
+    def __init__(self, parent=None, text="", is_tristate=False, is_new_item=False):
+        super(CustomTreeWidgetItem, self).__init__([text])
 
+        # The initial states are set through the base class, as the overridden
+        # `setData` has nothing to emit for an item that is being created.
         if is_tristate:
-            # flags |= QtCore.Qt.ItemIsTristate
-
             # Solely for the Parent item
-            self.setFlags(
-                self.flags()
-                | QtCore.Qt.ItemIsTristate
-                | QtCore.Qt.ItemIsEditable
-                | QtCore.Qt.ItemIsUserCheckable
-            )
+            self.setFlags(_DEFAULT_ITEM_FLAGS | _TRISTATE_ITEM_FLAGS)
         else:
-            self.setFlags(
-                self.flags()
-                | QtCore.Qt.ItemIsEditable
-                | QtCore.Qt.ItemIsUserCheckable
+            self.setFlags(_DEFAULT_ITEM_FLAGS | _ITEM_FLAGS)
+            QtWidgets.QTreeWidgetItem.setData(
+                self, 0, QtCore.Qt.CheckStateRole, QtCore.Qt.Unchecked
             )
-            self.setCheckState(0, QtCore.Qt.Unchecked)
 
-        self.setData(0, IsNewItemRole, is_new_item)
+        if is_new_item:
+            # Goes through `setData`, to be flagged with `HIGHLIGHT_NEW`
+            self.setData(0, IsNewItemRole, True)
+        else:
+            QtWidgets.QTreeWidgetItem.setData(self, 0, IsNewItemRole, False)
+
+        # Inserted once created, so that the model signals carry this item
+        # rather than a transient wrapper of the base class, whose id would
+        # not match the one of this item.
+        if isinstance(parent, QtWidgets.QTreeWidget):
+            parent.addTopLevelItem(self)
+        elif parent is not None:
+            parent.addChild(self)
 
     def setData(self, column, role, value):
         """Override QTreeWidgetItem setData function.
@@ -115,37 +1127,279 @@ class CustomTreeWidgetItem(QtWidgets.QTreeWidgetItem):
         checked/ unchecked. And so, this method will emits the signal as a
         means to handle this.
 
+        Changes of check state and `IsNewItemRole` are also counted into the
+        running counts of the parent item, if any. `IsNewItemRole` and
+        renaming are reflected into `HighlightFlagsRole`.
+
+        Calls are timed while the tree widget is instrumented, see
+        `CustomTreeWidget.set_instrumented`.
+
         Args:
             column (int): Column value of item.
             role (int): Value of Qt.ItemDataRole. It can be Qt.DisplayRole or
                 Qt.CheckStateRole.
             value (int or unicode): ???
         """
-        state = self.checkState(column)
-        QtWidgets.QTreeWidgetItem.setData(self, column, role, value)
-        if (role == QtCore.Qt.CheckStateRole and
-                state != self.checkState(column)):
+        if _INSTRUMENTED_TREES:
+            instrumentation = getattr(
+                self.treeWidget(), "_instrumentation", None
+            )
+            if (instrumentation is not None and
+                    id(self) not in instrumentation.timed_items):
+                instrumentation.time_item_set_data(self, column, role, value)
+                return
+
+        if role == QtCore.Qt.CheckStateRole:
+            state = self.checkState(column)
+            QtWidgets.QTreeWidgetItem.setData(self, column, role, value)
+            new_state = self.checkState(column)
+            if state == new_state:
+                return
+
+            if column == 0:
+                counts = getattr(self.parent(), "_child_counts", None)
+                if counts is not None:
+                    counts.update_state(state, new_state)
+
             tree_widget = self.treeWidget()
             if isinstance(tree_widget, CustomTreeWidget):
-                tree_widget.itemToggled.emit(self, column)
+                tree_widget._report_toggled_item(self, column, state)
+
+        elif (role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole) and
+                column == 0):
+            old_name = self.text(0)
+            QtWidgets.QTreeWidgetItem.setData(self, column, role, value)
+            if old_name != self.text(0):
+                if old_name:
+                    self.set_highlight(HIGHLIGHT_RENAMED)
+                tree_widget = self.treeWidget()
+                if isinstance(tree_widget, CustomTreeWidget):
+                    tree_widget._record_renamed_item(self, old_name)
+
+        elif role == IsNewItemRole and column == 0:
+            was_new = bool(self.data(column, role))
+            QtWidgets.QTreeWidgetItem.setData(self, column, role, value)
+            if was_new != bool(value):
+                self.set_highlight(HIGHLIGHT_NEW, bool(value))
+                counts = getattr(self.parent(), "_child_counts", None)
+                if counts is not None:
+                    counts.new += 1 if value else -1
+
+        else:
+            QtWidgets.QTreeWidgetItem.setData(self, column, role, value)
+
+    def highlight_flags(self):
+        """Derive the highlight categories of the item.
+
+        Returns:
+            int: Bit flags, eg. `HIGHLIGHT_NEW | HIGHLIGHT_CHECKED`.
+        """
+        flags = self.data(0, HighlightFlagsRole) or 0
+        if self.checkState(0) == QtCore.Qt.Checked:
+            flags |= HIGHLIGHT_CHECKED
+        tree_widget = self.treeWidget()
+        if isinstance(tree_widget, CustomTreeWidget):
+            if tree_widget.is_filter_match(self):
+                flags |= HIGHLIGHT_SEARCH_HIT
+            if tree_widget.has_baseline():
+                flags = (
+                    (flags & ~_STICKY_HIGHLIGHTS) | tree_widget.diff_flags(self)
+                )
+        return flags
+
+    def set_highlight(self, flag, enabled=True):
+        """Add/ remove the item into/ from given highlight category.
+
+        `HIGHLIGHT_CHECKED` follows the check state of the item, and is not
+        stored. Neither are the matches of `CustomTreeWidget.set_filter_text`,
+        which are reported as `HIGHLIGHT_SEARCH_HIT` on top of the stored
+        flags, nor the differences against the baseline of the tree widget.
+
+        Args:
+            flag (int): Highlight category, eg. `HIGHLIGHT_ERROR`.
+
+        Keyword Args:
+            enabled (bool): Add the item into the category if True, remove
+                it otherwise. True by default.
+        """
+        old_flags = self.data(0, HighlightFlagsRole) or 0
+        if enabled:
+            flags = old_flags | flag
+        else:
+            flags = old_flags & ~flag
+        flags &= ~HIGHLIGHT_CHECKED
+        if flags != old_flags:
+            QtWidgets.QTreeWidgetItem.setData(
+                self, 0, HighlightFlagsRole, flags
+            )
+
+    def child_counts(self):
+        """Derive the running counts of the child items.
+
+        Counts are computed upon the first call. They are kept up to date by
+        the `setData` of the child items, and by `CustomTreeWidget` whenever
+        child items are inserted or removed.
+
+        Returns:
+            _ChildCounts: Number of checked, unchecked and new child items.
+        """
+        if self._child_counts is None:
+            counts = _ChildCounts()
+            for num in range(self.childCount()):
+                counts.add_item(self.child(num))
+            self._child_counts = counts
+        return self._child_counts
+
+
+# Check state and name of the first column of an item
+_item_check_state = methodcaller("checkState", 0)
+_item_text = methodcaller("text", 0)
+
+# Weak references of the instrumented tree widgets, keyed by id. Items only
+# look their tree widget up while any is instrumented.
+_INSTRUMENTED_TREES = {}
+
+
+def _forget_instrumented_tree(tree_ref):
+    """Drop the weak reference of a collected tree widget."""
+    for key, value in list(_INSTRUMENTED_TREES.items()):
+        if value is tree_ref:
+            del _INSTRUMENTED_TREES[key]
+
+
+class _TreeInstrumentation(QtCore.QObject):
+    """Counted signals and timed slots of an instrumented `CustomTreeWidget`,
+    see `CustomTreeWidget.set_instrumented`.
+
+    Signals are connected to the methods of this child object, which refers
+    to the tree widget weakly, so that the connections do not keep the tree
+    widget alive.
+
+    Args:
+        tree_widget (CustomTreeWidget): Instrumented tree widget.
+    """
+    def __init__(self, tree_widget):
+        super(_TreeInstrumentation, self).__init__(tree_widget)
+        self._tree_ref = weakref.ref(tree_widget)
+        # (signal, connected slot, slot name or None) per connection
+        self.connections = []
+        # Ids of the items whose `setData` is being timed
+        self.timed_items = set()
+
+    def count_emission(self, signal_name, *args):
+        tree_widget = self._tree_ref()
+        if tree_widget is not None:
+            tree_widget._signal_counts[signal_name] += 1
+
+    def call_timed_slot(self, slot_name, *args):
+        # The tree widget is gone while its C++ object is being destroyed
+        tree_widget = self._tree_ref()
+        if tree_widget is None:
+            return
+        start = _clock()
+        try:
+            return getattr(tree_widget, slot_name)(*args)
+        finally:
+            tree_widget._record_slot_time(slot_name, _clock() - start)
+
+    def time_item_set_data(self, item, column, role, value):
+        """Call the `setData` of given item, and time it."""
+        self.timed_items.add(id(item))
+        start = _clock()
+        try:
+            item.setData(column, role, value)
+        finally:
+            self.timed_items.discard(id(item))
+            tree_widget = self._tree_ref()
+            if tree_widget is not None:
+                tree_widget._record_slot_time(
+                    "CustomTreeWidgetItem.setData", _clock() - start
+                )
 
 
 class CustomTreeWidget(QtWidgets.QTreeWidget):
     """Initialization class for QTreeWidget creation.
 
+    Toggled items are reported in batch by `itemsToggled`, once per event-loop
+    turn. The per-item `itemToggled` is only emitted if `emit_item_toggled`
+    is set to True.
+
     Args:
         widget (None):
     """
     itemToggled = QtCore.pyqtSignal(QtWidgets.QTreeWidgetItem, bool)
+    # Declared as object, as a list argument would be converted item by item
+    itemsToggled = QtCore.pyqtSignal(object)
 
     selectionItemChanged = QtCore.pyqtSignal(bool)
-    contentsUpdate = QtCore.pyqtSignal()
-
+    # Emitted once per event-loop turn with the change set, see `new_change_set`
+    contentsUpdate = QtCore.pyqtSignal(dict)
+    # Emitted when the baseline is set/ cleared, see `set_baseline`
+    baselineChanged = QtCore.pyqtSignal()
+    # Emitted with `can_undo()` and `can_redo()` whenever either may change,
+    # see `set_undo_enabled`
+    undoStateChanged = QtCore.pyqtSignal(bool, bool)
+
+    # Signals counted while instrumented, see `set_instrumented`
+    _INSTRUMENTED_SIGNALS = (
+        "itemToggled",
+        "itemsToggled",
+        "itemChanged",
+        "currentItemChanged",
+        "selectionItemChanged",
+        "contentsUpdate",
+        "baselineChanged",
+        "undoStateChanged",
+        "itemExpanded",
+    )
+    # Connections timed while instrumented, as (sender, signal, slot). Sender
+    # is an attribute of the widget, None for the widget itself.
+    _INSTRUMENTED_SLOTS = (
+        (None, "currentItemChanged", "selection_item_changed"),
+        (None, "itemChanged", "tree_item_changed"),
+        (None, "itemDoubleClicked", "tree_item_double_clicked"),
+        (None, "itemExpanded", "tree_item_expanded"),
+        (None, "customContextMenuRequested", "show_custom_menu"),
+        ("_toggled_timer", "timeout", "_emit_toggled_items"),
+        ("_changes_timer", "timeout", "_emit_contents_update"),
+        ("_filter_timer", "timeout", "_reapply_filter"),
+        ("_undo_timer", "timeout", "_close_undo_entry"),
+        ("model", "rowsInserted", "_rows_inserted"),
+        ("model", "rowsAboutToBeRemoved", "_rows_about_to_be_removed"),
+        ("model", "dataChanged", "_data_changed"),
+        ("model", "layoutChanged", "_clear_tree_items_cache"),
+        ("model", "layoutChanged", "_filter_layout_changed"),
+        ("model", "layoutChanged", "_invalidate_diff"),
+        ("model", "layoutChanged", "_discard_undo_entries"),
+        ("model", "modelReset", "_model_reset"),
+    )
     def __init__(self, widget=None):
         super(CustomTreeWidget, self).__init__(widget)
 
         self.rename_counter = False
 
+        # Per-item `itemToggled` is opt-in
+        self.emit_item_toggled = False
+
+        # Items toggled within the current event-loop turn, to be emitted
+        # with `itemsToggled` once control returns to the event loop.
+        self._toggled_items = []
+        self._toggled_timer = QtCore.QTimer(self)
+        self._toggled_timer.setSingleShot(True)
+        self._toggled_timer.setInterval(0)
+        self._toggled_timer.timeout.connect(self._emit_toggled_items)
+
+        # Changes made within the current event-loop turn, to be emitted with
+        # `contentsUpdate` once control returns to the event loop.
+        self._pending_changes = None
+        self._changes_timer = QtCore.QTimer(self)
+        self._changes_timer.setSingleShot(True)
+        self._changes_timer.setInterval(0)
+        self._changes_timer.timeout.connect(self._emit_contents_update)
+        # Set while `move_item` takes and inserts back an item, which is
+        # then recorded as moved rather than as removed and added.
+        self._is_moving_item = False
+
         # Context menu for QTreeWidgetItem
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_custom_menu)
@@ -155,24 +1409,437 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         self.itemChanged.connect(self.tree_item_changed)
         self.itemDoubleClicked.connect(self.tree_item_double_clicked)
 
-    def selection_item_changed(self, current, previous):
-        """Overrides widget's default signal.
-
-        Emiited when current item selection is changed. This will also toggles
-        the state of `self.add_child_btn`.
-        If a child item is selected, the "Add Child" button will be disabled.
+        # Names of sibling items, keyed by the id of their parent item (None
+        # for the top-level items). Each entry holds the parent item and the
+        # name counts, and is built upon its first lookup.
+        self._name_index = {}
+
+        # Results of `derive_tree_items`, per mode. Child tuples are cached
+        # per top-level item (keyed by its id, holding the item and the tuples
+        # per mode) so that a change only re-derives the tuple of its parent.
+        self._tree_items_cache = {}
+        self._child_items_cache = {}
+
+        # Set while items are inserted/ removed in bulk. The bookkeeping of
+        # the model signals is then done once for the whole operation.
+        self._is_bulk_editing = False
+
+        # Child providers of the top-level items that are yet to be expanded,
+        # keyed by the id of the item and holding the item and the provider.
+        # See `set_child_provider`.
+        self._child_providers = {}
+        self.itemExpanded.connect(self.tree_item_expanded)
+
+        # Search index of the item names, built upon the first search. See
+        # `derive_matching_items`.
+        self._search_index = None
+
+        # Filter state, see `set_filter_text`. Matching items are keyed by id,
+        # as are the counts of matching children per parent. The children of
+        # the "revealed" parents are hidden/ shown one by one, while the
+        # children of the other parents are hidden along with the parent.
+        # Revealed parents hold the item, and the rows of its children keyed
+        # by id (None once shifted).
+        self._filter_text = ""
+        self._filter_matches = {}
+        self._filter_child_hits = Counter()
+        self._filter_revealed_parents = {}
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(0)
+        self._filter_timer.timeout.connect(self._reapply_filter)
+
+        # Baseline to be compared against, as per `read_snapshot`, and the
+        # differences derived upon the first query after any change. See
+        # `set_baseline`.
+        self._diff_baseline = None
+        self._diff_changes = None
+        self._diff_highlights = None
+        # Flags of `diff_flags` per id of the queried items, derived along
+        # with `_diff_highlights`
+        self._diff_item_flags = {}
+        # Current snapshot node per top-level item, keyed by id and holding
+        # the item and its node. A node is replaced once its item or children
+        # change, so that the pairing of the children of the other parents is
+        # reused, see `diff_snapshot_nodes`.
+        self._diff_nodes = {}
+        self._diff_children = {}
+
+        # Undo journal, None unless enabled. Edits made within the current
+        # event-loop turn make a single entry, closed once control returns to
+        # the event loop. See `set_undo_enabled`.
+        self._undo_journal = None
+        self._undo_timer = QtCore.QTimer(self)
+        self._undo_timer.setSingleShot(True)
+        self._undo_timer.setInterval(0)
+        self._undo_timer.timeout.connect(self._close_undo_entry)
+
+        # Background load in progress, if any. See `load_tree_items_async`.
+        self._tree_items_loader = None
+
+        # Counted signals and timed slots, see `set_instrumented`. Timed slots
+        # are kept as [calls, total seconds, max seconds] per name.
+        self._instrumentation = None
+        self._signal_counts = Counter()
+        self._slot_stats = {}
+        self._stats_started = _clock()
+        self._stats_log_timer = None
+
+        # The name index, the cached results, the running counts of child
+        # items, the search index, the filter, the change set and the undo
+        # journal are kept up to date from the model signals, and the diff is
+        # invalidated
+        tree_model = self.model()
+        tree_model.rowsInserted.connect(self._rows_inserted)
+        tree_model.rowsAboutToBeRemoved.connect(self._rows_about_to_be_removed)
+        tree_model.dataChanged.connect(self._data_changed)
+        tree_model.layoutChanged.connect(self._clear_tree_items_cache)
+        tree_model.layoutChanged.connect(self._filter_layout_changed)
+        tree_model.layoutChanged.connect(self._invalidate_diff)
+        tree_model.layoutChanged.connect(self._discard_undo_entries)
+        tree_model.modelReset.connect(self._model_reset)
+
+    def _report_toggled_item(self, item, column, old_state=None):
+        """Collect toggled item, as reported by `CustomTreeWidgetItem.setData`.
 
         Args:
-            current (CustomTreeWidgetItem): Current selected item.
-            previous (CustomTreeWidgetItem or None): Previous selected item.
+            item (CustomTreeWidgetItem): Toggled item.
+            column (int): Column value of the toggled item.
+
+        Keyword Args:
+            old_state (QtCore.Qt.CheckState or None): Check state before the
+                toggle, to be recorded into the undo journal.
         """
-        state = True
-        if not current or current.parent():
-            state = False
+        if self.emit_item_toggled:
+            self.itemToggled.emit(item, column)
 
-        self.selectionItemChanged.emit(state)
+        if old_state is not None and column == 0:
+            self._journal_check_state(item, old_state)
 
-    def tree_item_changed(self, item, column):
+        if not self._toggled_items:
+            self._toggled_timer.start()
+        self._toggled_items.append(item)
+
+        self._pending_change_set()["check_changed"].append(
+            self.derive_item_path(item)
+        )
+
+    def _emit_toggled_items(self):
+        """Emits `itemsToggled` with the items toggled since the last call.
+
+        Items toggled more than once are only listed once, in the order of
+        their first toggle.
+        """
+        toggled_items, self._toggled_items = self._toggled_items, []
+
+        # Keyed by id, as items are not hashable. Keys keep their first
+        # position, see `OrderedDict`.
+        unique_items = list(OrderedDict(
+            zip(map(id, toggled_items), toggled_items)
+        ).values())
+
+        self.itemsToggled.emit(unique_items)
+
+    def _rows_inserted(self, parent_index, first, last):
+        self._invalidate_rows_diff(parent_index, first, last)
+        self._journal_inserted_rows(parent_index, first, last)
+        if self._is_bulk_editing:
+            return
+        self._index_inserted_names(parent_index, first, last)
+        self._invalidate_inserted_items(parent_index, first, last)
+        self._count_inserted_items(parent_index, first, last)
+        self._search_inserted_items(parent_index, first, last)
+        self._record_inserted_items(parent_index, first, last)
+
+    def _rows_about_to_be_removed(self, parent_index, first, last):
+        self._invalidate_rows_diff(parent_index, first, last)
+        self._journal_removed_rows(parent_index, first, last)
+        if self._is_bulk_editing:
+            return
+        self._unindex_removed_names(parent_index, first, last)
+        self._invalidate_removed_items(parent_index, first, last)
+        self._uncount_removed_items(parent_index, first, last)
+        self._unsearch_removed_items(parent_index, first, last)
+        self._record_removed_items(parent_index, first, last)
+
+    def _data_changed(self, top_left, bottom_right, roles):
+        self._reindex_renamed_names(top_left, bottom_right, roles)
+        self._invalidate_changed_items(top_left, bottom_right, roles)
+        self._search_renamed_items(top_left, bottom_right, roles)
+        if not roles or any(role in _DIFF_ROLES for role in roles):
+            self._invalidate_changed_diff(top_left, bottom_right, roles)
+
+    def _model_reset(self):
+        self._invalidate_diff()
+        self._discard_undo_entries()
+        self._name_index.clear()
+        self._child_providers.clear()
+        self._reset_search()
+        self._clear_tree_items_cache()
+        self._record_reset()
+
+    def _refresh_after_bulk_edit(self, parent_item=None):
+        """Drop the bookkeeping of given parent, after a bulk edit of its
+        children. Everything will be derived again upon the next query.
+
+        Keyword Args:
+            parent_item (QtWidgets.QTreeWidgetItem or None): Parent of the
+                edited items. None for the top-level items.
+        """
+        self._refresh_search(parent_item)
+        if parent_item is None:
+            self._name_index.pop(None, None)
+            self._tree_items_cache.clear()
+            return
+
+        self._name_index.pop(id(parent_item), None)
+        self._invalidate_tree_items(self.indexFromItem(parent_item))
+        if getattr(parent_item, "_child_counts", None) is not None:
+            parent_item._child_counts = None
+        if self._diff_nodes.pop(id(parent_item), None) is not None:
+            self._drop_diff()
+
+    def _pending_change_set(self):
+        """Derive the change set of the current event-loop turn.
+
+        Returns:
+            dict: Change set to be emitted with `contentsUpdate`.
+        """
+        if self._pending_changes is None:
+            self._pending_changes = new_change_set()
+            self._changes_timer.start()
+        return self._pending_changes
+
+    def _record_inserted_items(self, parent_index, first, last):
+        if self._is_moving_item:
+            return
+        parent_item = self.itemFromIndex(parent_index)
+        if parent_item is None:
+            parent_item = self.invisibleRootItem()
+
+        added = self._pending_change_set()["added"]
+        for num in range(first, last + 1):
+            added.append(self.derive_item_path(parent_item.child(num)))
+
+    def _record_removed_items(self, parent_index, first, last):
+        if self._is_moving_item:
+            return
+        parent_item = self.itemFromIndex(parent_index)
+        if parent_item is None:
+            parent_item = self.invisibleRootItem()
+
+        removed = self._pending_change_set()["removed"]
+        for num in range(first, last + 1):
+            removed.append(self.derive_item_path(parent_item.child(num)))
+
+    def _record_reset(self):
+        self._pending_change_set()["reset"] = True
+
+    def _record_renamed_item(self, item, old_name):
+        """Record renaming, as reported by `CustomTreeWidgetItem.setData`.
+
+        Args:
+            item (CustomTreeWidgetItem): Renamed item.
+            old_name (str): Previous name of the item.
+        """
+        old_path = old_name
+        if item.parent():
+            old_path = "{0}/{1}".format(item.parent().text(0), old_name)
+
+        self._pending_change_set()["renamed"].append(
+            (old_path, self.derive_item_path(item))
+        )
+        if self._name_index:
+            self._reindex_renamed_name(item, old_name)
+
+        if self._is_undo_recording():
+            parent_row, row = self._derive_item_rows(item)
+            self._record_undo(
+                (_UNDO_RENAME, parent_row, row, old_name, item.text(0))
+            )
+
+    def _emit_contents_update(self):
+        """Emits `contentsUpdate` with the changes made since the last call.
+
+        Moved items are recorded as such by `move_item`/ `move_item_multi`,
+        rather than as removed and added back.
+        """
+        changes, self._pending_changes = self._pending_changes, None
+        if changes is None:
+            return
+
+        # Items moved/ toggled several times are reported once
+        for key in ("moved", "check_changed"):
+            changes[key] = list(OrderedDict.fromkeys(changes[key]))
+
+        self.contentsUpdate.emit(changes)
+
+    def set_instrumented(self, enabled=True, log_interval=None):
+        """Count the emitted signals and time the connected slots.
+
+        The own slots of the widget (eg. `tree_item_changed`) and the
+        `setData` of `CustomTreeWidgetItem` are timed. The batched
+        `itemsToggled`/ `contentsUpdate` are timed through their emitters,
+        which includes the slots connected to them. Times are inclusive of
+        nested calls, eg. the `setData` of child items on a check cascade.
+
+        Slots are swapped with timed ones upon enabling, and swapped back
+        upon disabling, so nothing is counted nor timed otherwise. Timed
+        slots are called after the other slots of the same signal. The
+        instrumentation does not keep the widget alive, and ends along with
+        it.
+
+        Args:
+            enabled (bool): Instruments the widget if True. True by default.
+
+        Keyword Args:
+            log_interval (float or None): Seconds between each dump of the
+                stats into the log, see `log_stats`. None by default.
+        """
+        if enabled and self._instrumentation is None:
+            self._instrument()
+        elif not enabled and self._instrumentation is not None:
+            self._uninstrument()
+
+        if enabled and log_interval:
+            if self._stats_log_timer is None:
+                self._stats_log_timer = QtCore.QTimer(self)
+                self._stats_log_timer.timeout.connect(self.log_stats)
+            self._stats_log_timer.start(int(log_interval * 1000))
+        elif self._stats_log_timer is not None:
+            self._stats_log_timer.stop()
+
+    def is_instrumented(self):
+        """Check if signals and slots are being instrumented.
+
+        Returns:
+            bool: True if instrumented.
+        """
+        return self._instrumentation is not None
+
+    def _derive_sender(self, sender_name):
+        if sender_name is None:
+            return self
+        sender = getattr(self, sender_name)
+        if not isinstance(sender, QtCore.QObject):
+            # eg. `model`
+            sender = sender()
+        return sender
+
+    def _instrument(self):
+        instrumentation = _TreeInstrumentation(self)
+        connections = instrumentation.connections
+        for signal_name in self._INSTRUMENTED_SIGNALS:
+            signal = getattr(self, signal_name)
+            counter = partial(instrumentation.count_emission, signal_name)
+            signal.connect(counter)
+            connections.append((signal, counter, None))
+
+        for sender_name, signal_name, slot_name in self._INSTRUMENTED_SLOTS:
+            signal = getattr(self._derive_sender(sender_name), signal_name)
+            timed_slot = partial(instrumentation.call_timed_slot, slot_name)
+            signal.disconnect(getattr(self, slot_name))
+            signal.connect(timed_slot)
+            connections.append((signal, timed_slot, slot_name))
+
+        self._instrumentation = instrumentation
+        _INSTRUMENTED_TREES[id(self)] = weakref.ref(
+            self, _forget_instrumented_tree
+        )
+
+    def _uninstrument(self):
+        instrumentation, self._instrumentation = self._instrumentation, None
+        for signal, connected_slot, slot_name in instrumentation.connections:
+            signal.disconnect(connected_slot)
+            if slot_name is not None:
+                signal.connect(getattr(self, slot_name))
+
+        _INSTRUMENTED_TREES.pop(id(self), None)
+        instrumentation.connections = []
+        instrumentation.setParent(None)
+        instrumentation.deleteLater()
+
+    def _record_slot_time(self, slot_name, seconds):
+        slot_stats = self._slot_stats.get(slot_name)
+        if slot_stats is None:
+            self._slot_stats[slot_name] = [1, seconds, seconds]
+            return
+        slot_stats[0] += 1
+        slot_stats[1] += seconds
+        if seconds > slot_stats[2]:
+            slot_stats[2] = seconds
+
+    def stats(self):
+        """Derive the instrumented numbers since the last reset.
+
+        Returns:
+            dict: Stats with the following keys:
+                * "instrumented" - True if currently instrumented.
+                * "elapsed"      - Seconds since the last reset.
+                * "signals"      - Number of emissions, per signal name.
+                * "slots"        - Per slot name, a dict of "calls", and the
+                                   "total", "mean" and "max" seconds.
+        """
+        return {
+            "instrumented": self.is_instrumented(),
+            "elapsed": _clock() - self._stats_started,
+            "signals": dict(self._signal_counts),
+            "slots": dict(
+                (slot_name, {
+                    "calls": calls,
+                    "total": total,
+                    "mean": total / calls,
+                    "max": max_seconds,
+                })
+                for slot_name, (calls, total, max_seconds)
+                in self._slot_stats.items()
+            ),
+        }
+
+    def reset_stats(self):
+        """Clear the instrumented numbers."""
+        self._signal_counts.clear()
+        self._slot_stats.clear()
+        self._stats_started = _clock()
+
+    def log_stats(self):
+        """Dump the instrumented numbers into the log, slowest slots first."""
+        stats = self.stats()
+        LOGGER.info(
+            "%s stats over %.1fs", self.objectName() or "CustomTreeWidget",
+            stats["elapsed"]
+        )
+        for signal_name, count in sorted(stats["signals"].items()):
+            LOGGER.info("  signal %-28s %8d emits", signal_name, count)
+        slots = sorted(
+            stats["slots"].items(), key=lambda item: item[1]["total"],
+            reverse=True
+        )
+        for slot_name, slot_stats in slots:
+            LOGGER.info(
+                "  slot   %-28s %8d calls %10.4fs total %10.6fs max",
+                slot_name, slot_stats["calls"], slot_stats["total"],
+                slot_stats["max"]
+            )
+
+    def selection_item_changed(self, current, previous):
+        """Overrides widget's default signal.
+
+        Emiited when current item selection is changed. This will also toggles
+        the state of `self.add_child_btn`.
+        If a child item is selected, the "Add Child" button will be disabled.
+
+        Args:
+            current (CustomTreeWidgetItem): Current selected item.
+            previous (CustomTreeWidgetItem or None): Previous selected item.
+        """
+        state = True
+        if not current or current.parent():
+            state = False
+
+        self.selectionItemChanged.emit(state)
+
+    def tree_item_changed(self, item, column):
         """Overrides widget's default signal.
 
         Emitted when the contents of the selected item in the column changes.
@@ -181,54 +1848,4658 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
             item (CustomTreeWidgetItem): Selected item.
             column (int): Column value of the selected item.
         """
-        # If renaming does occurs, set the TreeWidgetItem to have IsNewItemRole
+        # If renaming does occurs, set the TreeWidgetItem to have IsNewItemRole.
+        # The renaming itself is recorded into `contentsUpdate` by the item.
         if self.rename_counter and self.prev_name != item.text(column):
             self.rename_counter = False
             item.setData(0, IsNewItemRole, True)
 
-            self.contentsUpdate.emit()
-
-        #>>> TODO - To do a double take where `contentsUpdate` may not be
-        # emitting correctly.
         elif item.data(column, IsNewItemRole):
             # print '>>> item is already an newitemrole'
             return
 
-        # if item.checkState(column) == QtCore.Qt.Checked:
-        #     print('Item Checked')
-        # elif item.checkState(column) == QtCore.Qt.Unchecked:
-        #     print('Item Unchecked')
+        # if item.checkState(column) == QtCore.Qt.Checked:
+        #     print('Item Checked')
+        # elif item.checkState(column) == QtCore.Qt.Unchecked:
+        #     print('Item Unchecked')
+
+        # elif item.text(0) and self._startup:
+        #     print 'Item Name changed'
+        #     item.setData(0, IsNewItemRole, True)
+        # print
+
+    def tree_item_double_clicked(self, item, column):
+        """Overrides widget's default signal.
+
+        Emitted when User performs double clicks inside the widget.
+
+        Args:
+            item (CustomTreeWidgetItem): Selected item.
+            column (int): Column value of the selected item.
+        """
+        # print '>>> tree item double clicked...'
+        self.prev_name = item.text(column)
+        self.rename_counter = True
+
+    def tree_item_expanded(self, item):
+        """Overrides widget's default signal.
+
+        Emitted when an item is expanded. Children of a lazily populated item
+        are fetched upon its first expansion.
+
+        Args:
+            item (CustomTreeWidgetItem): Expanded item.
+        """
+        if self.can_fetch_more(item):
+            self.fetch_more(item)
+
+    def show_custom_menu(self, pos):
+        """Display custom context menu on CustomTreeWidgetItem.
+
+        There are 2 sets of context menus depending on the hierarichal level
+        of the QTreeWidgetItem.
+        
+        Args:
+            pos (QtCore.QPoint): Mouse cursor position when performing right-
+                click action.
+        """
+        base_node = self.itemAt(pos)
+        if base_node is None:
+            return
+
+        qmenu = QtWidgets.QMenu(self)
+        remove_action = QtWidgets.QAction("Remove item", self)
+        remove_action.triggered.connect(self.remove_selected_item)
+        qmenu.addAction(remove_action)
+
+        #>>>
+        move_func = self.move_item
+        if self.selectionMode() != QtWidgets.QAbstractItemView.SingleSelection:
+            move_func = self.move_item_multi
+
+        move_up_action = QtWidgets.QAction("Move Up", self)
+        move_up_action.triggered.connect(partial(move_func, direction="up"))
+        qmenu.addAction(move_up_action)
+
+        move_down_action = QtWidgets.QAction("Move down", self)
+        move_down_action.triggered.connect(partial(move_func, direction="down"))
+        qmenu.addAction(move_down_action)
+
+        # The following options are only effected for top-level items
+        # top-level items do not have `parent()`
+        if base_node.parent() is None:
+            add_new_child_action = QtWidgets.QAction("Add new sub item", self)
+            add_new_child_action.triggered.connect(
+                partial(self.add_new_child_item, base_node)
+            )
+            # qmenu.addAction(add_new_child_action)
+            qmenu.insertAction(remove_action, add_new_child_action)
+
+        qmenu.exec_(self.mapToGlobal(pos))
+
+    def populate(self, tree_items, replace=True):
+        """Build the tree from given contents in one pass.
+
+        Items are created off-tree and attached with `addChildren` and
+        `addTopLevelItems`, while signals and updates of the widget are
+        suspended. No `itemToggled` nor `itemChanged` will be emitted, the
+        new top-level items are reported by `contentsUpdate` only.
+
+        A callable given in place of the children is registered as the child
+        provider of the top-level item, see `set_child_provider`. Startup then
+        only costs the top-level items.
+
+        Args:
+            tree_items (dict): Either in `{parent: [children]}` or in
+                `{page: {parent: [children]}}` format.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand. If False,
+                children of an existing top-level item of the same name will
+                be appended into it. True by default.
+        """
+        signals_blocked = self.blockSignals(True)
+        self.setUpdatesEnabled(False)
+        try:
+            if replace:
+                self.clear()
+
+            root_item = self.invisibleRootItem()
+            existing_items = {}
+            for num in range(root_item.childCount()):
+                top_level_item = root_item.child(num)
+                existing_items.setdefault(top_level_item.text(0), top_level_item)
+
+            new_items = []
+            lazy_items = []
+            for parent_name, child_names in _iter_parent_items(tree_items):
+                parent_item = existing_items.get(parent_name)
+                if parent_item is None:
+                    parent_item = CustomTreeWidgetItem(
+                        None, parent_name, is_tristate=True
+                    )
+                    new_items.append(parent_item)
+
+                if callable(child_names):
+                    lazy_items.append((parent_item, child_names))
+                    continue
+
+                parent_item.addChildren([
+                    CustomTreeWidgetItem(None, child_name)
+                    for child_name in child_names
+                ])
+
+            self.addTopLevelItems(new_items)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.blockSignals(signals_blocked)
+
+        for parent_item, provider in lazy_items:
+            self.set_child_provider(parent_item, provider)
+
+        # Replaced contents are not undone
+        if replace:
+            self.clear_undo()
+
+    def load_tree_items(self, records, replace=True):
+        """Build the tree from a stream of records.
+
+        Counterpart of `populate` for contents too large to be gathered into
+        a dict beforehand, eg. as read by `read_tree_items`. Children are
+        created in chunks, and each new top-level item is attached once its
+        records are consumed. Signals and updates of the widget are suspended
+        as per `populate`.
+
+        Args:
+            records (iterable(tuple)): `(parent, child, state)` records, as
+                yielded by `iter_tree_items`. A None child adds the top-level
+                item alone, a None state leaves the child unchecked. Check
+                states of top-level items follow their children.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand. If False,
+                children of an existing top-level item of the same name will
+                be appended into it. True by default.
+        """
+        signals_blocked = self.blockSignals(True)
+        self.setUpdatesEnabled(False)
+        try:
+            if replace:
+                self.clear()
+
+            # Records mostly go on with the last top-level item, eg. when
+            # loaded batch by batch. The top-level items are only mapped by
+            # name once another one is referred to.
+            root_item = self.invisibleRootItem()
+            existing_items = None
+            parent_item = None
+            if root_item.childCount():
+                parent_item = root_item.child(root_item.childCount() - 1)
+
+            # New top-level item, attached once all of its children are added
+            pending_item = None
+            for parent_name, children in _iter_record_chunks(records):
+                if parent_item is None or parent_item.text(0) != parent_name:
+                    if existing_items is None:
+                        existing_items = {}
+                        for num in range(root_item.childCount()):
+                            top_level_item = root_item.child(num)
+                            existing_items.setdefault(
+                                top_level_item.text(0), top_level_item
+                            )
+                    parent_item = existing_items.get(parent_name)
+
+                if parent_item is None:
+                    parent_item = CustomTreeWidgetItem(
+                        None, parent_name, is_tristate=True
+                    )
+                    existing_items[parent_name] = parent_item
+                    if pending_item is not None:
+                        self.addTopLevelItem(pending_item)
+                    pending_item = parent_item
+
+                child_items = []
+                for child_name, state in children:
+                    child_item = CustomTreeWidgetItem(None, child_name)
+                    if state is not None and state != QtCore.Qt.Unchecked:
+                        QtWidgets.QTreeWidgetItem.setData(
+                            child_item, 0, QtCore.Qt.CheckStateRole, state
+                        )
+                    child_items.append(child_item)
+                parent_item.addChildren(child_items)
+
+            if pending_item is not None:
+                self.addTopLevelItem(pending_item)
+        finally:
+            self.setUpdatesEnabled(True)
+            self.blockSignals(signals_blocked)
+
+        # Replaced contents are not undone
+        if replace:
+            self.clear_undo()
+
+    def set_child_provider(self, top_level_item, provider):
+        """Populate the children of given top-level item upon its first
+        expansion.
+
+        The item shows its expand arrow until then. The provider is called
+        once, with the name of the item, and returns the names of the child
+        items. Children are then appended as per `populate`, and inherit the
+        check state of the item if it has been checked beforehand.
+
+        Args:
+            top_level_item (CustomTreeWidgetItem): Top-level item.
+            provider (callable): Returns an iterable of child names.
+        """
+        self._child_providers[id(top_level_item)] = (top_level_item, provider)
+        top_level_item.setChildIndicatorPolicy(
+            QtWidgets.QTreeWidgetItem.ShowIndicator
+        )
+        if top_level_item.data(0, QtCore.Qt.CheckStateRole) is None:
+            # Shows the checkbox of the item while it has no children
+            QtWidgets.QTreeWidgetItem.setData(
+                top_level_item, 0, QtCore.Qt.CheckStateRole, QtCore.Qt.Unchecked
+            )
+        self._refresh_after_bulk_edit(top_level_item)
+
+        if top_level_item.isExpanded():
+            self.fetch_more(top_level_item)
+
+    def can_fetch_more(self, top_level_item):
+        """Check if given top-level item has children yet to be fetched.
+
+        Args:
+            top_level_item (QtWidgets.QTreeWidgetItem): Top-level item.
+
+        Returns:
+            bool: True if a child provider is pending for the item.
+        """
+        return id(top_level_item) in self._child_providers
+
+    def fetch_more(self, top_level_item):
+        """Fetch the children of given top-level item from its provider.
+
+        Fetched children are neither reported by `contentsUpdate` nor by
+        `itemsToggled`, as they are not changes made by User.
+
+        Args:
+            top_level_item (QtWidgets.QTreeWidgetItem): Top-level item.
+
+        Returns:
+            bool: True if the children have been fetched. False if there is no
+                pending provider for the item.
+        """
+        entry = self._child_providers.pop(id(top_level_item), None)
+        if entry is None:
+            return False
+
+        children = [
+            CustomTreeWidgetItem(None, child_name)
+            for child_name in entry[1](top_level_item.text(0))
+        ]
+        if top_level_item.checkState(0) == QtCore.Qt.Checked:
+            for child_item in children:
+                QtWidgets.QTreeWidgetItem.setData(
+                    child_item, 0, QtCore.Qt.CheckStateRole, QtCore.Qt.Checked
+                )
+
+        # Fetched children are not an edit to be undone
+        self._is_bulk_editing = True
+        undo_suspended = self._set_undo_suspended(True)
+        try:
+            top_level_item.addChildren(children)
+        finally:
+            self._set_undo_suspended(undo_suspended)
+            self._is_bulk_editing = False
+        top_level_item.setChildIndicatorPolicy(
+            QtWidgets.QTreeWidgetItem.DontShowIndicatorWhenChildless
+        )
+        self._refresh_after_bulk_edit(top_level_item)
+        return True
+
+    def derive_unloaded_items(self):
+        """Derive top-level items whose children are yet to be fetched.
+
+        Returns:
+            list(QtWidgets.QTreeWidgetItem): Top-level items, in tree order.
+        """
+        root_item = self.invisibleRootItem()
+        return [
+            root_item.child(num)
+            for num in range(root_item.childCount())
+            if id(root_item.child(num)) in self._child_providers
+        ]
+
+    def move_item(self, direction=""):
+        """Move selected item up/ down the index order as defined by User.
+
+        If top-level item is selected, the child items within will be moved
+        along with it.
+        
+        Args:
+            direction (str): Either 'up' or 'down'. Denotes the direction of
+                the new item placement.
+        """
+        
+        selected = self.currentItem()
+        is_undo_recording = self._is_undo_recording()
+        undo_suspended = self._set_undo_suspended(True)
+        self._is_moving_item = True
+        try:
+            parent_row, selected_index, new_index = self._move_current_item(
+                selected, direction
+            )
+        finally:
+            self._is_moving_item = False
+            self._set_undo_suspended(undo_suspended)
+
+        if new_index != selected_index:
+            self._pending_change_set()["moved"].append(
+                self.derive_item_path(selected)
+            )
+
+        if is_undo_recording and new_index != selected_index:
+            self._record_undo((
+                _UNDO_MOVE, parent_row, ((selected_index, selected_index),),
+                direction
+            ))
+
+    def _move_current_item(self, selected, direction):
+        """Move given item by one position, see `move_item`.
+
+        Returns:
+            tuple(int, int, int): Row of the top-level item (-1 for the
+                top-level items themselves), previous and new row of the
+                item.
+        """
+        # Top-Level item in selection
+        if selected.parent() is None:
+            parent_row = -1
+            selected_index = self.indexOfTopLevelItem(selected)
+            selected_item = self.topLevelItem(selected_index)
+            self.takeTopLevelItem(selected_index)
+
+            root_item = self.invisibleRootItem()
+            top_level_count = root_item.childCount()
+
+            if direction == "up":
+                new_index = selected_index - 1
+
+                if new_index < 0:
+                    new_index = 0
+
+            elif direction == "down":
+                new_index = selected_index + 1
+
+                if new_index > top_level_count:
+                    new_index = top_level_count
+
+            self.insertTopLevelItem(new_index, selected_item)
+            selected_item.setExpanded(True)
+
+        # Child item in selection
+        else:
+            parent_item = selected.parent()
+            parent_row = self.indexOfTopLevelItem(parent_item)
+            selected_index = parent_item.indexOfChild(selected)
+            selected_item = parent_item.takeChild(selected_index)
+
+            child_count = parent_item.childCount()
+
+            if direction == "up":
+                new_index = selected_index - 1
+
+                if new_index < 0:
+                    new_index = 0
+
+            elif direction == "down":
+                new_index = selected_index + 1
+
+                if new_index > child_count:
+                    new_index = child_count
+
+            parent_item.insertChild(new_index, selected_item)
+
+        self.setCurrentItem(selected_item)
+        return parent_row, selected_index, new_index
+
+    def move_item_multi(self, direction=""):
+        """Move selected items up/ down the index order as defined by User.
+
+        Selected rows are grouped per parent, and each contiguous run of rows
+        is moved by one position as a block, by moving the unselected item
+        next to it to the other side of the run. Runs that are already at
+        the first/ last row stay in place. Selection, current item and the
+        expanded state of top-level items are kept, and the widget is
+        repainted once.
+
+        Args:
+            direction (str): Either 'up' or 'down'. Denotes the direction of
+                the new item placement.
+        """
+        if direction not in ("up", "down"):
+            return
+
+        rows_per_parent = self.derive_selected_rows()
+        if not rows_per_parent:
+            return
+
+        # Parents are resolved upfront, as top-level rows may be moved too
+        groups = [
+            (parent_row, self.topLevelItem(parent_row), rows)
+            for parent_row, rows in rows_per_parent.items()
+            if parent_row != -1
+        ]
+        if -1 in rows_per_parent:
+            groups.append((-1, None, rows_per_parent[-1]))
+
+        current_item = self.currentItem()
+        selected_runs = []
+        moved_paths = []
+
+        # Moved runs are recorded per parent, rather than per model signal
+        is_undo_recording = self._is_undo_recording()
+        undo_commands = []
+
+        self.setUpdatesEnabled(False)
+        self._is_bulk_editing = True
+        undo_suspended = self._set_undo_suspended(True)
+        try:
+            for parent_row, parent_item, rows in groups:
+                parent = parent_item or self.invisibleRootItem()
+                runs, new_runs = _derive_moved_runs(
+                    _contiguous_runs(rows), parent.childCount(), direction
+                )
+                selected_runs.append((parent_item, new_runs))
+                if not runs:
+                    continue
+
+                self._move_child_runs(parent_item, runs, direction)
+                self._refresh_after_bulk_edit(parent_item)
+                if is_undo_recording:
+                    undo_commands.append(
+                        (_UNDO_MOVE, parent_row, tuple(runs), direction)
+                    )
+
+                offset = -1 if direction == "up" else 1
+                prefix = "" if parent_item is None else parent_item.text(0) + "/"
+                for first, last in runs:
+                    moved_paths.extend(
+                        prefix + parent.child(row).text(0)
+                        for row in range(first + offset, last + offset + 1)
+                    )
+
+            if moved_paths:
+                self._reselect_runs(selected_runs)
+                if current_item is not None:
+                    self.selectionModel().setCurrentIndex(
+                        self.indexFromItem(current_item),
+                        QtCore.QItemSelectionModel.NoUpdate
+                    )
+        finally:
+            self._set_undo_suspended(undo_suspended)
+            self._is_bulk_editing = False
+            self.setUpdatesEnabled(True)
+
+        for command in undo_commands:
+            self._record_undo(command)
+
+        if moved_paths:
+            self._pending_change_set()["moved"].extend(moved_paths)
+
+    def _move_child_runs(self, parent_item, runs, direction):
+        """Move each run of rows by one position within its parent.
+
+        A few runs are moved by taking the neighbouring item and inserting it
+        on the other side of the run. Otherwise all the children are taken at
+        once and added back in their new order. Top-level items are always
+        moved one by one, so that their children are left untouched.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem or None): Parent of the
+                runs. None for the top-level items.
+            runs (list(tuple(int, int))): First and last row of each run that
+                can be moved, in ascending order.
+            direction (str): Either 'up' or 'down'.
+        """
+        if parent_item is None or len(runs) <= _TAKE_CHILD_LIMIT:
+            for first, last in runs:
+                if direction == "up":
+                    neighbour_row, new_row = first - 1, last
+                else:
+                    neighbour_row, new_row = last + 1, first
+
+                if parent_item is None:
+                    item = self.topLevelItem(neighbour_row)
+                    is_expanded = item.isExpanded()
+                    self.takeTopLevelItem(neighbour_row)
+                    self.insertTopLevelItem(new_row, item)
+                    item.setExpanded(is_expanded)
+                else:
+                    item = parent_item.takeChild(neighbour_row)
+                    parent_item.insertChild(new_row, item)
+            return
+
+        items = parent_item.takeChildren()
+        for first, last in runs:
+            if direction == "up":
+                items[first - 1:last + 1] = items[first:last + 1] + [items[first - 1]]
+            else:
+                items[first:last + 2] = [items[last + 1]] + items[first:last + 1]
+        parent_item.addChildren(items)
+
+    def _reselect_runs(self, selected_runs):
+        """Replace the selection with given runs of rows, in one go.
+
+        Args:
+            selected_runs (list): Parent item (None for the top-level items)
+                and the runs of rows (list(tuple(int, int))) to be selected.
+        """
+        model = self.model()
+        selection = QtCore.QItemSelection()
+        for parent_item, runs in selected_runs:
+            if parent_item is None:
+                parent_index = QtCore.QModelIndex()
+            else:
+                parent_index = self.indexFromItem(parent_item)
+            for first, last in runs:
+                selection.select(
+                    model.index(first, 0, parent_index),
+                    model.index(last, 0, parent_index)
+                )
+        # Single column, so ranges are not expanded into rows
+        self.selectionModel().select(
+            selection, QtCore.QItemSelectionModel.ClearAndSelect
+        )
+
+    def add_item_dialog(self, title):
+        """Input dialog for creation of new Parent or Sub items.
+
+        Args:
+            title (str): Title indication to be display in Dialog for parent/
+                sub items creation.
+
+        Returns:
+            str: Name of new created item.
+        """
+        text, ok = QtWidgets.QInputDialog.getText(
+            self,
+            "Add {0} Item".format(title),
+            "Enter name for {0}-Item:".format(title)
+        )
+        if ok and text != "":
+            return text
+
+    def add_new_parent_item(self):
+        """Creation of new parent item."""
+        input_text = self.add_item_dialog("Parent")
+
+        if input_text:
+
+            if self.is_existing_name(input_text):
+                print ("'{0}' already exists!".format(input_text))
+                return
+
+            new_item = CustomTreeWidgetItem(
+                self, input_text, is_tristate=True, is_new_item=True
+            )
+
+            self.setCurrentItem(new_item)
+
+    def add_new_child_item(self, base_node):
+        """Creation of new child item, to be populated under parent item.
+
+        Args:
+            base_node (CustomTreeWidgetItem): Parent node for child item to be
+                added into.
+        """
+        input_text = self.add_item_dialog("Sub")
+
+        if input_text:
+            # Duplicates are checked against the fetched children
+            if self.can_fetch_more(base_node):
+                self.fetch_more(base_node)
+
+            if self.is_existing_name(input_text, base_node):
+                print ("'{0}' already existed under {1}".format(
+                    input_text,
+                    base_node.text(0)
+                ))
+                return
+
+            it = CustomTreeWidgetItem(base_node, input_text, is_new_item=True)
+            base_node.setExpanded(True)
+
+            self.setCurrentItem(it)
+
+    def is_top_level_item(self):
+        """Check if currently selected item is a top-level item.
+
+        Returns:
+            bool: True if selected item is top-level item. False if otherwise.
+        """
+        result = True
+        if self.currentItem().parent():
+            result = False
+        return result
+
+    def remove_selected_item(self):
+        """Removes selected entry in TreeWidget.
+
+        This method applies to both parent and child items. Selected rows are
+        grouped per parent and taken out in bulk while updates of the widget
+        are suspended.
+        """
+        rows_per_parent = self.derive_selected_rows()
+
+        # Children of removed top-level items go along with them
+        top_level_rows = rows_per_parent.pop(-1, [])
+        removed_parents = set(top_level_rows)
+
+        current_item = self.currentItem()
+        removed_items = []
+        removed_paths = []
+
+        # Removed rows are recorded as a whole, rather than per model signal
+        is_undo_recording = self._is_undo_recording()
+        undo_commands = []
+
+        self.setUpdatesEnabled(False)
+        self._is_bulk_editing = True
+        undo_suspended = self._set_undo_suspended(True)
+        try:
+            for parent_row, rows in rows_per_parent.items():
+                if parent_row in removed_parents:
+                    continue
+
+                parent_item = self.topLevelItem(parent_row)
+                prefix = parent_item.text(0) + "/"
+                taken_items = self._take_child_rows(parent_item, rows)
+                removed_paths.extend(prefix + item.text(0) for item in taken_items)
+                removed_items.extend(taken_items)
+                self._refresh_after_bulk_edit(parent_item)
+                if is_undo_recording:
+                    undo_commands.append((
+                        _UNDO_REMOVE, parent_row, tuple(_contiguous_runs(rows)),
+                        self._pack_undo_items(taken_items)
+                    ))
+
+            if is_undo_recording and removed_parents:
+                # Packed while in the tree, to keep their expanded state
+                undo_commands.append((
+                    _UNDO_REMOVE, -1, tuple(_contiguous_runs(removed_parents)),
+                    self._pack_undo_items([
+                        self.topLevelItem(row) for row in sorted(removed_parents)
+                    ])
+                ))
+
+            for row in sorted(removed_parents, reverse=True):
+                item = self.takeTopLevelItem(row)
+                self._name_index.pop(id(item), None)
+                self._child_items_cache.pop(id(item), None)
+                self._child_providers.pop(id(item), None)
+                removed_paths.append(item.text(0))
+                removed_items.append(item)
+            if removed_parents:
+                self._refresh_after_bulk_edit()
+        finally:
+            self._set_undo_suspended(undo_suspended)
+            self._is_bulk_editing = False
+            self.setUpdatesEnabled(True)
+
+        for command in undo_commands:
+            self._record_undo(command)
+
+        # Unselected children that have been taken and added back
+        if current_item is not None and current_item.treeWidget() is self:
+            self.setCurrentItem(current_item)
+
+        if removed_paths:
+            self._pending_change_set()["removed"].extend(removed_paths)
+
+        # Removed items are freed together, as the last references are dropped
+        del removed_items[:]
+
+    def derive_selected_rows(self):
+        """Derive the rows of selected items, grouped per parent.
+
+        Rows are read from the selection ranges, without looking up the index
+        of each selected item. The tree only allows 1-tier sub-menu, items
+        nested any deeper are left out rather than mistaken for the children
+        of a top-level item.
+
+        Returns:
+            dict: Rows of selected items (list(int)), keyed by the row of their
+                top-level item. Selected top-level items are keyed by -1.
+        """
+        rows_per_parent = defaultdict(list)
+        for selection_range in self.selectionModel().selection():
+            parent_index = selection_range.parent()
+            if not parent_index.isValid():
+                parent_row = -1
+            elif not parent_index.parent().isValid():
+                parent_row = parent_index.row()
+            else:
+                continue
+            rows_per_parent[parent_row].extend(
+                range(selection_range.top(), selection_range.bottom() + 1)
+            )
+        return rows_per_parent
+
+    def _take_child_rows(self, parent_item, rows):
+        """Take the child items of given rows out of the parent item.
+
+        A few rows are taken one by one, starting from the last one, so that
+        the rows still to be taken keep their position. Otherwise all the
+        children are taken at once, and the runs of rows in between the taken
+        ones are added back. That costs two model updates whatever the number
+        of rows, see `_TAKE_CHILD_LIMIT`.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem): Parent item.
+            rows (list(int)): Rows of the child items to be taken.
+
+        Returns:
+            list(QtWidgets.QTreeWidgetItem): Taken items, in ascending order.
+        """
+        rows = sorted(set(rows))
+        if len(rows) <= _TAKE_CHILD_LIMIT:
+            taken_items = [parent_item.takeChild(row) for row in reversed(rows)]
+            taken_items.reverse()
+            return taken_items
+
+        # Kept runs lie in between the taken ones
+        children = parent_item.takeChildren()
+        taken_items = []
+        kept_items = []
+        kept_first = 0
+        for first, last in _contiguous_runs(rows):
+            kept_items.extend(children[kept_first:first])
+            taken_items.extend(children[first:last + 1])
+            kept_first = last + 1
+        kept_items.extend(children[kept_first:])
+
+        parent_item.addChildren(kept_items)
+        return taken_items
+
+    def _insert_child_rows(self, parent_item, rows, items):
+        """Insert child items at given rows of the parent item.
+
+        Counterpart of `_take_child_rows`: a few items are inserted one by
+        one, otherwise all the children are taken at once and added back
+        along with the inserted items.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem): Parent item.
+            rows (list(int)): Rows of the inserted items once inserted, in
+                ascending order.
+            items (list(QtWidgets.QTreeWidgetItem)): Items to be inserted,
+                one per row.
+        """
+        if len(rows) <= _TAKE_CHILD_LIMIT:
+            for row, item in zip(rows, items):
+                parent_item.insertChild(row, item)
+            return
+
+        kept_items = parent_item.takeChildren()
+        inserted_items = dict(zip(rows, items))
+        kept_iter = iter(kept_items)
+        parent_item.addChildren([
+            inserted_items[row] if row in inserted_items else next(kept_iter)
+            for row in range(len(kept_items) + len(inserted_items))
+        ])
+
+    def get_selected_text(self):
+        """Get the text naming of selected item.
+        
+        If parent item is selected, only the name will be return.
+        If child item is selected, it will returns with the prefix of its parent
+        naming, eg. 'parentName/childName'.
+
+        Retuns:
+            str or None: Name of selected item.
+        """
+        current_item = self.currentItem()
+        if current_item:
+            return self.derive_item_path(current_item)
+
+    def derive_item_path(self, item):
+        """Derive the path of given item.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Parent or child item.
+
+        Returns:
+            str: Name of the item, prefixed with the name of its parent if it
+                is a child item, eg. 'parentName/childName'.
+        """
+        item_name = item.text(0)
+
+        # When child-item is given
+        if item.parent():
+            item_name = "{0}/{1}".format(item.parent().text(0), item_name)
+
+        return item_name
+
+    def get_selected_child_count(self):
+        """Derive number of child items under top-level item.
+
+        Returns:
+            int: Number of child items found under parent.
+        """
+        current_item = self.currentItem()
+        if current_item:
+            base_node = current_item.parent() or current_item
+            return base_node.childCount()
+
+    def derive_child_counts(self, base_node):
+        """Derive number of child items under given parent, per state.
+
+        Counts are kept by `CustomTreeWidgetItem` parents, and cost O(1) once
+        computed. Other parents will be counted on each call.
+
+        Args:
+            base_node (QtWidgets.QTreeWidgetItem): Parent node.
+
+        Returns:
+            dict: Number of child items, with "total", "checked",
+                "unchecked" and "new" as keys.
+        """
+        if isinstance(base_node, CustomTreeWidgetItem):
+            counts = base_node.child_counts()
+        else:
+            counts = _ChildCounts()
+            for num in range(base_node.childCount()):
+                counts.add_item(base_node.child(num))
+
+        return {
+            "total": base_node.childCount(),
+            "checked": counts.checked,
+            "unchecked": counts.unchecked,
+            "new": counts.new,
+        }
+
+    def _count_inserted_items(self, parent_index, first, last):
+        if not parent_index.isValid():
+            # Children may have been changed while the items were off-tree,
+            # they will be counted again upon the next query.
+            root_item = self.invisibleRootItem()
+            for num in range(first, last + 1):
+                item = root_item.child(num)
+                if getattr(item, "_child_counts", None) is not None:
+                    item._child_counts = None
+            return
+
+        parent_item = self.itemFromIndex(parent_index)
+        counts = getattr(parent_item, "_child_counts", None)
+        if counts is not None:
+            for num in range(first, last + 1):
+                counts.add_item(parent_item.child(num))
+
+    def _uncount_removed_items(self, parent_index, first, last):
+        if not parent_index.isValid():
+            return
+
+        parent_item = self.itemFromIndex(parent_index)
+        counts = getattr(parent_item, "_child_counts", None)
+        if counts is not None:
+            for num in range(first, last + 1):
+                counts.add_item(parent_item.child(num), sign=-1)
+
+    def set_check_state(self, items_or_paths, state):
+        """Check/ uncheck given items in one pass.
+
+        States are set without going through `CustomTreeWidgetItem.setData`
+        per item, and tri-state parents are derived once. Toggled items are
+        reported by a single `itemsToggled` and `contentsUpdate`, not by
+        `itemToggled`. The edit is undone as a single entry, see
+        `set_undo_enabled`.
+
+        Args:
+            items_or_paths (iterable): Items, or their paths, eg.
+                'parentName/childName'. A top-level item stands for all of
+                its children, if it has any.
+            state (QtCore.Qt.CheckState): New check state of the items.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+
+        Raises:
+            ValueError: If no item is found at one of the paths.
+        """
+        root_item = self.invisibleRootItem()
+        row_states = OrderedDict()
+        for item in self._derive_check_items(items_or_paths):
+            parent_item = item.parent()
+            if parent_item is None and item.childCount():
+                rows = range(item.childCount())
+                parent_item = item
+            else:
+                rows = (self.indexFromItem(item).row(),)
+                parent_item = parent_item or root_item
+
+            key = id(parent_item)
+            if key not in row_states:
+                row_states[key] = (parent_item, {})
+            row_states[key][1].update(dict.fromkeys(rows, state))
+        return self._set_check_states(row_states.values())
+
+    def check_all(self, parent_item=None):
+        """Check all child items of given top-level item in one pass, as
+        per `set_check_state`.
+
+        Keyword Args:
+            parent_item (QtWidgets.QTreeWidgetItem or str or None): Top-level
+                item, or its name. All items of the tree if None.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        return self._set_scope_check_state(parent_item, QtCore.Qt.Checked)
+
+    def uncheck_all(self, parent_item=None):
+        """Uncheck all child items of given top-level item in one pass, as
+        per `set_check_state`.
+
+        Keyword Args:
+            parent_item (QtWidgets.QTreeWidgetItem or str or None): Top-level
+                item, or its name. All items of the tree if None.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        return self._set_scope_check_state(parent_item, QtCore.Qt.Unchecked)
+
+    def invert_checks(self, parent_item=None):
+        """Toggle all child items of given top-level item in one pass, as
+        per `set_check_state`. Partially checked items get checked.
+
+        Keyword Args:
+            parent_item (QtWidgets.QTreeWidgetItem or str or None): Top-level
+                item, or its name. All items of the tree if None.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        return self._set_scope_check_state(parent_item, None)
+
+    def _derive_check_items(self, items_or_paths):
+        """Resolve the items of `set_check_state`. Paths are looked up
+        through maps of names, built once per call.
+
+        Yields:
+            QtWidgets.QTreeWidgetItem: Given items, and the ones at given
+                paths.
+
+        Raises:
+            ValueError: If no item is found at one of the paths.
+        """
+        top_level_items = None
+        child_rows = {}
+        for item in items_or_paths:
+            if not isinstance(item, _STRING_TYPES):
+                yield item
+                continue
+
+            # First item of each name, as per `derive_item_from_path`
+            if top_level_items is None:
+                top_level_items = {}
+                for num in range(self.topLevelItemCount() - 1, -1, -1):
+                    top_level_item = self.topLevelItem(num)
+                    top_level_items[top_level_item.text(0)] = top_level_item
+
+            parent_name, _, child_name = item.partition("/")
+            found_item = top_level_items.get(parent_name)
+            if found_item is not None and child_name:
+                rows = child_rows.get(id(found_item))
+                if rows is None:
+                    reversed_rows = range(found_item.childCount() - 1, -1, -1)
+                    rows = child_rows[id(found_item)] = dict(zip(
+                        [found_item.child(row).text(0) for row in reversed_rows],
+                        reversed_rows
+                    ))
+                row = rows.get(child_name)
+                found_item = None if row is None else found_item.child(row)
+
+            if found_item is None:
+                raise ValueError("No item found at '{0}'".format(item))
+            yield found_item
+
+    def _set_scope_check_state(self, parent_item, state):
+        """Set the check state of all child items of given top-level item.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem or str or None): Top-level
+                item, or its name. All items of the tree if None.
+            state (QtCore.Qt.CheckState or None): New check state, None to
+                toggle the current ones.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        root_item = self.invisibleRootItem()
+        if parent_item is None:
+            parent_items = [
+                root_item.child(num) for num in range(root_item.childCount())
+            ]
+        else:
+            parent_items = list(self._derive_check_items([parent_item]))
+
+        groups = []
+        # Top-level items without children have states of their own
+        leaf_rows = []
+        for item in parent_items:
+            child_count = item.childCount()
+            if child_count:
+                groups.append((item, range(child_count)))
+            elif item.parent() is None:
+                leaf_rows.append(root_item.indexOfChild(item))
+        if leaf_rows:
+            groups.append((root_item, leaf_rows))
+
+        if state is not None:
+            return self._set_check_states(
+                (group_item, dict.fromkeys(rows, state))
+                for group_item, rows in groups
+            )
+
+        checked = QtCore.Qt.Checked
+        unchecked = QtCore.Qt.Unchecked
+        row_states = []
+        for group_item, rows in groups:
+            states = map(
+                _item_check_state, map(group_item.child, rows)
+            )
+            row_states.append((group_item, dict(zip(rows, [
+                unchecked if state == checked else checked for state in states
+            ]))))
+        return self._set_check_states(row_states)
+
+    def _set_check_states(self, row_states):
+        """Set the check states of the children of each parent in one pass.
+
+        Args:
+            row_states (iterable(tuple)): Parent item, and the check states
+                of its children by row, see `_set_child_check_states`.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        toggled_items = []
+        for parent_item, states in row_states:
+            toggled_items.extend(
+                self._set_child_check_states(parent_item, states)
+            )
+        return toggled_items
+
+    def _set_child_check_states(self, parent_item, row_states):
+        """Set the check states of child items in one pass.
+
+        Setting the children one by one makes a tristate parent derive its
+        own state from every child, upon every child. Model signals are
+        therefore blocked while the states are set, and a single
+        `dataChanged` is emitted over the changed rows and their parent.
+        Toggled items are reported and journaled at once, see
+        `_report_toggled_items`.
+
+        Tri-state items having children are to be given their children
+        instead, else Qt would cascade through `CustomTreeWidgetItem.setData`.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem): Parent of the items, the
+                invisible root item for top-level items.
+            row_states (dict): Check state of the items, by row.
+
+        Returns:
+            list(CustomTreeWidgetItem): Toggled items.
+        """
+        rows = list(row_states)
+        items = list(map(parent_item.child, rows))
+        old_states = list(map(_item_check_state, items))
+        is_toggled = list(map(ne, old_states, row_states.values()))
+        if not any(is_toggled):
+            return []
+
+        toggled_items = list(compress(items, is_toggled))
+        toggled_rows = list(compress(rows, is_toggled))
+        old_states = list(compress(old_states, is_toggled))
+        new_states = list(compress(row_states.values(), is_toggled))
+
+        tree_model = self.model()
+        signals_blocked = tree_model.blockSignals(True)
+        try:
+            for _ in map(QtWidgets.QTreeWidgetItem.setData, toggled_items,
+                         repeat(0), repeat(QtCore.Qt.CheckStateRole),
+                         new_states):
+                pass
+        finally:
+            tree_model.blockSignals(signals_blocked)
+
+        if getattr(parent_item, "_child_counts", None) is not None:
+            parent_item._child_counts = None
+        roles = [QtCore.Qt.CheckStateRole]
+        parent_index = self.indexFromItem(parent_item)
+        tree_model.dataChanged.emit(
+            tree_model.index(min(toggled_rows), 0, parent_index),
+            tree_model.index(max(toggled_rows), 0, parent_index),
+            roles
+        )
+        if parent_index.isValid():
+            tree_model.dataChanged.emit(parent_index, parent_index, roles)
+
+        self._report_toggled_items(
+            parent_item, toggled_items, toggled_rows, old_states, new_states
+        )
+        return toggled_items
+
+    def _report_toggled_items(self, parent_item, items, rows, old_states,
+                              new_states):
+        """Collect the toggled children of a parent at once, as per
+        `_report_toggled_item`. No `itemToggled` is emitted per item.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem): Parent of the items, the
+                invisible root item for top-level items.
+            items (list(CustomTreeWidgetItem)): Toggled items.
+            rows (list(int)): Rows of the items.
+            old_states (list(int)): Check states before the toggles.
+            new_states (list(int)): Check states after the toggles.
+        """
+        if not self._toggled_items:
+            self._toggled_timer.start()
+        self._toggled_items.extend(items)
+
+        if parent_item is self.invisibleRootItem():
+            prefix = ""
+            parent_row = -1
+        else:
+            prefix = parent_item.text(0) + "/"
+            parent_row = self.indexOfTopLevelItem(parent_item)
+        self._pending_change_set()["check_changed"].extend(
+            prefix + item.text(0) for item in items
+        )
+
+        if self._is_undo_recording() and self._undo_journal.record_checks(
+                parent_row, rows, old_states, new_states):
+            self._undo_timer.start()
+
+    def derive_top_level_names(self):
+        """Derive top-level items' names.
+
+        Returns:
+            list(str): List of top-level items' name.
+        """
+        root_item = self.invisibleRootItem()
+        top_level_count = root_item.childCount()
+        top_item_names = []
+
+        for num in range(top_level_count):
+            top_item_names.append(root_item.child(num).text(0))
+
+        return top_item_names
+
+    def derive_child_names_from_top_level(self, base_node):
+        """Derive child items' names from given top-level item.
+
+        Args:
+            base_node (CustomTreeWidgetItem): Selected parent node.
+
+        Returns:
+            list(str): List of child items' name found within the parent node.
+        """
+        child_count = base_node.childCount()
+        child_names = []
+        for num in range(child_count):
+            child_names.append(base_node.child(num).text(0))
+        return child_names
+
+    def derive_name_index(self, base_node=None):
+        """Derive the name index of the child items of given parent.
+
+        The returned mapping is kept up to date by the widget as items are
+        added, removed, moved and renamed. It should not be modified.
+
+        Keyword Args:
+            base_node (CustomTreeWidgetItem or None): Parent node. If None,
+                the index of the top-level items is returned.
+
+        Returns:
+            collections.Counter: Number of items found per name.
+        """
+        key = None if base_node is None else id(base_node)
+        entry = self._name_index.get(key)
+        if entry is None:
+            parent_item = base_node
+            if parent_item is None:
+                parent_item = self.invisibleRootItem()
+            names = Counter(
+                parent_item.child(num).text(0)
+                for num in range(parent_item.childCount())
+            )
+            # Holding onto the parent item keeps its id from being reused
+            entry = self._name_index[key] = (base_node, names)
+        return entry[1]
+
+    def is_existing_name(self, name, base_node=None):
+        """Check if an item of given name already exists under given parent.
+
+        Args:
+            name (str): Name of the item.
+
+        Keyword Args:
+            base_node (CustomTreeWidgetItem or None): Parent node. If None,
+                the top-level items will be checked.
+
+        Returns:
+            bool: True if the name is already in use.
+        """
+        return name in self.derive_name_index(base_node)
+
+    def _derive_parent_key(self, parent_index):
+        """Derive the cache key and the parent item of given index.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Index of parent item.
+
+        Returns:
+            tuple(int or None, QtWidgets.QTreeWidgetItem): Id of the parent
+                item (None for the top-level) and the parent item.
+        """
+        if parent_index.isValid():
+            parent_item = self.itemFromIndex(parent_index)
+            return id(parent_item), parent_item
+        return None, self.invisibleRootItem()
+
+    def _index_inserted_names(self, parent_index, first, last):
+        if not self._name_index:
+            return
+
+        key, parent_item = self._derive_parent_key(parent_index)
+        entry = self._name_index.get(key)
+        if entry is None:
+            return
+
+        names = entry[1]
+        for num in range(first, last + 1):
+            names[parent_item.child(num).text(0)] += 1
+
+    def _unindex_removed_names(self, parent_index, first, last):
+        if not self._name_index:
+            return
+
+        key, parent_item = self._derive_parent_key(parent_index)
+        entry = self._name_index.get(key)
+        names = entry[1] if entry is not None else None
+
+        for num in range(first, last + 1):
+            item = parent_item.child(num)
+            # Removal of top-level item drops the index of its children
+            if key is None:
+                self._name_index.pop(id(item), None)
+
+            if names is not None:
+                name = item.text(0)
+                names[name] -= 1
+                if names[name] <= 0:
+                    del names[name]
+
+    def _reindex_renamed_names(self, top_left, bottom_right, roles):
+        # Renaming of `CustomTreeWidgetItem` is reported along with the old
+        # name, see `_reindex_renamed_name`. Otherwise the old names are
+        # unknown, the siblings will be re-indexed upon the next lookup. No
+        # roles stand for all of them.
+        if not self._name_index:
+            return
+        if roles and QtCore.Qt.DisplayRole not in roles:
+            return
+
+        key, parent_item = self._derive_parent_key(top_left.parent())
+        if key not in self._name_index:
+            return
+        if not roles or not all(
+                isinstance(parent_item.child(row), CustomTreeWidgetItem)
+                for row in range(top_left.row(), bottom_right.row() + 1)):
+            self._name_index.pop(key, None)
+
+    def _reindex_renamed_name(self, item, old_name):
+        """Move given renamed item from its old name to its new one, within
+        the name index of its parent.
+
+        Args:
+            item (CustomTreeWidgetItem): Renamed item.
+            old_name (str): Previous name of the item.
+        """
+        parent_item = item.parent()
+        entry = self._name_index.get(
+            None if parent_item is None else id(parent_item)
+        )
+        if entry is None:
+            return
+
+        names = entry[1]
+        names[old_name] -= 1
+        if names[old_name] <= 0:
+            del names[old_name]
+        names[item.text(0)] += 1
+
+    def derive_matching_items(self, text):
+        """Derive the items whose name contains given text.
+
+        The search index is built upon the first call, and kept up to date as
+        items are added, removed and renamed. Children yet to be fetched are
+        not searched, see `set_child_provider`.
+
+        Args:
+            text (str): Text to search for, case-insensitively.
+
+        Returns:
+            list(QtWidgets.QTreeWidgetItem): Matching top-level and child items,
+                in no particular order.
+        """
+        if self._search_index is None:
+            search_index = _SearchIndex()
+            root_item = self.invisibleRootItem()
+            for top_num in range(root_item.childCount()):
+                top_level_item = root_item.child(top_num)
+                search_index.add(top_level_item)
+                key = id(top_level_item)
+                for num in range(top_level_item.childCount()):
+                    search_index.add(top_level_item.child(num), key)
+            self._search_index = search_index
+
+        return self._search_index.search(text)
+
+    def filter_text(self):
+        """Text the items are currently filtered with, empty if none."""
+        return self._filter_text
+
+    def is_filter_match(self, item):
+        """Check if given item matches the current filter.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Item to check.
+
+        Returns:
+            bool: True if the item matches, False if not or if there is no
+                filter.
+        """
+        return id(item) in self._filter_matches
+
+    def set_filter_text(self, text):
+        """Show only the items whose name contains given text.
+
+        Parents stay visible when any of their children matches. Matching
+        items are highlighted as `HIGHLIGHT_SEARCH_HIT`, without being stored
+        into their data, see `is_filter_match`. Changing the text only
+        updates the items that stop or start matching; the first filter also
+        hides the top-level items, and each parent is filtered row by row the
+        first time it turns visible.
+
+        Args:
+            text (str): Text to filter with, case-insensitively. Empty text
+                shows every item again.
+        """
+        if not text:
+            self._clear_filter()
+            return
+
+        matches = dict(
+            (id(item), item) for item in self.derive_matching_items(text)
+        )
+        old_matches = self._filter_matches
+        added = [item for key, item in matches.items() if key not in old_matches]
+        removed = [
+            item for key, item in old_matches.items() if key not in matches
+        ]
+
+        self.setUpdatesEnabled(False)
+        try:
+            if not self._filter_text:
+                root_index = QtCore.QModelIndex()
+                for num in range(self.topLevelItemCount()):
+                    self.setRowHidden(num, root_index, True)
+            self._filter_text = text
+            self._filter_matches = matches
+            self._apply_filter_changes(added, removed)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _clear_filter(self):
+        if not self._filter_text:
+            return
+
+        self.setUpdatesEnabled(False)
+        try:
+            for parent_item, _ in self._filter_revealed_parents.values():
+                if parent_item.treeWidget() is self:
+                    parent_index = self.indexFromItem(parent_item)
+                    for num in range(parent_item.childCount()):
+                        self.setRowHidden(num, parent_index, False)
+
+            root_index = QtCore.QModelIndex()
+            for num in range(self.topLevelItemCount()):
+                self.setRowHidden(num, root_index, False)
+        finally:
+            self.setUpdatesEnabled(True)
+
+        self._filter_text = ""
+        self._filter_matches = {}
+        self._filter_child_hits.clear()
+        self._filter_revealed_parents.clear()
+
+    def _reapply_filter(self):
+        text = self._filter_text
+        if text:
+            self._clear_filter()
+            self.set_filter_text(text)
+
+    def _add_filter_match(self, item):
+        self._filter_matches[id(item)] = item
+        self._apply_filter_changes([item], [])
+
+    def _remove_filter_match(self, item):
+        del self._filter_matches[id(item)]
+        self._apply_filter_changes([], [item])
+
+    def _apply_filter_changes(self, added, removed):
+        """Reflect the items that start/ stop matching the filter, once
+        `_filter_matches` has been updated.
+
+        Args:
+            added (list(QtWidgets.QTreeWidgetItem)): Items now matching.
+            removed (list(QtWidgets.QTreeWidgetItem)): Items no longer
+                matching.
+        """
+        hits = self._filter_child_hits
+        changed_parents = {}
+        for sign, items in ((-1, removed), (1, added)):
+            for item in items:
+                parent_item = item.parent()
+                if parent_item is None:
+                    changed_parents.setdefault(id(item), (item, []))
+                    continue
+
+                key = id(parent_item)
+                hits[key] += sign
+                changed_parents.setdefault(key, (parent_item, []))[1].append(item)
+
+        for parent_item, child_items in changed_parents.values():
+            self._update_filtered_parent(parent_item, child_items)
+
+        # Repaints the highlight of the items that stayed visible
+        if changed_parents:
+            self.viewport().update()
+
+    def _update_filtered_parent(self, parent_item, child_items=()):
+        """Show given top-level item if it or any of its children matches the
+        filter, hide it otherwise.
+
+        The children are filtered row by row the first time the parent is
+        shown, which also maps them to their rows. Afterwards, only the rows
+        of the changed children are updated.
+
+        Args:
+            parent_item (QtWidgets.QTreeWidgetItem): Top-level item.
+
+        Keyword Args:
+            child_items (list(QtWidgets.QTreeWidgetItem)): Children that start/
+                stop matching the filter.
+        """
+        key = id(parent_item)
+        matches = self._filter_matches
+        if self._filter_child_hits[key] <= 0:
+            self._filter_child_hits.pop(key, None)
+        is_visible = key in matches or key in self._filter_child_hits
+
+        # Filtered through the rows, as each item scans its siblings upon the
+        # first lookup of its own row
+        entry = self._filter_revealed_parents.get(key)
+        if entry is None and is_visible:
+            parent_index = self.indexFromItem(parent_item)
+            rows = {}
+            for num in range(parent_item.childCount()):
+                child_key = id(parent_item.child(num))
+                rows[child_key] = num
+                self.setRowHidden(num, parent_index, child_key not in matches)
+            self._filter_revealed_parents[key] = [parent_item, rows]
+
+        elif entry is not None and child_items:
+            rows = entry[1]
+            if rows is None:
+                rows = entry[1] = dict(
+                    (id(parent_item.child(num)), num)
+                    for num in range(parent_item.childCount())
+                )
+            parent_index = self.indexFromItem(parent_item)
+            for child_item in child_items:
+                child_key = id(child_item)
+                self.setRowHidden(
+                    rows[child_key], parent_index, child_key not in matches
+                )
+
+        parent_item.setHidden(not is_visible)
+
+    def _search_inserted_items(self, parent_index, first, last):
+        if self._search_index is None and not self._filter_text:
+            return
+
+        key, parent_item = self._derive_parent_key(parent_index)
+        items = []
+        for num in range(first, last + 1):
+            item = parent_item.child(num)
+            # Children of an inserted top-level item come first, so that the
+            # parent is filtered upon their matches
+            if key is None:
+                items.extend(item.child(row) for row in range(item.childCount()))
+            items.append(item)
+
+        if self._search_index is not None:
+            for item in items:
+                parent_item = item.parent()
+                self._search_index.add(
+                    item, None if parent_item is None else id(parent_item)
+                )
+
+        if not self._filter_text:
+            return
+
+        # Rows of the following siblings are shifted
+        entry = self._filter_revealed_parents.get(key)
+        if entry is not None:
+            entry[1] = None
+
+        text = self._filter_text.lower()
+        for num, item in enumerate(items, first):
+            if text in item.text(0).lower():
+                self._add_filter_match(item)
+            elif key is None:
+                if item.parent() is None:
+                    self._update_filtered_parent(item)
+            elif entry is not None:
+                self.setRowHidden(num, parent_index, True)
+
+    def _unsearch_removed_items(self, parent_index, first, last):
+        if self._search_index is None and not self._filter_text:
+            return
+
+        key, parent_item = self._derive_parent_key(parent_index)
+        matches = self._filter_matches
+        for num in range(first, last + 1):
+            item = parent_item.child(num)
+            items = [item]
+            if key is None:
+                items.extend(item.child(row) for row in range(item.childCount()))
+                self._filter_revealed_parents.pop(id(item), None)
+                self._filter_child_hits.pop(id(item), None)
+            elif matches.pop(id(item), None) is not None:
+                self._filter_child_hits[key] -= 1
+
+            for removed_item in items:
+                if self._search_index is not None:
+                    self._search_index.remove(removed_item)
+                if key is None:
+                    matches.pop(id(removed_item), None)
+
+        # Parent of the removed children may no longer hold any match, and
+        # the rows of the following siblings are shifted
+        entry = self._filter_revealed_parents.get(key)
+        if entry is not None:
+            entry[1] = None
+        if key is not None and self._filter_text:
+            self._update_filtered_parent(parent_item)
+
+    def _search_renamed_items(self, top_left, bottom_right, roles):
+        # No roles stand for all of them
+        if roles and QtCore.Qt.DisplayRole not in roles:
+            return
+        if self._search_index is None and not self._filter_text:
+            return
+
+        _, parent_item = self._derive_parent_key(top_left.parent())
+        text = self._filter_text.lower()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            item = parent_item.child(row)
+            if self._search_index is not None:
+                self._search_index.rename(item)
+
+            if text:
+                is_match = text in item.text(0).lower()
+                if is_match and id(item) not in self._filter_matches:
+                    self._add_filter_match(item)
+                elif not is_match and id(item) in self._filter_matches:
+                    self._remove_filter_match(item)
+
+    def _filter_layout_changed(self):
+        # Children may have been sorted, their rows are mapped again upon the
+        # next change
+        for entry in self._filter_revealed_parents.values():
+            entry[1] = None
+
+    def _reset_search(self):
+        self._search_index = None
+        self._filter_matches = {}
+        self._filter_child_hits.clear()
+        self._filter_revealed_parents.clear()
+
+    def _refresh_search(self, parent_item=None):
+        """Index the children of given parent again after a bulk edit, and
+        re-filter the items once control returns to the event loop.
+
+        Keyword Args:
+            parent_item (QtWidgets.QTreeWidgetItem or None): Parent of the
+                edited items. None for the top-level items.
+        """
+        if self._search_index is not None:
+            parent = parent_item or self.invisibleRootItem()
+            self._search_index.refresh(
+                None if parent_item is None else id(parent_item),
+                [parent.child(num) for num in range(parent.childCount())]
+            )
+        if self._filter_text:
+            self._filter_timer.start()
+
+    def _clear_tree_items_cache(self):
+        self._tree_items_cache.clear()
+        self._child_items_cache.clear()
+
+    def _invalidate_tree_items(self, parent_index, modes=None):
+        """Drop the cached results affected by a change under given parent.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Index of parent of the changed
+                items.
+
+        Keyword Args:
+            modes (tuple(str) or None): Affected modes of `derive_tree_items`.
+                If None, all modes are affected.
+        """
+        if not self._tree_items_cache and not self._child_items_cache:
+            return
+
+        if modes is None:
+            self._tree_items_cache.clear()
+        else:
+            for mode in modes:
+                self._tree_items_cache.pop(mode, None)
+
+        if parent_index.isValid():
+            key, _ = self._derive_parent_key(parent_index)
+            entry = self._child_items_cache.get(key)
+            if entry is None:
+                return
+            if modes is None:
+                entry[1].clear()
+            else:
+                for mode in modes:
+                    entry[1].pop(mode, None)
+
+    def _invalidate_inserted_items(self, parent_index, first, last):
+        self._invalidate_tree_items(parent_index)
+
+    def _invalidate_removed_items(self, parent_index, first, last):
+        if not parent_index.isValid():
+            root_item = self.invisibleRootItem()
+            for num in range(first, last + 1):
+                self._child_items_cache.pop(id(root_item.child(num)), None)
+        self._invalidate_tree_items(parent_index)
+
+    def _invalidate_changed_items(self, top_left, bottom_right, roles):
+        # No roles stand for all of them
+        if not roles or QtCore.Qt.DisplayRole in roles:
+            self._invalidate_tree_items(top_left.parent())
+        elif QtCore.Qt.CheckStateRole in roles:
+            # Toggles do not change the result of "all" mode
+            self._invalidate_tree_items(
+                top_left.parent(), modes=("checked", "unchecked")
+            )
+
+    def derive_tree_items(self, mode="all", fetch=False):
+        """Derive items based on specified mode chosen.
+
+        Results are cached per mode and per top-level item, so that repeated
+        calls on an unchanged tree only copy the names into new lists. The
+        returned dict is the caller's to modify.
+
+        Keyword Args:
+            mode (str): Determines what items to derive. Defaults to `all`.
+                There are 3 modes to choose from:
+                    * "all"       - Get all items within the widget.
+                    * "checked"   - Get only checked items within the widget.
+                    * "unchecked" - Get only unchecked items within the widget.
+            fetch (bool): Fetch the children of every lazily populated item
+                beforehand. If False, items whose children are yet to be
+                fetched are reported with None instead of a list. False by
+                default.
+
+        Returns:
+            OrderedDict: Contains names of top-level items and lists of its
+                sub items. Contents are returned in ordered placement as
+                defined by User.
+
+                ..code-block:: json
+                        {
+                            'topA': [
+                                'a101',
+                                'a102'
+                            ],
+                            'topB': [
+                                'b101'
+                            ]
+                        }
+        """
+        if fetch:
+            for top_level_item in self.derive_unloaded_items():
+                self.fetch_more(top_level_item)
+
+        # Cached as tuples of names, copied into lists on every call so that
+        # the callers cannot alter the cache
+        cached_items = self._tree_items_cache.get(mode)
+        if cached_items is None:
+            root_item = self.invisibleRootItem()
+            cached_items = self._tree_items_cache[mode] = tuple(
+                (str(top_level_item.text(0)),
+                 self._derive_child_items(top_level_item, mode))
+                for top_level_item in (
+                    root_item.child(top_num)
+                    for top_num in range(root_item.childCount())
+                )
+            )
+
+        return OrderedDict(
+            (name, None if child_items is None else list(child_items))
+            for name, child_items in cached_items
+        )
+
+    def _derive_child_items(self, top_level_item, mode):
+        """Derive names of child items of given top-level item.
+
+        Args:
+            top_level_item (CustomTreeWidgetItem): Top-level item.
+            mode (str): Either "all", "checked" or "unchecked".
+
+        Returns:
+            tuple(str) or None: Names of child items, as per given mode. None
+                if the children are yet to be fetched.
+        """
+        key = id(top_level_item)
+        if key in self._child_providers:
+            return None
+
+        entry = self._child_items_cache.get(key)
+        if entry is None:
+            # Holding onto the item keeps its id from being reused
+            entry = self._child_items_cache[key] = (top_level_item, {})
+
+        child_items = entry[1].get(mode)
+        if child_items is not None:
+            return child_items
+
+        # Skip the scan if the running counts tell that none or all of the
+        # children are matching
+        if (mode in ("checked", "unchecked") and
+                isinstance(top_level_item, CustomTreeWidgetItem)):
+            counts = top_level_item.child_counts()
+            matched = counts.checked if mode == "checked" else counts.unchecked
+            if not matched:
+                entry[1][mode] = ()
+                return entry[1][mode]
+            if matched == top_level_item.childCount():
+                entry[1][mode] = self._derive_child_items(
+                    top_level_item, "all"
+                )
+                return entry[1][mode]
+
+        child_items = []
+        for child_num in range(top_level_item.childCount()):
+            child_item = top_level_item.child(child_num)
+            child_item_name = str(child_item.text(0)) or ""
+
+            if mode == "all":
+                child_items.append(child_item_name)
+
+            elif mode == "checked":
+                if child_item.checkState(0) == QtCore.Qt.Checked:
+                    child_items.append(child_item_name)
+
+            elif mode == "unchecked":
+                if child_item.checkState(0) == QtCore.Qt.Unchecked:
+                    child_items.append(child_item_name)
+
+        child_items = entry[1][mode] = tuple(child_items)
+        return child_items
+
+    def iter_tree_items(self, mode="all", fetch=False):
+        """Iterate over the items based on specified mode chosen.
+
+        Streaming counterpart of `derive_tree_items`: nothing is gathered nor
+        cached, so that the whole contents are never held in memory at once.
+        The tree should not be modified while iterating.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked", as per
+                `derive_tree_items`. Defaults to `all`.
+            fetch (bool): Fetch the children of every lazily populated item
+                beforehand. If False, such items are yielded as per items
+                without children. False by default.
+
+        Yields:
+            tuple(str, str or None, QtCore.Qt.CheckState): Name of top-level
+                item, name of child item and its check state. A top-level item
+                without children of given mode, or whose children are yet to
+                be fetched, is yielded once with None as child and its own
+                check state.
+        """
+        if fetch:
+            for top_level_item in self.derive_unloaded_items():
+                self.fetch_more(top_level_item)
+
+        root_item = self.invisibleRootItem()
+        for top_num in range(root_item.childCount()):
+            top_level_item = root_item.child(top_num)
+            top_level_item_name = str(top_level_item.text(0))
+
+            child_count = top_level_item.childCount()
+            if id(top_level_item) in self._child_providers:
+                child_count = 0
+            elif (mode in ("checked", "unchecked") and
+                    isinstance(top_level_item, CustomTreeWidgetItem)):
+                # Skip the scan if none of the children are matching
+                counts = top_level_item.child_counts()
+                if not (counts.checked if mode == "checked" else
+                        counts.unchecked):
+                    child_count = 0
+
+            has_children = False
+            for child_num in range(child_count):
+                child_item = top_level_item.child(child_num)
+                state = child_item.checkState(0)
+                if (mode == "all" or
+                        mode == "checked" and state == QtCore.Qt.Checked or
+                        mode == "unchecked" and state == QtCore.Qt.Unchecked):
+                    has_children = True
+                    yield top_level_item_name, str(child_item.text(0)), state
+
+            if not has_children:
+                yield top_level_item_name, None, top_level_item.checkState(0)
+
+    def export_tree_items(self, file_path, mode="all"):
+        """Write the items into a file, one at a time.
+
+        See `write_tree_items` for the formats. Children of lazily populated
+        items are fetched beforehand, as the file cannot tell them apart from
+        items without children.
+
+        Args:
+            file_path (str): Path of the file, ".ndjson"/ ".jsonl" to keep the
+                check states.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked".
+
+        Returns:
+            int: Number of written records.
+        """
+        return write_tree_items(
+            self.iter_tree_items(mode, fetch=True), file_path
+        )
+
+    def import_tree_items(self, file_path, replace=True):
+        """Build the tree from a file written by `export_tree_items`, one
+        record at a time.
+
+        Args:
+            file_path (str): Path of the file.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+
+        Raises:
+            ValueError: If the file is malformed.
+        """
+        self.load_tree_items(read_tree_items(file_path), replace=replace)
+
+    def load_tree_items_async(self, provider, replace=True,
+                              chunk_size=_LOADER_CHUNK_SIZE,
+                              frame_budget=_LOADER_FRAME_BUDGET,
+                              freeze_gc=False):
+        """Build the tree from a stream of records, read in a background
+        thread and inserted batch by batch. See `TreeItemsLoader`.
+
+        A load still in progress is cancelled beforehand.
+
+        Args:
+            provider (callable or iterable): `(parent, child, state)` records
+                as per `load_tree_items`, or a callable returning them, eg.
+                `partial(read_tree_items, file_path)`.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+            chunk_size (int): Number of records sent per chunk.
+            frame_budget (float): Seconds spent inserting records per
+                event-loop turn.
+            freeze_gc (bool): Freezes the loaded items out of the garbage
+                collector while loading, see `TreeItemsLoader`.
+
+        Returns:
+            TreeItemsLoader: Started loader, reporting the progress.
+        """
+        if self._tree_items_loader is not None:
+            self._tree_items_loader.cancel()
+        self._tree_items_loader = TreeItemsLoader(
+            self, provider, replace=replace, chunk_size=chunk_size,
+            frame_budget=frame_budget, freeze_gc=freeze_gc
+        )
+        self._tree_items_loader.start()
+        return self._tree_items_loader
+
+    def derive_snapshot_nodes(self):
+        """Derive the names, check states, new states and expanded state of
+        the items, as written into a snapshot.
+
+        Children yet to be fetched are left out.
+
+        Returns:
+            list(tuple): `(name, flags, child_names, child_states)` per
+                top-level item, see `write_snapshot`.
+        """
+        root_item = self.invisibleRootItem()
+        return [
+            self._derive_snapshot_node(root_item.child(top_num))
+            for top_num in range(root_item.childCount())
+        ]
+
+    def _derive_snapshot_node(self, top_level_item):
+        """Derive the snapshot node of given top-level item.
+
+        Args:
+            top_level_item (QtWidgets.QTreeWidgetItem): Top-level item.
+
+        Returns:
+            tuple: `(name, flags, child_names, child_states)`, see
+                `write_snapshot`.
+        """
+        flags = _NEW_BIT if top_level_item.data(0, IsNewItemRole) else 0
+        if top_level_item.isExpanded():
+            flags |= _SNAPSHOT_EXPANDED_BIT
+
+        child_names = []
+        child_states = bytearray()
+        if id(top_level_item) not in self._child_providers:
+            for child_num in range(top_level_item.childCount()):
+                child_item = top_level_item.child(child_num)
+                child_names.append(str(child_item.text(0)))
+                state = 0
+                if child_item.checkState(0) == QtCore.Qt.Checked:
+                    state |= _CHECKED_BIT
+                if child_item.data(0, IsNewItemRole):
+                    state |= _NEW_BIT
+                child_states.append(state)
+
+        return (
+            str(top_level_item.text(0)), flags, child_names, child_states
+        )
+
+    def save_snapshot(self, file_path):
+        """Write a binary snapshot of the names, check states, new states
+        and expanded top-level items.
+
+        See `write_snapshot`. Children of lazily populated items are fetched
+        beforehand, as the snapshot cannot tell them apart from items without
+        children.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+        """
+        for top_level_item in self.derive_unloaded_items():
+            self.fetch_more(top_level_item)
+        write_snapshot(file_path, self.derive_snapshot_nodes())
+
+    def load_snapshot(self, file_path):
+        """Replace the tree contents with a binary snapshot.
+
+        See `_SnapshotReader`. The records are decoded from the mapped file
+        one top-level item at a time, and built as per `load_tree_items`.
+        Top-level items of the same name are merged into one, as per
+        `load_tree_items`. The new items and the expanded top-level items are
+        restored afterwards.
+
+        One item is still created per row, 1M items take about 10 seconds.
+        See `CustomTreeView` for large trees.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot, or of a newer version.
+        """
+        # Rows of the flagged items, as (top-level row, child row or None)
+        new_rows = []
+        expanded_rows = []
+
+        def iter_records(nodes):
+            checked = QtCore.Qt.Checked
+            for top_num, (name, flags, child_names, child_states) in (
+                    enumerate(nodes)):
+                if flags & _NEW_BIT:
+                    new_rows.append((top_num, None))
+                if flags & _SNAPSHOT_EXPANDED_BIT:
+                    expanded_rows.append(top_num)
+                if not child_names:
+                    yield name, None, None
+                    continue
+
+                if child_states.translate(_IS_NEW_TABLE).count(b"\x01"):
+                    new_rows.extend(
+                        (top_num, num)
+                        for num, state in enumerate(child_states)
+                        if state & _NEW_BIT
+                    )
+                for num, child_name in enumerate(child_names):
+                    if child_states[num] & _CHECKED_BIT:
+                        yield name, child_name, checked
+                    else:
+                        yield name, child_name, None
+
+        with _SnapshotReader(file_path) as reader:
+            self.load_tree_items(iter_records(reader.iter_nodes()))
+
+        for top_num, child_num in new_rows:
+            item = self.topLevelItem(top_num)
+            if child_num is not None:
+                item = item.child(child_num)
+            item.setData(0, IsNewItemRole, True)
+        for top_num in expanded_rows:
+            self.topLevelItem(top_num).setExpanded(True)
+        self.clear_undo()
+
+    def set_baseline(self, file_path=None):
+        """Set the contents to compare the tree against, see `derive_diff`.
+
+        Once set, the new/ renamed items are highlighted as per the diff
+        rather than as per their stored `IsNewItemRole` and renaming, see
+        `diff_flags`.
+
+        Keyword Args:
+            file_path (str or None): Path of a snapshot file, see
+                `save_snapshot`. If None, the current contents are taken.
+
+        Raises:
+            ValueError: If the file is not a snapshot, or of a newer version.
+        """
+        if file_path is None:
+            # Shared with the current nodes, so that unchanged parents are
+            # compared by identity
+            self._diff_baseline = self._derive_diff_nodes()
+        else:
+            self._diff_baseline = read_snapshot(file_path)
+        self._diff_children = {}
+        self._diff_changes = None
+        self._diff_highlights = None
+        self.viewport().update()
+        self.baselineChanged.emit()
+
+    def clear_baseline(self):
+        """Stop comparing the tree against a baseline."""
+        if self._diff_baseline is None:
+            return
+        self._diff_baseline = None
+        self._diff_changes = None
+        self._diff_highlights = None
+        self._diff_nodes = {}
+        self._diff_children = {}
+        self.viewport().update()
+        self.baselineChanged.emit()
+
+    def has_baseline(self):
+        """Check if the tree is compared against a baseline.
+
+        Returns:
+            bool: True if a baseline is set.
+        """
+        return self._diff_baseline is not None
+
+    def derive_diff(self):
+        """Derive the differences of the tree against its baseline.
+
+        See `diff_snapshot_nodes`. The result is derived upon the first call
+        after any change of the tree, and should not be modified. Only the
+        parents changed since the previous call are compared again. Children
+        fetched after the baseline has been set are reported as added.
+
+        Returns:
+            dict: Change set, see `new_change_set`. Empty if no baseline is
+                set.
+        """
+        if self._diff_baseline is None:
+            return new_change_set()
+        if self._diff_changes is None:
+            self._diff_changes = diff_snapshot_nodes(
+                self._diff_baseline, self._derive_diff_nodes(),
+                self._diff_children
+            )
+        return self._diff_changes
+
+    def _derive_diff_nodes(self):
+        """Derive the snapshot nodes of the current contents, reusing the
+        nodes of the unchanged top-level items.
+
+        Returns:
+            list(tuple): Node per top-level item, see `derive_snapshot_nodes`.
+        """
+        cached_nodes = self._diff_nodes
+        diff_nodes = {}
+        nodes = []
+        root_item = self.invisibleRootItem()
+        for top_num in range(root_item.childCount()):
+            top_level_item = root_item.child(top_num)
+            entry = cached_nodes.get(id(top_level_item))
+            if entry is None or entry[0] is not top_level_item:
+                entry = (
+                    top_level_item, self._derive_snapshot_node(top_level_item)
+                )
+            diff_nodes[id(top_level_item)] = entry
+            nodes.append(entry[1])
+        self._diff_nodes = diff_nodes
+        return nodes
+
+    def diff_flags(self, item):
+        """Derive the highlight categories of given item, as per the diff of
+        the tree against its baseline.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Parent or child item.
+
+        Returns:
+            int: Bit flags among `HIGHLIGHT_NEW`, `HIGHLIGHT_RENAMED`,
+                `HIGHLIGHT_MOVED` and `HIGHLIGHT_CHECK_CHANGED`. 0 if no
+                baseline is set.
+        """
+        if self._diff_baseline is None:
+            return 0
+
+        highlights = self._diff_highlights
+        if highlights is None:
+            changes = self.derive_diff()
+            highlights = defaultdict(int)
+            for key, flag in (("added", HIGHLIGHT_NEW),
+                              ("moved", HIGHLIGHT_MOVED),
+                              ("check_changed", HIGHLIGHT_CHECK_CHANGED)):
+                for path in changes[key]:
+                    highlights[path] |= flag
+            for _, path in changes["renamed"]:
+                highlights[path] |= HIGHLIGHT_RENAMED
+            highlights = self._diff_highlights = dict(highlights)
+            self._diff_item_flags = {}
+
+        # Items keep their id while the diff stands, as removals drop it
+        flags = self._diff_item_flags.get(id(item))
+        if flags is not None:
+            return flags
+
+        flags = highlights.get(self.derive_item_path(item), 0)
+        parent_item = item.parent()
+        if parent_item is not None:
+            # Children of an added top-level item are not listed separately
+            flags |= highlights.get(parent_item.text(0), 0) & HIGHLIGHT_NEW
+        self._diff_item_flags[id(item)] = flags
+        return flags
+
+    def has_view_flags(self):
+        """Check if the painted rows carry highlight flags that are not
+        stored in their items, see `derive_view_flags`.
+
+        Returns:
+            bool: True while the tree is filtered with any match, or compared
+                against a baseline.
+        """
+        return bool(self._filter_matches) or self._diff_baseline is not None
+
+    def derive_view_flags(self, index, flags):
+        """Fold the search hit and the diff flags of the item at given index
+        into its stored highlight flags, see `CustomTreeDelegate`.
+
+        Args:
+            index (QtCore.QModelIndex): Index of the painted item.
+            flags (int): Stored flags of the item, see `HighlightFlagsRole`.
+
+        Returns:
+            int: Highlight flags of the item.
+        """
+        item = self.itemFromIndex(index)
+        if id(item) in self._filter_matches:
+            flags |= HIGHLIGHT_SEARCH_HIT
+        if self._diff_baseline is not None:
+            flags = (flags & ~_STICKY_HIGHLIGHTS) | self.diff_flags(item)
+        return flags
+
+    def derive_item_from_path(self, path):
+        """Find the item of given path.
+
+        Args:
+            path (str): Path of the item, eg. 'parentName/childName'.
+
+        Returns:
+            QtWidgets.QTreeWidgetItem or None: First item of given path, if
+                any.
+        """
+        parent_name, _, child_name = path.partition("/")
+        root_item = self.invisibleRootItem()
+        for top_num in range(root_item.childCount()):
+            top_level_item = root_item.child(top_num)
+            if top_level_item.text(0) != parent_name:
+                continue
+            if not child_name:
+                return top_level_item
+            for child_num in range(top_level_item.childCount()):
+                child_item = top_level_item.child(child_num)
+                if child_item.text(0) == child_name:
+                    return child_item
+        return None
+
+    def _invalidate_diff(self, *args):
+        """Drop the differences against the baseline, to be derived again
+        upon the next query. The view is repainted, as the highlights of
+        items other than the changed ones may differ.
+        """
+        self._diff_nodes = {}
+        self._drop_diff()
+
+    def _drop_diff(self):
+        """Drop the differences against the baseline, keeping the snapshot
+        nodes of the unchanged top-level items.
+        """
+        if self._diff_changes is None:
+            return
+        self._diff_changes = None
+        self._diff_highlights = None
+        self.viewport().update()
+
+    def _invalidate_rows_diff(self, parent_index, first, last):
+        """Drop the snapshot node of the parent of given inserted/ removed
+        rows, or of the top-level items themselves.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Parent of the rows.
+            first (int): First row.
+            last (int): Last row.
+        """
+        if not self._diff_nodes:
+            self._drop_diff()
+            return
+        if parent_index.isValid():
+            self._diff_nodes.pop(
+                id(self.itemFromIndex(parent_index)), None
+            )
+        else:
+            # Items taken out may have been edited meanwhile
+            root_item = self.invisibleRootItem()
+            for row in range(first, last + 1):
+                self._diff_nodes.pop(id(root_item.child(row)), None)
+        self._drop_diff()
+
+    def _invalidate_changed_diff(self, top_left, bottom_right, roles):
+        """Update the snapshot node of the parent of given changed rows.
+
+        Names and check states of the children are patched into a copy of
+        the node.
+
+        Args:
+            top_left (QtCore.QModelIndex): First changed index.
+            bottom_right (QtCore.QModelIndex): Last changed index.
+            roles (list(int)): Changed roles, all of them if empty.
+        """
+        diff_nodes = self._diff_nodes
+        if not diff_nodes:
+            self._drop_diff()
+            return
+
+        is_renamed = not roles or any(
+            role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole)
+            for role in roles
+        )
+        parent_index = top_left.parent()
+        first = top_left.row()
+        last = bottom_right.row()
+        if not parent_index.isValid():
+            # Check states of the top-level items are not part of the nodes
+            if is_renamed:
+                root_item = self.invisibleRootItem()
+                for row in range(first, last + 1):
+                    diff_nodes.pop(id(root_item.child(row)), None)
+                self._drop_diff()
+            return
+
+        parent_item = self.itemFromIndex(parent_index)
+        entry = diff_nodes.get(id(parent_item))
+        if entry is None:
+            self._drop_diff()
+            return
+        name, flags, child_names, child_states = entry[1]
+        if last >= len(child_states):
+            # Children yet to be fetched are not part of the node
+            diff_nodes.pop(id(parent_item), None)
+            self._drop_diff()
+            return
+
+        if is_renamed:
+            child_names = list(child_names)
+        child_states = bytearray(child_states)
+        checked = QtCore.Qt.Checked
+        for row in range(first, last + 1):
+            child_item = parent_item.child(row)
+            if is_renamed:
+                child_names[row] = str(child_item.text(0))
+            if child_item.checkState(0) == checked:
+                child_states[row] |= _CHECKED_BIT
+            else:
+                child_states[row] &= ~_CHECKED_BIT
+        diff_nodes[id(parent_item)] = (
+            parent_item, (name, flags, child_names, child_states)
+        )
+        self._drop_diff()
+
+    def set_undo_enabled(self, enabled=True, max_bytes=UNDO_MEMORY_LIMIT):
+        """Record the edits into an undo journal, see `undo`/ `redo`.
+
+        Added, removed, moved, renamed and checked/ unchecked items are
+        recorded as compact commands, which refer to the items by their rows.
+        Names and packed states are only kept for the rows that are out of
+        the tree. Edits made within an event-loop turn, eg. a bulk removal or
+        a check cascade, are undone as one.
+
+        Changes of the whole contents (`populate`, `clear`, sorting...) drop
+        the journal, as the recorded rows no longer apply.
+
+        Keyword Args:
+            enabled (bool): Record the edits if True, drop the journal
+                otherwise. True by default.
+            max_bytes (int): Memory cap of the journal. The oldest entries are
+                evicted beyond it.
+        """
+        if not enabled:
+            if self._undo_journal is not None:
+                self._undo_journal = None
+                self._undo_timer.stop()
+                self.undoStateChanged.emit(False, False)
+            return
+
+        if self._undo_journal is None:
+            self._undo_journal = _UndoJournal(max_bytes)
+        else:
+            self._undo_journal.max_bytes = max_bytes
+            self._undo_journal.evict()
+        self.undoStateChanged.emit(self.can_undo(), self.can_redo())
+
+    def is_undo_enabled(self):
+        """Check if the edits are recorded into an undo journal.
+
+        Returns:
+            bool: True if enabled, see `set_undo_enabled`.
+        """
+        return self._undo_journal is not None
+
+    def can_undo(self):
+        """Check if there is any edit to be undone.
+
+        Returns:
+            bool: True if `undo` would undo an edit.
+        """
+        journal = self._undo_journal
+        if journal is None:
+            return False
+        return bool(
+            journal.undo_entries or
+            (journal.open_entry is not None and journal.open_entry.commands)
+        )
+
+    def can_redo(self):
+        """Check if there is any undone edit to be redone.
+
+        Returns:
+            bool: True if `redo` would redo an edit.
+        """
+        journal = self._undo_journal
+        return journal is not None and bool(journal.redo_entries)
+
+    def undo(self):
+        """Undo the last edit, see `set_undo_enabled`.
+
+        Returns:
+            bool: True if an edit has been undone.
+        """
+        journal = self._undo_journal
+        if journal is None:
+            return False
+        self._close_undo_entry()
+        if not journal.undo_entries:
+            return False
+
+        entry = journal.undo_entries.pop()
+        self._apply_undo_entry(entry, is_redo=False)
+        journal.push(entry, journal.redo_entries)
+        self.undoStateChanged.emit(self.can_undo(), self.can_redo())
+        return True
+
+    def redo(self):
+        """Redo the last undone edit.
+
+        Returns:
+            bool: True if an edit has been redone.
+        """
+        journal = self._undo_journal
+        if journal is None:
+            return False
+        self._close_undo_entry()
+        if not journal.redo_entries:
+            return False
+
+        entry = journal.redo_entries.pop()
+        self._apply_undo_entry(entry, is_redo=True)
+        journal.push(entry, journal.undo_entries)
+        self.undoStateChanged.emit(self.can_undo(), self.can_redo())
+        return True
+
+    def clear_undo(self):
+        """Drop every edit recorded into the undo journal."""
+        journal = self._undo_journal
+        if journal is None:
+            return
+        had_entries = self.can_undo() or self.can_redo()
+        journal.clear()
+        self._undo_timer.stop()
+        if had_entries:
+            self.undoStateChanged.emit(False, False)
+
+    def undo_stats(self):
+        """Derive the usage of the undo journal.
+
+        Returns:
+            dict: Number of entries to undo/ redo, and their estimated size
+                against the memory cap in bytes. Empty if the journal is not
+                enabled.
+        """
+        journal = self._undo_journal
+        if journal is None:
+            return {}
+        self._close_undo_entry()
+        return {
+            "undo_count": len(journal.undo_entries),
+            "redo_count": len(journal.redo_entries),
+            "bytes": journal.size,
+            "max_bytes": journal.max_bytes,
+        }
+
+    def _is_undo_recording(self):
+        journal = self._undo_journal
+        return journal is not None and not journal.suspended
+
+    def _set_undo_suspended(self, suspended):
+        """Suspend/ resume the recording of the edits, eg. while an edit is
+        recorded as a whole rather than per model signal.
+
+        Args:
+            suspended (bool): Suspend the recording if True.
+
+        Returns:
+            bool: Previous value, to be restored afterwards.
+        """
+        journal = self._undo_journal
+        if journal is None:
+            return False
+        was_suspended = journal.suspended
+        journal.suspended = suspended
+        return was_suspended
+
+    def _record_undo(self, command):
+        if self._undo_journal.record(command):
+            self._undo_timer.start()
+
+    def _close_undo_entry(self):
+        """Push the edits of the current event-loop turn as one undo entry."""
+        journal = self._undo_journal
+        if journal is None:
+            return
+        self._undo_timer.stop()
+        if journal.close():
+            self.undoStateChanged.emit(True, False)
+
+    def _discard_undo_entries(self, *args):
+        """Drop the undo journal, once the recorded rows no longer apply."""
+        self.clear_undo()
+
+    def _derive_item_rows(self, item):
+        """Derive the rows of given item and of its top-level item.
+
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Parent or child item.
+
+        Returns:
+            tuple(int, int): Row of the top-level item (-1 for the top-level
+                items themselves), and row of the item.
+        """
+        parent_item = item.parent()
+        row = self.indexFromItem(item).row()
+        if parent_item is None:
+            return -1, row
+        return self.indexFromItem(parent_item).row(), row
+
+    def _derive_undo_parent_row(self, parent_index):
+        """Derive the parent row of the rows of a model signal.
+
+        Returns:
+            int or None: Row of the parent, -1 for the top-level items. None
+                if the rows are nested deeper than child items.
+        """
+        if not parent_index.isValid():
+            return -1
+        if parent_index.parent().isValid():
+            return None
+        return parent_index.row()
+
+    def _journal_inserted_rows(self, parent_index, first, last):
+        if not self._is_undo_recording():
+            return
+        parent_row = self._derive_undo_parent_row(parent_index)
+        if parent_row is None:
+            self.clear_undo()
+            return
+        self._record_undo((_UNDO_INSERT, parent_row, ((first, last),), None))
+
+    def _journal_removed_rows(self, parent_index, first, last):
+        if not self._is_undo_recording():
+            return
+        parent_row = self._derive_undo_parent_row(parent_index)
+        if parent_row is None:
+            self.clear_undo()
+            return
+
+        parent_item = self.itemFromIndex(parent_index)
+        if parent_item is None:
+            parent_item = self.invisibleRootItem()
+        self._record_undo((
+            _UNDO_REMOVE, parent_row, ((first, last),),
+            self._pack_undo_items(
+                [parent_item.child(num) for num in range(first, last + 1)]
+            )
+        ))
+
+    def _journal_check_state(self, item, old_state):
+        """Record a check toggle, as reported by `CustomTreeWidgetItem.setData`.
+
+        Tri-state items having children are left out, as their state follows
+        the one of their children.
+        """
+        if not self._is_undo_recording():
+            return
+        if item.childCount() and item.flags() & QtCore.Qt.ItemIsTristate:
+            return
+        parent_row, row = self._derive_item_rows(item)
+        if self._undo_journal.record_check(
+                parent_row, row, int(old_state), int(item.checkState(0))):
+            self._undo_timer.start()
+
+    def _pack_undo_items(self, items):
+        """Pack the names and states of given items, along with the ones of
+        their children.
+
+        Args:
+            items (list(QtWidgets.QTreeWidgetItem)): Items of the same parent.
+
+        Returns:
+            tuple: Names (list(str)), states (bytearray of `_CHECKED_BIT`,
+                `_NEW_BIT` and `_SNAPSHOT_EXPANDED_BIT`), and the packed
+                children per item (list) or None if no item has any.
+        """
+        names = []
+        states = bytearray()
+        children = None
+        for num, item in enumerate(items):
+            names.append(item.text(0))
+            state = 0
+            if item.checkState(0) == QtCore.Qt.Checked:
+                state |= _CHECKED_BIT
+            if item.data(0, IsNewItemRole):
+                state |= _NEW_BIT
+            if item.isExpanded():
+                state |= _SNAPSHOT_EXPANDED_BIT
+            states.append(state)
+
+            if item.childCount():
+                if children is None:
+                    children = [None] * len(items)
+                children[num] = self._pack_undo_items(
+                    [item.child(child_num)
+                     for child_num in range(item.childCount())]
+                )
+        return names, states, children
+
+    def _unpack_undo_items(self, payload, is_tristate):
+        """Create the items packed by `_pack_undo_items`, off-tree.
+
+        Args:
+            payload (tuple): Packed items.
+            is_tristate (bool): Create tri-state items.
+
+        Returns:
+            list(CustomTreeWidgetItem): Created items.
+        """
+        names, states, children = payload
+        items = []
+        for num, name in enumerate(names):
+            state = states[num]
+            item = CustomTreeWidgetItem(
+                None, name, is_tristate=is_tristate,
+                is_new_item=bool(state & _NEW_BIT)
+            )
+            if children is not None and children[num] is not None:
+                item.addChildren(self._unpack_undo_items(children[num], False))
+            elif state & _CHECKED_BIT:
+                QtWidgets.QTreeWidgetItem.setData(
+                    item, 0, QtCore.Qt.CheckStateRole, QtCore.Qt.Checked
+                )
+            items.append(item)
+        return items
+
+    def _apply_undo_entry(self, entry, is_redo):
+        """Undo/ redo the commands of given entry, without recording them.
+
+        Each command is replaced with the one to be applied next, eg. taken
+        rows are packed into the command so as to be inserted back.
+        """
+        journal = self._undo_journal
+        commands = entry.commands
+        order = range(len(commands))
+        if not is_redo:
+            order = reversed(order)
+
+        journal.suspended = True
+        self.setUpdatesEnabled(False)
+        try:
+            for num in order:
+                commands[num] = self._apply_undo_command(commands[num], is_redo)
+        finally:
+            self.setUpdatesEnabled(True)
+            journal.suspended = False
+
+    def _apply_undo_command(self, command, is_redo):
+        """Undo/ redo given command.
+
+        Returns:
+            tuple or list: Command to be applied next.
+        """
+        kind = command[0]
+        if kind == _UNDO_CHECK:
+            _, parent_rows, rows, old_states, new_states = command
+            states = new_states if is_redo else old_states
+            order = range(len(rows))
+            if not is_redo:
+                # Earlier toggles of the same item take precedence
+                order = reversed(order)
+
+            child_states = defaultdict(dict)
+            for num in order:
+                child_states[parent_rows[num]][rows[num]] = states[num]
+            for parent_row, row_states in child_states.items():
+                if parent_row == -1:
+                    parent_item = self.invisibleRootItem()
+                else:
+                    parent_item = self.topLevelItem(parent_row)
+                self._set_child_check_states(parent_item, row_states)
+            return command
+
+        if kind == _UNDO_RENAME:
+            _, parent_row, row, old_name, new_name = command
+            self._derive_undo_item(parent_row, row).setText(
+                0, new_name if is_redo else old_name
+            )
+            return command
+
+        if kind == _UNDO_MOVE:
+            _, parent_row, runs, direction = command
+            if not is_redo:
+                offset = -1 if direction == "up" else 1
+                runs = [(first + offset, last + offset) for first, last in runs]
+                direction = "down" if direction == "up" else "up"
+            self._move_undo_runs(parent_row, runs, direction)
+            return command
+
+        # Undoing an insertion takes the rows out, to be inserted back upon
+        # redo. Conversely for a removal.
+        _, parent_row, runs, payload = command
+        if (kind == _UNDO_INSERT) == is_redo:
+            self._insert_undo_rows(parent_row, runs, payload)
+            return (kind, parent_row, runs, None)
+        return (kind, parent_row, runs, self._take_undo_rows(parent_row, runs))
+
+    def _derive_undo_item(self, parent_row, row):
+        if parent_row == -1:
+            return self.topLevelItem(row)
+        return self.topLevelItem(parent_row).child(row)
+
+    def _insert_undo_rows(self, parent_row, runs, payload):
+        """Insert the packed items back at given rows.
+
+        Args:
+            parent_row (int): Row of the parent, -1 for the top-level items.
+            runs (tuple(tuple(int, int))): First and last row of each run.
+            payload (tuple): Items packed by `_pack_undo_items`.
+        """
+        rows = [row for first, last in runs for row in range(first, last + 1)]
+        items = self._unpack_undo_items(payload, parent_row == -1)
+
+        self._is_bulk_editing = True
+        try:
+            if parent_row == -1:
+                parent_item = None
+                for row, item in zip(rows, items):
+                    self.insertTopLevelItem(row, item)
+            else:
+                parent_item = self.topLevelItem(parent_row)
+                self._insert_child_rows(parent_item, rows, items)
+        finally:
+            self._is_bulk_editing = False
+        self._refresh_after_bulk_edit(parent_item)
+
+        states = payload[1]
+        for num, item in enumerate(items):
+            if states[num] & _SNAPSHOT_EXPANDED_BIT:
+                item.setExpanded(True)
+        self._pending_change_set()["added"].extend(
+            self.derive_item_path(item) for item in items
+        )
+
+    def _take_undo_rows(self, parent_row, runs):
+        """Take the items of given rows out of the tree.
+
+        Args:
+            parent_row (int): Row of the parent, -1 for the top-level items.
+            runs (tuple(tuple(int, int))): First and last row of each run.
+
+        Returns:
+            tuple: Taken items, packed by `_pack_undo_items`.
+        """
+        rows = [row for first, last in runs for row in range(first, last + 1)]
+        if parent_row == -1:
+            parent_item = None
+            items = [self.topLevelItem(row) for row in rows]
+        else:
+            parent_item = self.topLevelItem(parent_row)
+            items = [parent_item.child(row) for row in rows]
+        payload = self._pack_undo_items(items)
+        removed_paths = [self.derive_item_path(item) for item in items]
+
+        self._is_bulk_editing = True
+        try:
+            if parent_item is None:
+                for row in reversed(rows):
+                    item = self.takeTopLevelItem(row)
+                    self._name_index.pop(id(item), None)
+                    self._child_items_cache.pop(id(item), None)
+                    self._child_providers.pop(id(item), None)
+            else:
+                self._take_child_rows(parent_item, rows)
+        finally:
+            self._is_bulk_editing = False
+        self._refresh_after_bulk_edit(parent_item)
+
+        self._pending_change_set()["removed"].extend(removed_paths)
+        # Taken items are freed together, as the last references are dropped
+        del items[:]
+        return payload
+
+    def _move_undo_runs(self, parent_row, runs, direction):
+        """Move each run of rows by one position, see `_move_child_runs`."""
+        parent_item = None
+        if parent_row != -1:
+            parent_item = self.topLevelItem(parent_row)
+
+        self._is_bulk_editing = True
+        try:
+            self._move_child_runs(parent_item, runs, direction)
+        finally:
+            self._is_bulk_editing = False
+        self._refresh_after_bulk_edit(parent_item)
+
+        parent = parent_item or self.invisibleRootItem()
+        offset = -1 if direction == "up" else 1
+        self._pending_change_set()["moved"].extend(
+            self.derive_item_path(parent.child(row))
+            for first, last in runs
+            for row in range(first + offset, last + offset + 1)
+        )
+
+
+    ####################################################################################################
+
+    # TBC
+    def handleItemToggled(self, item, column):
+        """Handle list item(s) when it is checked/ unchecked.
+
+        Args:
+            item ():
+            column (int): 
+        """
+        # http://stackoverflow.com/questions/13662020/how-to-implement-itemchecked-and-itemunchecked-signals-for-qtreewidget-in-pyqt4
+        # print '>>> ItemChecked', int(item.checkState(column))
+        # print item.text(column)
+
+        item_name = item.text(column)
+        # top-level node
+        if item.parent():
+            item_name = "{0}/{1}".format(item.parent().text(column), item_name)
+
+        # Returns both top and sub item if the top is checked...
+
+        return item_name
+
+    # TBC
+    def set_background_color(self, color_text=""):
+        self.setStyleSheet("""QTreeWidget{background: {0};}""".format(color_text))
+
+    #TBC
+    def make_checkbox_more_visible(self):
+        """Background color of the QTreeWidget are changed to conform to Maya
+        standards. As such, the outline of the checkboxes are black in color,
+        blending in with the almost black background. Thus making it hard to
+        visualize if there is a checkbox.
+
+        This method will cause the outline color to appear in white.
+        """
+        # https://stackoverflow.com/questions/54655382/change-the-style-of-a-checkbox-in-a-qtreewidget-without-affecting-the-check-mark
+        file_tree_palette = QtWidgets.QtGui()
+        file_tree_palette.setColor(QtWidgets.QtGui.Window, QtGui.QColor(255, 255, 255))
+        # file_tree_palette.setColor(QtWidgets.QtGui.Base, QtGui.QColor(30, 30, 30))
+        # file_tree_palette.setColor(QtWidgets.QtGui.Highlight, QtGui.QColor(93, 93, 93))
+        self.setPalette(file_tree_palette)
+
+    # END OF QTREEWIDGET TBC #
+
+    ####################################################################################################
+
+
+
+####################################################################################################
+# Model-backed engine                                                                              #
+####################################################################################################
+
+# Bit flags packed into `_TreeNode.states`, one byte per child row. They
+# share the values of the highlight flags, so that a packed state is returned
+# as is for `HighlightFlagsRole`.
+_CHECKED_BIT = HIGHLIGHT_CHECKED
+_NEW_BIT = HIGHLIGHT_NEW
+# Bits that are kept by their own role, and not by `HighlightFlagsRole`
+_STATE_BITS = _CHECKED_BIT | _NEW_BIT
+
+# Translation tables used to update/ query the packed child states in bulk.
+_CHECK_ALL_TABLE = bytes(bytearray((b | _CHECKED_BIT) for b in range(256)))
+_UNCHECK_ALL_TABLE = bytes(bytearray((b & ~_CHECKED_BIT) for b in range(256)))
+_INVERT_CHECKS_TABLE = bytes(bytearray((b ^ _CHECKED_BIT) for b in range(256)))
+_IS_CHECKED_TABLE = bytes(bytearray((b & _CHECKED_BIT) for b in range(256)))
+_IS_NEW_TABLE = bytes(bytearray(int(bool(b & _NEW_BIT)) for b in range(256)))
+_IS_UNCHECKED_TABLE = bytes(bytearray((~b & _CHECKED_BIT) for b in range(256)))
+
+# Item flags are queried for every row upon layout, compose them only once.
+_TOP_LEVEL_FLAGS = (
+    QtCore.Qt.ItemIsEnabled
+    | QtCore.Qt.ItemIsSelectable
+    | QtCore.Qt.ItemIsEditable
+    | QtCore.Qt.ItemIsUserCheckable
+)
+_CHILD_FLAGS = _TOP_LEVEL_FLAGS | QtCore.Qt.ItemNeverHasChildren
+
+
+def _contiguous_runs(rows):
+    """Group row numbers into contiguous runs.
+
+    Args:
+        rows (iterable(int)): Row numbers, in any order.
+
+    Returns:
+        list(tuple(int, int)): First and last row of each run, in ascending
+            order.
+    """
+    runs = []
+    for row in sorted(set(rows)):
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+def _derive_moved_runs(runs, count, direction):
+    """Derive where runs of rows end up, when moved by one position.
+
+    Runs that are already at the first/ last row stay in place. As runs are
+    separated by at least one row, every other run can be moved.
+
+    Args:
+        runs (list(tuple(int, int))): First and last row of each run, in
+            ascending order.
+        count (int): Number of rows under the parent.
+        direction (str): Either 'up' or 'down'.
+
+    Returns:
+        tuple(list, list): Runs that can be moved, and the first and last row
+            of every run after the move.
+    """
+    offset = -1 if direction == "up" else 1
+    movable_runs = []
+    new_runs = []
+    for first, last in runs:
+        if first + offset < 0 or last + offset >= count:
+            new_runs.append((first, last))
+        else:
+            movable_runs.append((first, last))
+            new_runs.append((first + offset, last + offset))
+    return movable_runs, new_runs
+
+
+# Binary snapshot of the tree contents, see `write_snapshot`. Increase the
+# version upon any change of the layout.
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_MAGIC = b"QTSNAP\r\n"
+# Magic, version, reserved flags, top-level count, child count, string table
+# size in bytes. Little-endian, as are the arrays.
+_SNAPSHOT_HEADER = struct.Struct("<8sHHIIQ")
+# Bit of the top-level flags, on top of `_NEW_BIT`
+_SNAPSHOT_EXPANDED_BIT = 0x80
+# Keeps the check/ new bits of a packed state, dropping the highlight flags
+_SNAPSHOT_STATES_TABLE = bytes(bytearray((b & _STATE_BITS) for b in range(256)))
+# Typecode of unsigned 32-bit arrays
+_UINT32 = "I" if array("I").itemsize == 4 else "L"
+
+
+def _pack_uint32(values):
+    packed = array(_UINT32, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tostring() if sys.version_info[0] < 3 else packed.tobytes()
+
+
+def _unpack_uint32(data):
+    unpacked = array(_UINT32)
+    if sys.version_info[0] < 3:
+        unpacked.fromstring(bytes(data))
+    else:
+        unpacked.frombytes(data)
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return unpacked
+
+
+def write_snapshot(file_path, nodes):
+    """Write a binary snapshot of the tree contents.
+
+    Layout, after the header (`_SNAPSHOT_HEADER`):
+        * uint32[top-level count + 1] - Offsets of the children of each
+          top-level item, into the child arrays.
+        * uint8[top-level count]      - Flags of the top-level items,
+          `_NEW_BIT` and `_SNAPSHOT_EXPANDED_BIT`.
+        * uint8[child count]          - Packed states of the children,
+          `_CHECKED_BIT` and `_NEW_BIT`, as per `_TreeNode.states`.
+        * uint32[name count + 1]      - Byte offsets of the names into the
+          string table, top-level names first.
+        * String table                - UTF-8 names, each followed by a NUL.
+
+    Args:
+        file_path (str): Path of the file to write into.
+        nodes (list(tuple)): `(name, flags, child_names, child_states)` per
+            top-level item, where `child_states` is a bytearray.
+
+    Raises:
+        ValueError: If the string table exceeds 4GB.
+    """
+    child_offsets = [0]
+    parent_flags = bytearray()
+    names = []
+    for name, flags, child_names, _ in nodes:
+        child_offsets.append(child_offsets[-1] + len(child_names))
+        parent_flags.append(flags & (_NEW_BIT | _SNAPSHOT_EXPANDED_BIT))
+        names.append(name)
+    for _, _, child_names, _ in nodes:
+        names.extend(child_names)
+
+    encoded_names = [name.encode("utf-8") + b"\0" for name in names]
+    string_offsets = [0] * (len(encoded_names) + 1)
+    offset = 0
+    for num, encoded_name in enumerate(encoded_names, 1):
+        offset += len(encoded_name)
+        string_offsets[num] = offset
+    if offset >= 1 << 32:
+        raise ValueError("Snapshot string table exceeds 4GB")
+
+    with open(file_path, "wb") as snapshot_file:
+        snapshot_file.write(_SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0,
+            len(nodes), child_offsets[-1], offset
+        ))
+        snapshot_file.write(_pack_uint32(child_offsets))
+        snapshot_file.write(bytes(parent_flags))
+        for _, _, _, child_states in nodes:
+            snapshot_file.write(bytes(bytearray(child_states)))
+        snapshot_file.write(_pack_uint32(string_offsets))
+        snapshot_file.write(b"".join(encoded_names))
+
+
+def _uint32_view(view):
+    """Derive the unsigned 32-bit values of a little-endian section.
+
+    Args:
+        view (memoryview): Bytes of the section.
+
+    Returns:
+        memoryview or array: The section cast as is, if the platform allows
+            it, else a copy of its values.
+    """
+    if sys.version_info[0] >= 3 and sys.byteorder == "little":
+        return view.cast(_UINT32)
+    return _unpack_uint32(view.tobytes())
+
+
+class _SnapshotReader(object):
+    """Reader of a binary snapshot written by `write_snapshot`.
+
+    The file is memory-mapped, and its sections are kept as views over the
+    map until `close`. Nodes are decoded one top-level item at a time, see
+    `iter_nodes`.
+
+    Args:
+        file_path (str): Path of the file to read from.
+
+    Raises:
+        ValueError: If the file is not a snapshot, or of a newer version.
+    """
+    def __init__(self, file_path):
+        with open(file_path, "rb") as snapshot_file:
+            if not os.fstat(snapshot_file.fileno()).st_size:
+                raise ValueError("Empty snapshot: {0}".format(file_path))
+            self._map = mmap.mmap(
+                snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self._views = []
+        try:
+            self._read_header(file_path)
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self, file_path):
+        snapshot = self._map
+        if len(snapshot) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Truncated snapshot: {0}".format(file_path))
+        magic, version, _, parent_count, child_count, table_size = (
+            _SNAPSHOT_HEADER.unpack_from(snapshot, 0)
+        )
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("Not a snapshot: {0}".format(file_path))
+        if not 1 <= version <= SNAPSHOT_VERSION:
+            raise ValueError("Unsupported snapshot version {0}: {1}".format(
+                version, file_path
+            ))
+
+        self.parent_count = parent_count
+        self.child_count = child_count
+        view = memoryview(snapshot)
+        self._views.append(view)
+        pos = _SNAPSHOT_HEADER.size
+        for size in ((parent_count + 1) * 4, parent_count, child_count,
+                     (parent_count + child_count + 1) * 4, table_size):
+            self._views.append(view[pos:pos + size])
+            pos += size
+        if pos > len(snapshot):
+            raise ValueError("Truncated snapshot: {0}".format(file_path))
+
+        (_, child_offsets, self._parent_flags, self._child_states,
+         string_offsets, self._string_table) = self._views
+        self._child_offsets = _uint32_view(child_offsets)
+        self._string_offsets = _uint32_view(string_offsets)
+        self._views.extend((self._child_offsets, self._string_offsets))
+
+    def _decode_names(self, first, last):
+        """Decode the names of given range of the string table.
+
+        The range is split on its NUL terminators, falling back onto the
+        offsets only if a name holds a NUL.
+        """
+        offsets = self._string_offsets
+        table = self._string_table
+        names = (
+            table[offsets[first]:offsets[last]].tobytes().decode("utf-8")
+            .split(u"\0")[:-1]
+        )
+        if len(names) != last - first:
+            names = [
+                table[offsets[num]:offsets[num + 1] - 1].tobytes()
+                .decode("utf-8")
+                for num in range(first, last)
+            ]
+        return names
+
+    def iter_nodes(self):
+        """Decode the nodes, one top-level item at a time.
+
+        Yields:
+            tuple: `(name, flags, child_names, child_states)` per top-level
+                item, where `child_states` is a bytearray.
+        """
+        parent_count = self.parent_count
+        parent_names = self._decode_names(0, parent_count)
+        child_offsets = self._child_offsets
+        parent_flags = self._parent_flags
+        child_states = self._child_states
+        for num in range(parent_count):
+            first = child_offsets[num]
+            last = child_offsets[num + 1]
+            yield (
+                parent_names[num],
+                bytearray(parent_flags[num:num + 1])[0],
+                self._decode_names(parent_count + first, parent_count + last),
+                bytearray(child_states[first:last])
+            )
+
+    def close(self):
+        """Release the views, and unmap the file."""
+        for view in reversed(self._views):
+            # Views are released upon collection on Python 2
+            release = getattr(view, "release", None)
+            if release is not None:
+                release()
+        self._views = []
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_snapshot(file_path):
+    """Read a binary snapshot written by `write_snapshot`.
+
+    See `_SnapshotReader`, which decodes the nodes one top-level item at a
+    time without copying the file.
+
+    Args:
+        file_path (str): Path of the file to read from.
+
+    Returns:
+        list(tuple): `(name, flags, child_names, child_states)` per top-level
+            item, where `child_states` is a bytearray.
+
+    Raises:
+        ValueError: If the file is not a snapshot, or of a newer version.
+    """
+    with _SnapshotReader(file_path) as reader:
+        return list(reader.iter_nodes())
+
+
+def _match_sibling_names(old_names, new_names):
+    """Pair the siblings of same name, in order of their rows.
+
+    Args:
+        old_names (list(str)): Names of the siblings in the baseline.
+        new_names (list(str)): Names of the current siblings.
+
+    Returns:
+        list(int or None): Baseline row of each current sibling, None if its
+            name is not found among the unpaired baseline siblings.
+    """
+    if old_names == new_names:
+        return list(range(len(new_names)))
+
+    old_rows = dict(zip(old_names, range(len(old_names))))
+    if len(old_rows) == len(old_names):
+        return list(map(old_rows.pop, new_names, repeat(None)))
+
+    # Some names are held more than once, their rows are paired in order
+    old_rows = {}
+    for row, name in enumerate(old_names):
+        rows = old_rows.get(name)
+        if rows is None:
+            old_rows[name] = deque([row])
+        else:
+            rows.append(row)
+    new_to_old = []
+    for name in new_names:
+        rows = old_rows.get(name)
+        new_to_old.append(rows.popleft() if rows else None)
+    return new_to_old
+
+
+def _derive_kept_rows(new_to_old):
+    """Derive the current and baseline rows of the paired siblings.
+
+    Args:
+        new_to_old (list(int or None)): Baseline row of each current sibling.
+
+    Returns:
+        tuple(list(int), list(int)): Current rows and baseline rows of the
+            paired siblings, in current order.
+    """
+    is_kept = list(map(is_not, new_to_old, repeat(None)))
+    return (
+        list(compress(range(len(new_to_old)), is_kept)),
+        list(compress(new_to_old, is_kept))
+    )
+
+
+def _derive_moved_rows(new_rows, old_rows):
+    """Derive the siblings that have been moved among the kept siblings.
+
+    A sibling is moved if both its preceding and its following kept sibling
+    changed. Siblings shifted by the move of another one keep either of them.
+
+    Args:
+        new_rows (list(int)): Current rows of the kept siblings.
+        old_rows (list(int)): Baseline rows of the kept siblings, in current
+            order.
+
+    Returns:
+        list(int): Current rows of the moved siblings.
+    """
+    if all(map(lt, old_rows, old_rows[1:])):
+        # Kept siblings are in their baseline order
+        return []
+
+    old_order = sorted(old_rows)
+    old_previous = dict(zip(old_order[1:], old_order))
+    old_next = dict(zip(old_order, old_order[1:]))
+    is_moved = map(
+        and_,
+        map(ne, map(old_previous.get, old_rows), [None] + old_rows[:-1]),
+        map(ne, map(old_next.get, old_rows), old_rows[1:] + [None])
+    )
+    return list(compress(new_rows, is_moved))
+
+
+def _derive_unmatched_rows(new_to_old, old_rows, old_count):
+    """Derive the siblings left unpaired by name.
+
+    Args:
+        new_to_old (list(int or None)): Baseline row of each current sibling.
+        old_rows (list(int)): Baseline rows of the paired siblings.
+        old_count (int): Number of siblings in the baseline.
+
+    Returns:
+        tuple(list(int), list(int)): Sorted rows of the unpaired baseline
+            siblings, and of the unpaired current siblings.
+    """
+    old_unmatched = []
+    if len(old_rows) != old_count:
+        old_unmatched = sorted(set(range(old_count)).difference(old_rows))
+    new_unmatched = []
+    if len(old_rows) != len(new_to_old):
+        new_unmatched = list(compress(
+            range(len(new_to_old)), map(is_, new_to_old, repeat(None))
+        ))
+    return old_unmatched, new_unmatched
+
+
+def _derive_gap_keys(unmatched_rows, anchors, skipped_rows):
+    """Key the unpaired siblings by their place, ie. the baseline row of the
+    preceding paired sibling and their rank after it.
+
+    Args:
+        unmatched_rows (list(int)): Sorted rows of the unpaired siblings.
+        anchors (sequence(int)): Baseline row of each paired sibling, by row.
+        skipped_rows (set(int)): Unpaired rows to be left out of the ranks.
+
+    Returns:
+        dict: Row of each unpaired sibling, keyed by (anchor, rank).
+    """
+    keys = {}
+    last_row = -2
+    anchor = rank = -1
+    for row in unmatched_rows:
+        if row != last_row + 1:
+            anchor = anchors[row - 1] if row else -1
+            rank = 0
+        last_row = row
+        if row not in skipped_rows:
+            keys[(anchor, rank)] = row
+            rank += 1
+    return keys
+
+
+def _pair_gap_rows(old_keys, new_keys):
+    """Pair the unpaired siblings that stand at the same place, ie. renamed
+    items.
+
+    Args:
+        old_keys (dict): Unpaired baseline rows, as per `_derive_gap_keys`.
+        new_keys (dict): Unpaired current rows, as per `_derive_gap_keys`.
+
+    Returns:
+        list(tuple(int, int)): Baseline row and current row of each pair,
+            sorted by current row.
+    """
+    return sorted(
+        ((old_keys[key], new_row) for key, new_row in new_keys.items()
+         if key in old_keys),
+        key=itemgetter(1)
+    )
+
+
+class _ChildrenDiff(object):
+    """Children of a parent left unpaired by name, see `diff_snapshot_nodes`.
+
+    Args:
+        path (str): Path of the parent.
+        names (list(str)): Names of the children.
+        states (bytearray): Packed states of the children.
+        unmatched_rows (list(int)): Sorted rows of the unpaired children.
+    """
+    __slots__ = ("path", "names", "states", "unmatched_rows", "moved_rows")
+
+    def __init__(self, path, names, states, unmatched_rows):
+        self.path = path
+        self.names = names
+        self.states = states
+        self.unmatched_rows = unmatched_rows
+        # Unpaired rows moved across parents
+        self.moved_rows = set()
+
+    def derive_path(self, row):
+        return "{0}/{1}".format(self.path, self.names[row])
+
+
+def _diff_children(old_node, node):
+    """Pair the children of a kept parent by name, see `diff_snapshot_nodes`.
+
+    Args:
+        old_node (tuple): Baseline node of the parent, as per `read_snapshot`.
+        node (tuple): Current node of the parent.
+
+    Returns:
+        tuple(list(str), list(str), tuple or None): Paths of the children
+            moved within the parent, paths of the kept children whose check
+            state changed, and the baseline/ current `_ChildrenDiff` along
+            with the baseline row of each current child, if any child is left
+            unpaired.
+    """
+    old_path, _, old_child_names, old_child_states = old_node
+    path, _, child_names, child_states = node
+
+    if old_child_names == child_names:
+        # Same children in the same order, only their check states may differ
+        old_checked = old_child_states.translate(_IS_CHECKED_TABLE)
+        checked = child_states.translate(_IS_CHECKED_TABLE)
+        if old_checked == checked:
+            return [], [], None
+        return [], [
+            "{0}/{1}".format(path, child_names[row])
+            for row in compress(
+                range(len(child_names)), map(ne, old_checked, checked)
+            )
+        ], None
+
+    child_new_to_old = _match_sibling_names(old_child_names, child_names)
+    child_new_rows, child_old_rows = _derive_kept_rows(child_new_to_old)
+    moved = [
+        "{0}/{1}".format(path, child_names[row])
+        for row in _derive_moved_rows(child_new_rows, child_old_rows)
+    ]
+
+    # Check states of the kept children
+    check_changed = []
+    old_checked = old_child_states.translate(_IS_CHECKED_TABLE)
+    checked = child_states.translate(_IS_CHECKED_TABLE)
+    if old_checked != checked or old_child_names != child_names:
+        check_changed = [
+            "{0}/{1}".format(path, child_names[row])
+            for row in compress(child_new_rows, map(
+                ne,
+                map(old_checked.__getitem__, child_old_rows),
+                map(checked.__getitem__, child_new_rows)
+            ))
+        ]
+
+    old_unmatched, new_unmatched = _derive_unmatched_rows(
+        child_new_to_old, child_old_rows, len(old_child_names)
+    )
+    if not old_unmatched and not new_unmatched:
+        return moved, check_changed, None
+
+    return moved, check_changed, (
+        _ChildrenDiff(
+            old_path, old_child_names, old_child_states, old_unmatched
+        ),
+        _ChildrenDiff(path, child_names, child_states, new_unmatched),
+        child_new_to_old
+    )
+
+
+def diff_snapshot_nodes(baseline_nodes, nodes, children_diffs=None):
+    """Compare the tree contents against a baseline.
+
+    Both contents are given as per `read_snapshot`. Siblings are paired by
+    name through hash maps, so that the cost is linear to the number of items:
+        * Siblings of same name under the same parent are kept items. They
+          are moved if their order changed among the kept siblings.
+        * Unpaired children of same name under another parent are moved.
+        * Unpaired siblings that stand at the same place, between the same
+          kept siblings, are renamed.
+        * Any other item is added/ removed.
+
+    Check changes are reported for the kept, moved and renamed children.
+
+    Nodes are not modified. Given `children_diffs`, the children of a kept
+    parent are only paired again if its baseline or current node is another
+    object than upon the previous call, so that a tree whose nodes are
+    replaced per changed parent is compared at the cost of these parents.
+
+    Args:
+        baseline_nodes (list(tuple)): Contents to compare against.
+        nodes (list(tuple)): Current contents.
+
+    Keyword Args:
+        children_diffs (dict or None): Pairing of the children per kept
+            parent, updated in place, to be given back upon the next call.
+
+    Returns:
+        dict: Change set, see `new_change_set`.
+    """
+    changes = new_change_set()
+    check_changed = changes["check_changed"]
+
+    old_names = [node[0] for node in baseline_nodes]
+    new_names = [node[0] for node in nodes]
+    new_to_old = _match_sibling_names(old_names, new_names)
+    new_rows, old_rows = _derive_kept_rows(new_to_old)
+    changes["moved"].extend(
+        new_names[row] for row in _derive_moved_rows(new_rows, old_rows)
+    )
+    old_unmatched, new_unmatched = _derive_unmatched_rows(
+        new_to_old, old_rows, len(old_names)
+    )
+    renamed_rows = _pair_gap_rows(
+        _derive_gap_keys(old_unmatched, range(len(old_names)), ()),
+        _derive_gap_keys(new_unmatched, new_to_old, ())
+    )
+    for old_row, new_row in renamed_rows:
+        changes["renamed"].append((old_names[old_row], new_names[new_row]))
+        new_to_old[new_row] = old_row
+    paired_rows = set(old_row for old_row, _ in renamed_rows)
+    changes["added"].extend(
+        new_names[row] for row in new_unmatched
+        if new_to_old[row] is None
+    )
+    changes["removed"].extend(
+        old_names[row] for row in old_unmatched if row not in paired_rows
+    )
+
+    # Pairings of the previous call, keyed by the ids of the nodes. Entries
+    # hold the nodes, so that their ids are not reused meanwhile.
+    previous_diffs = {} if children_diffs is None else children_diffs
+    kept_diffs = {}
+
+    # Children left unpaired per parent, as baseline and current diffs
+    unpaired_diffs = []
+    # Unpaired baseline children per name, as (children diff, row)
+    old_rows_by_name = {}
+    for new_row, old_row in enumerate(new_to_old):
+        if old_row is None:
+            continue
+        old_node = baseline_nodes[old_row]
+        node = nodes[new_row]
+        key = (id(old_node), id(node))
+        entry = previous_diffs.get(key)
+        if entry is None or entry[0] is not old_node or entry[1] is not node:
+            entry = (old_node, node, _diff_children(old_node, node))
+        kept_diffs[key] = entry
+
+        moved, kept_check_changed, unpaired = entry[2]
+        changes["moved"].extend(moved)
+        check_changed.extend(kept_check_changed)
+        if unpaired is None:
+            continue
+
+        old_diff, new_diff, _ = unpaired
+        # Reset from the previous call
+        old_diff.moved_rows = set()
+        new_diff.moved_rows = set()
+        for row in old_diff.unmatched_rows:
+            old_rows_by_name.setdefault(old_diff.names[row], deque()).append(
+                (old_diff, row)
+            )
+        unpaired_diffs.append(unpaired)
+
+    if children_diffs is not None:
+        children_diffs.clear()
+        children_diffs.update(kept_diffs)
+
+    # Children moved across parents
+    for _, new_diff, _ in unpaired_diffs:
+        for row in new_diff.unmatched_rows:
+            entries = old_rows_by_name.get(new_diff.names[row])
+            if not entries:
+                continue
+            old_diff, old_row = entries.popleft()
+            old_diff.moved_rows.add(old_row)
+            new_diff.moved_rows.add(row)
+            path = new_diff.derive_path(row)
+            changes["moved"].append(path)
+            if (old_diff.states[old_row] ^ new_diff.states[row]) & _CHECKED_BIT:
+                check_changed.append(path)
+
+    # Renamed children, then the remaining ones are added/ removed
+    for old_diff, new_diff, child_new_to_old in unpaired_diffs:
+        renamed_rows = _pair_gap_rows(
+            _derive_gap_keys(
+                old_diff.unmatched_rows, range(len(old_diff.names)),
+                old_diff.moved_rows
+            ),
+            _derive_gap_keys(
+                new_diff.unmatched_rows, child_new_to_old, new_diff.moved_rows
+            )
+        )
+        for old_row, new_row in renamed_rows:
+            path = new_diff.derive_path(new_row)
+            changes["renamed"].append((old_diff.derive_path(old_row), path))
+            if (old_diff.states[old_row] ^
+                    new_diff.states[new_row]) & _CHECKED_BIT:
+                check_changed.append(path)
+
+        old_diff.moved_rows.update(old_row for old_row, _ in renamed_rows)
+        new_diff.moved_rows.update(new_row for _, new_row in renamed_rows)
+        changes["added"].extend(
+            new_diff.derive_path(row) for row in new_diff.unmatched_rows
+            if row not in new_diff.moved_rows
+        )
+        changes["removed"].extend(
+            old_diff.derive_path(row) for row in old_diff.unmatched_rows
+            if row not in old_diff.moved_rows
+        )
+
+    return changes
+
+
+class _TreeNode(object):
+    """Compact storage of a top-level entry and all of its children.
+
+    Children are not wrapped into Python objects. Their names are kept in a
+    plain list and their check/ new states are packed into a bytearray, one
+    byte per row, so the memory cost per child stays flat.
+
+    Args:
+        name (str): Name of the top-level entry.
+        children (list(str) or callable): Names of the child entries, or the
+            provider to fetch them from, see `CustomTreeModel.fetchMore`.
+        is_new (bool): If it is a new item. False by default.
+    """
+    __slots__ = (
+        "name", "is_new", "highlight", "row", "names", "states",
+        "checked_count", "provider"
+    )
+
+    def __init__(self, name="", children=(), is_new=False):
+        self.name = name
+        self.is_new = is_new
+        # Highlight flags of the top-level entry, other than new/ checked
+        self.highlight = 0
+        self.row = 0
+        self.provider = None
+        if callable(children):
+            self.provider = children
+            children = ()
+        self.names = list(children)
+        self.states = bytearray(len(self.names))
+        self.checked_count = 0
+
+    def check_state(self):
+        """Derive the tri-state value of the top-level entry.
+
+        Returns:
+            QtCore.Qt.CheckState: Checked only if all children are checked.
+        """
+        if not self.checked_count:
+            return QtCore.Qt.Unchecked
+        if self.checked_count == len(self.names):
+            return QtCore.Qt.Checked
+        return QtCore.Qt.PartiallyChecked
+
+
+class CustomTreeModel(QtCore.QAbstractItemModel):
+    """Model-backed storage for large trees, to be used with `CustomTreeView`.
+
+    Only allows 1-tier sub-menu, same as `CustomTreeWidget`. Top-level items
+    are stored as `_TreeNode`, while child items are rows within them and do
+    not have any Python wrapper.
+
+    Args:
+        parent (QtCore.QObject or None): Parent object.
+    """
+    itemToggled = QtCore.pyqtSignal(QtCore.QModelIndex, int)
+    contentsUpdate = QtCore.pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super(CustomTreeModel, self).__init__(parent)
+
+        # Sentinel node, used as the internal pointer of top-level indexes.
+        # Child indexes point to the `_TreeNode` they belong to.
+        self._root = _TreeNode()
+        self._nodes = []
+
+        # Changes made within the current event-loop turn, to be emitted with
+        # `contentsUpdate` once control returns to the event loop.
+        self._pending_changes = None
+        self._changes_timer = QtCore.QTimer(self)
+        self._changes_timer.setSingleShot(True)
+        self._changes_timer.setInterval(0)
+        self._changes_timer.timeout.connect(self._emit_contents_update)
+
+    def _pending_change_set(self):
+        """Derive the change set of the current event-loop turn.
+
+        Returns:
+            dict: Change set to be emitted with `contentsUpdate`.
+        """
+        if self._pending_changes is None:
+            self._pending_changes = new_change_set()
+            self._changes_timer.start()
+        return self._pending_changes
+
+    def _emit_contents_update(self):
+        """Emits `contentsUpdate` with the changes made since the last call,
+        see `CustomTreeWidget._emit_contents_update`.
+        """
+        changes, self._pending_changes = self._pending_changes, None
+        if changes is None:
+            return
+
+        changes["moved"] = list(OrderedDict.fromkeys(changes["moved"]))
+        self.contentsUpdate.emit(changes)
+
+    def _locate(self, index):
+        """Derive the storage location of given index.
+
+        Args:
+            index (QtCore.QModelIndex): Valid index of the model.
+
+        Returns:
+            tuple(_TreeNode, int): Top-level node and the child row within it.
+                Child row is -1 if index is a top-level item.
+        """
+        pointer = index.internalPointer()
+        if pointer is self._root:
+            return self._nodes[index.row()], -1
+        return pointer, index.row()
+
+    def _renumber(self, start=0):
+        """Refresh the cached row of top-level nodes from given row onwards.
+
+        Args:
+            start (int): First row to be refreshed.
+        """
+        for row in range(start, len(self._nodes)):
+            self._nodes[row].row = row
+
+    def _top_level_index(self, node):
+        return self.createIndex(node.row, 0, self._root)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if column != 0 or row < 0:
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            if row < len(self._nodes):
+                return self.createIndex(row, column, self._root)
+            return QtCore.QModelIndex()
+
+        if parent.internalPointer() is self._root:
+            node = self._nodes[parent.row()]
+            if row < len(node.names):
+                return self.createIndex(row, column, node)
+        return QtCore.QModelIndex()
+
+    def parent(self, index=None):
+        # `QObject.parent()` shares the same name
+        if index is None:
+            return QtCore.QObject.parent(self)
+
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        pointer = index.internalPointer()
+        if pointer is self._root:
+            return QtCore.QModelIndex()
+        return self._top_level_index(pointer)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._nodes)
+        if parent.column() == 0 and parent.internalPointer() is self._root:
+            return len(self._nodes[parent.row()].names)
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        # Shows the expand arrow of items that are yet to be fetched
+        if not parent.isValid():
+            return bool(self._nodes)
+        if parent.internalPointer() is self._root:
+            node = self._nodes[parent.row()]
+            return bool(node.names) or node.provider is not None
+        return False
+
+    def canFetchMore(self, parent):
+        if parent.isValid() and parent.internalPointer() is self._root:
+            return self._nodes[parent.row()].provider is not None
+        return False
+
+    def fetchMore(self, parent):
+        """Fetch the children of given top-level item from its provider.
+
+        Called by the view upon the first expansion of the item. Fetched
+        children are appended as per `add_child_items`.
+
+        Args:
+            parent (QtCore.QModelIndex): Index of the top-level item.
+        """
+        if not self.canFetchMore(parent):
+            return
+
+        node = self._nodes[parent.row()]
+        provider, node.provider = node.provider, None
+        if not self.add_child_items(parent, provider(node.name)).isValid():
+            # No children after all, the arrow of the item is gone
+            self.dataChanged.emit(parent, parent, [])
+
+    def set_child_provider(self, parent_index, provider):
+        """Populate the children of given top-level item upon its first
+        expansion.
+
+        The item shows its expand arrow until then. The provider is called
+        once, with the name of the item, and returns the names of the child
+        items.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Index of the top-level item.
+            provider (callable): Returns an iterable of child names.
+        """
+        self._nodes[parent_index.row()].provider = provider
+        self.dataChanged.emit(parent_index, parent_index, [])
+
+    def derive_unloaded_indexes(self):
+        """Derive top-level items whose children are yet to be fetched.
+
+        Returns:
+            list(QtCore.QModelIndex): Indexes of the top-level items.
+        """
+        return [
+            self._top_level_index(node)
+            for node in self._nodes
+            if node.provider is not None
+        ]
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        if index.internalPointer() is self._root:
+            return _TOP_LEVEL_FLAGS
+        return _CHILD_FLAGS
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        node, row = self._locate(index)
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return node.name if row < 0 else node.names[row]
+
+        elif role == QtCore.Qt.CheckStateRole:
+            if row < 0:
+                return node.check_state()
+            if node.states[row] & _CHECKED_BIT:
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+
+        elif role == IsNewItemRole:
+            if row < 0:
+                return node.is_new
+            return bool(node.states[row] & _NEW_BIT)
+
+        elif role == HighlightFlagsRole:
+            if row >= 0:
+                return node.states[row]
+            flags = node.highlight
+            if node.is_new:
+                flags |= HIGHLIGHT_NEW
+            if node.checked_count and node.checked_count == len(node.names):
+                flags |= HIGHLIGHT_CHECKED
+            return flags
+
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """Override QAbstractItemModel setData function.
+
+        Checking a top-level item will check/ uncheck all of its children in
+        a single pass. Renaming an item will flag it with `IsNewItemRole`, as
+        per `CustomTreeWidget.tree_item_changed`.
+
+        Setting `HighlightFlagsRole` leaves the new/ checked flags as they
+        are, those are set through their own roles.
+
+        Args:
+            index (QtCore.QModelIndex): Index of item.
+            value (int or unicode): New value of the item for given role.
+            role (int): Value of Qt.ItemDataRole. It can be Qt.EditRole,
+                Qt.CheckStateRole, IsNewItemRole or HighlightFlagsRole.
+
+        Returns:
+            bool: True if the value has been set.
+        """
+        if not index.isValid():
+            return False
+
+        node, row = self._locate(index)
+        if role == QtCore.Qt.EditRole:
+            return self._rename(index, node, row, value)
+
+        elif role == QtCore.Qt.CheckStateRole:
+            return self._set_check_state(index, node, row, value)
+
+        elif role == IsNewItemRole:
+            if row < 0:
+                node.is_new = bool(value)
+            elif value:
+                node.states[row] |= _NEW_BIT
+            else:
+                node.states[row] &= ~_NEW_BIT
+            self.dataChanged.emit(index, index, [role, HighlightFlagsRole])
+            return True
+
+        elif role == HighlightFlagsRole:
+            flags = int(value) & 0xFF & ~_STATE_BITS
+            if row < 0:
+                node.highlight = flags
+            else:
+                node.states[row] = (node.states[row] & _STATE_BITS) | flags
+            self.dataChanged.emit(index, index, [role])
+            return True
+
+        return False
+
+    def _rename(self, index, node, row, name):
+        old_name = node.name if row < 0 else node.names[row]
+        if not name or name == old_name:
+            return False
+
+        if row < 0:
+            sibling_names = self.derive_top_level_names()
+        else:
+            sibling_names = node.names
+        if name in sibling_names:
+            print ("'{0}' already exists!".format(name))
+            return False
+
+        if row < 0:
+            node.name = name
+            node.is_new = True
+            node.highlight |= HIGHLIGHT_RENAMED
+            renamed = (old_name, name)
+        else:
+            node.names[row] = name
+            node.states[row] |= _NEW_BIT | HIGHLIGHT_RENAMED
+            renamed = (
+                "{0}/{1}".format(node.name, old_name),
+                "{0}/{1}".format(node.name, name)
+            )
+
+        self.dataChanged.emit(index, index)
+
+        self._pending_change_set()["renamed"].append(renamed)
+        return True
+
+    def _set_check_state(self, index, node, row, value):
+        checked = value != QtCore.Qt.Unchecked
+
+        # Top-level item, cascades the state to all of its children
+        if row < 0:
+            child_count = len(node.names)
+            if not child_count:
+                return False
+            if node.checked_count == (child_count if checked else 0):
+                return True
+
+            if checked:
+                node.states = node.states.translate(_CHECK_ALL_TABLE)
+                node.checked_count = child_count
+            else:
+                node.states = node.states.translate(_UNCHECK_ALL_TABLE)
+                node.checked_count = 0
+            self.dataChanged.emit(
+                self.createIndex(0, 0, node),
+                self.createIndex(child_count - 1, 0, node),
+                [QtCore.Qt.CheckStateRole]
+            )
+
+        else:
+            if bool(node.states[row] & _CHECKED_BIT) == checked:
+                return True
+
+            if checked:
+                node.states[row] |= _CHECKED_BIT
+                node.checked_count += 1
+            else:
+                node.states[row] &= ~_CHECKED_BIT
+                node.checked_count -= 1
+            self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+
+            # Refresh the tri-state of its top-level item
+            parent_index = self._top_level_index(node)
+            self.dataChanged.emit(
+                parent_index, parent_index, [QtCore.Qt.CheckStateRole]
+            )
+
+        self.itemToggled.emit(index, index.column())
+        return True
+
+    def set_check_state(self, indexes_or_paths, state):
+        """Check/ uncheck given items in one pass.
+
+        Each top-level item emits a single `dataChanged` over its toggled
+        rows and a single `itemToggled`, whatever the number of rows.
+
+        Args:
+            indexes_or_paths (iterable): Indexes, or their paths, eg.
+                'parentName/childName'. A top-level item stands for all of
+                its children.
+            state (QtCore.Qt.CheckState): New check state of the items.
+
+        Returns:
+            int: Number of toggled rows.
+
+        Raises:
+            ValueError: If no item is found at one of the paths.
+        """
+        node_rows = OrderedDict()
+        for node, row in self._derive_check_locations(indexes_or_paths):
+            if row < 0:
+                node_rows[node.row] = (node, None)
+                continue
+            rows = node_rows.setdefault(node.row, (node, set()))[1]
+            if rows is not None:
+                rows.add(row)
+
+        return sum(
+            self._set_node_check_states(node, rows, state)
+            for node, rows in node_rows.values()
+        )
+
+    def check_all(self, parent_index=None):
+        """Check all child items of given top-level item in one pass.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the model if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self._set_scope_check_state(parent_index, QtCore.Qt.Checked)
+
+    def uncheck_all(self, parent_index=None):
+        """Uncheck all child items of given top-level item in one pass.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the model if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self._set_scope_check_state(parent_index, QtCore.Qt.Unchecked)
+
+    def invert_checks(self, parent_index=None):
+        """Toggle the check state of all child items of given top-level item
+        in one pass.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the model if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self._set_scope_check_state(parent_index, None)
+
+    def _set_scope_check_state(self, parent_index, state):
+        if parent_index is None:
+            nodes = list(self._nodes)
+        else:
+            nodes = [
+                node for node, _ in self._derive_check_locations([parent_index])
+            ]
+        return sum(
+            self._set_node_check_states(node, None, state) for node in nodes
+        )
+
+    def _derive_check_locations(self, indexes_or_paths):
+        """Resolve the items of `set_check_state`.
+
+        Yields:
+            tuple(_TreeNode, int): Top-level node and the child row within
+                it, -1 for the top-level item itself.
+
+        Raises:
+            ValueError: If no item is found at one of the paths.
+        """
+        nodes = None
+        child_rows = {}
+        for index in indexes_or_paths:
+            if not isinstance(index, _STRING_TYPES):
+                if index.isValid():
+                    yield self._locate(index)
+                continue
+
+            # First item of each name, as per `CustomTreeWidget`
+            if nodes is None:
+                nodes = dict(
+                    (node.name, node) for node in reversed(self._nodes)
+                )
+
+            parent_name, _, child_name = index.partition("/")
+            node = nodes.get(parent_name)
+            row = -1
+            if node is not None and child_name:
+                rows = child_rows.get(node.row)
+                if rows is None:
+                    reversed_rows = range(len(node.names) - 1, -1, -1)
+                    rows = child_rows[node.row] = dict(zip(
+                        [node.names[num] for num in reversed_rows],
+                        reversed_rows
+                    ))
+                row = rows.get(child_name)
+                if row is None:
+                    node = None
+
+            if node is None:
+                raise ValueError("No item found at '{0}'".format(index))
+            yield node, row
+
+    def _set_node_check_states(self, node, rows, state):
+        """Set the check states of the children of a top-level node.
+
+        Args:
+            node (_TreeNode): Top-level node.
+            rows (set(int) or None): Child rows, all of them if None.
+            state (QtCore.Qt.CheckState or None): New check state, None to
+                toggle the current ones.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        child_count = len(node.names)
+        if not child_count:
+            return 0
+
+        if rows is None:
+            old_count = node.checked_count
+            if state is None:
+                node.states = node.states.translate(_INVERT_CHECKS_TABLE)
+                node.checked_count = child_count - old_count
+                toggled_count = child_count
+            else:
+                checked = state != QtCore.Qt.Unchecked
+                node.checked_count = child_count if checked else 0
+                toggled_count = abs(node.checked_count - old_count)
+                node.states = node.states.translate(
+                    _CHECK_ALL_TABLE if checked else _UNCHECK_ALL_TABLE
+                )
+            first, last = 0, child_count - 1
+
+        else:
+            states = node.states
+            if state is None:
+                toggled_rows = sorted(rows)
+            else:
+                checked = state != QtCore.Qt.Unchecked
+                toggled_rows = sorted(
+                    row for row in rows
+                    if bool(states[row] & _CHECKED_BIT) != checked
+                )
+            for row in toggled_rows:
+                states[row] ^= _CHECKED_BIT
+                if states[row] & _CHECKED_BIT:
+                    node.checked_count += 1
+                else:
+                    node.checked_count -= 1
+            toggled_count = len(toggled_rows)
+            if toggled_rows:
+                first, last = toggled_rows[0], toggled_rows[-1]
+
+        if not toggled_count:
+            return 0
+
+        self.dataChanged.emit(
+            self.createIndex(first, 0, node),
+            self.createIndex(last, 0, node),
+            [QtCore.Qt.CheckStateRole]
+        )
+        parent_index = self._top_level_index(node)
+        self.dataChanged.emit(
+            parent_index, parent_index, [QtCore.Qt.CheckStateRole]
+        )
+        self.itemToggled.emit(parent_index, 0)
+        return toggled_count
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        if count <= 0 or row < 0 or row + count > self.rowCount(parent):
+            return False
+
+        self._pending_change_set()["removed"].extend(
+            self.derive_item_paths(row, row + count - 1, parent)
+        )
+        self.beginRemoveRows(parent, row, row + count - 1)
+        if not parent.isValid():
+            del self._nodes[row:row + count]
+            self._renumber(row)
+        else:
+            node = self._nodes[parent.row()]
+            removed_states = node.states[row:row + count]
+            node.checked_count -= removed_states.translate(
+                _IS_CHECKED_TABLE
+            ).count(b"\x01")
+            del node.names[row:row + count]
+            del node.states[row:row + count]
+        self.endRemoveRows()
+
+        if parent.isValid():
+            self.dataChanged.emit(parent, parent, [QtCore.Qt.CheckStateRole])
+        return True
+
+    def moveRows(self, sourceParent, sourceRow, count,
+                 destinationParent, destinationChild):
+        # Items can only be re-ordered within the same parent
+        if count <= 0 or sourceParent != destinationParent:
+            return False
+        if not self.beginMoveRows(sourceParent, sourceRow,
+                                  sourceRow + count - 1, destinationParent,
+                                  destinationChild):
+            return False
+
+        insert_at = destinationChild
+        if destinationChild > sourceRow:
+            insert_at -= count
+
+        def _move(sequence):
+            block = sequence[sourceRow:sourceRow + count]
+            del sequence[sourceRow:sourceRow + count]
+            sequence[insert_at:insert_at] = block
+
+        if not sourceParent.isValid():
+            _move(self._nodes)
+            self._renumber(min(sourceRow, insert_at))
+        else:
+            node = self._nodes[sourceParent.row()]
+            _move(node.names)
+            _move(node.states)
+        self.endMoveRows()
+
+        self._pending_change_set()["moved"].extend(
+            self.derive_item_paths(
+                insert_at, insert_at + count - 1, sourceParent
+            )
+        )
+        return True
+
+    def derive_item_paths(self, first, last, parent_index=QtCore.QModelIndex()):
+        """Derive the paths of a run of rows.
+
+        Args:
+            first (int): First row.
+            last (int): Last row.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex): Index of the top-level item.
+                Top-level rows if not given.
+
+        Returns:
+            list(str): Paths of the items, eg. 'parentName/childName'.
+        """
+        if not parent_index.isValid():
+            return [node.name for node in self._nodes[first:last + 1]]
+
+        node = self._nodes[parent_index.row()]
+        prefix = node.name + "/"
+        return [prefix + name for name in node.names[first:last + 1]]
+
+    def set_tree_items(self, tree_items):
+        """Replace the model contents with given items.
+
+        Args:
+            tree_items (dict): Either in `{parent: [children]}` or in
+                `{page: {parent: [children]}}` format.
+        """
+        self.beginResetModel()
+        self._nodes = [
+            _TreeNode(name, children)
+            for name, children in _iter_parent_items(tree_items)
+        ]
+        self._renumber()
+        self.endResetModel()
+
+    def populate(self, tree_items, replace=True):
+        """Build the model from given contents in one pass.
+
+        Args:
+            tree_items (dict): Either in `{parent: [children]}` or in
+                `{page: {parent: [children]}}` format.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand. If False,
+                children of an existing top-level item of the same name will
+                be appended into it. True by default.
+        """
+        if replace:
+            self.set_tree_items(tree_items)
+            return
+
+        existing_rows = {}
+        for node in self._nodes:
+            existing_rows.setdefault(node.name, node.row)
+
+        for parent_name, child_names in _iter_parent_items(tree_items):
+            row = existing_rows.get(parent_name)
+            if row is None:
+                parent_index = self.add_top_level_item(parent_name)
+                existing_rows[parent_name] = parent_index.row()
+            else:
+                parent_index = self.index(row, 0)
+
+            if callable(child_names):
+                self.set_child_provider(parent_index, child_names)
+            else:
+                self.add_child_items(parent_index, child_names)
+
+    def load_tree_items(self, records, replace=True):
+        """Build the model from a stream of records.
+
+        See `CustomTreeWidget.load_tree_items`. Children are packed chunk by
+        chunk, and the model is reset once if `replace` is True.
+
+        Args:
+            records (iterable(tuple)): `(parent, child, state)` records.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand. If False,
+                children of an existing top-level item of the same name will
+                be appended into it. True by default.
+        """
+        if replace:
+            self.beginResetModel()
+            self._nodes = []
+
+        try:
+            # Top-level nodes are only mapped by name once another one than
+            # the last is referred to, see `CustomTreeWidget.load_tree_items`
+            nodes = None
+            node = self._nodes[-1] if self._nodes else None
+            for parent_name, children in _iter_record_chunks(records):
+                if node is None or node.name != parent_name:
+                    if nodes is None:
+                        nodes = {}
+                        for existing_node in self._nodes:
+                            nodes.setdefault(existing_node.name, existing_node)
+                    node = nodes.get(parent_name)
+
+                if node is None:
+                    if replace:
+                        node = _TreeNode(parent_name)
+                        node.row = len(self._nodes)
+                        self._nodes.append(node)
+                    else:
+                        parent_index = self.add_top_level_item(parent_name)
+                        node = self._nodes[parent_index.row()]
+                    nodes[parent_name] = node
+
+                if not children:
+                    continue
+
+                names = [child_name for child_name, _ in children]
+                states = bytearray(
+                    _CHECKED_BIT if state == QtCore.Qt.Checked else 0
+                    for _, state in children
+                )
+                checked_count = len(states) - states.count(b"\x00")
+                if replace:
+                    node.names.extend(names)
+                    node.states.extend(states)
+                    node.checked_count += checked_count
+                    continue
+
+                first = len(node.names)
+                parent_index = self._top_level_index(node)
+                self.add_child_items(parent_index, names)
+                if checked_count:
+                    node.states[first:] = states
+                    node.checked_count += checked_count
+                    self.dataChanged.emit(
+                        self.createIndex(first, 0, node),
+                        self.createIndex(len(node.names) - 1, 0, node),
+                        [QtCore.Qt.CheckStateRole]
+                    )
+                    self.dataChanged.emit(
+                        parent_index, parent_index, [QtCore.Qt.CheckStateRole]
+                    )
+        finally:
+            if replace:
+                self.endResetModel()
+
+    def save_snapshot(self, file_path, expanded_rows=()):
+        """Write a binary snapshot of the model contents.
+
+        See `write_snapshot`. The packed child states are written as is.
+        Children of lazily populated items are fetched beforehand.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+
+        Keyword Args:
+            expanded_rows (iterable(int)): Rows of the expanded top-level
+                items, as known by the view.
+        """
+        for parent_index in self.derive_unloaded_indexes():
+            self.fetchMore(parent_index)
+
+        expanded_rows = set(expanded_rows)
+        nodes = []
+        for node in self._nodes:
+            flags = _NEW_BIT if node.is_new else 0
+            if node.row in expanded_rows:
+                flags |= _SNAPSHOT_EXPANDED_BIT
+            nodes.append((
+                node.name,
+                flags,
+                node.names,
+                node.states.translate(_SNAPSHOT_STATES_TABLE)
+            ))
+        write_snapshot(file_path, nodes)
+
+    def load_snapshot(self, file_path):
+        """Replace the model contents with a binary snapshot.
+
+        See `_SnapshotReader`. Names and packed states are handed over to the
+        nodes as they are decoded from the mapped file, under a single model
+        reset.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+
+        Returns:
+            list(int): Rows of the top-level items that were expanded.
+
+        Raises:
+            ValueError: If the file is not a snapshot, or of a newer version.
+        """
+        with _SnapshotReader(file_path) as reader:
+            self.beginResetModel()
+            self._nodes = []
+            expanded_rows = []
+            try:
+                for row, (name, flags, child_names, child_states) in (
+                        enumerate(reader.iter_nodes())):
+                    node = _TreeNode(name, is_new=bool(flags & _NEW_BIT))
+                    node.row = row
+                    node.names = child_names
+                    node.states = child_states
+                    node.checked_count = child_states.translate(
+                        _IS_CHECKED_TABLE
+                    ).count(b"\x01")
+                    self._nodes.append(node)
+                    if flags & _SNAPSHOT_EXPANDED_BIT:
+                        expanded_rows.append(row)
+            finally:
+                self.endResetModel()
+        return expanded_rows
+
+    def add_top_level_item(self, name, is_new=False):
+        """Append a new top-level item.
+
+        Args:
+            name (str): Name of the new item.
+            is_new (bool): If it is a new item. False by default.
+
+        Returns:
+            QtCore.QModelIndex: Index of the new item.
+        """
+        row = len(self._nodes)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        node = _TreeNode(name, is_new=is_new)
+        node.row = row
+        self._nodes.append(node)
+        self.endInsertRows()
+        return self._top_level_index(node)
+
+    def add_child_items(self, parent_index, names, is_new=False):
+        """Append new child items under given top-level item.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Index of the top-level item.
+            names (list(str)): Names of the new child items.
+            is_new (bool): If they are new items. False by default.
+
+        Returns:
+            QtCore.QModelIndex: Index of the first new child item.
+        """
+        node = self._nodes[parent_index.row()]
+        names = list(names)
+        if not names:
+            return QtCore.QModelIndex()
+
+        row = len(node.names)
+        self.beginInsertRows(parent_index, row, row + len(names) - 1)
+        node.names.extend(names)
+        node.states.extend(bytearray([_NEW_BIT if is_new else 0]) * len(names))
+        self.endInsertRows()
+
+        # New children are unchecked, the tri-state may have changed
+        self.dataChanged.emit(
+            parent_index, parent_index, [QtCore.Qt.CheckStateRole]
+        )
+        return self.createIndex(row, 0, node)
+
+    def derive_top_level_names(self):
+        """Derive top-level items' names.
+
+        Returns:
+            list(str): List of top-level items' name.
+        """
+        return [node.name for node in self._nodes]
+
+    def derive_child_names_from_top_level(self, parent_index):
+        """Derive child items' names from given top-level item.
+
+        Args:
+            parent_index (QtCore.QModelIndex): Index of the top-level item.
+
+        Returns:
+            list(str): List of child items' name found within the parent node.
+        """
+        return list(self._nodes[parent_index.row()].names)
+
+    def derive_tree_items(self, mode="all", fetch=False):
+        """Derive items based on specified mode chosen.
+
+        Same as `CustomTreeWidget.derive_tree_items`, but the check states are
+        filtered from the packed storage without visiting every row in Python.
+        Results are not cached.
+
+        Keyword Args:
+            mode (str): Determines what items to derive. Defaults to `all`.
+                There are 3 modes to choose from:
+                    * "all"       - Get all items within the widget.
+                    * "checked"   - Get only checked items within the widget.
+                    * "unchecked" - Get only unchecked items within the widget.
+            fetch (bool): Fetch the children of every lazily populated item
+                beforehand. If False, items whose children are yet to be
+                fetched are reported with None instead of a list. False by
+                default.
+
+        Returns:
+            OrderedDict: Contains names of top-level items and lists of its
+                sub items. Contents are returned in ordered placement as
+                defined by User.
+        """
+        if fetch:
+            for parent_index in self.derive_unloaded_indexes():
+                self.fetchMore(parent_index)
+
+        all_items = OrderedDict()
+        for node in self._nodes:
+            if node.provider is not None:
+                all_items[node.name] = None
+
+            elif mode == "all":
+                all_items[node.name] = list(node.names)
+
+            elif mode == "checked":
+                if node.checked_count == len(node.names):
+                    all_items[node.name] = list(node.names)
+                elif not node.checked_count:
+                    all_items[node.name] = []
+                else:
+                    all_items[node.name] = list(compress(
+                        node.names, node.states.translate(_IS_CHECKED_TABLE)
+                    ))
+
+            elif mode == "unchecked":
+                if not node.checked_count:
+                    all_items[node.name] = list(node.names)
+                elif node.checked_count == len(node.names):
+                    all_items[node.name] = []
+                else:
+                    all_items[node.name] = list(compress(
+                        node.names, node.states.translate(_IS_UNCHECKED_TABLE)
+                    ))
+
+            else:
+                all_items[node.name] = []
+
+        return all_items
+
+    def iter_tree_items(self, mode="all", fetch=False):
+        """Iterate over the items based on specified mode chosen.
+
+        See `CustomTreeWidget.iter_tree_items`.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked".
+            fetch (bool): Fetch the children of lazily populated items
+                beforehand. False by default.
+
+        Yields:
+            tuple(str, str or None, QtCore.Qt.CheckState): Name of top-level
+                item, name of child item and its check state.
+        """
+        if fetch:
+            for parent_index in self.derive_unloaded_indexes():
+                self.fetchMore(parent_index)
+
+        for node in self._nodes:
+            has_children = False
+            if node.provider is not None:
+                pass
+
+            elif mode == "all":
+                names = node.names
+                states = node.states
+                for row in range(len(names)):
+                    has_children = True
+                    if states[row] & _CHECKED_BIT:
+                        yield node.name, names[row], QtCore.Qt.Checked
+                    else:
+                        yield node.name, names[row], QtCore.Qt.Unchecked
+
+            elif mode in ("checked", "unchecked"):
+                if mode == "checked":
+                    state = QtCore.Qt.Checked
+                    matched = node.checked_count
+                    table = _IS_CHECKED_TABLE
+                else:
+                    state = QtCore.Qt.Unchecked
+                    matched = len(node.names) - node.checked_count
+                    table = _IS_UNCHECKED_TABLE
+
+                if matched:
+                    for name in compress(node.names, node.states.translate(table)):
+                        has_children = True
+                        yield node.name, name, state
+
+            if not has_children:
+                yield node.name, None, node.check_state()
+
+
+class CustomTreeView(QtWidgets.QTreeView):
+    """Model-backed counterpart of `CustomTreeWidget`, for large trees.
+
+    Provides the same public API as `CustomTreeWidget`, but items are
+    addressed by `QtCore.QModelIndex` instead of `CustomTreeWidgetItem`.
+
+    Args:
+        widget (None):
+    """
+    itemToggled = QtCore.pyqtSignal(QtCore.QModelIndex, int)
+
+    selectionItemChanged = QtCore.pyqtSignal(bool)
+    contentsUpdate = QtCore.pyqtSignal(dict)
+
+    def __init__(self, widget=None):
+        super(CustomTreeView, self).__init__(widget)
+
+        # All rows are of the same height, which spares the view from
+        # measuring each row upon layout.
+        self.setUniformRowHeights(True)
+
+        # Context menu for tree items
+        self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_custom_menu)
+
+        self.setModel(CustomTreeModel(self))
 
-        # elif item.text(0) and self._startup:
-        #     print 'Item Name changed'
-        #     item.setData(0, IsNewItemRole, True)
-        # print
+        # Background load in progress, if any. See `load_tree_items_async`.
+        self._tree_items_loader = None
 
-    def tree_item_double_clicked(self, item, column):
-        """Overrides widget's default signal.
+    def setModel(self, model):
+        """Override QTreeView setModel function.
 
-        Emitted when User performs double clicks inside the widget.
+        Forwards the signals of `CustomTreeModel` to the view.
 
         Args:
-            item (CustomTreeWidgetItem): Selected item.
-            column (int): Column value of the selected item.
+            model (CustomTreeModel): Model to be displayed.
         """
-        # print '>>> tree item double clicked...'
-        self.prev_name = item.text(column)
-        self.rename_counter = True
+        super(CustomTreeView, self).setModel(model)
+        model.itemToggled.connect(self.itemToggled)
+        model.contentsUpdate.connect(self.contentsUpdate)
+        self.selectionModel().currentChanged.connect(
+            self.selection_item_changed
+        )
+
+    def selection_item_changed(self, current, previous):
+        """Emitted when current item selection is changed.
+
+        Args:
+            current (QtCore.QModelIndex): Current selected item.
+            previous (QtCore.QModelIndex): Previous selected item.
+        """
+        state = current.isValid() and not current.parent().isValid()
+        self.selectionItemChanged.emit(state)
 
     def show_custom_menu(self, pos):
-        """Display custom context menu on CustomTreeWidgetItem.
+        """Display custom context menu on tree items.
 
-        There are 2 sets of context menus depending on the hierarichal level
-        of the QTreeWidgetItem.
-        
         Args:
             pos (QtCore.QPoint): Mouse cursor position when performing right-
                 click action.
         """
-        base_node = self.itemAt(pos)
-        if base_node is None:
+        base_index = self.indexAt(pos)
+        if not base_index.isValid():
             return
 
         qmenu = QtWidgets.QMenu(self)
@@ -236,7 +6507,6 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         remove_action.triggered.connect(self.remove_selected_item)
         qmenu.addAction(remove_action)
 
-        #>>>
         move_up_action = QtWidgets.QAction("Move Up", self)
         move_up_action.triggered.connect(partial(self.move_item, direction="up"))
         qmenu.addAction(move_up_action)
@@ -245,14 +6515,11 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         move_down_action.triggered.connect(partial(self.move_item, direction="down"))
         qmenu.addAction(move_down_action)
 
-        # The following options are only effected for top-level items
-        # top-level items do not have `parent()`
-        if base_node.parent() is None:
+        if not base_index.parent().isValid():
             add_new_child_action = QtWidgets.QAction("Add new sub item", self)
             add_new_child_action.triggered.connect(
-                partial(self.add_new_child_item, base_node)
+                partial(self.add_new_child_item, base_index)
             )
-            # qmenu.addAction(add_new_child_action)
             qmenu.insertAction(remove_action, add_new_child_action)
 
         qmenu.exec_(self.mapToGlobal(pos))
@@ -260,63 +6527,32 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
     def move_item(self, direction=""):
         """Move selected item up/ down the index order as defined by User.
 
-        If top-level item is selected, the child items within will be moved
-        along with it.
-        
         Args:
             direction (str): Either 'up' or 'down'. Denotes the direction of
                 the new item placement.
         """
-        
-        selected = self.currentItem()
-
-        # Top-Level item in selection
-        if selected.parent() is None:
-            selected_index = self.indexOfTopLevelItem(selected)
-            selected_item = self.topLevelItem(selected_index)
-            self.takeTopLevelItem(selected_index)
-
-            root_item = self.invisibleRootItem()
-            top_level_count = root_item.childCount()
-
-            if direction == "up":
-                new_index = selected_index - 1
-
-                if new_index < 0:
-                    new_index = 0
-
-            elif direction == "down":
-                new_index = selected_index + 1
-
-                if new_index > top_level_count:
-                    new_index = top_level_count
+        current = self.currentIndex()
+        if not current.isValid():
+            return
 
-            self.insertTopLevelItem(new_index, selected_item)
-            selected_item.setExpanded(True)
+        model = self.model()
+        parent_index = current.parent()
+        row = current.row()
 
-        # Child item in selection
+        if direction == "up":
+            new_row = max(row - 1, 0)
+            destination = new_row
+        elif direction == "down":
+            new_row = min(row + 1, model.rowCount(parent_index) - 1)
+            destination = new_row + 1
         else:
-            parent_item = selected.parent()
-            selected_index = parent_item.indexOfChild(selected)
-            selected_item = parent_item.takeChild(selected_index)
-
-            child_count = parent_item.childCount()
-
-            if direction == "up":
-                new_index = selected_index - 1
-
-                if new_index < 0:
-                    new_index = 0
-
-            elif direction == "down":
-                new_index = selected_index + 1
-
-                if new_index > child_count:
-                    new_index = child_count
+            return
 
-            parent_item.insertChild(new_index, selected_item)
+        if new_row == row:
+            return
 
-        self.setCurrentItem(selected_item)
+        model.moveRows(parent_index, row, 1, parent_index, destination)
+        self.setCurrentIndex(model.index(new_row, 0, parent_index))
 
     def add_item_dialog(self, title):
         """Input dialog for creation of new Parent or Sub items.
@@ -339,45 +6575,42 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
     def add_new_parent_item(self):
         """Creation of new parent item."""
         input_text = self.add_item_dialog("Parent")
-        top_level_names = self.derive_top_level_names()
-
         if input_text:
 
-            if input_text in top_level_names:
+            if input_text in self.derive_top_level_names():
                 print ("'{0}' already exists!".format(input_text))
                 return
 
-            new_item = CustomTreeWidgetItem(
-                self, input_text, is_tristate=True, is_new_item=True
+            new_index = self.model().add_top_level_item(
+                input_text, is_new=True
             )
+            self.setCurrentIndex(new_index)
 
-            self.setCurrentItem(new_item)
-
-    def add_new_child_item(self, base_node):
+    def add_new_child_item(self, base_index):
         """Creation of new child item, to be populated under parent item.
 
         Args:
-            base_node (CustomTreeWidgetItem): Parent node for child item to be
+            base_index (QtCore.QModelIndex): Parent item for child item to be
                 added into.
         """
         input_text = self.add_item_dialog("Sub")
-        child_item_names = self.derive_child_names_from_top_level(base_node)
-
         if input_text:
+            # Duplicates are checked against the fetched children
+            if self.model().canFetchMore(base_index):
+                self.model().fetchMore(base_index)
 
-            if input_text in child_item_names:
+            if input_text in self.derive_child_names_from_top_level(base_index):
                 print ("'{0}' already existed under {1}".format(
                     input_text,
-                    base_node.text(0)
+                    base_index.data()
                 ))
                 return
 
-            it = CustomTreeWidgetItem(base_node, input_text, is_new_item=True)
-            self.setItemExpanded(base_node, True) # This is only available in Qt4
-            # base_node.setExpanded(True)
-            it.setData(0, IsNewItemRole, True)
-
-            self.setCurrentItem(it)
+            new_index = self.model().add_child_items(
+                base_index, [input_text], is_new=True
+            )
+            self.setExpanded(base_index, True)
+            self.setCurrentIndex(new_index)
 
     def is_top_level_item(self):
         """Check if currently selected item is a top-level item.
@@ -385,25 +6618,44 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         Returns:
             bool: True if selected item is top-level item. False if otherwise.
         """
-        result = True
-        if self.currentItem().parent():
-            result = False
-        return result
+        return not self.currentIndex().parent().isValid()
 
     def remove_selected_item(self):
-        """Removes selected entry in TreeWidget.
+        """Removes selected entries in the view.
 
-        This method applies to both parent and child items.
+        Selected rows are grouped per parent, and each contiguous run of rows
+        is removed in a single operation.
         """
-        root = self.invisibleRootItem()
-        for item in self.selectedItems():
-            (item.parent() or root).removeChild(item)
+        model = self.model()
+
+        # Read the selection ranges rather than `selectedRows()`, which would
+        # create an index for every selected row.
+        rows_per_parent = defaultdict(list)
+        for selection_range in self.selectionModel().selection():
+            parent_index = selection_range.parent()
+            parent_row = parent_index.row() if parent_index.isValid() else -1
+            rows_per_parent[parent_row].extend(
+                range(selection_range.top(), selection_range.bottom() + 1)
+            )
+
+        # Children of removed top-level items go along with them
+        top_level_rows = rows_per_parent.pop(-1, [])
+        removed_parents = set(top_level_rows)
 
-        self.contentsUpdate.emit()
+        # Removed rows are reported by the model, see `contentsUpdate`
+        for parent_row, rows in rows_per_parent.items():
+            if parent_row in removed_parents:
+                continue
+            parent_index = model.index(parent_row, 0)
+            for first, last in reversed(_contiguous_runs(rows)):
+                model.removeRows(first, last - first + 1, parent_index)
+
+        for first, last in reversed(_contiguous_runs(top_level_rows)):
+            model.removeRows(first, last - first + 1)
 
     def get_selected_text(self):
         """Get the text naming of selected item.
-        
+
         If parent item is selected, only the name will be return.
         If child item is selected, it will returns with the prefix of its parent
         naming, eg. 'parentName/childName'.
@@ -411,17 +6663,11 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         Retuns:
             str or None: Name of selected item.
         """
-        current_item = self.currentItem()
-        if current_item:
-            item_name = current_item.text(0)
-
-            # When child-item is selected
-            if current_item.parent():
-                item_name = "{0}/{1}".format(
-                    current_item.parent().text(0),
-                    item_name
-                )
-
+        current = self.currentIndex()
+        if current.isValid():
+            item_name = current.data()
+            if current.parent().isValid():
+                item_name = "{0}/{1}".format(current.parent().data(), item_name)
             return item_name
 
     def get_selected_child_count(self):
@@ -430,10 +6676,64 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         Returns:
             int: Number of child items found under parent.
         """
-        current_item = self.currentItem()
-        if current_item:
-            base_node = current_item[0]
-            return base_node.childCount()
+        current = self.currentIndex()
+        if current.isValid():
+            if current.parent().isValid():
+                current = current.parent()
+            return self.model().rowCount(current)
+
+    def set_check_state(self, indexes_or_paths, state):
+        """Check/ uncheck given items in one pass.
+
+        See `CustomTreeModel.set_check_state`.
+
+        Args:
+            indexes_or_paths (iterable): Indexes, or their paths, eg.
+                'parentName/childName'.
+            state (QtCore.Qt.CheckState): New check state of the items.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self.model().set_check_state(indexes_or_paths, state)
+
+    def check_all(self, parent_index=None):
+        """Check all child items in one pass, see `CustomTreeModel.check_all`.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the view if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self.model().check_all(parent_index)
+
+    def uncheck_all(self, parent_index=None):
+        """Uncheck all child items in one pass, see
+        `CustomTreeModel.uncheck_all`.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the view if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self.model().uncheck_all(parent_index)
+
+    def invert_checks(self, parent_index=None):
+        """Toggle the check state of all child items in one pass, see
+        `CustomTreeModel.invert_checks`.
+
+        Keyword Args:
+            parent_index (QtCore.QModelIndex or str or None): Top-level item,
+                or its name. All items of the view if None.
+
+        Returns:
+            int: Number of toggled rows.
+        """
+        return self.model().invert_checks(parent_index)
 
     def derive_top_level_names(self):
         """Derive top-level items' names.
@@ -441,168 +6741,579 @@ class CustomTreeWidget(QtWidgets.QTreeWidget):
         Returns:
             list(str): List of top-level items' name.
         """
-        root_item = self.invisibleRootItem()
-        top_level_count = root_item.childCount()
-        top_item_names = []
-
-        for num in range(top_level_count):
-            top_item_names.append(root_item.child(num).text(0))
-
-        return top_item_names
+        return self.model().derive_top_level_names()
 
-    def derive_child_names_from_top_level(self, base_node):
+    def derive_child_names_from_top_level(self, base_index):
         """Derive child items' names from given top-level item.
 
         Args:
-            base_node (CustomTreeWidgetItem): Selected parent node.
+            base_index (QtCore.QModelIndex): Selected parent item.
 
         Returns:
             list(str): List of child items' name found within the parent node.
         """
-        child_count = base_node.childCount()
-        child_names = []
-        for num in range(child_count):
-            child_names.append(base_node.child(num).text(0))
-        return child_names
+        return self.model().derive_child_names_from_top_level(base_index)
+
+    def populate(self, tree_items, replace=True):
+        """Build the view contents in one pass.
+
+        See `CustomTreeModel.populate`.
+
+        Args:
+            tree_items (dict): Either in `{parent: [children]}` or in
+                `{page: {parent: [children]}}` format.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+        """
+        self.model().populate(tree_items, replace=replace)
 
-    def derive_tree_items(self, mode="all"):
+    def derive_tree_items(self, mode="all", fetch=False):
         """Derive items based on specified mode chosen.
 
-        Keyword Args: 
-            mode (str): Determines what items to derive. Defaults to `all`.
-                There are 3 modes to choose from:
-                    * "all"       - Get all items within the widget.
-                    * "checked"   - Get only checked items within the widget.
-                    * "unchecked" - Get only unchecked items within the widget.
+        See `CustomTreeModel.derive_tree_items`.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked".
+            fetch (bool): Fetch the children of lazily populated items
+                beforehand. False by default.
 
         Returns:
-            dict: Contains names of top-level items and its sub items. Contents
-                are returned in ordered placement as defined by User.
+            dict: Contains names of top-level items and its sub items.
+        """
+        return self.model().derive_tree_items(mode, fetch=fetch)
 
-                ..code-block:: json
-                        {
-                            'topA': [
-                                'a101',
-                                'a102'
-                            ],
-                            'topB': [
-                                'b101'
-                            ]
-                        }
+    def iter_tree_items(self, mode="all", fetch=False):
+        """Iterate over the items based on specified mode chosen.
+
+        See `CustomTreeModel.iter_tree_items`.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked".
+            fetch (bool): Fetch the children of lazily populated items
+                beforehand. False by default.
+
+        Yields:
+            tuple(str, str or None, QtCore.Qt.CheckState): Name of top-level
+                item, name of child item and its check state.
         """
-        # all_items = defaultdict(list)
-        all_items = OrderedDict()
-        
-        root_item = self.invisibleRootItem()
-        top_level_count = root_item.childCount()
+        return self.model().iter_tree_items(mode, fetch=fetch)
 
-        for top_num in range(top_level_count):
-            top_level_item = root_item.child(top_num)
-            top_level_item_name = str(top_level_item.text(0))
-            child_count = top_level_item.childCount()
+    def load_tree_items(self, records, replace=True):
+        """Build the view contents from a stream of records.
 
-            all_items[top_level_item_name] = []
+        See `CustomTreeModel.load_tree_items`.
 
-            for child_num in range(child_count):
-                child_item = top_level_item.child(child_num)
-                child_item_name = str(child_item.text(0)) or ""
-
-                if mode == "all":
-                    # all_items[top_level_item.text(0)].append(child.text(0))
-                    all_items[top_level_item_name].append(child_item_name)
-                
-                elif mode == "checked":
-                    if child_item.checkState(0) == QtCore.Qt.Checked:
-                        # all_items[top_level_item.text(0)].append(child_item.text(0))
-                        all_items[top_level_item_name].append(child_item_name)
-
-                elif mode == "unchecked":
-                    if child_item.checkState(0) == QtCore.Qt.Unchecked:
-                        # all_items[top_level_item.text(0)].append(child_item.text(0))
-                        all_items[top_level_item_name].append(child_item_name)
+        Args:
+            records (iterable(tuple)): `(parent, child, state)` records.
 
-        return all_items
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+        """
+        self.model().load_tree_items(records, replace=replace)
 
+    def export_tree_items(self, file_path, mode="all"):
+        """Write the items into a file, one at a time.
 
-    ####################################################################################################
+        See `write_tree_items` for the formats. Children of lazily populated
+        items are fetched beforehand, as the file cannot tell them apart from
+        items without children.
 
-    # TBC
-    def handleItemToggled(self, item, column):
-        """Handle list item(s) when it is checked/ unchecked.
+        Args:
+            file_path (str): Path of the file, ".ndjson"/ ".jsonl" to keep the
+                check states.
+
+        Keyword Args:
+            mode (str): Either "all", "checked" or "unchecked".
+
+        Returns:
+            int: Number of written records.
+        """
+        return write_tree_items(
+            self.iter_tree_items(mode, fetch=True), file_path
+        )
+
+    def import_tree_items(self, file_path, replace=True):
+        """Build the view contents from a file written by
+        `export_tree_items`, one record at a time.
+
+        Args:
+            file_path (str): Path of the file.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+
+        Raises:
+            ValueError: If the file is malformed.
+        """
+        self.load_tree_items(read_tree_items(file_path), replace=replace)
+
+    def load_tree_items_async(self, provider, replace=True,
+                              chunk_size=_LOADER_CHUNK_SIZE,
+                              frame_budget=_LOADER_FRAME_BUDGET,
+                              freeze_gc=False):
+        """Build the view contents from a stream of records, read in a
+        background thread. See `CustomTreeWidget.load_tree_items_async`.
+
+        Args:
+            provider (callable or iterable): `(parent, child, state)` records,
+                or a callable returning them.
+
+        Keyword Args:
+            replace (bool): Clears the existing items beforehand.
+            chunk_size (int): Number of records sent per chunk.
+            frame_budget (float): Seconds spent inserting records per
+                event-loop turn.
+            freeze_gc (bool): Freezes the loaded items out of the garbage
+                collector while loading, see `TreeItemsLoader`.
+
+        Returns:
+            TreeItemsLoader: Started loader, reporting the progress.
+        """
+        if self._tree_items_loader is not None:
+            self._tree_items_loader.cancel()
+        self._tree_items_loader = TreeItemsLoader(
+            self, provider, replace=replace, chunk_size=chunk_size,
+            frame_budget=frame_budget, freeze_gc=freeze_gc
+        )
+        self._tree_items_loader.start()
+        return self._tree_items_loader
+
+    def save_snapshot(self, file_path):
+        """Write a binary snapshot of the view contents, including the
+        expanded top-level items.
+
+        See `CustomTreeModel.save_snapshot`.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+        """
+        model = self.model()
+        expanded_rows = [
+            row for row in range(model.rowCount())
+            if self.isExpanded(model.index(row, 0))
+        ]
+        model.save_snapshot(file_path, expanded_rows)
+
+    def load_snapshot(self, file_path):
+        """Replace the view contents with a binary snapshot, and restore the
+        expanded top-level items.
+
+        See `CustomTreeModel.load_snapshot`.
+
+        Args:
+            file_path (str): Path of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot, or of a newer version.
+        """
+        model = self.model()
+        for row in model.load_snapshot(file_path):
+            self.setExpanded(model.index(row, 0), True)
+
+
+class _TreeRecordsReader(QtCore.QObject):
+    """Reader of the records of a provider, run in the thread of a
+    `TreeItemsLoader`.
+
+    Records are sent in chunks through queued signals. Reading blocks once
+    `max_pending_chunks` chunks are sent ahead of their insertion, until
+    `release_chunk` is called.
+
+    Args:
+        provider (callable or iterable): Records, or a callable returning
+            them, called in the reading thread.
+        chunk_size (int): Number of records per chunk.
+        max_pending_chunks (int): Number of chunks sent ahead.
+    """
+    chunkRead = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, provider, chunk_size, max_pending_chunks):
+        super(_TreeRecordsReader, self).__init__()
+        self._provider = provider
+        self._chunk_size = chunk_size
+        self._pending_chunks = threading.Semaphore(max_pending_chunks)
+        self._is_cancelled = False
+
+    def run(self):
+        records = None
+        chunk = []
+        try:
+            records = self._provider
+            if callable(records):
+                records = records()
+
+            for record in records:
+                if self._is_cancelled:
+                    return
+                chunk.append(record)
+                if len(chunk) >= self._chunk_size:
+                    if not self._send_chunk(chunk):
+                        return
+                    chunk = []
+            if chunk:
+                self._send_chunk(chunk)
+
+        # Errors of the provider are reported to the GUI thread, rather than
+        # lost along with the reading thread
+        except Exception as error:
+            LOGGER.exception("Failed to read the tree records")
+            if chunk:
+                self._send_chunk(chunk)
+            self.failed.emit(str(error))
+        finally:
+            close = getattr(records, "close", None)
+            if close is not None:
+                close()
+            self.finished.emit()
+
+    def _send_chunk(self, chunk):
+        self._pending_chunks.acquire()
+        if self._is_cancelled:
+            return False
+        self.chunkRead.emit(chunk)
+        return True
+
+    def release_chunk(self):
+        """Allow another chunk to be sent, once one has been inserted."""
+        self._pending_chunks.release()
+
+    def cancel(self):
+        """Stop reading upon the next record."""
+        self._is_cancelled = True
+        self._pending_chunks.release()
+
+
+class TreeItemsLoader(QtCore.QObject):
+    """Load the records of a provider into a tree in the background.
+
+    The provider is run in a `QThread`, eg. reading a file or querying a
+    database, and its records are sent in chunks to the GUI thread. There,
+    they are inserted through `load_tree_items` of the tree, in batches
+    sized to `frame_budget` seconds per event-loop turn. The tree stays
+    interactive for the whole load, and shows the records loaded so far.
+
+    Records are those of `CustomTreeWidget.load_tree_items`, ie.
+    `(parent, child, state)` tuples, grouped by parent.
+
+    Example:
+        loader = tree.load_tree_items_async(partial(read_tree_items, path))
+        loader.progressChanged.connect(progress_bar.setValue)
+        cancel_button.clicked.connect(loader.cancel)
+
+    Args:
+        tree (CustomTreeWidget or CustomTreeView): Tree to be loaded.
+        provider (callable or iterable): Records, or a callable returning
+            them. A callable is called in the reading thread, so that files
+            or database connections are opened there.
+
+    Keyword Args:
+        replace (bool): Clears the tree once started. If False, children of
+            an existing top-level item of the same name are appended into
+            it. True by default.
+        chunk_size (int): Number of records sent per chunk.
+        frame_budget (float): Seconds spent inserting records per event-loop
+            turn.
+        freeze_gc (bool): Freezes the loaded items out of the garbage
+            collector until the load is over, so that its full collections
+            do not stall the GUI thread. The freeze is process-wide, ie.
+            every object created meanwhile is frozen as well, and is not to
+            be used if the application freezes the collector itself. False
+            by default.
+    """
+    # Number of records inserted so far
+    progressChanged = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal()
+    cancelled = QtCore.pyqtSignal()
+    # Error message of the provider. `finished` follows, with the records
+    # read before the error inserted.
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, tree, provider, replace=True,
+                 chunk_size=_LOADER_CHUNK_SIZE,
+                 frame_budget=_LOADER_FRAME_BUDGET, freeze_gc=False):
+        super(TreeItemsLoader, self).__init__(tree)
+        self._tree = tree
+        self._provider = provider
+        self._replace = replace
+        self._chunk_size = chunk_size
+        self.frame_budget = frame_budget
+        self._freeze_gc = freeze_gc
+        if freeze_gc:
+            # Released along with the loader, should the load not be over
+            self.destroyed.connect(partial(_release_gc_freeze, id(self)))
+
+        self._thread = None
+        self._reader = None
+        self._is_read = False
+        self._is_running = False
+        # Chunks received and yet to be inserted, and the number of records
+        # of the first chunk already inserted
+        self._chunks = deque()
+        self._chunk_offset = 0
+        self._batch_size = _LOADER_FIRST_BATCH_SIZE
+        self._inserted_count = 0
+        # End of the last insertion, None when waiting for records
+        self._insertion_end = None
+
+        self._insert_timer = QtCore.QTimer(self)
+        self._insert_timer.setSingleShot(True)
+        self._insert_timer.setInterval(0)
+        self._insert_timer.timeout.connect(self._insert_records)
+
+    def start(self):
+        """Clear the tree if replacing, and start reading the records."""
+        if self._is_running:
+            return
+
+        if self._replace:
+            self._tree.load_tree_items((), replace=True)
+
+        self._is_running = True
+        self._is_read = False
+        self._inserted_count = 0
+        reader = _TreeRecordsReader(
+            self._provider, self._chunk_size, _LOADER_PENDING_CHUNKS
+        )
+        thread = QtCore.QThread()
+        reader.moveToThread(thread)
+        thread.started.connect(reader.run)
+        reader.chunkRead.connect(self._queue_chunk)
+        reader.failed.connect(self.failed)
+        reader.finished.connect(self._reader_finished)
+        # Quits from the reading thread, so that `wait` does not depend on
+        # the event loop of the GUI thread
+        reader.finished.connect(thread.quit, QtCore.Qt.DirectConnection)
+
+        # Reading stops along with the loader or the application, and the
+        # thread is released once done
+        self.destroyed.connect(reader.cancel, QtCore.Qt.DirectConnection)
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(reader.cancel, QtCore.Qt.DirectConnection)
+        _READING_THREADS[id(thread)] = (thread, reader)
+        thread.finished.connect(partial(_READING_THREADS.pop, id(thread), None))
+
+        self._thread = thread
+        self._reader = reader
+        thread.start()
+
+    def cancel(self):
+        """Stop the load. Records inserted so far are kept in the tree."""
+        if not self._is_running:
+            return
+
+        self._reader.cancel()
+        self._insert_timer.stop()
+        self._chunks.clear()
+        self._stop()
+        self.cancelled.emit()
+
+    def is_running(self):
+        return self._is_running
+
+    def inserted_count(self):
+        """Derive the number of records inserted so far.
+
+        Returns:
+            int: Number of records.
+        """
+        return self._inserted_count
+
+    def wait(self, msecs=None):
+        """Block until the reading thread is done, eg. before quitting.
+
+        Keyword Args:
+            msecs (int or None): Maximum time to wait. Waits until the thread
+                is done if None.
+
+        Returns:
+            bool: True if the thread is done.
+        """
+        if self._thread is None:
+            return True
+        if msecs is None:
+            return self._thread.wait()
+        return self._thread.wait(msecs)
+
+    def _queue_chunk(self, chunk):
+        if not self._is_running:
+            return
+        self._chunks.append(chunk)
+        if not self._insert_timer.isActive():
+            self._insert_timer.start()
+
+    def _reader_finished(self):
+        self._is_read = True
+        if self._is_running and not self._chunks:
+            self._finish()
+
+    def _insert_records(self):
+        """Insert the received records for up to `frame_budget` seconds."""
+        chunks = self._chunks
+        start = _clock()
+        budget = self.frame_budget
+        if self._insertion_end is not None:
+            budget = max(
+                budget, min(start - self._insertion_end, _LOADER_MAX_FRAME_BUDGET)
+            )
+        deadline = start + budget
+        while chunks and self._is_running:
+            chunk = chunks[0]
+            first = self._chunk_offset
+            last = min(first + self._batch_size, len(chunk))
+
+            batch_start = _clock()
+            self._tree.load_tree_items(chunk[first:last], replace=False)
+            now = _clock()
+
+            # Batches follow the insertion rate, so that each takes about
+            # half the frame budget
+            rate = (last - first) / max(now - batch_start, 1e-6)
+            self._batch_size = max(
+                int(rate * budget / 2), _LOADER_FIRST_BATCH_SIZE // 10
+            )
+
+            self._inserted_count += last - first
+            if last < len(chunk):
+                self._chunk_offset = last
+            else:
+                chunks.popleft()
+                self._chunk_offset = 0
+                self._reader.release_chunk()
 
-        Args:
-            item ():
-            column (int): 
-        """
-        # http://stackoverflow.com/questions/13662020/how-to-implement-itemchecked-and-itemunchecked-signals-for-qtreewidget-in-pyqt4
-        # print '>>> ItemChecked', int(item.checkState(column))
-        # print item.text(column)
+            if now >= deadline:
+                break
 
-        item_name = item.text(column)
-        # top-level node
-        if item.parent():
-            item_name = "{0}/{1}".format(item.parent().text(column), item_name)
+        if not self._is_running:
+            return
+        if self._freeze_gc:
+            _hold_gc_freeze(id(self))
+        self.progressChanged.emit(self._inserted_count)
+        if chunks:
+            self._insertion_end = _clock()
+            self._insert_timer.start()
+        else:
+            self._insertion_end = None
+            if self._is_read:
+                self._finish()
 
-        # Returns both top and sub item if the top is checked...
+    def _finish(self):
+        self._stop()
+        # Replaced contents are not undone, see `load_tree_items`
+        if self._replace and hasattr(self._tree, "clear_undo"):
+            self._tree.clear_undo()
+        self.finished.emit()
 
-        return item_name
+    def _stop(self):
+        self._is_running = False
+        self._chunk_offset = 0
+        _release_gc_freeze(id(self))
 
-    # TBC
-    def set_background_color(self, color_text=""):
-        self.setStyleSheet("""QTreeWidget{background: {0};}""".format(color_text))
 
-    #TBC
-    def make_checkbox_more_visible(self):
-        """Background color of the QTreeWidget are changed to conform to Maya
-        standards. As such, the outline of the checkboxes are black in color,
-        blending in with the almost black background. Thus making it hard to
-        visualize if there is a checkbox.
+class DiffReviewPanel(QtWidgets.QTreeWidget):
+    """Review panel of the differences of a `CustomTreeWidget` against its
+    baseline, see `CustomTreeWidget.set_baseline`.
 
-        This method will cause the outline color to appear in white.
-        """
-        # https://stackoverflow.com/questions/54655382/change-the-style-of-a-checkbox-in-a-qtreewidget-without-affecting-the-check-mark
-        file_tree_palette = QtWidgets.QtGui()
-        file_tree_palette.setColor(QtWidgets.QtGui.Window, QtGui.QColor(255, 255, 255))
-        # file_tree_palette.setColor(QtWidgets.QtGui.Base, QtGui.QColor(30, 30, 30))
-        # file_tree_palette.setColor(QtWidgets.QtGui.Highlight, QtGui.QColor(93, 93, 93))
-        self.setPalette(file_tree_palette)
+    Changes are listed per category, and refreshed upon `contentsUpdate`.
+    Double-clicking a listed item selects it into the tree widget.
 
-    #TBC
-    def move_item_multi(self, direction=""):
-        """Move multiple items up/ down the index order as defined by User.
+    Args:
+        tree_widget (CustomTreeWidget or None): Tree widget to be reviewed.
+        parent (QtWidgets.QWidget or None): Parent widget.
+    """
+    # Listed items per category, any further item is only counted
+    max_listed_items = 1000
+
+    _CATEGORIES = (
+        ("added", "Added"),
+        ("removed", "Removed"),
+        ("renamed", "Renamed"),
+        ("moved", "Moved"),
+        ("check_changed", "Check Changed"),
+    )
+
+    def __init__(self, tree_widget=None, parent=None):
+        super(DiffReviewPanel, self).__init__(parent)
+        self.setHeaderHidden(True)
+        self._tree_widget = None
+        self.itemDoubleClicked.connect(self.reveal_item)
+        self.set_tree_widget(tree_widget)
+
+    def set_tree_widget(self, tree_widget):
+        """Review given tree widget.
 
-        >>> NOTE: Not yet try when a parent and a child/children of different
-        parents are selected.
-        
         Args:
-            direction (str): Either 'up' or 'down'. Denotes the direction of
-                the new item placement.
+            tree_widget (CustomTreeWidget or None): Tree widget to be
+                reviewed.
         """
-        # only if multi selection is set
-        selected = self.selectedItems()
-        for s in selected:
-            if s.parent() is None:
-                selected_index = self.indexOfTopLevelItem(s)
-                selected_item = self.topLevelItem(selected_index)
-                self.takeTopLevelItem(selected_index)
-
-                root_item = self.invisibleRootItem()
-                top_level_count = root_item.childCount()
-
-                if direction == "up":
-                    new_index = selected_index - 1
+        if self._tree_widget is not None:
+            self._tree_widget.contentsUpdate.disconnect(self.refresh)
+            self._tree_widget.baselineChanged.disconnect(self.refresh)
+        self._tree_widget = tree_widget
+        if tree_widget is not None:
+            tree_widget.contentsUpdate.connect(self.refresh)
+            tree_widget.baselineChanged.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self, *args):
+        """List the differences of the tree widget against its baseline."""
+        self.clear()
+        if self._tree_widget is None or not self._tree_widget.has_baseline():
+            return
 
-                    if new_index < 0:
-                        new_index = 0
+        changes = self._tree_widget.derive_diff()
+        category_items = []
+        for key, label in self._CATEGORIES:
+            paths = changes[key]
+            if not paths:
+                continue
+
+            child_items = []
+            for path in paths[:self.max_listed_items]:
+                if key == "renamed":
+                    old_path, path = path
+                    child_item = QtWidgets.QTreeWidgetItem(
+                        ["{0} -> {1}".format(old_path, path)]
+                    )
+                else:
+                    child_item = QtWidgets.QTreeWidgetItem([path])
+                if key != "removed":
+                    child_item.setData(0, QtCore.Qt.UserRole, path)
+                child_items.append(child_item)
+            if len(paths) > self.max_listed_items:
+                child_items.append(QtWidgets.QTreeWidgetItem([
+                    "... {0} more".format(len(paths) - self.max_listed_items)
+                ]))
+
+            category_item = QtWidgets.QTreeWidgetItem(
+                ["{0} ({1})".format(label, len(paths))]
+            )
+            category_item.addChildren(child_items)
+            category_items.append(category_item)
 
-            self.insertTopLevelItem(new_index, selected_item)
-            selected_item.setExpanded(True)
-            self.setCurrentItem(s)
+        self.addTopLevelItems(category_items)
+        self.expandAll()
 
+    def reveal_item(self, item, column=0):
+        """Select the item of given listed change into the tree widget.
 
-    # END OF QTREEWIDGET TBC #
+        Args:
+            item (QtWidgets.QTreeWidgetItem): Listed change. Removed items
+                cannot be revealed.
 
-    ####################################################################################################
+        Keyword Args:
+            column (int): Column value of the listed change.
+        """
+        path = item.data(0, QtCore.Qt.UserRole)
+        if not path or self._tree_widget is None:
+            return
+        tree_item = self._tree_widget.derive_item_from_path(path)
+        if tree_item is not None:
+            self._tree_widget.setCurrentItem(tree_item)
+            self._tree_widget.scrollToItem(tree_item)
 
 
 
@@ -646,7 +7357,56 @@ def main():
             child = CustomTreeWidgetItem(parent, child_name)
             child.setCheckState(0, QtCore.Qt.Unchecked)
     
-    tree.show() 
+    tree.show()
+    sys.exit(app.exec_())
+
+
+### with model ###
+def main_model_backed(child_count=1000000):
+    app = QtWidgets.QApplication(sys.argv)
+    tree = CustomTreeView()
+    tree.header().hide()
+    tree.setItemDelegate(CustomTreeDelegate(tree))
+
+    tree_items = OrderedDict()
+    for i in range(3):
+        parent_name = "Parent {}".format(i)
+        tree_items[parent_name] = [
+            "Child {}".format(x) for x in range(child_count)
+        ]
+    tree.populate(tree_items)
+
+    tree.show()
+    sys.exit(app.exec_())
+
+
+### with background loading ###
+def main_background_loading(child_count=1000000):
+    app = QtWidgets.QApplication(sys.argv)
+    widget = QtWidgets.QWidget()
+    tree = CustomTreeView()
+    tree.header().hide()
+    progress_bar = QtWidgets.QProgressBar()
+    progress_bar.setMaximum(3 * child_count)
+    cancel_btn = QtWidgets.QPushButton("Cancel")
+
+    layout = QtWidgets.QVBoxLayout(widget)
+    layout.addWidget(tree)
+    layout.addWidget(progress_bar)
+    layout.addWidget(cancel_btn)
+
+    def iter_records():
+        for i in range(3):
+            parent_name = "Parent {}".format(i)
+            for x in range(child_count):
+                yield parent_name, "Child {}".format(x), QtCore.Qt.Unchecked
+
+    loader = tree.load_tree_items_async(iter_records)
+    loader.progressChanged.connect(progress_bar.setValue)
+    loader.finished.connect(partial(cancel_btn.setEnabled, False))
+    cancel_btn.clicked.connect(loader.cancel)
+
+    widget.show()
     sys.exit(app.exec_())
 
 
@@ -685,16 +7445,23 @@ class MainApp(QtWidgets.QWidget):
         #     for c in pv:
         #         child = CustomTreeWidgetItem(parent, c)
 
-        for page_name, page_contents in test_dict.items():
-            # page_item = PageHeaderItem(self._tree, page_name)
-            for pk, pv in page_contents.items():
-                parent = CustomTreeWidgetItem(self._tree, pk, is_tristate=True)
-                for c in pv:
-                    child = CustomTreeWidgetItem(parent, c)
-
+        self._tree.populate(test_dict)
 
         # Expand the hierarchy by default
         self._tree.expandAll()
+
+        # Changes are reviewed against the initial contents
+        self._tree.set_baseline()
+        self.diff_panel = DiffReviewPanel(self._tree)
+
+        # Menu of the tree items, kept up to date instead of rebuilt per click
+        self._tree_menu = TreeMenuModel(self._tree, self)
+
+        self._tree.set_undo_enabled()
+        undo_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Undo, self)
+        undo_shortcut.activated.connect(self._tree.undo)
+        redo_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Redo, self)
+        redo_shortcut.activated.connect(self._tree.redo)
         #>>> only if multi-selection is required
         # self._tree.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
 
@@ -704,9 +7471,14 @@ class MainApp(QtWidgets.QWidget):
         add_items_layout.addWidget(self.add_parent_btn)
         add_items_layout.addWidget(self.add_child_btn)
 
+        self.filter_edit = QtWidgets.QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter...")
+        self.filter_edit.setClearButtonEnabled(True)
+
         tree_layout = QtWidgets.QVBoxLayout()
         self.btn1 = QtWidgets.QPushButton("TEST BTN1")
         self.btn2 = QtWidgets.QPushButton("TEST BTN2")
+        tree_layout.addWidget(self.filter_edit)
         tree_layout.addWidget(self._tree)
         tree_layout.addLayout(add_items_layout)
         tree_layout.addWidget(self.btn1)
@@ -722,6 +7494,7 @@ class MainApp(QtWidgets.QWidget):
         main_layout = QtWidgets.QHBoxLayout()
         main_layout.addLayout(tree_layout)
         main_layout.addWidget(self.list_widget)
+        main_layout.addWidget(self.diff_panel)
         
         # self.setLayout(tree_layout)
         self.setLayout(main_layout)
@@ -738,6 +7511,7 @@ class MainApp(QtWidgets.QWidget):
 
         self.add_parent_btn.clicked.connect(self.add_parent_item)
         self.add_child_btn.clicked.connect(self.add_child_item)
+        self.filter_edit.textChanged.connect(self._tree.set_filter_text)
 
     def initial_selection(self):
         """Ensure selection in CustomTreeWidget during startup.
@@ -769,7 +7543,8 @@ class MainApp(QtWidgets.QWidget):
     def check_selection(self, value):
         self.add_child_btn.setEnabled(value)
 
-    def update_dictionary(self):
+    def update_dictionary(self, changes=None):
+        print ('>>> changes: ', changes)
         print ('>>> update: ', self._tree.derive_tree_items())
         return self._tree.derive_tree_items()
 
@@ -780,20 +7555,7 @@ class MainApp(QtWidgets.QWidget):
 
     def button1_test(self):
         # print '>>> Button1 test'
-        aaa = self._tree.derive_tree_items()
-        self.qmenu = QCustomMenu(title='', parent=self)
-
-        for pk, pv in aaa.items():
-            base_qmenu = QCustomMenu(title=pk, parent=self)
-            test_action = QtWidgets.QAction(pk, self)
-            test_action.setMenu(base_qmenu)
-            self.qmenu.addAction(test_action)
-
-            for v in pv:
-                action = QSubAction(v, self)
-                base_qmenu.addAction(action)
-
-        self.qmenu.exec_(QtWidgets.QCursor.pos())
+        self._tree_menu.menu().exec_(QtGui.QCursor.pos())
 
     def button2_test(self):
         # print '>>> Button2 test'
@@ -812,10 +7574,18 @@ class QSubAction(QtWidgets.QAction):
 
 
 class QCustomMenu(QtWidgets.QMenu):
-    """Customized QMenu."""
+    """Customized QMenu.
+
+    Toggling a `QSubAction` keeps the menu open. Thousands of entries are
+    better shown in virtualized mode, see `set_virtual_entries`.
+    """
+    # Emitted upon toggling an entry in virtualized mode, with the row of the
+    # entry and its new check state
+    entryToggled = QtCore.pyqtSignal(int, bool)
 
     def __init__(self, title, parent=None):
         super(QCustomMenu, self).__init__(title=str(title), parent=parent)
+        self._virtual_entries = None
         self.setup_menu()
 
     def mousePressEvent(self,event):
@@ -831,7 +7601,7 @@ class QCustomMenu(QtWidgets.QMenu):
         self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
 
     def contextMenuEvent(self, event):
-        no_right_click = [QAddAction]
+        no_right_click = [QSubAction]
         if any([isinstance(self.actionAt(event.pos()), instance) for instance in no_right_click]):
             return
         pos = event.pos()
@@ -839,6 +7609,756 @@ class QCustomMenu(QtWidgets.QMenu):
     def addAction(self, action):
         super(QCustomMenu, self).addAction(action)
 
+    def clear(self):
+        self._virtual_entries = None
+        super(QCustomMenu, self).clear()
+
+    def set_virtual_entries(self, names, checked_states=None):
+        """Show checkable entries as a virtualized list, instead of a
+        `QSubAction` per entry.
+
+        The existing actions are cleared. Neither an action nor a widget is
+        created per entry, see `VirtualMenuEntries`.
+
+        Args:
+            names (list(str)): Names of the entries.
+
+        Keyword Args:
+            checked_states (bytearray or None): 1 for each checked entry, 0
+                otherwise. All entries are unchecked if None.
+
+        Returns:
+            VirtualMenuEntries: List of the entries.
+        """
+        self.clear()
+        entries = VirtualMenuEntries(names, checked_states, self)
+        entries.entryToggled.connect(self.entryToggled)
+        action = QtWidgets.QWidgetAction(self)
+        action.setDefaultWidget(entries)
+        super(QCustomMenu, self).addAction(action)
+        self._virtual_entries = entries
+        return entries
+
+    def virtual_entries(self):
+        """Derive the list of entries of the virtualized mode.
+
+        Returns:
+            VirtualMenuEntries or None: List of the entries, None if the menu
+                is not virtualized.
+        """
+        return self._virtual_entries
+
+
+class _MenuEntriesModel(QtCore.QAbstractListModel):
+    """Checkable entries of `VirtualMenuEntries`.
+
+    Names are kept in a plain list and check states packed into a bytearray,
+    one byte per entry. Filtering keeps the rows of the matching entries, in
+    order, see `set_filter_text`.
+
+    Names are indexed by trigram in batches of `index_batch_size`, one batch
+    per event-loop turn, see `start_indexing`.
+
+    Args:
+        names (list(str)): Names of the entries.
+        checked_states (bytearray or None): 1 for each checked entry.
+        parent (QtCore.QObject or None): Parent object.
+    """
+    entryToggled = QtCore.pyqtSignal(int, bool)
+
+    # Names indexed per event-loop turn
+    index_batch_size = 5000
+
+    def __init__(self, names, checked_states=None, parent=None):
+        super(_MenuEntriesModel, self).__init__(parent)
+        self._names = list(names)
+        if checked_states is None:
+            self._states = bytearray(len(self._names))
+        else:
+            self._states = bytearray(checked_states)
+
+        # Entry rows of the matching entries, all of them if None, and the
+        # text they match, None once an entry is renamed
+        self._rows = None
+        self._rows_text = None
+        # Lower-case names, and the rows of each trigram up to the indexed
+        # count
+        self._lower_names = None
+        self._grams = defaultdict(list)
+        self._indexed_count = 0
+        self._index_timer = QtCore.QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_batch)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self._rows is None:
+            return len(self._names)
+        return len(self._rows)
+
+    def flags(self, index):
+        # Not user-checkable, a click anywhere on the row toggles the entry
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.derive_entry_row(index.row())
+        if role == QtCore.Qt.DisplayRole:
+            return self._names[row]
+        elif role == QtCore.Qt.CheckStateRole:
+            if self._states[row]:
+                return QtCore.Qt.Checked
+            return QtCore.Qt.Unchecked
+        return None
+
+    def derive_entry_row(self, row):
+        """Derive the entry shown at given row.
+
+        Args:
+            row (int): Row of the model, amongst the matching entries.
+
+        Returns:
+            int: Row of the entry.
+        """
+        if self._rows is None:
+            return row
+        return self._rows[row]
+
+    def _derive_index(self, entry_row):
+        """Derive the index showing given entry.
+
+        Returns:
+            QtCore.QModelIndex: Index of the entry, invalid if it does not
+                match the filter.
+        """
+        if self._rows is None:
+            return self.index(entry_row, 0)
+        row = bisect_left(self._rows, entry_row)
+        if row < len(self._rows) and self._rows[row] == entry_row:
+            return self.index(row, 0)
+        return QtCore.QModelIndex()
+
+    def _derive_lower_names(self):
+        if self._lower_names is None:
+            self._lower_names = [name.lower() for name in self._names]
+        return self._lower_names
+
+    def is_indexed(self):
+        return self._indexed_count >= len(self._names)
+
+    def start_indexing(self):
+        """Index the names by trigram over the next event-loop turns, unless
+        they are indexed already."""
+        if self._indexed_count < len(self._names):
+            self._index_timer.start()
+
+    def _index_batch(self):
+        lower_names = self._derive_lower_names()
+        grams = self._grams
+        start = self._indexed_count
+        stop = min(start + self.index_batch_size, len(lower_names))
+        for row in range(start, stop):
+            for gram in _derive_grams(lower_names[row]):
+                grams[gram].append(row)
+
+        self._indexed_count = stop
+        if stop >= len(lower_names):
+            self._index_timer.stop()
+
+    def set_filter_text(self, text):
+        """Only keep the entries whose name contains given text.
+
+        Indexed names are looked up through their trigrams, see
+        `_search_grams`, and the ones yet to be indexed are scanned.
+
+        Args:
+            text (str): Text to search for, case-insensitively. Empty text
+                keeps all entries.
+        """
+        text = text.lower()
+        self.beginResetModel()
+        if not text:
+            self._rows = None
+        elif self._rows is not None and self._rows_text is not None and \
+                self._rows_text in text:
+            # Narrowed down from the previous matches, already in order
+            self._rows = array("i", _search_grams(
+                self._grams, self._derive_lower_names(), text, self._rows
+            ))
+        else:
+            lower_names = self._derive_lower_names()
+            rows = _search_grams(self._grams, lower_names, text)
+            # Shorter texts are compared against every name already
+            if len(text) >= 3:
+                rows.extend(
+                    row for row in range(self._indexed_count, len(lower_names))
+                    if text in lower_names[row]
+                )
+            self._rows = array("i", sorted(rows))
+        self._rows_text = text or None
+        self.endResetModel()
+        self.start_indexing()
+
+    def toggle(self, row):
+        """Toggle the entry shown at given row, and emit `entryToggled`.
+
+        Args:
+            row (int): Row of the model, amongst the matching entries.
+        """
+        entry_row = self.derive_entry_row(row)
+        checked = not self._states[entry_row]
+        self.set_entry_checked(entry_row, checked)
+        self.entryToggled.emit(entry_row, checked)
+
+    def entry_count(self):
+        return len(self._names)
+
+    def is_entry_checked(self, entry_row):
+        return bool(self._states[entry_row])
+
+    def set_entry_checked(self, entry_row, checked):
+        """Check/ uncheck given entry, without emitting `entryToggled`.
+
+        Args:
+            entry_row (int): Row of the entry.
+            checked (bool): New check state.
+        """
+        if bool(self._states[entry_row]) == checked:
+            return
+        self._states[entry_row] = checked
+        index = self._derive_index(entry_row)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+
+    def rename_entry(self, entry_row, name):
+        """Rename given entry. The matching entries are only derived again
+        upon next filter change.
+
+        Args:
+            entry_row (int): Row of the entry.
+            name (str): New name of the entry.
+        """
+        self._names[entry_row] = name
+        self._rows_text = None
+        if self._lower_names is not None:
+            old_name = self._lower_names[entry_row]
+            self._lower_names[entry_row] = name.lower()
+            if entry_row < self._indexed_count:
+                for gram in _derive_grams(old_name):
+                    self._grams[gram].remove(entry_row)
+                for gram in _derive_grams(name.lower()):
+                    self._grams[gram].append(entry_row)
+
+        index = self._derive_index(entry_row)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole])
+
+
+class VirtualMenuEntries(QtWidgets.QWidget):
+    """Virtualized list of checkable menu entries, with a type-to-filter
+    field, see `QCustomMenu.set_virtual_entries`.
+
+    Entries are shown through a `QListView` with uniform item sizes, so
+    only the visible rows are painted, and the hidden ones are never laid
+    out. Clicking an entry, or pressing Space/ Enter on it, toggles it and
+    keeps the menu open. Down arrow moves from the filter to the entries.
+
+    Args:
+        names (list(str)): Names of the entries.
+
+    Keyword Args:
+        checked_states (bytearray or None): 1 for each checked entry, 0
+            otherwise. All entries are unchecked if None.
+        parent (QtWidgets.QWidget or None): Parent widget.
+    """
+    # Emitted upon toggling an entry, with its row and new check state
+    entryToggled = QtCore.pyqtSignal(int, bool)
+
+    # Number of entries shown at once, the others are scrolled to
+    visible_entry_count = 20
+    # Widest list, longer names are elided
+    max_width = 600
+    # Entries laid out per event-loop turn
+    layout_batch_size = 5000
+
+    def __init__(self, names, checked_states=None, parent=None):
+        super(VirtualMenuEntries, self).__init__(parent)
+        self._model = _MenuEntriesModel(names, checked_states, self)
+        self._model.entryToggled.connect(self.entryToggled)
+
+        self._filter_edit = QtWidgets.QLineEdit(self)
+        self._filter_edit.setPlaceholderText("Filter...")
+        self._filter_edit.setClearButtonEnabled(True)
+        self._filter_edit.textChanged.connect(self.set_filter_text)
+        self._filter_edit.installEventFilter(self)
+
+        self._view = QtWidgets.QListView(self)
+        self._view.setUniformItemSizes(True)
+        # Lays the entries out over successive event-loop turns, starting
+        # with the visible ones
+        self._view.setLayoutMode(QtWidgets.QListView.Batched)
+        self._view.setBatchSize(self.layout_batch_size)
+        self._view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._view.setModel(self._model)
+        self._view.clicked.connect(self._toggle_index)
+        self._view.installEventFilter(self)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(self._filter_edit)
+        layout.addWidget(self._view)
+        self._fit_view(names)
+
+    def _fit_view(self, names):
+        """Size the list to show `visible_entry_count` entries, as wide as
+        the longest name.
+
+        Args:
+            names (list(str)): Names of the entries.
+        """
+        view = self._view
+        entry_count = self._model.rowCount()
+        if entry_count:
+            row_height = view.sizeHintForRow(0)
+        else:
+            row_height = view.fontMetrics().height()
+        view.setFixedHeight(
+            min(entry_count, self.visible_entry_count) * row_height
+            + 2 * view.frameWidth()
+        )
+
+        style = view.style()
+        longest_name = max(names, key=len) if entry_count else ""
+        width = (
+            view.fontMetrics().boundingRect(longest_name).width()
+            + style.pixelMetric(QtWidgets.QStyle.PM_IndicatorWidth)
+            + style.pixelMetric(QtWidgets.QStyle.PM_ScrollBarExtent)
+            + 4 * style.pixelMetric(QtWidgets.QStyle.PM_FocusFrameHMargin)
+            + 2 * view.frameWidth()
+        )
+        view.setMinimumWidth(min(width, self.max_width))
+
+    def showEvent(self, event):
+        super(VirtualMenuEntries, self).showEvent(event)
+        self._filter_edit.setFocus()
+        self._model.start_indexing()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.KeyPress:
+            key = event.key()
+            if (obj is self._filter_edit and key == QtCore.Qt.Key_Down
+                    and self._model.rowCount()):
+                self._view.setFocus()
+                self._view.setCurrentIndex(self._model.index(0, 0))
+                return True
+            if obj is self._view and key in (
+                    QtCore.Qt.Key_Space, QtCore.Qt.Key_Return,
+                    QtCore.Qt.Key_Enter):
+                self._toggle_index(self._view.currentIndex())
+                return True
+        return super(VirtualMenuEntries, self).eventFilter(obj, event)
+
+    def _toggle_index(self, index):
+        if index.isValid():
+            self._model.toggle(index.row())
+
+    def entry_count(self):
+        """Derive the number of entries, whether matching the filter or not.
+
+        Returns:
+            int: Number of entries.
+        """
+        return self._model.entry_count()
+
+    def is_indexed(self):
+        """Derive if all names are indexed. Names are indexed over the
+        event-loop turns following the first show of the list, or the first
+        filter change.
+
+        Returns:
+            bool: True if the filter only looks up the index.
+        """
+        return self._model.is_indexed()
+
+    def filter_text(self):
+        return self._filter_edit.text()
+
+    def set_filter_text(self, text):
+        """Only show the entries whose name contains given text.
+
+        Args:
+            text (str): Text to search for, case-insensitively. Empty text
+                shows all entries.
+        """
+        if self._filter_edit.text() != text:
+            # Filters through `textChanged`
+            self._filter_edit.setText(text)
+            return
+        self._model.set_filter_text(text)
+
+    def derive_matching_rows(self):
+        """Derive the entries matching the filter.
+
+        Returns:
+            list(int): Rows of the matching entries, in order.
+        """
+        model = self._model
+        return [
+            model.derive_entry_row(row) for row in range(model.rowCount())
+        ]
+
+    def is_entry_checked(self, row):
+        """Derive the check state of given entry.
+
+        Args:
+            row (int): Row of the entry.
+
+        Returns:
+            bool: True if the entry is checked.
+        """
+        return self._model.is_entry_checked(row)
+
+    def set_entry_checked(self, row, checked):
+        """Check/ uncheck given entry, without emitting `entryToggled`.
+
+        Args:
+            row (int): Row of the entry.
+            checked (bool): New check state.
+        """
+        self._model.set_entry_checked(row, checked)
+
+    def rename_entry(self, row, name):
+        """Rename given entry, see `_MenuEntriesModel.rename_entry`.
+
+        Args:
+            row (int): Row of the entry.
+            name (str): New name of the entry.
+        """
+        self._model.rename_entry(row, name)
+
+
+class _TreeMenuEntry(object):
+    """Submenu of a top-level item, see `TreeMenuModel`.
+
+    Args:
+        item (QtWidgets.QTreeWidgetItem): Top-level item.
+        menu (QCustomMenu): Submenu of its child items.
+    """
+    __slots__ = ("item", "menu", "children", "actions", "rows", "is_stale")
+
+    def __init__(self, item, menu):
+        self.item = item
+        self.menu = menu
+        # Child items by row, as of the last build of the submenu
+        self.children = []
+        # Actions by row, empty if the submenu is virtualized
+        self.actions = []
+        # Rows by name of the child items, first one of each name
+        self.rows = {}
+        self.is_stale = True
+
+
+class TreeMenuModel(QtCore.QObject):
+    """Menu of the items of a `CustomTreeWidget`, kept up to date with it.
+
+    The menu holds a submenu per top-level item, and a `QSubAction` per
+    child item. Submenus are only built upon their first `aboutToShow`, so
+    showing the menu does not depend on the number of child items.
+
+    Upon `contentsUpdate`, renamed items are renamed in place. The submenus
+    whose child items are added, removed or moved are rebuilt upon their
+    next `aboutToShow`, and the top-level entries only when top-level items
+    are added, removed or moved.
+
+    Submenus of more than `virtual_entry_count` child items are virtualized,
+    see `QCustomMenu.set_virtual_entries`.
+
+    Check states are bound both ways: entries show the check state of their
+    child item, toggling an entry checks/ unchecks its item, and items
+    toggled in the tree, as reported by `itemsToggled`, are checked/
+    unchecked in the menu. Either way costs a lookup per toggled item, keyed
+    by id as items are not hashable, and no rebuild.
+
+    Args:
+        tree_widget (CustomTreeWidget or None): Tree widget to be mirrored.
+        parent (QtWidgets.QWidget or None): Parent of the menu.
+    """
+    # Submenus of more child items are virtualized
+    virtual_entry_count = 500
+
+    def __init__(self, tree_widget=None, parent=None):
+        super(TreeMenuModel, self).__init__(parent)
+        self._menu = QCustomMenu(title="", parent=parent)
+        self._menu.aboutToShow.connect(self._refresh_menu)
+        self._tree_widget = None
+        self._entries = []
+        # Entries by name of their top-level item, first one of each name
+        self._named_entries = {}
+        # (entry, row) by id of the child items of the built submenus
+        self._child_entries = {}
+        # Set while the menu is synced, so that its toggles are not echoed
+        # back to the tree
+        self._is_syncing = False
+        self._is_stale = True
+        self.set_tree_widget(tree_widget)
+
+    def menu(self):
+        """Derive the menu, refreshed whenever it is shown.
+
+        Returns:
+            QCustomMenu: Menu of the tree items.
+        """
+        return self._menu
+
+    def set_tree_widget(self, tree_widget):
+        """Mirror given tree widget.
+
+        Args:
+            tree_widget (CustomTreeWidget or None): Tree widget to be
+                mirrored.
+        """
+        if self._tree_widget is not None:
+            self._tree_widget.contentsUpdate.disconnect(self.update_menu)
+            self._tree_widget.itemsToggled.disconnect(self.update_check_states)
+        self._tree_widget = tree_widget
+        if tree_widget is not None:
+            tree_widget.contentsUpdate.connect(self.update_menu)
+            tree_widget.itemsToggled.connect(self.update_check_states)
+        self._is_stale = True
+        for entry in self._entries:
+            entry.is_stale = True
+
+    def update_menu(self, changes):
+        """Update the entries of the changed items.
+
+        Args:
+            changes (dict): Change set, see `new_change_set`.
+        """
+        if changes.get("reset"):
+            self._is_stale = True
+            for entry in self._entries:
+                entry.is_stale = True
+            return
+
+        for key in ("added", "removed", "moved"):
+            for path in changes.get(key, ()):
+                self._mark_stale(path)
+
+        for old_path, path in changes.get("renamed", ()):
+            self._rename(old_path, path)
+
+    def update_check_states(self, items):
+        """Check/ uncheck the entries of given toggled items.
+
+        Items of the submenus that have not been built yet are skipped, as
+        submenus are built with the current check states.
+
+        Args:
+            items (list(QtWidgets.QTreeWidgetItem)): Toggled items, see
+                `CustomTreeWidget.itemsToggled`.
+        """
+        child_entries = self._child_entries
+        if not child_entries:
+            return
+
+        checked = QtCore.Qt.Checked
+        self._is_syncing = True
+        try:
+            for item in items:
+                found = child_entries.get(id(item))
+                if found is None:
+                    continue
+                entry, row = found
+                is_checked = item.checkState(0) == checked
+                if entry.actions:
+                    entry.actions[row].setChecked(is_checked)
+                else:
+                    entry.menu.virtual_entries().set_entry_checked(
+                        row, is_checked
+                    )
+        finally:
+            self._is_syncing = False
+
+    def _toggle_item(self, entry, row, checked):
+        """Check/ uncheck the child item of given toggled entry.
+
+        Args:
+            entry (_TreeMenuEntry): Submenu of the toggled entry.
+            row (int): Row of the toggled entry.
+            checked (bool): New check state of the entry.
+        """
+        if self._is_syncing:
+            return
+
+        item = entry.children[row]
+        try:
+            is_in_tree = item.treeWidget() is self._tree_widget
+        except RuntimeError:
+            # Deleted since the submenu was built
+            is_in_tree = False
+        if not is_in_tree:
+            return
+
+        item.setCheckState(
+            0, QtCore.Qt.Checked if checked else QtCore.Qt.Unchecked
+        )
+
+    def _mark_stale(self, path):
+        """Mark the entry of given changed path to be rebuilt.
+
+        Args:
+            path (str): Path of an added/ removed/ moved item.
+        """
+        parent_name, _, child_name = path.partition("/")
+        entry = self._named_entries.get(parent_name)
+        if not child_name or entry is None:
+            self._is_stale = True
+        else:
+            entry.is_stale = True
+
+    def _rename(self, old_path, path):
+        """Rename the action of given renamed item in place.
+
+        Args:
+            old_path (str): Path of the item before renaming.
+            path (str): Path of the item after renaming.
+        """
+        old_parent_name, _, old_child_name = old_path.partition("/")
+        parent_name, _, child_name = path.partition("/")
+
+        # Top-level item, renamed by the rebuild if the entries are stale
+        if not child_name:
+            if self._is_stale:
+                return
+            entry = self._named_entries.get(old_parent_name)
+            if entry is None or entry.item.text(0) != parent_name:
+                self._is_stale = True
+                return
+            del self._named_entries[old_parent_name]
+            self._named_entries.setdefault(parent_name, entry)
+            entry.menu.setTitle(parent_name)
+            return
+
+        entry = self._named_entries.get(parent_name)
+        if entry is None:
+            self._is_stale = True
+            return
+        if entry.is_stale:
+            return
+
+        row = entry.rows.pop(old_child_name, None)
+        if row is None:
+            entry.is_stale = True
+            return
+        if entry.actions:
+            entry.actions[row].setText(child_name)
+        else:
+            entry.menu.virtual_entries().rename_entry(row, child_name)
+        entry.rows.setdefault(child_name, row)
+
+    def _refresh_menu(self):
+        """Rebuild the top-level entries if any top-level item has been
+        added/ removed/ moved. Submenus are kept for the remaining items.
+        """
+        if not self._is_stale:
+            return
+        self._is_stale = False
+
+        old_entries = dict((id(entry.item), entry) for entry in self._entries)
+        for entry in self._entries:
+            self._menu.removeAction(entry.menu.menuAction())
+
+        items = []
+        if self._tree_widget is not None:
+            root_item = self._tree_widget.invisibleRootItem()
+            items = [
+                root_item.child(num) for num in range(root_item.childCount())
+            ]
+
+        entries = []
+        for item in items:
+            entry = old_entries.pop(id(item), None)
+            if entry is None:
+                entry = _TreeMenuEntry(
+                    item, QCustomMenu(item.text(0), self._menu)
+                )
+                entry.menu.aboutToShow.connect(
+                    partial(self._refresh_entry, entry)
+                )
+                entry.menu.entryToggled.connect(
+                    partial(self._toggle_item, entry)
+                )
+            else:
+                entry.menu.setTitle(item.text(0))
+            entries.append(entry)
+
+        for entry in old_entries.values():
+            self._forget_children(entry)
+            entry.menu.deleteLater()
+
+        self._entries = entries
+        self._named_entries = {}
+        for entry in reversed(entries):
+            self._named_entries[entry.item.text(0)] = entry
+        self._menu.addActions([entry.menu.menuAction() for entry in entries])
+
+    def _refresh_entry(self, entry):
+        """Rebuild the actions of given submenu, if its child items have
+        changed since it was last shown.
+
+        Args:
+            entry (_TreeMenuEntry): Submenu to be refreshed.
+        """
+        if not entry.is_stale:
+            return
+        entry.is_stale = False
+
+        self._forget_children(entry)
+        item = entry.item
+        children = list(map(item.child, range(item.childCount())))
+        names = list(map(_item_text, children))
+        checked = QtCore.Qt.Checked
+        states = bytearray(
+            state == checked for state in map(_item_check_state, children)
+        )
+        rows = range(len(children))
+
+        entry.children = children
+        entry.rows = dict(zip(reversed(names), reversed(rows)))
+        self._child_entries.update(
+            zip(map(id, children), zip(repeat(entry), rows))
+        )
+
+        if len(names) > self.virtual_entry_count:
+            entry.menu.set_virtual_entries(names, states)
+            entry.actions = []
+            return
+
+        # Actions are owned by the submenu
+        entry.menu.clear()
+        actions = []
+        for row, name in enumerate(names):
+            action = QSubAction(name, entry.menu)
+            action.setChecked(bool(states[row]))
+            action.toggled.connect(partial(self._toggle_item, entry, row))
+            actions.append(action)
+        entry.actions = actions
+        entry.menu.addActions(actions)
+
+    def _forget_children(self, entry):
+        """Unbind the child items of given submenu from their entries.
+
+        Args:
+            entry (_TreeMenuEntry): Submenu to be rebuilt or deleted.
+        """
+        pop = self._child_entries.pop
+        for child in entry.children:
+            pop(id(child), None)
+        entry.children = []
+
 
 
 
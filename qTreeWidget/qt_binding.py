@@ -0,0 +1,199 @@
+"""Lazy Qt binding layer of the custom widgets.
+
+The binding is picked upon first use of a Qt submodule, not at import time.
+A binding already imported by the host application is used as is, else the
+first one found of `BINDING_ORDER`. Set the `QT_BINDING` environment
+variable to force one of them, eg. "PySide2".
+
+Only the submodules that are used get imported, eg. importing `QtCore` does
+not import `QtWidgets`:
+
+    ..code-block:: python
+            from qt_binding import QtCore, QtWidgets
+            QtCore.Qt.UserRole      # Imports the binding and its QtCore only
+            QtWidgets.QTreeWidget   # Imports its QtWidgets
+
+Submodules are presented with the names of PyQt5, ie.
+`QtCore.pyqtSignal`, `pyqtSlot` and `pyqtProperty` are provided for PySide2.
+PyQt4 is not supported.
+
+A copy of this module ships next to each widget module, `qTreeWidget` and
+`qListWidget`, so that each directory is importable on its own. The copies
+are to be kept identical.
+
+`lazy_module` defers the import of a whole module until one of its
+attributes is used, so that widget classes are only created when needed.
+"""
+import importlib
+import os
+import sys
+import types
+
+
+# Bindings to be looked for, in order of preference
+BINDING_ORDER = ("PyQt5", "PySide2")
+
+# PyQt5 names of the PySide2 attributes
+_PYSIDE_ALIASES = {
+    "QtCore": {
+        "pyqtSignal": "Signal",
+        "pyqtSlot": "Slot",
+        "pyqtProperty": "Property",
+    },
+}
+
+_binding = None
+
+# Stands for missing attributes, as opposed to the ones set to None
+_MISSING = object()
+
+
+def binding_name():
+    """Derive the name of the binding in use, importing it if need be.
+
+    Returns:
+        str: Either "PyQt5" or "PySide2".
+
+    Raises:
+        ImportError: If none of the bindings can be imported.
+    """
+    global _binding
+    if _binding is not None:
+        return _binding
+
+    requested = os.environ.get("QT_BINDING")
+    names = (requested,) if requested else BINDING_ORDER
+
+    # A binding imported by the host application takes precedence
+    for name in names:
+        if name in sys.modules:
+            _binding = name
+            return _binding
+
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        _binding = name
+        return _binding
+
+    raise ImportError("No Qt binding found, tried {0}".format(
+        ", ".join(names)
+    ))
+
+
+def import_submodule(name):
+    """Import a submodule of the binding in use.
+
+    Args:
+        name (str): PyQt5 name of the submodule, eg. "QtWidgets".
+
+    Returns:
+        module: Submodule of the binding.
+    """
+    return importlib.import_module("{0}.{1}".format(binding_name(), name))
+
+
+class _LazyQtModule(types.ModuleType):
+    """Submodule of the binding, imported upon first attribute access.
+
+    Found attributes are set onto the instance, so that further access costs
+    the same as on the submodule itself.
+
+    Args:
+        name (str): PyQt5 name of the submodule, eg. "QtCore".
+    """
+    def __init__(self, name):
+        super(_LazyQtModule, self).__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _derive_module(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = import_submodule(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+
+        module = self._derive_module()
+        value = getattr(module, attr, _MISSING)
+        if value is _MISSING:
+            alias = _PYSIDE_ALIASES.get(self.__name__, {}).get(attr)
+            if alias is not None:
+                value = getattr(module, alias, _MISSING)
+        if value is _MISSING:
+            raise AttributeError("{0} has no attribute '{1}'".format(
+                self.__name__, attr
+            ))
+        setattr(self, attr, value)
+        return value
+
+    def __dir__(self):
+        return dir(self._derive_module())
+
+
+QtCore = _LazyQtModule("QtCore")
+QtGui = _LazyQtModule("QtGui")
+QtWidgets = _LazyQtModule("QtWidgets")
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in of a module, importing it upon first attribute access.
+
+    Args:
+        name (str): Name the stand-in is registered with.
+        target (str): Name of the module to be imported.
+        doc (str or None): Docstring of the stand-in.
+    """
+    def __init__(self, name, target, doc=None):
+        super(_LazyModule, self).__init__(name, doc)
+        self.__dict__["_lazy_target"] = target
+
+    def _load(self):
+        return importlib.import_module(self.__dict__["_lazy_target"])
+
+    def __getattr__(self, attr):
+        # Leaves the attributes of module objects to the stand-in, except
+        # the ones of star imports
+        if (attr.startswith("__") and attr.endswith("__")
+                and attr != "__all__"):
+            raise AttributeError(attr)
+
+        module = self._load()
+        if attr == "__all__":
+            value = getattr(module, "__all__", None) or [
+                name for name in dir(module) if not name.startswith("_")
+            ]
+        else:
+            value = getattr(module, attr)
+        setattr(self, attr, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(dir(self._load())) | set(self.__dict__))
+
+
+def lazy_module(name, target, doc=None):
+    """Register a stand-in of `target` module under `name`.
+
+    Neither the binding nor `target` are imported until an attribute of the
+    stand-in is used.
+
+    Args:
+        name (str): Name to register the stand-in with, usually `__name__`
+            of the calling module.
+        target (str): Name of the module to be imported.
+
+    Keyword Args:
+        doc (str or None): Docstring of the stand-in.
+
+    Returns:
+        module: The stand-in, also set into `sys.modules`.
+    """
+    module = _LazyModule(name, target, doc)
+    sys.modules[name] = module
+    return module
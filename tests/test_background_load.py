@@ -0,0 +1,111 @@
+"""Behaviour tests of the background loading of `CustomTreeWidget` and
+`CustomTreeView` - `load_tree_items_async()`.
+
+Usage:
+    python -m pytest tests
+"""
+import gc
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+def iter_records():
+    for parent_num in range(20):
+        for child_num in range(50):
+            yield (
+                u"parent{0}".format(parent_num),
+                u"child{0}".format(child_num),
+                QtCore.Qt.Checked if child_num % 2 else QtCore.Qt.Unchecked
+            )
+
+
+class BackgroundLoadTest(QtTestCase):
+
+    def setUp(self):
+        self.frozen_counts = []
+
+    def progress_changed(self, count):
+        if hasattr(gc, "get_freeze_count"):
+            self.frozen_counts.append(gc.get_freeze_count())
+
+    def load(self, tree, **kwargs):
+        """Load the records of `iter_records` into given tree, until
+        `finished`.
+
+        Returns:
+            TreeItemsLoader: Finished loader.
+        """
+        loop = QtCore.QEventLoop()
+        loader = tree.load_tree_items_async(
+            iter_records, chunk_size=100, **kwargs
+        )
+        loader.progressChanged.connect(self.progress_changed)
+        loader.finished.connect(loop.quit)
+        QtCore.QTimer.singleShot(10000, loop.quit)
+        loop.exec_()
+        loader.wait()
+        self.assertFalse(loader.is_running())
+        return loader
+
+    def test_records_loaded(self):
+        for tree in (qtreewidget.CustomTreeWidget(),
+                     qtreewidget.CustomTreeView()):
+            tree.populate({u"old": [u"a"]})
+            loader = self.load(tree)
+            self.assertEqual(loader.inserted_count(), 1000)
+
+            tree_items = tree.derive_tree_items()
+            self.assertEqual(
+                list(tree_items),
+                [u"parent{0}".format(num) for num in range(20)]
+            )
+            self.assertEqual(len(tree_items[u"parent3"]), 50)
+            self.assertEqual(
+                len(tree.derive_tree_items("checked")[u"parent3"]), 25
+            )
+
+    def test_gc_frozen_only_if_asked(self):
+        if not hasattr(gc, "freeze"):
+            self.skipTest("gc.freeze() needs Python 3.7")
+
+        for freeze_gc in (False, True):
+            del self.frozen_counts[:]
+            self.load(qtreewidget.CustomTreeWidget(), freeze_gc=freeze_gc)
+            self.assertTrue(self.frozen_counts)
+
+            # Frozen while loading if asked, and released once done
+            self.assertEqual(
+                set(bool(count) for count in self.frozen_counts),
+                set([freeze_gc])
+            )
+            self.assertEqual(gc.get_freeze_count(), 0)
+
+    def test_gc_freeze_shared_by_loaders(self):
+        if not hasattr(gc, "freeze"):
+            self.skipTest("gc.freeze() needs Python 3.7")
+
+        first_tree = qtreewidget.CustomTreeWidget()
+        second_tree = qtreewidget.CustomTreeWidget()
+        first_loader = first_tree.load_tree_items_async(
+            iter_records, chunk_size=100, freeze_gc=True
+        )
+        second_loader = second_tree.load_tree_items_async(
+            iter_records, chunk_size=100, freeze_gc=True
+        )
+        while not (first_loader.inserted_count() and
+                   second_loader.inserted_count()):
+            self.app.processEvents()
+        self.assertTrue(gc.get_freeze_count())
+
+        # Still frozen until the last loader is over
+        first_loader.cancel()
+        self.assertTrue(gc.get_freeze_count())
+        second_loader.cancel()
+        self.assertEqual(gc.get_freeze_count(), 0)
+        first_loader.wait()
+        second_loader.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()
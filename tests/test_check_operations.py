@@ -0,0 +1,141 @@
+"""Behaviour tests of the bulk check operations of `CustomTreeWidget` and
+`CustomTreeView` - `set_check_state()`, `check_all()`, `uncheck_all()` and
+`invert_checks()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+TREE_ITEMS = {u"A": [u"a", u"b", u"c"], u"B": [u"d", u"e"], u"C": []}
+
+
+class WidgetCheckOperationsTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate(TREE_ITEMS)
+        self.app.processEvents()
+        self.emitted = []
+        self.tree_widget.itemsToggled.connect(self.emitted.append)
+
+    def derive_checked(self):
+        tree_items = self.tree_widget.derive_tree_items("checked")
+        return dict(
+            (name, children) for name, children in tree_items.items()
+            if children
+        )
+
+    def test_paths_and_items(self):
+        parent_item = self.tree_widget.topLevelItem(0)
+        toggled = self.tree_widget.set_check_state(
+            [u"A/a", parent_item.child(2), u"B"], QtCore.Qt.Checked
+        )
+        self.assertEqual(
+            sorted(item.text(0) for item in toggled),
+            [u"a", u"c", u"d", u"e"]
+        )
+        self.assertEqual(
+            self.derive_checked(), {u"A": [u"a", u"c"], u"B": [u"d", u"e"]}
+        )
+
+        # Parents are derived from their children
+        self.assertEqual(parent_item.checkState(0), QtCore.Qt.PartiallyChecked)
+        self.assertEqual(
+            self.tree_widget.topLevelItem(1).checkState(0), QtCore.Qt.Checked
+        )
+
+        # Reported once
+        self.app.processEvents()
+        self.assertEqual(len(self.emitted), 1)
+        self.assertEqual(
+            sorted(item.text(0) for item in self.emitted[0]),
+            [u"a", u"c", u"d", u"e"]
+        )
+
+        with self.assertRaises(ValueError):
+            self.tree_widget.set_check_state([u"A/z"], QtCore.Qt.Checked)
+
+    def test_scoped_operations(self):
+        self.tree_widget.check_all(u"A")
+        self.assertEqual(self.derive_checked(), {u"A": [u"a", u"b", u"c"]})
+
+        self.tree_widget.set_check_state([u"B/d"], QtCore.Qt.Checked)
+        self.tree_widget.invert_checks()
+        self.assertEqual(self.derive_checked(), {u"B": [u"e"]})
+
+        self.tree_widget.check_all()
+        self.tree_widget.uncheck_all(self.tree_widget.topLevelItem(1))
+        self.assertEqual(self.derive_checked(), {u"A": [u"a", u"b", u"c"]})
+
+        # Unchanged states are not toggled
+        self.assertEqual(self.tree_widget.uncheck_all(u"B"), [])
+
+    def test_undone_as_one_edit(self):
+        self.tree_widget.set_undo_enabled()
+        self.tree_widget.check_all()
+        self.tree_widget.set_check_state([u"A/a", u"B/e"], QtCore.Qt.Unchecked)
+        self.assertEqual(
+            self.derive_checked(), {u"A": [u"b", u"c"], u"B": [u"d"]}
+        )
+
+        # Successive check edits are merged into one, as per
+        # `_UNDO_MERGE_INTERVAL`
+        self.tree_widget.undo()
+        self.assertEqual(self.derive_checked(), {})
+        self.assertFalse(self.tree_widget.can_undo())
+        self.tree_widget.redo()
+        self.assertEqual(
+            self.derive_checked(), {u"A": [u"b", u"c"], u"B": [u"d"]}
+        )
+
+
+class ViewCheckOperationsTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_view = qtreewidget.CustomTreeView()
+        self.tree_view.populate(TREE_ITEMS)
+        self.model = self.tree_view.model()
+        self.changed_rows = []
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right, roles: self.changed_rows.append(
+                (top_left.row(), bottom_right.row())
+            )
+        )
+
+    def derive_checked(self):
+        tree_items = self.tree_view.derive_tree_items("checked")
+        return dict(
+            (name, children) for name, children in tree_items.items()
+            if children
+        )
+
+    def test_paths_and_indexes(self):
+        parent_index = self.model.index(0, 0)
+        count = self.tree_view.set_check_state(
+            [u"A/a", self.model.index(2, 0, parent_index)], QtCore.Qt.Checked
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(self.derive_checked(), {u"A": [u"a", u"c"]})
+        self.assertEqual(
+            self.model.data(parent_index, QtCore.Qt.CheckStateRole),
+            QtCore.Qt.PartiallyChecked
+        )
+
+        # A single range over the toggled rows, then the parent row
+        self.assertEqual(self.changed_rows, [(0, 2), (0, 0)])
+
+    def test_scoped_operations(self):
+        self.assertEqual(self.tree_view.check_all(u"A"), 3)
+        self.assertEqual(self.tree_view.invert_checks(), 5)
+        self.assertEqual(self.derive_checked(), {u"B": [u"d", u"e"]})
+        self.assertEqual(self.tree_view.uncheck_all(u"B"), 2)
+        self.assertEqual(self.tree_view.uncheck_all(), 0)
+        self.assertEqual(self.derive_checked(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
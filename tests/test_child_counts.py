@@ -0,0 +1,58 @@
+"""Behaviour tests of the running counts of checked/ unchecked/ new child
+items per parent - `derive_child_counts()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class ChildCountsTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b", u"c"]})
+        self.parent_item = self.tree_widget.topLevelItem(0)
+
+    def derive_counts(self):
+        return self.tree_widget.derive_child_counts(self.parent_item)
+
+    def test_check_toggles(self):
+        self.assertEqual(self.derive_counts(), {
+            "total": 3, "checked": 0, "unchecked": 3, "new": 0,
+        })
+        self.parent_item.child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.parent_item.child(2).setCheckState(0, QtCore.Qt.Checked)
+        self.parent_item.child(2).setCheckState(0, QtCore.Qt.Unchecked)
+        self.assertEqual(self.derive_counts(), {
+            "total": 3, "checked": 1, "unchecked": 2, "new": 0,
+        })
+
+    def test_added_removed(self):
+        self.derive_counts()
+        self.parent_item.child(1).setCheckState(0, QtCore.Qt.Checked)
+        self.parent_item.addChild(qtreewidget.CustomTreeWidgetItem(
+            None, u"d", is_new_item=True
+        ))
+        self.parent_item.takeChild(1)
+        self.assertEqual(self.derive_counts(), {
+            "total": 3, "checked": 0, "unchecked": 3, "new": 1,
+        })
+
+        self.parent_item.child(2).setData(0, qtreewidget.IsNewItemRole, False)
+        self.assertEqual(self.derive_counts()["new"], 0)
+
+    def test_plain_parent_counted(self):
+        parent_item = QtWidgets.QTreeWidgetItem([u"P"])
+        self.tree_widget.addTopLevelItem(parent_item)
+        parent_item.addChild(qtreewidget.CustomTreeWidgetItem(None, u"p"))
+        parent_item.child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(
+            self.tree_widget.derive_child_counts(parent_item)["checked"], 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
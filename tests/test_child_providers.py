@@ -0,0 +1,72 @@
+"""Behaviour tests of the lazily populated children of `CustomTreeWidget`
+and `CustomTreeView`, fetched from a per-item provider.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class ChildProviderTest(QtTestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def provider(self, name):
+        self.calls.append(name)
+        return [name + u"1", name + u"2"]
+
+    def test_widget_fetched_once_upon_expansion(self):
+        tree_widget = qtreewidget.CustomTreeWidget()
+        tree_widget.populate({u"A": [u"a"], u"Lazy": self.provider})
+        lazy_item = tree_widget.topLevelItem(1)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(lazy_item.childCount(), 0)
+        self.assertTrue(tree_widget.can_fetch_more(lazy_item))
+        self.assertEqual(tree_widget.derive_unloaded_items(), [lazy_item])
+
+        lazy_item.setExpanded(True)
+        lazy_item.setExpanded(False)
+        lazy_item.setExpanded(True)
+        self.assertEqual(self.calls, [u"Lazy"])
+        self.assertEqual(
+            [lazy_item.child(num).text(0) for num in range(2)],
+            [u"Lazy1", u"Lazy2"]
+        )
+        self.assertFalse(tree_widget.can_fetch_more(lazy_item))
+        self.assertFalse(tree_widget.fetch_more(lazy_item))
+
+    def test_widget_fetched_children_follow_check_state(self):
+        tree_widget = qtreewidget.CustomTreeWidget()
+        tree_widget.populate({u"Lazy": self.provider})
+        lazy_item = tree_widget.topLevelItem(0)
+        lazy_item.setCheckState(0, QtCore.Qt.Checked)
+        self.assertTrue(tree_widget.fetch_more(lazy_item))
+        self.assertEqual(
+            tree_widget.derive_tree_items("checked"),
+            {u"Lazy": [u"Lazy1", u"Lazy2"]}
+        )
+
+    def test_view_fetched_upon_expansion(self):
+        tree_view = qtreewidget.CustomTreeView()
+        tree_view.populate({u"Lazy": self.provider, u"B": [u"b"]})
+        model = tree_view.model()
+        lazy_index = model.index(0, 0)
+        self.assertTrue(model.hasChildren(lazy_index))
+        self.assertTrue(model.canFetchMore(lazy_index))
+        self.assertEqual(model.rowCount(lazy_index), 0)
+
+        # Fetched by the view, upon the layout of the expanded item
+        tree_view.show()
+        self.addCleanup(tree_view.close)
+        tree_view.setExpanded(lazy_index, True)
+        self.app.processEvents()
+        self.assertEqual(self.calls, [u"Lazy"])
+        self.assertEqual(model.rowCount(lazy_index), 2)
+        self.assertFalse(model.canFetchMore(lazy_index))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Behaviour tests of `contentsUpdate`, emitted once per event-loop turn
+with the change set of `CustomTreeWidget` and `CustomTreeView`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class ContentsUpdateTest(QtTestCase):
+
+    def create_tree(self, tree_class):
+        tree = tree_class()
+        tree.populate({u"A": [u"a", u"b", u"c"], u"B": [u"d"]})
+        self.app.processEvents()
+        changes = []
+        tree.contentsUpdate.connect(changes.append)
+        return tree, changes
+
+    def test_widget_changes_merged(self):
+        tree_widget, changes = self.create_tree(qtreewidget.CustomTreeWidget)
+        parent_item = tree_widget.topLevelItem(0)
+        parent_item.child(0).setText(0, u"z")
+        parent_item.child(1).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(changes, [])
+
+        self.app.processEvents()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]["renamed"], [(u"A/a", u"A/z")])
+        self.assertEqual(changes[0]["check_changed"], [u"A/b"])
+
+    def test_widget_moves_tracked(self):
+        tree_widget, changes = self.create_tree(qtreewidget.CustomTreeWidget)
+        parent_item = tree_widget.topLevelItem(0)
+        tree_widget.setCurrentItem(parent_item.child(0))
+        tree_widget.move_item("down")
+        self.app.processEvents()
+        self.assertEqual(changes[-1]["moved"], [u"A/a"])
+        self.assertEqual(changes[-1]["added"], [])
+        self.assertEqual(changes[-1]["removed"], [])
+
+        # An item replaced by another of the same name is not a move
+        parent_item.takeChild(2)
+        parent_item.addChild(qtreewidget.CustomTreeWidgetItem(None, u"c"))
+        self.app.processEvents()
+        self.assertEqual(changes[-1]["moved"], [])
+        self.assertEqual(changes[-1]["removed"], [u"A/c"])
+        self.assertEqual(changes[-1]["added"], [u"A/c"])
+
+    def test_view_changes_merged(self):
+        tree_view, changes = self.create_tree(qtreewidget.CustomTreeView)
+        model = tree_view.model()
+        parent_index = model.index(0, 0)
+        model.setData(model.index(0, 0, parent_index), u"y")
+        model.setData(model.index(1, 0, parent_index), u"z")
+
+        selection_model = tree_view.selectionModel()
+        selection_model.select(
+            model.index(1, 0),
+            QtCore.QItemSelectionModel.Select
+            | QtCore.QItemSelectionModel.Rows
+        )
+        tree_view.remove_selected_item()
+        self.assertEqual(changes, [])
+
+        self.app.processEvents()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(
+            changes[0]["renamed"], [(u"A/a", u"A/y"), (u"A/b", u"A/z")]
+        )
+        self.assertEqual(changes[0]["removed"], [u"B"])
+
+    def test_view_moves_tracked(self):
+        tree_view, changes = self.create_tree(qtreewidget.CustomTreeView)
+        model = tree_view.model()
+        tree_view.setCurrentIndex(model.index(2, 0, model.index(0, 0)))
+        tree_view.move_item("up")
+        self.app.processEvents()
+        self.assertEqual(changes[-1]["moved"], [u"A/c"])
+        self.assertEqual(
+            tree_view.derive_tree_items()[u"A"], [u"a", u"c", u"b"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Behaviour tests of the highlight styles of the rows painted by
+`CustomTreeDelegate`, including the search hits and the diff flags of
+`CustomTreeWidget`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class PaintedRowFlagsTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b", u"c"]})
+        self.parent_item = self.tree_widget.topLevelItem(0)
+
+        # One style attribute per category, to tell them apart
+        self.delegate = qtreewidget.CustomTreeDelegate(self.tree_widget)
+        self.delegate.set_highlight_rule(
+            qtreewidget.HIGHLIGHT_SEARCH_HIT, bold=True
+        )
+        self.delegate.set_highlight_rule(
+            qtreewidget.HIGHLIGHT_RENAMED, italic=True
+        )
+        self.delegate.set_highlight_rule(
+            qtreewidget.HIGHLIGHT_CHECK_CHANGED, background_color=QtCore.Qt.red
+        )
+        self.tree_widget.setItemDelegate(self.delegate)
+
+    def paint_style(self, item):
+        """Derive the style of the row of given item, as per the paint of the
+        view.
+
+        Returns:
+            tuple(bool, bool, bool): Bold, italic and red background.
+        """
+        option = QtWidgets.QStyleOptionViewItem()
+        option.widget = self.tree_widget
+        self.delegate.initStyleOption(
+            option, self.tree_widget.indexFromItem(item)
+        )
+        return (
+            option.font.bold(),
+            option.font.italic(),
+            option.backgroundBrush.color() == QtCore.Qt.red,
+        )
+
+    def test_search_hits_and_diff(self):
+        self.assertFalse(self.tree_widget.has_view_flags())
+        self.tree_widget.set_baseline()
+        self.parent_item.child(1).setText(0, u"bz")
+        self.tree_widget.set_filter_text(u"z")
+        self.assertTrue(self.tree_widget.has_view_flags())
+
+        self.assertEqual(
+            self.paint_style(self.parent_item.child(1)), (True, True, False)
+        )
+        self.assertEqual(
+            self.paint_style(self.parent_item.child(0)), (False, False, False)
+        )
+
+        # Styles follow the diff as the tree changes
+        self.parent_item.child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(
+            self.paint_style(self.parent_item.child(0)), (False, False, True)
+        )
+        self.parent_item.child(1).setText(0, u"b")
+        self.assertEqual(
+            self.paint_style(self.parent_item.child(1)), (False, False, False)
+        )
+
+    def test_stored_flags_without_view_flags(self):
+        self.parent_item.child(2).setText(0, u"z")
+        self.assertFalse(self.tree_widget.has_view_flags())
+        self.assertEqual(
+            self.paint_style(self.parent_item.child(2)), (False, True, False)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Behaviour tests of the results of `derive_tree_items`, for both
+`CustomTreeWidget` and `CustomTreeView`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class DeriveTreeItemsTest(QtTestCase):
+
+    def create_trees(self):
+        trees = []
+        for tree_class in (qtreewidget.CustomTreeWidget,
+                           qtreewidget.CustomTreeView):
+            tree = tree_class()
+            tree.populate({u"A": [u"a", u"b"], u"B": [u"c"]})
+            trees.append(tree)
+        return trees
+
+    def test_fresh_lists(self):
+        for tree in self.create_trees():
+            tree_items = tree.derive_tree_items()
+            self.assertEqual(tree_items, {u"A": [u"a", u"b"], u"B": [u"c"]})
+            self.assertEqual(list(tree_items), [u"A", u"B"])
+
+            # Changes to the results leave the next ones alone
+            tree_items[u"A"].append(u"z")
+            del tree_items[u"B"]
+            self.assertEqual(
+                tree.derive_tree_items(), {u"A": [u"a", u"b"], u"B": [u"c"]}
+            )
+
+    def test_modes(self):
+        tree_widget, tree_view = self.create_trees()
+        tree_widget.topLevelItem(0).child(1).setCheckState(
+            0, QtCore.Qt.Checked
+        )
+        model = tree_view.model()
+        model.setData(
+            model.index(1, 0, model.index(0, 0)), QtCore.Qt.Checked,
+            QtCore.Qt.CheckStateRole
+        )
+        for tree in (tree_widget, tree_view):
+            self.assertEqual(
+                tree.derive_tree_items("checked"), {u"A": [u"b"], u"B": []}
+            )
+            self.assertEqual(
+                tree.derive_tree_items("unchecked"),
+                {u"A": [u"a"], u"B": [u"c"]}
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
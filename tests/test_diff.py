@@ -0,0 +1,145 @@
+"""Behaviour tests of the diff against a baseline: `diff_snapshot_nodes`,
+and the diff of `CustomTreeWidget` kept up to date with its edits.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, make_node, qtreewidget
+
+
+class DiffSnapshotNodesTest(unittest.TestCase):
+
+    def diff(self, baseline_nodes, nodes):
+        changes = qtreewidget.diff_snapshot_nodes(baseline_nodes, nodes)
+        return dict((key, value) for key, value in changes.items() if value)
+
+    def test_unchanged(self):
+        nodes = [make_node("A", ["a", "b"], checked=["a"])]
+        self.assertEqual(self.diff(nodes, nodes), {})
+
+    def test_check_changed(self):
+        baseline = [make_node("A", ["a", "b"])]
+        nodes = [make_node("A", ["a", "b"], checked=["b"])]
+        self.assertEqual(
+            self.diff(baseline, nodes), {"check_changed": ["A/b"]}
+        )
+
+    def test_added_removed(self):
+        baseline = [make_node("A", ["a", "b"]), make_node("B", [])]
+        nodes = [make_node("A", ["a"]), make_node("C", ["x"])]
+        self.assertEqual(self.diff(baseline, nodes), {
+            "renamed": [("B", "C")],
+            "added": ["C/x"],
+            "removed": ["A/b"],
+        })
+
+    def test_renamed_in_place(self):
+        baseline = [make_node("A", ["a", "b", "c"])]
+        nodes = [make_node("A", ["a", "z", "c"], checked=["z"])]
+        self.assertEqual(self.diff(baseline, nodes), {
+            "renamed": [("A/b", "A/z")],
+            "check_changed": ["A/z"],
+        })
+
+    def test_moved_within_parent(self):
+        baseline = [make_node("A", ["a", "b", "c", "d"])]
+        nodes = [make_node("A", ["a", "c", "d", "b"])]
+        self.assertEqual(self.diff(baseline, nodes), {"moved": ["A/b"]})
+
+    def test_moved_across_parents(self):
+        baseline = [make_node("A", ["a", "b"], checked=["b"]),
+                    make_node("B", ["c"])]
+        nodes = [make_node("A", ["a"]), make_node("B", ["c", "b"])]
+        self.assertEqual(self.diff(baseline, nodes), {
+            "moved": ["B/b"],
+            "check_changed": ["B/b"],
+        })
+
+    def test_duplicate_names_paired_in_order(self):
+        baseline = [("A", 0, ["a", "x", "a"], bytearray([1, 0, 0]))]
+        nodes = [("A", 0, ["a", "a"], bytearray([1, 0]))]
+        self.assertEqual(self.diff(baseline, nodes), {"removed": ["A/x"]})
+
+    def test_children_diffs_reused(self):
+        baseline = [make_node("A", ["a", "b"]), make_node("B", ["c", "d"])]
+        nodes = list(baseline)
+        children_diffs = {}
+        changes = qtreewidget.diff_snapshot_nodes(
+            baseline, nodes, children_diffs
+        )
+        self.assertFalse(changes["check_changed"])
+        self.assertEqual(len(children_diffs), 2)
+
+        # Only the replaced node is paired again
+        cached_entry = children_diffs[(id(baseline[0]), id(nodes[0]))]
+        nodes[1] = make_node("B", ["d", "x"], checked=["d"])
+        changes = qtreewidget.diff_snapshot_nodes(
+            baseline, nodes, children_diffs
+        )
+        self.assertIs(
+            children_diffs[(id(baseline[0]), id(nodes[0]))], cached_entry
+        )
+        self.assertEqual(len(children_diffs), 2)
+        self.assertEqual(
+            changes, qtreewidget.diff_snapshot_nodes(baseline, nodes)
+        )
+        self.assertEqual(changes["removed"], ["B/c"])
+        self.assertEqual(changes["added"], ["B/x"])
+        self.assertEqual(changes["check_changed"], ["B/d"])
+
+        # Moves across parents are derived again from the cached pairings
+        nodes[0] = make_node("A", ["a", "c", "b"])
+        changes = qtreewidget.diff_snapshot_nodes(
+            baseline, nodes, children_diffs
+        )
+        self.assertEqual(
+            changes, qtreewidget.diff_snapshot_nodes(baseline, nodes)
+        )
+        self.assertEqual(changes["moved"], ["A/c"])
+
+
+class BaselineDiffTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b"], u"B": [u"c"]})
+        self.baseline_nodes = self.tree_widget.derive_snapshot_nodes()
+        self.tree_widget.set_baseline()
+
+    def derive_full_diff(self):
+        return qtreewidget.diff_snapshot_nodes(
+            self.baseline_nodes, self.tree_widget.derive_snapshot_nodes()
+        )
+
+    def test_edits_rediffed(self):
+        self.assertFalse(any(self.tree_widget.derive_diff().values()))
+
+        first_item = self.tree_widget.topLevelItem(0)
+        first_item.child(1).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(
+            self.tree_widget.derive_diff()["check_changed"], [u"A/b"]
+        )
+        self.assertEqual(
+            self.tree_widget.diff_flags(first_item.child(1)),
+            qtreewidget.HIGHLIGHT_CHECK_CHANGED
+        )
+        self.assertEqual(self.tree_widget.diff_flags(first_item.child(0)), 0)
+
+        self.tree_widget.topLevelItem(1).child(0).setText(0, u"z")
+        changes = self.tree_widget.derive_diff()
+        self.assertEqual(changes["renamed"], [(u"B/c", u"B/z")])
+        self.assertEqual(changes, self.derive_full_diff())
+
+    def test_cleared(self):
+        self.tree_widget.topLevelItem(0).child(0).setCheckState(
+            0, QtCore.Qt.Checked
+        )
+        self.tree_widget.clear_baseline()
+        self.assertFalse(self.tree_widget.has_baseline())
+        self.assertFalse(any(self.tree_widget.derive_diff().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
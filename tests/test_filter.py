@@ -0,0 +1,115 @@
+"""Behaviour tests of the search and the filter of `CustomTreeWidget` -
+`derive_matching_items()` and `set_filter_text()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class FilterTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.setSelectionMode(
+            QtWidgets.QAbstractItemView.ExtendedSelection
+        )
+        self.tree_widget.populate({
+            u"Alpha": [u"apple", u"banana", u"cherry"],
+            u"Beta": [u"bar", u"baz"],
+            u"Gamma": [u"grape"],
+        })
+
+    def derive_matching_names(self, text):
+        return sorted(
+            item.text(0)
+            for item in self.tree_widget.derive_matching_items(text)
+        )
+
+    def derive_visible_names(self):
+        names = []
+        for top_num in range(self.tree_widget.topLevelItemCount()):
+            top_level_item = self.tree_widget.topLevelItem(top_num)
+            if top_level_item.isHidden():
+                continue
+            names.append(top_level_item.text(0))
+            names.extend(
+                top_level_item.child(num).text(0)
+                for num in range(top_level_item.childCount())
+                if not top_level_item.child(num).isHidden()
+            )
+        return names
+
+    def test_growing_and_shrinking_text(self):
+        # Shorter than a trigram, then narrowed down as typed
+        self.assertEqual(
+            self.derive_matching_names(u"A"),
+            [u"Alpha", u"Beta", u"Gamma", u"apple", u"banana", u"bar",
+             u"baz", u"grape"]
+        )
+        self.assertEqual(
+            self.derive_matching_names(u"ba"), [u"banana", u"bar", u"baz"]
+        )
+        self.assertEqual(self.derive_matching_names(u"ban"), [u"banana"])
+        self.assertEqual(
+            self.derive_matching_names(u"ba"), [u"banana", u"bar", u"baz"]
+        )
+
+        # Edits in between are found by the next, longer text
+        self.tree_widget.topLevelItem(2).child(0).setText(0, u"bay")
+        self.assertEqual(
+            self.derive_matching_names(u"bay"), [u"bay"]
+        )
+
+    def test_filter_follows_edits(self):
+        self.tree_widget.set_filter_text(u"b")
+        self.tree_widget.set_filter_text(u"ba")
+        self.assertEqual(
+            self.derive_visible_names(),
+            [u"Alpha", u"banana", u"Beta", u"bar", u"baz"]
+        )
+
+        self.tree_widget.topLevelItem(0).child(2).setText(0, u"bat")
+        self.tree_widget.topLevelItem(1).child(1).setText(0, u"quux")
+        self.assertEqual(
+            self.derive_visible_names(),
+            [u"Alpha", u"banana", u"bat", u"Beta", u"bar"]
+        )
+
+    def test_index_refreshed_per_parent_after_bulk_edits(self):
+        self.tree_widget.derive_matching_items(u"a")
+
+        # Bulk removal of children, then of a top-level item and its children
+        model = self.tree_widget.model()
+        selection_model = self.tree_widget.selectionModel()
+        for index in (model.index(1, 0, model.index(0, 0)),
+                      model.index(2, 0)):
+            selection_model.select(index, QtCore.QItemSelectionModel.Select)
+        self.tree_widget.remove_selected_item()
+        self.assertEqual(self.derive_matching_names(u"an"), [])
+        self.assertEqual(self.derive_matching_names(u"ap"), [u"apple"])
+
+        # Fetched children are indexed
+        self.tree_widget.set_child_provider(
+            self.tree_widget.topLevelItem(1), lambda name: [u"banjo"]
+        )
+        self.tree_widget.fetch_more(self.tree_widget.topLevelItem(1))
+        self.assertEqual(self.derive_matching_names(u"ban"), [u"banjo"])
+
+        # Undone removal puts the items back into the index
+        self.tree_widget.set_undo_enabled()
+        selection_model.clearSelection()
+        selection_model.select(
+            model.index(0, 0, model.index(0, 0)),
+            QtCore.QItemSelectionModel.Select
+        )
+        self.tree_widget.remove_selected_item()
+        self.assertEqual(self.derive_matching_names(u"pp"), [])
+        self.tree_widget.undo()
+        self.assertEqual(self.derive_matching_names(u"pp"), [u"apple"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Behaviour tests of the opt-in signal and slot instrumentation of
+`CustomTreeWidget`.
+
+Usage:
+    python -m pytest tests
+"""
+import gc
+import unittest
+import weakref
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class InstrumentationTest(QtTestCase):
+
+    def test_timed_per_widget(self):
+        tree_widget = qtreewidget.CustomTreeWidget()
+        tree_widget.populate({"A": ["a", "b"]})
+        other = qtreewidget.CustomTreeWidget()
+        other.populate({"B": ["x"]})
+        tree_widget.set_instrumented(True)
+
+        tree_widget.topLevelItem(0).child(0).setCheckState(
+            0, QtCore.Qt.Checked
+        )
+        other.topLevelItem(0).child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.app.processEvents()
+        self.assertIn(
+            "CustomTreeWidgetItem.setData", tree_widget.stats()["slots"]
+        )
+        self.assertNotIn("CustomTreeWidgetItem.setData", other.stats()["slots"])
+        self.assertEqual(tree_widget.stats()["signals"]["itemsToggled"], 1)
+
+        tree_widget.set_instrumented(False)
+        self.assertFalse(tree_widget.is_instrumented())
+        self.assertEqual(qtreewidget._INSTRUMENTED_TREES, {})
+
+    def test_does_not_keep_widget_alive(self):
+        tree_widget = qtreewidget.CustomTreeWidget()
+        tree_widget.populate({"A": ["a"]})
+        tree_widget.set_instrumented(True)
+        tree_ref = weakref.ref(tree_widget)
+
+        del tree_widget
+        gc.collect()
+        self.assertIsNone(tree_ref())
+        self.assertEqual(qtreewidget._INSTRUMENTED_TREES, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
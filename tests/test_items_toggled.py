@@ -0,0 +1,57 @@
+"""Behaviour tests of the coalesced `itemsToggled` signal of
+`CustomTreeWidget`, and of its opt-in per-item `itemToggled`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class ItemsToggledTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b", u"c"]})
+        self.parent_item = self.tree_widget.topLevelItem(0)
+        self.emitted = []
+        self.tree_widget.itemsToggled.connect(self.emitted.append)
+        self.toggled = []
+        self.tree_widget.itemToggled.connect(
+            lambda item, column: self.toggled.append(item)
+        )
+
+    def test_emitted_once_per_turn(self):
+        first_item = self.parent_item.child(0)
+        last_item = self.parent_item.child(2)
+        last_item.setCheckState(0, QtCore.Qt.Checked)
+        first_item.setCheckState(0, QtCore.Qt.Checked)
+        last_item.setCheckState(0, QtCore.Qt.Unchecked)
+        self.assertEqual(self.emitted, [])
+
+        self.app.processEvents()
+        self.assertEqual(len(self.emitted), 1)
+        self.assertEqual(
+            [item.text(0) for item in self.emitted[0]], [u"c", u"a"]
+        )
+
+        self.app.processEvents()
+        self.assertEqual(len(self.emitted), 1)
+
+    def test_item_toggled_opt_in(self):
+        self.parent_item.child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(self.toggled, [])
+
+        self.tree_widget.emit_item_toggled = True
+        self.parent_item.child(1).setCheckState(0, QtCore.Qt.Checked)
+        self.assertEqual(self.toggled, [self.parent_item.child(1)])
+
+    def test_unchanged_state_not_reported(self):
+        self.parent_item.child(0).setCheckState(0, QtCore.Qt.Unchecked)
+        self.app.processEvents()
+        self.assertEqual(self.emitted, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Behaviour tests of the block moves of the selected items of
+`CustomTreeWidget` - `move_item_multi()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class MoveItemMultiTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.setSelectionMode(
+            QtWidgets.QAbstractItemView.ExtendedSelection
+        )
+        self.tree_widget.populate({
+            u"A": [u"a", u"b", u"c", u"d", u"e"], u"B": [u"f"], u"C": [],
+        })
+        self.model = self.tree_widget.model()
+
+    def select_rows(self, parent_index, rows):
+        selection = QtCore.QItemSelection()
+        for row in rows:
+            index = self.model.index(row, 0, parent_index)
+            selection.select(index, index)
+        self.tree_widget.selectionModel().select(
+            selection, QtCore.QItemSelectionModel.Select
+        )
+
+    def derive_selected_names(self):
+        return sorted(
+            item.text(0) for item in self.tree_widget.selectedItems()
+        )
+
+    def test_runs_moved_as_blocks(self):
+        self.select_rows(self.model.index(0, 0), [1, 2, 4])
+        self.tree_widget.move_item_multi("up")
+        self.assertEqual(
+            self.tree_widget.derive_tree_items()[u"A"],
+            [u"b", u"c", u"a", u"e", u"d"]
+        )
+        self.assertEqual(self.derive_selected_names(), [u"b", u"c", u"e"])
+
+        # Runs at the first row stay in place, the others go on moving
+        self.tree_widget.move_item_multi("up")
+        self.assertEqual(
+            self.tree_widget.derive_tree_items()[u"A"],
+            [u"b", u"c", u"e", u"a", u"d"]
+        )
+
+    def test_top_level_items_keep_children(self):
+        self.tree_widget.topLevelItem(0).setExpanded(True)
+        self.select_rows(QtCore.QModelIndex(), [0])
+        self.tree_widget.move_item_multi("down")
+        self.assertEqual(
+            list(self.tree_widget.derive_tree_items()), [u"B", u"A", u"C"]
+        )
+        self.assertEqual(self.tree_widget.topLevelItem(1).childCount(), 5)
+        self.assertTrue(self.tree_widget.topLevelItem(1).isExpanded())
+
+    def test_moves_undone(self):
+        self.tree_widget.set_undo_enabled()
+        expected = self.tree_widget.derive_tree_items()
+        self.select_rows(self.model.index(0, 0), [0, 1])
+        self.tree_widget.move_item_multi("down")
+        self.assertEqual(
+            self.tree_widget.derive_tree_items()[u"A"],
+            [u"c", u"a", u"b", u"d", u"e"]
+        )
+        self.tree_widget.undo()
+        self.assertEqual(self.tree_widget.derive_tree_items(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Behaviour tests of the name index of sibling items of `CustomTreeWidget`,
+kept up to date as items are added, removed and renamed.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtWidgets, qtreewidget
+
+
+class NameIndexTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b", u"b"], u"B": []})
+        self.parent_item = self.tree_widget.topLevelItem(0)
+
+    def test_added_removed(self):
+        names = self.tree_widget.derive_name_index(self.parent_item)
+        self.assertEqual(names, {u"a": 1, u"b": 2})
+
+        self.parent_item.addChild(qtreewidget.CustomTreeWidgetItem(None, u"c"))
+        self.parent_item.takeChild(0)
+        self.assertEqual(names, {u"b": 2, u"c": 1})
+        self.assertFalse(
+            self.tree_widget.is_existing_name(u"a", self.parent_item)
+        )
+        self.assertTrue(self.tree_widget.is_existing_name(u"B"))
+
+    def test_renamed_in_place(self):
+        names = self.tree_widget.derive_name_index(self.parent_item)
+        self.parent_item.child(1).setText(0, u"z")
+
+        # The index is updated rather than derived again
+        self.assertIs(
+            self.tree_widget.derive_name_index(self.parent_item), names
+        )
+        self.assertEqual(names, {u"a": 1, u"b": 1, u"z": 1})
+
+        self.tree_widget.topLevelItem(1).setText(0, u"C")
+        self.assertEqual(
+            self.tree_widget.derive_name_index(), {u"A": 1, u"C": 1}
+        )
+
+    def test_renamed_plain_item(self):
+        self.parent_item.addChild(QtWidgets.QTreeWidgetItem([u"p"]))
+        self.assertTrue(
+            self.tree_widget.is_existing_name(u"p", self.parent_item)
+        )
+        self.parent_item.child(3).setText(0, u"q")
+        self.assertEqual(
+            self.tree_widget.derive_name_index(self.parent_item),
+            {u"a": 1, u"b": 2, u"q": 1}
+        )
+
+    def test_changes_of_all_roles(self):
+        tree_items = self.tree_widget.derive_tree_items()
+        self.tree_widget.derive_name_index(self.parent_item)
+        model = self.tree_widget.model()
+        index = model.index(0, 0, model.index(0, 0))
+
+        # Renamed behind the back of the caches, then reported with no roles
+        signals_blocked = model.blockSignals(True)
+        QtWidgets.QTreeWidgetItem.setData(
+            self.parent_item.child(0), 0, 0, u"x"
+        )
+        model.blockSignals(signals_blocked)
+        self.assertEqual(self.tree_widget.derive_tree_items(), tree_items)
+        model.dataChanged.emit(index, index, [])
+
+        self.assertEqual(
+            self.tree_widget.derive_tree_items()[u"A"], [u"x", u"b", u"b"]
+        )
+        self.assertFalse(
+            self.tree_widget.is_existing_name(u"a", self.parent_item)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
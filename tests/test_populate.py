@@ -0,0 +1,49 @@
+"""Behaviour tests of the one-pass population of `CustomTreeWidget` and
+`CustomTreeView` - `populate()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, qtreewidget
+
+
+class PopulateTest(QtTestCase):
+
+    def test_formats(self):
+        for tree_class in (qtreewidget.CustomTreeWidget,
+                           qtreewidget.CustomTreeView):
+            tree = tree_class()
+            tree.populate({u"A": [u"a", u"b"], u"B": []})
+            self.assertEqual(
+                tree.derive_tree_items(), {u"A": [u"a", u"b"], u"B": []}
+            )
+
+            # Pages are flattened into their parents
+            tree.populate({u"page": {u"C": [u"c"]}})
+            self.assertEqual(tree.derive_tree_items(), {u"C": [u"c"]})
+
+    def test_merged_into_existing_parents(self):
+        for tree_class in (qtreewidget.CustomTreeWidget,
+                           qtreewidget.CustomTreeView):
+            tree = tree_class()
+            tree.populate({u"A": [u"a"]})
+            tree.populate({u"A": [u"b"], u"B": [u"c"]}, replace=False)
+            self.assertEqual(
+                tree.derive_tree_items(), {u"A": [u"a", u"b"], u"B": [u"c"]}
+            )
+
+    def test_no_item_signals(self):
+        tree_widget = qtreewidget.CustomTreeWidget()
+        changed_items = []
+        tree_widget.itemChanged.connect(
+            lambda item, column: changed_items.append(item)
+        )
+        tree_widget.populate({u"A": [u"a", u"b"]})
+        self.assertEqual(changed_items, [])
+        self.assertEqual(tree_widget.topLevelItem(0).childCount(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Behaviour tests of the string table of custom_qlistwidget.
+
+Runs under the `offscreen` QPA platform unless `QT_QPA_PLATFORM` is set.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+for directory in ("qTreeWidget", "qListWidget"):
+    sys.path.insert(0, os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", directory
+    ))
+
+import custom_qlistwidget as qlistwidget
+from custom_qlistwidget import QtCore, QtWidgets
+
+
+class CustomListModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (
+            QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        )
+
+    def setUp(self):
+        self.model = qlistwidget.CustomListModel()
+        self.model.set_items([u"a", u"", u"été", u"d"])
+
+    def item_texts(self):
+        return [
+            self.model.item_text(row) for row in range(self.model.rowCount())
+        ]
+
+    def test_offsets_are_32_bit(self):
+        self.assertEqual(self.model._starts.itemsize, 4)
+        self.assertEqual(len(self.model._starts), 4)
+
+    def test_texts(self):
+        self.model.add_items([u"\U0001f600", u"f"])
+        self.assertEqual(
+            self.item_texts(),
+            [u"a", u"", u"été", u"d", u"\U0001f600", u"f"]
+        )
+
+    def test_rename_appends_then_compacts(self):
+        index = self.model.index(2, 0)
+        self.assertTrue(self.model.setData(index, u"renamed"))
+        self.assertEqual(self.item_texts(), [u"a", u"", u"renamed", u"d"])
+
+        for num in range(20):
+            self.model.setData(index, u"renamed {0}".format(num))
+        self.assertEqual(self.model.item_text(2), u"renamed 19")
+        self.assertLessEqual(
+            len(self.model._table), 2 * self.model._text_size
+        )
+
+    def test_remove_rows(self):
+        self.model.setData(
+            self.model.index(3, 0), QtCore.Qt.Checked, QtCore.Qt.CheckStateRole
+        )
+        self.assertTrue(self.model.removeRows(1, 2))
+        self.assertEqual(self.item_texts(), [u"a", u"d"])
+        self.assertEqual(
+            [self.model.is_checked(row) for row in range(2)], [False, True]
+        )
+        self.assertEqual(self.model._text_size, 4)
+        self.assertFalse(self.model.removeRows(1, 2))
+
+    def test_table_size_limited(self):
+        # Stands for the 4GB addressed by the offsets
+        max_table_size = qlistwidget._MAX_TABLE_SIZE
+        self.addCleanup(
+            setattr, qlistwidget, "_MAX_TABLE_SIZE", max_table_size
+        )
+        qlistwidget._MAX_TABLE_SIZE = 18
+
+        # Table of "a", "", "été" and "d", with their ends
+        self.assertEqual(len(self.model._table), 11)
+        with self.assertRaises(ValueError):
+            self.model.add_items([u"12345", u"6"])
+        with self.assertRaises(ValueError):
+            self.model.set_items([u"x" * 18])
+        self.assertEqual(self.model.rowCount(), 4)
+        self.model.add_items([u"1234", u"5"])
+        self.assertEqual(len(self.model._table), 18)
+
+        with self.assertLogs(qlistwidget.LOGGER, "ERROR"):
+            self.assertFalse(
+                self.model.setData(self.model.index(0, 0), u"abc")
+            )
+
+        # Texts of the removed rows are dropped to make room
+        self.model.removeRows(4, 1)
+        self.assertTrue(self.model.setData(self.model.index(0, 0), u"abc"))
+        self.assertEqual(
+            self.item_texts(), [u"abc", u"", u"été", u"d", u"5"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
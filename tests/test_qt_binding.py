@@ -0,0 +1,73 @@
+"""Behaviour tests of the lazy binding layer `qt_binding`, shipped next to
+each widget module.
+
+Usage:
+    python -m pytest tests
+"""
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+import tree_test_case
+
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Imports a widget module and creates a widget, in a fresh interpreter
+IMPORT_SCRIPT = """
+import {0} as module
+from {0} import QtWidgets
+app = QtWidgets.QApplication([])
+module.{1}()
+"""
+
+
+class QtBindingTest(unittest.TestCase):
+
+    def run_alone(self, directory, module_name, class_name):
+        """Import given module with only its own directory on the path.
+
+        Returns:
+            int: Exit code of the interpreter.
+        """
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        env.pop("PYTHONPATH", None)
+        return subprocess.call(
+            [sys.executable, "-c",
+             IMPORT_SCRIPT.format(module_name, class_name)],
+            cwd=os.path.join(ROOT_DIR, directory), env=env
+        )
+
+    def test_copies_identical(self):
+        contents = []
+        for directory in ("qTreeWidget", "qListWidget"):
+            file_path = os.path.join(ROOT_DIR, directory, "qt_binding.py")
+            with io.open(file_path, encoding="utf-8") as file_object:
+                contents.append(file_object.read())
+        self.assertEqual(contents[0], contents[1])
+
+    def test_directories_importable_alone(self):
+        self.assertEqual(
+            self.run_alone(
+                "qListWidget", "custom_qlistwidget", "CustomListWidget"
+            ), 0
+        )
+        self.assertEqual(
+            self.run_alone(
+                "qTreeWidget", "custom_qtreewidget_Qt4Compatible",
+                "CustomTreeWidget"
+            ), 0
+        )
+
+    def test_qt4_module_shares_widgets(self):
+        import custom_qtreewidget_Qt4Compatible
+        self.assertIs(
+            custom_qtreewidget_Qt4Compatible.CustomTreeWidget,
+            tree_test_case.qtreewidget.CustomTreeWidget
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
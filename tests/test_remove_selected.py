@@ -0,0 +1,85 @@
+"""Behaviour tests of the bulk removal of the selected items of
+`CustomTreeWidget` - `remove_selected_item()`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class RemoveSelectedItemTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.setSelectionMode(
+            QtWidgets.QAbstractItemView.ExtendedSelection
+        )
+        self.child_names = [u"c{0}".format(num) for num in range(30)]
+        self.tree_widget.populate({
+            u"A": self.child_names, u"B": [u"b"], u"C": [u"c"],
+        })
+
+    def select_rows(self, parent_index, rows):
+        model = self.tree_widget.model()
+        selection = QtCore.QItemSelection()
+        for row in rows:
+            index = model.index(row, 0, parent_index)
+            selection.select(index, index)
+        self.tree_widget.selectionModel().select(
+            selection, QtCore.QItemSelectionModel.Select
+        )
+
+    def test_runs_removed(self):
+        model = self.tree_widget.model()
+        # Beyond `_TAKE_CHILD_LIMIT`, as well as a few rows
+        for rows in ([0, 1, 2, 7, 8, 20, 29] + list(range(10, 15)),
+                     [3, 5]):
+            self.tree_widget.clearSelection()
+            self.select_rows(model.index(0, 0), rows)
+            expected = [
+                name for num, name in enumerate(self.child_names)
+                if num not in rows
+            ]
+            self.tree_widget.remove_selected_item()
+            self.assertEqual(
+                self.tree_widget.derive_tree_items()[u"A"], expected
+            )
+            self.child_names = expected
+
+    def test_removal_undone(self):
+        self.tree_widget.set_undo_enabled()
+        expected = self.tree_widget.derive_tree_items()
+        model = self.tree_widget.model()
+        self.select_rows(model.index(0, 0), range(0, 30, 3))
+        self.select_rows(QtCore.QModelIndex(), [1])
+        self.tree_widget.remove_selected_item()
+        self.assertEqual(
+            list(self.tree_widget.derive_tree_items()), [u"A", u"C"]
+        )
+        self.assertEqual(len(self.tree_widget.derive_tree_items()[u"A"]), 20)
+
+        self.tree_widget.undo()
+        self.assertEqual(self.tree_widget.derive_tree_items(), expected)
+
+    def test_nested_items_left_out(self):
+        child_item = self.tree_widget.topLevelItem(0).child(2)
+        child_item.addChild(QtWidgets.QTreeWidgetItem([u"nested"]))
+        model = self.tree_widget.model()
+
+        # Row 0 of the child at row 2, not row 0 of the top-level row 2
+        self.select_rows(self.tree_widget.indexFromItem(child_item), [0])
+        self.assertEqual(dict(self.tree_widget.derive_selected_rows()), {})
+        self.tree_widget.remove_selected_item()
+        self.assertEqual(self.tree_widget.derive_tree_items()[u"C"], [u"c"])
+        self.assertEqual(child_item.childCount(), 1)
+
+        self.select_rows(model.index(0, 0), [0])
+        self.assertEqual(
+            dict(self.tree_widget.derive_selected_rows()), {0: [0]}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
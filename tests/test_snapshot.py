@@ -0,0 +1,125 @@
+"""Behaviour tests of the binary snapshots: the file format, and the save/
+load of `CustomTreeWidget` and `CustomTreeView`.
+
+Usage:
+    python -m pytest tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, make_node, qtreewidget
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "tree.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        nodes = [
+            make_node(u"A", [u"a", u"été"], checked=[u"a"],
+                      flags=qtreewidget._SNAPSHOT_EXPANDED_BIT),
+            make_node(u"Empty", []),
+            (u"B", qtreewidget._NEW_BIT, [u"b"],
+             bytearray([qtreewidget._NEW_BIT | qtreewidget._CHECKED_BIT])),
+        ]
+        qtreewidget.write_snapshot(self.file_path, nodes)
+        self.assertEqual(qtreewidget.read_snapshot(self.file_path), nodes)
+
+    def test_names_holding_nul(self):
+        nodes = [make_node(u"A\0B", [u"a\0", u"b"])]
+        qtreewidget.write_snapshot(self.file_path, nodes)
+        self.assertEqual(qtreewidget.read_snapshot(self.file_path), nodes)
+
+    def test_invalid_files(self):
+        with open(self.file_path, "wb") as snapshot_file:
+            snapshot_file.write(b"")
+        self.assertRaises(
+            ValueError, qtreewidget.read_snapshot, self.file_path
+        )
+
+        with open(self.file_path, "wb") as snapshot_file:
+            snapshot_file.write(b"NOTASNAPSHOT" * 4)
+        self.assertRaises(
+            ValueError, qtreewidget.read_snapshot, self.file_path
+        )
+
+        # Truncated sections
+        qtreewidget.write_snapshot(
+            self.file_path, [make_node(u"A", [u"a", u"b"])]
+        )
+        with open(self.file_path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+        with open(self.file_path, "wb") as snapshot_file:
+            snapshot_file.write(data[:-3])
+        self.assertRaises(
+            ValueError, qtreewidget.read_snapshot, self.file_path
+        )
+
+
+class SaveLoadSnapshotTest(QtTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "tree.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_unloaded_parents_fetched(self):
+        expected = {
+            u"A": [u"a", u"b"], u"Lazy": [u"Lazy1", u"Lazy2"], u"Empty": [],
+        }
+        for tree_class in (qtreewidget.CustomTreeWidget,
+                           qtreewidget.CustomTreeView):
+            tree = tree_class()
+            tree.populate({
+                u"A": [u"a", u"b"],
+                u"Lazy": lambda name: [name + u"1", name + u"2"],
+                u"Empty": [],
+            })
+            tree.save_snapshot(self.file_path)
+
+            loaded_tree = tree_class()
+            loaded_tree.load_snapshot(self.file_path)
+            self.assertEqual(
+                dict(
+                    (name, list(children)) for name, children in
+                    loaded_tree.derive_tree_items().items()
+                ),
+                expected
+            )
+
+    def test_widget_states_kept(self):
+        tree = qtreewidget.CustomTreeWidget()
+        tree.populate({u"A": [u"a", u"b"], u"B": [u"c"]})
+        tree.topLevelItem(0).child(1).setCheckState(0, QtCore.Qt.Checked)
+        tree.topLevelItem(1).setExpanded(True)
+        tree.topLevelItem(1).child(0).setData(
+            0, qtreewidget.IsNewItemRole, True
+        )
+        tree.save_snapshot(self.file_path)
+
+        loaded_tree = qtreewidget.CustomTreeWidget()
+        loaded_tree.load_snapshot(self.file_path)
+        first_item = loaded_tree.topLevelItem(0)
+        second_item = loaded_tree.topLevelItem(1)
+        self.assertEqual(
+            [first_item.child(num).checkState(0) for num in range(2)],
+            [QtCore.Qt.Unchecked, QtCore.Qt.Checked]
+        )
+        self.assertFalse(first_item.isExpanded())
+        self.assertTrue(second_item.isExpanded())
+        is_new_role = qtreewidget.IsNewItemRole
+        self.assertFalse(first_item.child(0).data(0, is_new_role))
+        self.assertTrue(second_item.child(0).data(0, is_new_role))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Behaviour tests of the streaming of the tree contents: the JSON token
+reader, and the export/ import of `CustomTreeWidget` and `CustomTreeView`.
+
+Usage:
+    python -m pytest tests
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class JsonTokenReaderTest(unittest.TestCase):
+
+    def read_tokens(self, text, chunk_size):
+        reader = qtreewidget._JsonTokenReader(io.StringIO(text), chunk_size)
+        tokens = []
+        while True:
+            token = reader.next_token()
+            if token == (True, None):
+                return tokens
+            tokens.append(token)
+
+    def test_tokens_cut_by_chunks(self):
+        text = u'{"parent": ["child 1", 12345, -1.5e3, true, null]}'
+        expected = [
+            (True, u"{"), (False, u"parent"), (True, u":"), (True, u"["),
+            (False, u"child 1"), (True, u","), (False, 12345), (True, u","),
+            (False, -1500.0), (True, u","), (False, True), (True, u","),
+            (False, None), (True, u"]"), (True, u"}"),
+        ]
+        for chunk_size in (1, 2, 3, 7, 64):
+            self.assertEqual(self.read_tokens(text, chunk_size), expected)
+
+    def test_number_at_end_of_file(self):
+        self.assertEqual(self.read_tokens(u" 1234", 2), [(False, 1234)])
+
+    def test_malformed(self):
+        self.assertRaises(ValueError, self.read_tokens, u'["unterminated', 4)
+        self.assertRaises(ValueError, self.read_tokens, u"[tru]", 2)
+
+    def test_expect(self):
+        reader = qtreewidget._JsonTokenReader(io.StringIO(u'{"a"'), 2)
+        reader.expect(u"{")
+        self.assertRaises(ValueError, reader.expect, u":")
+
+    def test_records(self):
+        reader = qtreewidget._JsonTokenReader(
+            io.StringIO(u'{"A": ["a", "b"], "B": [], "page": {"C": ["c"]}}'),
+            3
+        )
+        reader.expect(u"{")
+        self.assertEqual(list(qtreewidget._iter_json_records(reader)), [
+            (u"A", u"a", None), (u"A", u"b", None), (u"B", None, None),
+            (u"C", u"c", None),
+        ])
+
+
+class ExportImportTest(QtTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def round_trip(self, tree_class, file_name):
+        tree = tree_class()
+        tree.populate({
+            u"A": [u"a", u"b"],
+            u"Lazy": lambda name: [name + u"1", name + u"2"],
+            u"Empty": [],
+        })
+        file_path = os.path.join(self.temp_dir, file_name)
+        tree.export_tree_items(file_path)
+
+        imported_tree = tree_class()
+        imported_tree.import_tree_items(file_path)
+        return imported_tree
+
+    def test_unloaded_parents_fetched(self):
+        expected = {
+            u"A": [u"a", u"b"], u"Lazy": [u"Lazy1", u"Lazy2"], u"Empty": [],
+        }
+        for tree_class in (qtreewidget.CustomTreeWidget,
+                           qtreewidget.CustomTreeView):
+            for file_name in ("tree.json", "tree.ndjson"):
+                imported_tree = self.round_trip(tree_class, file_name)
+                self.assertEqual(
+                    dict(
+                        (name, list(children)) for name, children in
+                        imported_tree.derive_tree_items().items()
+                    ),
+                    expected
+                )
+
+    def test_check_states_kept(self):
+        tree = qtreewidget.CustomTreeWidget()
+        tree.populate({u"A": [u"a", u"b"]})
+        tree.topLevelItem(0).child(1).setCheckState(0, QtCore.Qt.Checked)
+        file_path = os.path.join(self.temp_dir, "tree.ndjson")
+        self.assertEqual(tree.export_tree_items(file_path), 2)
+
+        imported_tree = qtreewidget.CustomTreeView()
+        imported_tree.import_tree_items(file_path)
+        self.assertEqual(
+            list(imported_tree.iter_tree_items("checked")),
+            [(u"A", u"b", QtCore.Qt.Checked)]
+        )
+
+    def test_iter_without_fetch(self):
+        tree = qtreewidget.CustomTreeWidget()
+        tree.populate({u"Lazy": lambda name: [u"x"]})
+        self.assertEqual(
+            [record[:2] for record in tree.iter_tree_items()],
+            [(u"Lazy", None)]
+        )
+        self.assertEqual(
+            [record[:2] for record in tree.iter_tree_items(fetch=True)],
+            [(u"Lazy", u"x")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Behaviour tests of the menu of the tree items, `TreeMenuModel`, kept up
+to date with its `CustomTreeWidget`, including the check states bound both
+ways.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+class TreeMenuModelTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({
+            u"A": [u"a", u"b", u"c"], u"B": [u"d"], u"C": [],
+        })
+        self.app.processEvents()
+        self.menu_model = qtreewidget.TreeMenuModel(self.tree_widget)
+        self.menu = self.menu_model.menu()
+
+    def show_menu(self):
+        """Refresh the menu as upon showing it.
+
+        Returns:
+            list(QCustomMenu): Submenus of the top-level items.
+        """
+        self.app.processEvents()
+        self.menu.aboutToShow.emit()
+        return [action.menu() for action in self.menu.actions()]
+
+    def show_submenu(self, row):
+        """Refresh the submenu at given row, as upon showing it.
+
+        Returns:
+            list(str): Texts of its actions.
+        """
+        submenu = self.show_menu()[row]
+        submenu.aboutToShow.emit()
+        return [action.text() for action in submenu.actions()]
+
+    def test_submenus_built_upon_show(self):
+        submenus = self.show_menu()
+        self.assertEqual(
+            [submenu.title() for submenu in submenus], [u"A", u"B", u"C"]
+        )
+        self.assertEqual(submenus[0].actions(), [])
+
+        self.assertEqual(self.show_submenu(0), [u"a", u"b", u"c"])
+        self.assertTrue(all(
+            isinstance(action, qtreewidget.QSubAction)
+            for action in submenus[0].actions()
+        ))
+        self.assertEqual(self.show_submenu(2), [])
+
+    def test_renamed_in_place(self):
+        self.show_submenu(0)
+        submenu = self.show_menu()[0]
+        actions = submenu.actions()
+
+        self.tree_widget.topLevelItem(0).child(1).setText(0, u"z")
+        self.tree_widget.topLevelItem(0).setText(0, u"Y")
+        self.assertEqual(self.show_submenu(0), [u"a", u"z", u"c"])
+        self.assertEqual(submenu.actions(), actions)
+        self.assertIs(self.show_menu()[0], submenu)
+        self.assertEqual(submenu.title(), u"Y")
+
+    def test_rebuilt_upon_added_removed_items(self):
+        self.show_submenu(0)
+        parent_item = self.tree_widget.topLevelItem(0)
+        kept_submenu = self.show_menu()[1]
+
+        parent_item.addChild(qtreewidget.CustomTreeWidgetItem(None, u"e"))
+        parent_item.removeChild(parent_item.child(0))
+        self.assertEqual(self.show_submenu(0), [u"b", u"c", u"e"])
+
+        # Submenus are kept for the remaining top-level items
+        self.tree_widget.takeTopLevelItem(2)
+        self.tree_widget.insertTopLevelItem(
+            0, qtreewidget.CustomTreeWidgetItem(None, u"D")
+        )
+        submenus = self.show_menu()
+        self.assertEqual(
+            [submenu.title() for submenu in submenus], [u"D", u"A", u"B"]
+        )
+        self.assertIs(submenus[2], kept_submenu)
+
+    def test_large_submenus_virtualized(self):
+        self.menu_model.virtual_entry_count = 2
+        self.assertEqual(self.show_submenu(1), [u"d"])
+
+        self.show_submenu(0)
+        entries = self.show_menu()[0].virtual_entries()
+        self.assertIsNotNone(entries)
+        self.assertEqual(entries.entry_count(), 3)
+        self.assertTrue(all(
+            isinstance(action, QtWidgets.QWidgetAction)
+            for action in self.show_menu()[0].actions()
+        ))
+
+
+class TreeMenuCheckStatesTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b", u"c"]})
+        self.parent_item = self.tree_widget.topLevelItem(0)
+        self.parent_item.child(1).setCheckState(0, QtCore.Qt.Checked)
+        self.app.processEvents()
+        self.menu_model = qtreewidget.TreeMenuModel(self.tree_widget)
+
+    def show_submenu(self):
+        """Refresh the submenu of the top-level item, as upon showing it.
+
+        Returns:
+            QCustomMenu: Submenu of the top-level item.
+        """
+        self.app.processEvents()
+        menu = self.menu_model.menu()
+        menu.aboutToShow.emit()
+        submenu = menu.actions()[0].menu()
+        submenu.aboutToShow.emit()
+        return submenu
+
+    def derive_checked_rows(self, submenu):
+        entries = submenu.virtual_entries()
+        if entries is None:
+            return [
+                row for row, action in enumerate(submenu.actions())
+                if action.isChecked()
+            ]
+        return [
+            row for row in range(entries.entry_count())
+            if entries.is_entry_checked(row)
+        ]
+
+    def test_actions_bound_both_ways(self):
+        submenu = self.show_submenu()
+        self.assertEqual(self.derive_checked_rows(submenu), [1])
+
+        # Tree to menu
+        self.parent_item.child(0).setCheckState(0, QtCore.Qt.Checked)
+        self.parent_item.child(1).setCheckState(0, QtCore.Qt.Unchecked)
+        self.app.processEvents()
+        self.assertEqual(self.derive_checked_rows(submenu), [0])
+
+        # Menu to tree, without being echoed back
+        toggled = []
+        self.tree_widget.itemsToggled.connect(toggled.append)
+        submenu.actions()[2].setChecked(True)
+        self.assertEqual(
+            self.parent_item.child(2).checkState(0), QtCore.Qt.Checked
+        )
+        self.app.processEvents()
+        self.assertEqual(toggled, [[self.parent_item.child(2)]])
+        self.assertEqual(self.derive_checked_rows(submenu), [0, 2])
+
+    def test_virtual_entries_bound_both_ways(self):
+        self.menu_model.virtual_entry_count = 2
+        submenu = self.show_submenu()
+        entries = submenu.virtual_entries()
+        self.assertEqual(self.derive_checked_rows(submenu), [1])
+
+        self.tree_widget.check_all()
+        self.app.processEvents()
+        self.assertEqual(self.derive_checked_rows(submenu), [0, 1, 2])
+
+        entries.entryToggled.emit(0, False)
+        self.assertEqual(
+            self.parent_item.child(0).checkState(0), QtCore.Qt.Unchecked
+        )
+
+    def test_removed_items_unbound(self):
+        submenu = self.show_submenu()
+        removed_item = self.parent_item.takeChild(2)
+        action = submenu.actions()[2]
+
+        # Toggled before the submenu is rebuilt
+        action.setChecked(True)
+        self.assertEqual(removed_item.checkState(0), QtCore.Qt.Unchecked)
+
+        submenu = self.show_submenu()
+        self.assertEqual(len(submenu.actions()), 2)
+        self.tree_widget.uncheck_all()
+        self.app.processEvents()
+        self.assertEqual(self.derive_checked_rows(submenu), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
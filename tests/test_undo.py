@@ -0,0 +1,130 @@
+"""Behaviour tests of the undo/ redo of `CustomTreeWidget` edits, and of its
+memory-bounded journal.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, qtreewidget
+
+
+class UndoJournalTest(unittest.TestCase):
+
+    def test_entry_per_event_loop_turn(self):
+        journal = qtreewidget._UndoJournal()
+        rename = (qtreewidget._UNDO_RENAME, -1, 0, u"a", u"b")
+        self.assertTrue(journal.record(rename))
+        self.assertFalse(journal.record(rename))
+        self.assertTrue(journal.close())
+        self.assertFalse(journal.close())
+
+        self.assertEqual(len(journal.undo_entries), 1)
+        self.assertEqual(journal.undo_entries[0].commands, [rename, rename])
+        self.assertEqual(journal.size, journal.undo_entries[0].size)
+
+    def test_check_toggles_packed_and_merged(self):
+        journal = qtreewidget._UndoJournal()
+        journal.record_check(0, 1, 0, 2)
+        journal.record_checks(0, [2, 3], [0, 0], [2, 2])
+        journal.close()
+        journal.record_check(1, 0, 2, 0)
+        journal.close()
+
+        # Consecutive check-only entries make a single one
+        self.assertEqual(len(journal.undo_entries), 1)
+        commands = journal.undo_entries[0].commands
+        self.assertEqual(len(commands), 2)
+        kind, parent_rows, rows, old_states, new_states = commands[0]
+        self.assertEqual(kind, qtreewidget._UNDO_CHECK)
+        self.assertEqual(list(parent_rows), [0, 0, 0])
+        self.assertEqual(list(rows), [1, 2, 3])
+        self.assertEqual(old_states, bytearray([0, 0, 0]))
+        self.assertEqual(new_states, bytearray([2, 2, 2]))
+
+    def test_check_toggles_not_merged_with_edits(self):
+        journal = qtreewidget._UndoJournal()
+        journal.record((qtreewidget._UNDO_RENAME, -1, 0, u"a", u"b"))
+        journal.close()
+        journal.record_check(0, 0, 0, 2)
+        journal.close()
+        self.assertEqual(len(journal.undo_entries), 2)
+
+    def test_new_edit_drops_redo(self):
+        journal = qtreewidget._UndoJournal()
+        journal.record((qtreewidget._UNDO_RENAME, -1, 0, u"a", u"b"))
+        journal.close()
+        entry = journal.undo_entries.pop()
+        journal.push(entry, journal.redo_entries)
+        self.assertEqual(len(journal.redo_entries), 1)
+
+        journal.record((qtreewidget._UNDO_RENAME, -1, 0, u"b", u"c"))
+        journal.close()
+        self.assertEqual(len(journal.redo_entries), 0)
+        self.assertEqual(journal.size, journal.undo_entries[0].size)
+
+    def test_oldest_entries_evicted(self):
+        journal = qtreewidget._UndoJournal()
+        for num in range(3):
+            journal.record((qtreewidget._UNDO_RENAME, -1, num, u"a", u"b"))
+            journal.close()
+        entry_size = journal.undo_entries[0].size
+        journal.max_bytes = entry_size * 2
+        journal.evict()
+
+        self.assertEqual(len(journal.undo_entries), 2)
+        self.assertEqual(
+            [entry.commands[0][2] for entry in journal.undo_entries], [1, 2]
+        )
+        self.assertLessEqual(journal.size, journal.max_bytes)
+
+    def test_clear(self):
+        journal = qtreewidget._UndoJournal()
+        journal.record_check(0, 0, 0, 2)
+        journal.clear()
+        self.assertIsNone(journal.open_entry)
+        self.assertFalse(journal.close())
+        self.assertEqual(journal.size, 0)
+
+
+class UndoRedoTest(QtTestCase):
+
+    def setUp(self):
+        self.tree_widget = qtreewidget.CustomTreeWidget()
+        self.tree_widget.populate({u"A": [u"a", u"b"], u"B": [u"c"]})
+        self.tree_widget.set_undo_enabled()
+
+    def test_rename_and_check(self):
+        child_item = self.tree_widget.topLevelItem(0).child(1)
+        child_item.setText(0, u"z")
+        self.tree_widget.undo()
+        self.assertEqual(child_item.text(0), u"b")
+        self.tree_widget.redo()
+        self.assertEqual(child_item.text(0), u"z")
+
+        child_item.setCheckState(0, QtCore.Qt.Checked)
+        self.assertTrue(self.tree_widget.undo())
+        self.assertEqual(child_item.checkState(0), QtCore.Qt.Unchecked)
+        self.assertTrue(self.tree_widget.can_redo())
+
+    def test_removal_undone_as_one(self):
+        expected = self.tree_widget.derive_tree_items()
+        first_item = self.tree_widget.topLevelItem(0)
+        first_item.takeChild(1)
+        first_item.takeChild(0)
+        self.assertEqual(self.tree_widget.derive_tree_items()[u"A"], [])
+
+        self.assertTrue(self.tree_widget.undo())
+        self.assertEqual(self.tree_widget.derive_tree_items(), expected)
+        self.assertFalse(self.tree_widget.can_undo())
+
+    def test_populate_drops_journal(self):
+        self.tree_widget.topLevelItem(0).child(0).setText(0, u"z")
+        self.assertTrue(self.tree_widget.can_undo())
+        self.tree_widget.populate({u"C": []})
+        self.assertFalse(self.tree_widget.can_undo())
+        self.assertFalse(self.tree_widget.undo())
+
+
+if __name__ == "__main__":
+    unittest.main()
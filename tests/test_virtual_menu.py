@@ -0,0 +1,94 @@
+"""Behaviour tests of the virtualized mode of `QCustomMenu` -
+`set_virtual_entries()` and `VirtualMenuEntries`.
+
+Usage:
+    python -m pytest tests
+"""
+import unittest
+
+from tree_test_case import QtTestCase, QtCore, QtWidgets, qtreewidget
+
+
+NAMES = [u"Apple", u"banana", u"Bar", u"cherry", u"grape", u"BARLEY"]
+
+
+class VirtualMenuEntriesTest(QtTestCase):
+
+    def setUp(self):
+        self.menu = qtreewidget.QCustomMenu(u"Menu")
+        self.menu.addAction(qtreewidget.QSubAction(u"old", self.menu))
+        self.entries = self.menu.set_virtual_entries(
+            NAMES, bytearray([0, 1, 0, 0, 0, 0])
+        )
+        self.toggled = []
+        self.menu.entryToggled.connect(
+            lambda row, checked: self.toggled.append((row, checked))
+        )
+
+    def filter_names(self, text):
+        self.entries.set_filter_text(text)
+        return [NAMES[row] for row in self.entries.derive_matching_rows()]
+
+    def test_single_widget_action(self):
+        actions = self.menu.actions()
+        self.assertEqual(len(actions), 1)
+        self.assertIsInstance(actions[0], QtWidgets.QWidgetAction)
+        self.assertIs(actions[0].defaultWidget(), self.entries)
+        self.assertEqual(self.entries.entry_count(), len(NAMES))
+
+        self.menu.clear()
+        self.assertIsNone(self.menu.virtual_entries())
+
+    def test_filter_as_typed(self):
+        self.assertFalse(self.entries.is_indexed())
+        self.assertEqual(
+            self.filter_names(u"b"), [u"banana", u"Bar", u"BARLEY"]
+        )
+        self.assertEqual(self.filter_names(u"bar"), [u"Bar", u"BARLEY"])
+        self.assertEqual(self.filter_names(u"barl"), [u"BARLEY"])
+        self.assertEqual(self.filter_names(u"a"), [
+            u"Apple", u"banana", u"Bar", u"grape", u"BARLEY"
+        ])
+        self.assertEqual(self.filter_names(u""), NAMES)
+
+        # Same matches once indexed
+        while not self.entries.is_indexed():
+            self.app.processEvents()
+        self.assertEqual(self.filter_names(u"ar"), [u"Bar", u"BARLEY"])
+        self.assertEqual(self.filter_names(u"rry"), [u"cherry"])
+
+    def test_partly_indexed(self):
+        model = self.entries.findChild(QtWidgets.QListView).model()
+        model.index_batch_size = 2
+        model.start_indexing()
+        self.app.processEvents()
+        self.assertFalse(self.entries.is_indexed())
+        self.assertEqual(self.filter_names(u"bar"), [u"Bar", u"BARLEY"])
+
+    def test_renamed_entries_filtered_again(self):
+        self.assertEqual(self.filter_names(u"gr"), [u"grape"])
+        self.entries.rename_entry(3, u"greengage")
+        self.assertEqual(self.entries.derive_matching_rows(), [4])
+
+        # Not narrowed down from the matches before renaming
+        self.entries.set_filter_text(u"gre")
+        self.assertEqual(self.entries.derive_matching_rows(), [3])
+
+    def test_toggled_from_keyboard(self):
+        view = self.entries.findChild(QtWidgets.QListView)
+        self.filter_names(u"an")
+        view.setCurrentIndex(view.model().index(0, 0))
+        QtWidgets.QApplication.sendEvent(view, qtreewidget.QtGui.QKeyEvent(
+            QtCore.QEvent.KeyPress, QtCore.Qt.Key_Space, QtCore.Qt.NoModifier
+        ))
+        self.assertEqual(self.toggled, [(1, False)])
+        self.assertFalse(self.entries.is_entry_checked(1))
+
+        # Set without being reported
+        self.entries.set_entry_checked(4, True)
+        self.assertTrue(self.entries.is_entry_checked(4))
+        self.assertEqual(self.toggled, [(1, False)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Shared setup of the behaviour tests of the tree and list widgets.
+
+The widget directories are put onto `sys.path`, and Qt runs under the
+`offscreen` QPA platform unless `QT_QPA_PLATFORM` is set.
+"""
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+for _directory in ("qTreeWidget", "qListWidget"):
+    sys.path.insert(0, os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", _directory
+    ))
+
+import custom_qtreewidget_Qt5Compatible as qtreewidget
+from custom_qtreewidget_Qt5Compatible import QtCore, QtWidgets
+
+
+def make_node(name, children, checked=(), flags=0):
+    """Create a snapshot node, as per `read_snapshot`.
+
+    Args:
+        name (str): Name of the top-level item.
+        children (list(str)): Names of the child items.
+
+    Keyword Args:
+        checked (iterable(str)): Names of the checked children.
+        flags (int): Flags of the top-level item.
+
+    Returns:
+        tuple: `(name, flags, child_names, child_states)`.
+    """
+    checked = set(checked)
+    states = bytearray(
+        qtreewidget._CHECKED_BIT if child in checked else 0
+        for child in children
+    )
+    return (name, flags, list(children), states)
+
+
+class QtTestCase(unittest.TestCase):
+    """Test case running a `QApplication`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = (
+            QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        )